@@ -8,16 +8,26 @@ import multiprocessing as mp
 import queue
 import time
 
-from pymavlink import mavutil
-
 from modules.common.modules.logger import logger
 from modules.common.modules.logger import logger_main_setup
 from modules.common.modules.read_yaml import read_yaml
 from modules.command import command
 from modules.command import command_worker
+from modules.command import fleet_command_worker
+from modules.command import geofence
+from modules.command import mission
+from modules.command import state_predictor
+from modules.connection import connection_factory
+from modules.connection import link_manager
+from modules.connection import outbound_channel
+from modules.connection import reconnecting_connection
+from modules.connection import outbound_writer_worker
 from modules.heartbeat import heartbeat_receiver_worker
 from modules.heartbeat import heartbeat_sender_worker
-from modules.telemetry import telemetry_worker
+from modules.telemetry import streaming_telemetry_worker
+from modules.telemetry import telemetry_decimator
+from modules.telemetry import telemetry_decimator_worker
+from utilities.workers import partitioned_queue
 from utilities.workers import queue_proxy_wrapper
 from utilities.workers import worker_controller
 from utilities.workers import worker_manager
@@ -25,6 +35,28 @@ from utilities.workers import worker_manager
 
 # MAVLink connection
 CONNECTION_STRING = "tcp:localhost:12345"
+SOCKET_OPTIONS = connection_factory.SocketOptions(
+    tcp_nodelay=True,
+    receive_buffer_size=1 << 20,  # bytes, absorbs telemetry bursts
+    send_buffer_size=1 << 16,  # bytes
+    keepalive=True,
+    keepalive_idle=5,  # seconds
+    keepalive_interval=1,  # seconds
+    keepalive_count=3,
+    low_latency=True,
+)
+RECONNECT_MAX_BACKOFF = 5.0  # seconds
+# Drain the socket a chunk at a time instead of a system call per message
+BULK_READ = True
+# Redundant links to the same drone (e.g. a backup radio at "udpin:0.0.0.0:14550")
+BACKUP_CONNECTION_STRINGS: "list[str]" = []
+LINK_STALL_TIMEOUT = 0.25  # seconds
+# TelemetryData per second, None to forward on every ATTITUDE or LOCAL_POSITION_NED update
+TELEMETRY_OUTPUT_RATE: float | None = None
+# Interpolate position and attitude to a common timestamp instead of pairing the latest of each
+TELEMETRY_ALIGNED = True
+# (idle, active, paused) ATTITUDE and LOCAL_POSITION_NED rates to request, None to leave as is
+TELEMETRY_STREAM_RATES: "tuple[float, float, float] | None" = (2.0, 20.0, 0.5)
 
 # =================================================================================================
 #                            ↓ BOOTCAMPERS MODIFY BELOW THIS COMMENT ↓
@@ -33,17 +65,68 @@ CONNECTION_STRING = "tcp:localhost:12345"
 TELEMETRY_QUEUE_SIZE = 10
 HEARTBEAT_QUEUE_SIZE = 5
 COMMAND_QUEUE_SIZE = 5
+COMMAND_TELEMETRY_QUEUE_SIZE = 5
+TELEMETRY_MONITOR_QUEUE_SIZE = 5
+COMMAND_ACK_QUEUE_SIZE = 10
+BREACH_QUEUE_SIZE = 20
+OUTBOUND_QUEUE_SIZE = 20
+# Seconds after creation that telemetry is dropped at dequeue, None to keep everything
+TELEMETRY_DEADLINE: float | None = 0.2
+COMMAND_TELEMETRY_DEADLINE: float | None = 0.2
 
 # Set worker counts
 HEARTBEAT_SENDER_WORKER_COUNT = 1
 HEARTBEAT_RECEIVER_WORKER_COUNT = 1
 TELEMETRY_WORKER_COUNT = 1
+TELEMETRY_DECIMATOR_WORKER_COUNT = 1  # Must be 1, periods are kept per worker
+# One partition each, telemetry and ACKs are routed by system ID so a vehicle sticks to a worker
 COMMAND_WORKER_COUNT = 1
+OUTBOUND_WRITER_WORKER_COUNT = 1  # Must be 1, the writer owns all outbound traffic
 
 # Any other constants
 HEARTBEAT_PERIOD = 1.0  # seconds
+# Wait on heartbeats and declare disconnection once the phi accrual suspicion crosses
+# the threshold, instead of polling every period and counting misses
+HEARTBEAT_EVENT_DRIVEN = True
+HEARTBEAT_PHI_THRESHOLD = 8.0
+# Output heartbeat state changes only, with a summary every so often (None for no summary)
+HEARTBEAT_EDGE_TRIGGERED = True
+HEARTBEAT_SUMMARY_PERIOD: float | None = 30.0  # seconds
+# Track each system and component heard from (gimbals, companion computers, other vehicles)
+HEARTBEAT_TRACK_ENDPOINTS = True
+HEARTBEAT_ENDPOINT_TIMEOUT = 5.0  # seconds
 TARGET_POSITION = command.Position(0.0, 0.0, 10.0)  # Example target position
 MAIN_LOOP_DURATION = 100  # seconds
+# Telemetry per second for each consumer, None for every sample
+COMMAND_TELEMETRY_RATE: float | None = 10.0
+TELEMETRY_MONITOR_RATE: float | None = 1.0
+# Decide on telemetry extrapolated to now, None to decide on the state as received
+COMMAND_PREDICTOR: state_predictor.PredictorKind | None = state_predictor.PredictorKind.KALMAN
+# Hold back repeats of a command until it is acknowledged, retrying unacknowledged ones
+COMMAND_ACK_TRACKING = True
+COMMAND_ACK_TIMEOUT = 1.0  # seconds
+# Decide on the newest queued telemetry only, instead of working through a backlog
+COMMAND_LATEST_WINS = True
+# Target of each vehicle by MAVLink system ID, commands every vehicle at once instead of
+# TARGET_POSITION for a single one when set.
+FLEET_TARGETS: "dict[int, command.Position]" = {}
+# CSV of x,y,z waypoints to fly instead of TARGET_POSITION, None to hold the target
+MISSION_FILE: str | None = None
+MISSION_ACCEPTANCE_RADIUS = 1.0  # m
+# Off the active leg by more than this, the mission is rejoined at the nearest waypoint
+MISSION_REJOIN_DISTANCE = 20.0  # m
+# Steer towards the point this far along the active leg, which pulls the vehicle back onto it
+MISSION_LOOK_AHEAD = 5.0  # m
+# Zones checked before every command, None for no fence
+GEOFENCE_ZONES: list[geofence.GeofenceZone] | None = None
+GEOFENCE_CELL_SIZE = 10.0  # m
+# Outbound message type: (messages per second, burst) to each target system
+OUTBOUND_RATE_LIMITS = {
+    "COMMAND_LONG": (5.0, 5.0),
+    "HEARTBEAT": (2.0, 2.0),
+}
+# Messages held back by the rate limits before the oldest is dropped, room for every vehicle
+OUTBOUND_MAX_PENDING = 100 + 2 * len(FLEET_TARGETS)
 
 # =================================================================================================
 #                            ↑ BOOTCAMPERS MODIFY ABOVE THIS COMMENT ↑
@@ -77,7 +160,30 @@ def main() -> int:
     # To test, you will run each of your workers individually to see if they work
     # (test "drones" are provided for you test your workers)
     # NOTE: If you want to have type annotations for the connection, it is of type mavutil.mavfile
-    connection = mavutil.mavlink_connection(CONNECTION_STRING)
+    if len(BACKUP_CONNECTION_STRINGS) > 0:
+        # Merged inbound streams, outbound over the best link
+        result, connection = link_manager.LinkManager.create(
+            [CONNECTION_STRING] + BACKUP_CONNECTION_STRINGS,
+            SOCKET_OPTIONS,
+            main_logger,
+            stall_timeout=LINK_STALL_TIMEOUT,
+        )
+    else:
+        # The connection re-dials by itself if the drone restarts
+        result, connection = reconnecting_connection.ReconnectingConnection.create(
+            CONNECTION_STRING,
+            SOCKET_OPTIONS,
+            main_logger,
+            max_backoff=RECONNECT_MAX_BACKOFF,
+            bulk_read=BULK_READ,
+        )
+    if not result:
+        main_logger.error("Failed to create connection")
+        return -1
+
+    # Get Pylance to stop complaining
+    assert connection is not None
+
     connection.wait_heartbeat(timeout=30)  # Wait for the "drone" to connect
 
     # =============================================================================================
@@ -89,17 +195,67 @@ def main() -> int:
     # Create a multiprocess manager for synchronized queues
     mp_manager = mp.Manager()
 
+    # Receiving workers report link health to the outbound writer, which picks the link
+    if isinstance(connection, link_manager.LinkManager):
+        connection.share_health(mp_manager.dict())
+    # Only the outbound writer re-dials, the other processes re-open after it has
+    if isinstance(connection, reconnecting_connection.ReconnectingConnection):
+        connection.share_state(mp_manager.dict())
+
     # Create queues
-    telemetry_queue = queue_proxy_wrapper.QueueProxyWrapper(mp_manager, TELEMETRY_QUEUE_SIZE)
+    telemetry_queue = queue_proxy_wrapper.QueueProxyWrapper(
+        mp_manager, TELEMETRY_QUEUE_SIZE, TELEMETRY_DEADLINE
+    )
     heartbeat_queue = queue_proxy_wrapper.QueueProxyWrapper(mp_manager, HEARTBEAT_QUEUE_SIZE)
+    # Current connection state, for reading whenever instead of from the queue
+    heartbeat_state = mp_manager.Value(str, "Disconnected")
     command_queue = queue_proxy_wrapper.QueueProxyWrapper(mp_manager, COMMAND_QUEUE_SIZE)
+    # Breaches have their own queue so they are never stuck behind commands
+    breach_queue = queue_proxy_wrapper.QueueProxyWrapper(mp_manager, BREACH_QUEUE_SIZE)
+    command_telemetry_queue = partitioned_queue.PartitionedQueue(
+        [
+            queue_proxy_wrapper.QueueProxyWrapper(
+                mp_manager, COMMAND_TELEMETRY_QUEUE_SIZE, COMMAND_TELEMETRY_DEADLINE
+            )
+            for _ in range(COMMAND_WORKER_COUNT)
+        ],
+        "system_id",
+    )
+    telemetry_monitor_queue = queue_proxy_wrapper.QueueProxyWrapper(
+        mp_manager, TELEMETRY_MONITOR_QUEUE_SIZE
+    )
+    command_ack_queue = partitioned_queue.PartitionedQueue(
+        [
+            queue_proxy_wrapper.QueueProxyWrapper(mp_manager, COMMAND_ACK_QUEUE_SIZE)
+            for _ in range(COMMAND_WORKER_COUNT)
+        ],
+        "system_id",
+    )
+    outbound_queue = queue_proxy_wrapper.QueueProxyWrapper(mp_manager, OUTBOUND_QUEUE_SIZE)
+
+    # Everything that sends goes through the outbound writer instead of writing to the socket
+    outbound_connection = outbound_channel.OutboundChannel(connection, outbound_queue)
 
     # Create worker properties for each worker type (what inputs it takes, how many workers)
+    # Outbound writer
+    result, outbound_writer_properties = worker_manager.WorkerProperties.create(
+        count=OUTBOUND_WRITER_WORKER_COUNT,
+        target=outbound_writer_worker.outbound_writer_worker,
+        work_arguments=(connection, OUTBOUND_RATE_LIMITS, OUTBOUND_MAX_PENDING),
+        input_queues=[outbound_queue],
+        output_queues=[],
+        controller=controller,
+        local_logger=main_logger,
+    )
+    if not result:
+        main_logger.error("Failed to create outbound writer properties")
+        return -1
+
     # Heartbeat sender
     result, heartbeat_sender_properties = worker_manager.WorkerProperties.create(
         count=HEARTBEAT_SENDER_WORKER_COUNT,
         target=heartbeat_sender_worker.heartbeat_sender_worker,
-        work_arguments=(connection, HEARTBEAT_PERIOD),
+        work_arguments=(outbound_connection, HEARTBEAT_PERIOD),
         input_queues=[],
         output_queues=[],
         controller=controller,
@@ -110,10 +266,19 @@ def main() -> int:
         return -1
 
     # Heartbeat receiver
+    heartbeat_receiver_args = heartbeat_receiver_worker.HeartbeatReceiverArgs(
+        HEARTBEAT_EVENT_DRIVEN,
+        HEARTBEAT_PHI_THRESHOLD,
+        edge_triggered=HEARTBEAT_EDGE_TRIGGERED,
+        summary_period=HEARTBEAT_SUMMARY_PERIOD,
+        state_slot=heartbeat_state,
+        track_endpoints=HEARTBEAT_TRACK_ENDPOINTS,
+        endpoint_timeout=HEARTBEAT_ENDPOINT_TIMEOUT,
+    )
     result, heartbeat_receiver_properties = worker_manager.WorkerProperties.create(
         count=HEARTBEAT_RECEIVER_WORKER_COUNT,
         target=heartbeat_receiver_worker.heartbeat_receiver_worker,
-        work_arguments=(connection, HEARTBEAT_PERIOD),
+        work_arguments=(connection, HEARTBEAT_PERIOD, heartbeat_receiver_args),
         input_queues=[],
         output_queues=[heartbeat_queue],
         controller=controller,
@@ -126,10 +291,15 @@ def main() -> int:
     # Telemetry
     result, telemetry_properties = worker_manager.WorkerProperties.create(
         count=TELEMETRY_WORKER_COUNT,
-        target=telemetry_worker.telemetry_worker,
-        work_arguments=(connection, None),  # args object placeholder
+        target=streaming_telemetry_worker.streaming_telemetry_worker,
+        work_arguments=(
+            outbound_connection,
+            TELEMETRY_OUTPUT_RATE,
+            TELEMETRY_ALIGNED,
+            TELEMETRY_STREAM_RATES,
+        ),
         input_queues=[],
-        output_queues=[telemetry_queue],
+        output_queues=[telemetry_queue, command_ack_queue],
         controller=controller,
         local_logger=main_logger,
     )
@@ -137,21 +307,94 @@ def main() -> int:
         main_logger.error("Failed to create telemetry properties")
         return -1
 
-    # Command
-    result, command_properties = worker_manager.WorkerProperties.create(
-        count=COMMAND_WORKER_COUNT,
-        target=command_worker.command_worker,
-        work_arguments=(connection, TARGET_POSITION, None),  # args object placeholder
+    # Telemetry decimator
+    result, telemetry_decimator_properties = worker_manager.WorkerProperties.create(
+        count=TELEMETRY_DECIMATOR_WORKER_COUNT,
+        target=telemetry_decimator_worker.telemetry_decimator_worker,
+        work_arguments=(
+            [
+                telemetry_decimator.DecimatorOutput(
+                    command_telemetry_queue,
+                    COMMAND_TELEMETRY_RATE,
+                    telemetry_decimator.DecimationMode.LATEST,
+                ),
+                telemetry_decimator.DecimatorOutput(
+                    telemetry_monitor_queue,
+                    TELEMETRY_MONITOR_RATE,
+                    telemetry_decimator.DecimationMode.ENVELOPE,
+                ),
+            ],
+        ),
         input_queues=[telemetry_queue],
-        output_queues=[command_queue],
+        output_queues=[],
         controller=controller,
         local_logger=main_logger,
     )
     if not result:
-        main_logger.error("Failed to create command properties")
+        main_logger.error("Failed to create telemetry decimator properties")
         return -1
 
+    # Command, one worker per partition
+    mission_waypoints = None
+    if MISSION_FILE is not None:
+        mission_waypoints = [
+            tuple(point) for point in mission.load_waypoints(MISSION_FILE).tolist()
+        ]
+
+    command_properties_list = []
+    for partition in range(COMMAND_WORKER_COUNT):
+        if FLEET_TARGETS:
+            command_target = fleet_command_worker.fleet_command_worker
+            command_arguments = (
+                outbound_connection,
+                FLEET_TARGETS,
+                fleet_command_worker.FleetCommandWorkerArgs(
+                    GEOFENCE_ZONES, GEOFENCE_CELL_SIZE, breach_queue
+                ),
+            )
+        else:
+            command_target = command_worker.command_worker
+            command_arguments = (
+                outbound_connection,
+                TARGET_POSITION,
+                command_worker.CommandWorkerArgs(
+                    COMMAND_PREDICTOR,
+                    command_ack_queue.partitions[partition] if COMMAND_ACK_TRACKING else None,
+                    COMMAND_ACK_TIMEOUT,
+                    waypoints=mission_waypoints,
+                    acceptance_radius=MISSION_ACCEPTANCE_RADIUS,
+                    rejoin_distance=MISSION_REJOIN_DISTANCE,
+                    look_ahead=MISSION_LOOK_AHEAD,
+                    geofence_zones=GEOFENCE_ZONES,
+                    geofence_cell_size=GEOFENCE_CELL_SIZE,
+                    latest_wins=COMMAND_LATEST_WINS,
+                    breach_queue=breach_queue,
+                ),
+            )
+
+        result, command_properties = worker_manager.WorkerProperties.create(
+            count=1,
+            target=command_target,
+            work_arguments=command_arguments,
+            input_queues=[command_telemetry_queue.partitions[partition]],
+            output_queues=[command_queue],
+            controller=controller,
+            local_logger=main_logger,
+        )
+        if not result:
+            main_logger.error("Failed to create command properties")
+            return -1
+
+        command_properties_list.append(command_properties)
+
     # Create the workers (processes) and obtain their managers
+    result, outbound_writer_manager = worker_manager.WorkerManager.create(
+        outbound_writer_properties, main_logger
+    )
+    if not result:
+        main_logger.error("Failed to create outbound writer manager")
+        return -1
+
     result, heartbeat_sender_manager = worker_manager.WorkerManager.create(
         heartbeat_sender_properties, main_logger
     )
@@ -173,16 +416,32 @@ def main() -> int:
         main_logger.error("Failed to create telemetry manager")
         return -1
 
-    result, command_manager = worker_manager.WorkerManager.create(command_properties, main_logger)
+    result, telemetry_decimator_manager = worker_manager.WorkerManager.create(
+        telemetry_decimator_properties, main_logger
+    )
     if not result:
-        main_logger.error("Failed to create command manager")
+        main_logger.error("Failed to create telemetry decimator manager")
         return -1
 
+    command_managers = []
+    for command_properties in command_properties_list:
+        result, command_manager = worker_manager.WorkerManager.create(
+            command_properties, main_logger
+        )
+        if not result:
+            main_logger.error("Failed to create command manager")
+            return -1
+
+        command_managers.append(command_manager)
+
     # Start worker processes
+    outbound_writer_manager.start_workers()
     heartbeat_sender_manager.start_workers()
     heartbeat_receiver_manager.start_workers()
     telemetry_manager.start_workers()
-    command_manager.start_workers()
+    telemetry_decimator_manager.start_workers()
+    for command_manager in command_managers:
+        command_manager.start_workers()
 
     main_logger.info("Started")
 
@@ -204,6 +463,16 @@ def main() -> int:
             except queue.Empty:
                 pass
 
+            # Read every breach first
+            while True:
+                try:
+                    breach = breach_queue.queue.get_nowait()
+                except queue.Empty:
+                    break
+
+                if breach is not None:
+                    main_logger.error(f"{breach}")
+
             # Read from command queue
             try:
                 command_data = command_queue.queue.get(timeout=0.1)
@@ -212,6 +481,14 @@ def main() -> int:
             except queue.Empty:
                 pass
 
+            # Read from telemetry monitor queue
+            try:
+                telemetry_envelope = telemetry_monitor_queue.queue.get_nowait()
+                if telemetry_envelope is not None:
+                    main_logger.info(f"Telemetry: {telemetry_envelope}")
+            except queue.Empty:
+                pass
+
             # Small delay to prevent busy waiting
             time.sleep(0.1)
 
@@ -219,13 +496,20 @@ def main() -> int:
             main_logger.info("Keyboard interrupt received")
             break
 
+    main_logger.info(f"Heartbeat state at exit: {heartbeat_state.value}")
+
     # Stop the processes
     controller.request_exit()
 
     main_logger.info("Requested exit")
 
     # Fill and drain queues from END TO START
+    outbound_queue.fill_queue_with_sentinel()
     command_queue.fill_queue_with_sentinel()
+    breach_queue.fill_queue_with_sentinel()
+    telemetry_monitor_queue.fill_queue_with_sentinel()
+    command_telemetry_queue.fill_queue_with_sentinel()
+    command_ack_queue.fill_queue_with_sentinel()
     telemetry_queue.fill_queue_with_sentinel()
     heartbeat_queue.fill_queue_with_sentinel()
 
@@ -233,19 +517,32 @@ def main() -> int:
     time.sleep(0.5)
 
     # Drain queues
+    outbound_queue.drain_queue()
     command_queue.drain_queue()
+    breach_queue.drain_queue()
+    telemetry_monitor_queue.drain_queue()
+    command_telemetry_queue.drain_queue()
+    command_ack_queue.drain_queue()
     telemetry_queue.drain_queue()
     heartbeat_queue.drain_queue()
 
     main_logger.info("Queues cleared")
 
     # Clean up worker processes
-    command_manager.join_workers()
+    for command_manager in command_managers:
+        command_manager.join_workers()
+    telemetry_decimator_manager.join_workers()
     telemetry_manager.join_workers()
     heartbeat_receiver_manager.join_workers()
     heartbeat_sender_manager.join_workers()
+    outbound_writer_manager.join_workers()
 
     main_logger.info("Stopped")
+    if isinstance(connection, link_manager.LinkManager):
+        for link_statistics in connection.get_statistics():
+            main_logger.info(f"Link {link_statistics}")
+    else:
+        main_logger.info(f"Connection {connection.get_metrics()}")
 
     # We can reset controller in case we want to reuse it
     # Alternatively, create a new WorkerController instance
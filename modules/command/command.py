@@ -3,10 +3,17 @@ Decision-making logic.
 """
 
 import math
+import time
 from typing import Tuple, Union
 
 from pymavlink import mavutil
 
+from utilities.statistics import running_statistics
+from . import command_decision
+from . import command_tracker
+from . import geofence
+from . import mission
+from . import state_predictor
 from ..common.modules.logger import logger
 from ..telemetry import telemetry
 
@@ -25,6 +32,19 @@ class Position:
 # =================================================================================================
 #                            ↓ BOOTCAMPERS MODIFY BELOW THIS COMMENT ↓
 # =================================================================================================
+class _SystemState:
+    """
+    Estimate, average velocity and fence state of one system.
+    """
+
+    def __init__(self, predictor_kind: state_predictor.PredictorKind | None) -> None:
+        self.predictor = (
+            None if predictor_kind is None else state_predictor.StatePredictor(predictor_kind)
+        )
+        self.velocity_statistics = running_statistics.CumulativeStatistics(3)
+        self.breached = False
+
+
 class Command:  # pylint: disable=too-many-instance-attributes
     """
     Command class to make a decision based on recieved telemetry,
@@ -33,16 +53,29 @@ class Command:  # pylint: disable=too-many-instance-attributes
 
     __private_key = object()
 
+    # Commanded when the telemetry does not say which system it is from
+    DEFAULT_TARGET_SYSTEM = 1
+
     @classmethod
     def create(
         cls,
         connection: mavutil.mavfile,
         target: Position,
         local_logger: logger.Logger,
+        predictor_kind: state_predictor.PredictorKind | None = None,
+        tracker: command_tracker.CommandTracker | None = None,
+        waypoints: mission.Mission | None = None,
+        fence: geofence.Geofence | None = None,
     ) -> Tuple[bool, Union["Command", None]]:
         """
         Falliable create (instantiation) method to create a Command object.
 
+        predictor_kind: Decide on the state extrapolated to now instead of the received state,
+            with a predictor of this kind for each system.
+        tracker: Send through it so a command is not repeated while one is awaiting its ACK.
+        waypoints: Fly its active leg instead of heading for the fixed target.
+        fence: Hold commands while the position breaches it.
+
         Returns:
             tuple[bool, Command | None]: A tuple containing:
                 - success: True if creation was successful, False otherwise
@@ -63,7 +96,16 @@ class Command:  # pylint: disable=too-many-instance-attributes
                 return False, None
 
             # Create the Command object
-            command = cls(cls.__private_key, connection, target, local_logger)
+            command = cls(
+                cls.__private_key,
+                connection,
+                target,
+                local_logger,
+                predictor_kind,
+                tracker,
+                waypoints,
+                fence,
+            )
             local_logger.info("Command object created successfully")
             return True, command
 
@@ -78,27 +120,44 @@ class Command:  # pylint: disable=too-many-instance-attributes
         connection: mavutil.mavfile,
         target: Position,
         local_logger: logger.Logger,
+        predictor_kind: state_predictor.PredictorKind | None,
+        tracker: command_tracker.CommandTracker | None,
+        waypoints: mission.Mission | None,
+        fence: geofence.Geofence | None,
     ) -> None:
         assert key is Command.__private_key, "Use create() method"
         self.connection = connection
         self.target = target
         self.logger = local_logger
-        self.velocity_history = []
+        self.predictor_kind = predictor_kind
+        self.tracker = tracker
+        self.mission = waypoints
+        self.fence = fence
+        # Telemetry of a partition can come from several systems, None if it does not say
+        self.systems: "dict[int | None, _SystemState]" = {}
+
+    def fold(self, telemetry_data: telemetry.TelemetryData) -> None:
+        """
+        Count a sample that is skipped without deciding towards the average velocity,
+        and the state estimate if predicting.
+        """
+        self.__estimate(telemetry_data)
 
     def run(self, telemetry_data: telemetry.TelemetryData) -> None:
         """
         Make a decision based on received telemetry data.
+
+        Returns a geofence.BreachEvent instead when the position starts breaching the fence,
+        and nothing is commanded until it is back inside.
         """
         # ----------------- AVERAGE VELOCITY -----------------
         # Calculate average velocity first, before any command logic
-        vx, vy, vz = telemetry_data.x_velocity, telemetry_data.y_velocity, telemetry_data.z_velocity
-        self.velocity_history.append((vx, vy, vz))
-        avg_vx = sum(v[0] for v in self.velocity_history) / len(self.velocity_history)
-        avg_vy = sum(v[1] for v in self.velocity_history) / len(self.velocity_history)
-        avg_vz = sum(v[2] for v in self.velocity_history) / len(self.velocity_history)
-        self.logger.info(f"AVERAGE VELOCITY: ({avg_vx}, {avg_vy}, {avg_vz})")
-
-        # Use COMMAND_LONG (76) message, assume the target_system=1 and target_componenet=0
+        system, telemetry_data = self.__estimate(telemetry_data)
+        avg_vx, avg_vy, avg_vz = system.velocity_statistics.mean
+        source = "" if telemetry_data.system_id is None else f"SYSTEM {telemetry_data.system_id} "
+        self.logger.info(f"{source}AVERAGE VELOCITY: ({avg_vx}, {avg_vy}, {avg_vz})")
+
+        # Use COMMAND_LONG (76) message to the system the telemetry is from and target_componenet=0
         # The appropriate commands to use are instructed below
 
         # Adjust height using the comand MAV_CMD_CONDITION_CHANGE_ALT (113)
@@ -108,52 +167,137 @@ class Command:  # pylint: disable=too-many-instance-attributes
         # String to return to main: "CHANGING_YAW: {degree you changed it by in range [-180, 180]}"
         # Positive angle is counter-clockwise as in a right handed system
 
-        delta_z = self.target.z - telemetry_data.z
-        if abs(delta_z) > 0.5:
+        if self.fence is not None:
+            breach = self.fence.check(
+                telemetry_data.x, telemetry_data.y, telemetry_data.z, telemetry_data.system_id
+            )
+            if breach is not None:
+                if system.breached:
+                    return None
+
+                system.breached = True
+                self.logger.error(str(breach))
+                return breach
+
+            if system.breached:
+                system.breached = False
+                self.logger.info(f"{source}GEOFENCE CLEARED")
+
+        if self.mission is not None:
+            if self.mission.update(telemetry_data.x, telemetry_data.y, telemetry_data.z):
+                self.logger.info(f"WAYPOINT {self.mission.active_index} ACTIVE")
+            target_x, target_y, _ = self.mission.active_target
+            target_yaw, target_z = self.mission.leg_target(
+                telemetry_data.x, telemetry_data.y, telemetry_data.z
+            )
+        else:
+            target_x, target_y, target_z = self.target.x, self.target.y, self.target.z
+            target_yaw = None
+
+        decision, amount = command_decision.decide(
+            telemetry_data.x,
+            telemetry_data.y,
+            telemetry_data.z,
+            telemetry_data.yaw,
+            target_x,
+            target_y,
+            target_z,
+            target_yaw,
+        )
+
+        if decision == command_decision.Decision.CHANGE_ALTITUDE:
             # Send altitude command with required mock parameters
-            self.connection.mav.command_long_send(
-                1,
-                0,
+            sent = self.__send(
+                telemetry_data.system_id,
                 mavutil.mavlink.MAV_CMD_CONDITION_CHANGE_ALT,
-                0,
-                1,  # param1: ascent/descent speed (Z_SPEED = 1)
-                0,
-                0,
-                0,
-                0,
-                0,  # params 2-6 unused
-                self.target.z,  # param7: absolute target altitude
+                (
+                    1,  # param1: ascent/descent speed (Z_SPEED = 1)
+                    0,
+                    0,
+                    0,
+                    0,
+                    0,  # params 2-6 unused
+                    target_z,  # param7: absolute target altitude
+                ),
+                (target_z,),
+                command_decision.ALTITUDE_TOLERANCE,
             )
-            return f"CHANGE ALTITUDE: {delta_z}"
-
-        dx = self.target.x - telemetry_data.x
-        dy = self.target.y - telemetry_data.y
-        target_yaw_rad = math.atan2(dy, dx)
-        target_yaw_deg = math.degrees(target_yaw_rad)
-        now_yaw_rad = telemetry_data.yaw
-        now_yaw_deg = math.degrees(now_yaw_rad)
-        yaw_diff_deg = target_yaw_deg - now_yaw_deg
-        yaw_diff_deg = (yaw_diff_deg + 180) % 360 - 180
-        if abs(yaw_diff_deg) > 5:
-            direction = 1 if yaw_diff_deg > 0 else -1
-            self.connection.mav.command_long_send(
-                1,
-                0,
+            return f"CHANGE ALTITUDE: {amount}" if sent else None
+
+        if decision == command_decision.Decision.CHANGE_YAW:
+            direction = 1 if amount > 0 else -1
+            # The relative angle shrinks while turning, the heading it aims for does not.
+            # Compared as a unit vector so it does not jump at +-180 degrees.
+            heading = math.radians(math.degrees(telemetry_data.yaw) + amount)
+            sent = self.__send(
+                telemetry_data.system_id,
                 mavutil.mavlink.MAV_CMD_CONDITION_YAW,
-                0,
-                yaw_diff_deg,
-                5,
-                direction,
-                1,
-                0,
-                0,
-                0,
+                (amount, 5, direction, 1, 0, 0, 0),
+                (math.cos(heading), math.sin(heading)),
+                2.0 * math.sin(math.radians(command_decision.YAW_TOLERANCE) / 2.0),
             )
-            return f"CHANGE YAW: {yaw_diff_deg}"
+            return f"CHANGE YAW: {amount}" if sent else None
 
         # If no command was sent, return None explicitly
         return None
 
+    def get_prediction_errors(self) -> "dict[int | None, state_predictor.PredictionErrors]":
+        """
+        Prediction errors of each system seen so far, empty if not predicting.
+        """
+        return {
+            system_id: system.predictor.get_errors()
+            for system_id, system in self.systems.items()
+            if system.predictor is not None
+        }
+
+    def __estimate(
+        self, telemetry_data: telemetry.TelemetryData
+    ) -> "tuple[_SystemState, telemetry.TelemetryData]":
+        """
+        State of the system the sample is from, and the sample to decide on, predicted if
+        predicting, with its velocity counted towards the system's average. Skipped and
+        decided samples go through the same path.
+        """
+        system = self.systems.get(telemetry_data.system_id)
+        if system is None:
+            system = _SystemState(self.predictor_kind)
+            self.systems[telemetry_data.system_id] = system
+
+        if system.predictor is not None:
+            telemetry_data = system.predictor.predict(telemetry_data, time.monotonic())
+
+        system.velocity_statistics.add(
+            (telemetry_data.x_velocity, telemetry_data.y_velocity, telemetry_data.z_velocity)
+        )
+        return system, telemetry_data
+
+    def __send(
+        self,
+        system_id: int | None,
+        command_id: int,
+        params: "tuple[float, ...]",
+        identity: "tuple[float, ...]",
+        tolerance: float,
+    ) -> bool:
+        """
+        COMMAND_LONG to the system and target_component=0, through the tracker if any.
+
+        system_id: Vehicle the telemetry is from, None for target_system=1.
+
+        Returns False if the tracker suppressed it.
+        """
+        if system_id is None:
+            system_id = self.DEFAULT_TARGET_SYSTEM
+
+        if self.tracker is None:
+            self.connection.mav.command_long_send(system_id, 0, command_id, 0, *params)
+            return True
+
+        return self.tracker.send(
+            command_id, params, identity, tolerance, time.monotonic(), system_id
+        )
+
 
 # =================================================================================================
 #                            ↑ BOOTCAMPERS MODIFY ABOVE THIS COMMENT ↑
@@ -0,0 +1,91 @@
+"""
+Altitude and yaw decision logic, for one sample or whole arrays of them.
+"""
+
+import enum
+import math
+
+import numpy as np
+
+
+ALTITUDE_TOLERANCE = 0.5  # m
+YAW_TOLERANCE = 5.0  # degrees
+
+
+class Decision(enum.IntEnum):
+    """
+    Command to send, altitude takes priority over yaw.
+    """
+
+    NONE = 0
+    CHANGE_ALTITUDE = 1
+    CHANGE_YAW = 2
+
+
+def decide(
+    x: float,
+    y: float,
+    z: float,
+    yaw: float,
+    target_x: float,
+    target_y: float,
+    target_z: float,
+    target_yaw: float | None = None,
+) -> "tuple[Decision, float]":
+    """
+    Decision for one sample. yaw is in radians.
+
+    target_yaw: Heading in radians to face instead of towards the target, e.g. along a leg.
+
+    Returns the decision and its amount: the altitude change in m or the relative yaw
+    in degrees in [-180, 180), counter-clockwise positive. The amount is 0 for NONE.
+    """
+    delta_z = target_z - z
+    if abs(delta_z) > ALTITUDE_TOLERANCE:
+        return Decision.CHANGE_ALTITUDE, delta_z
+
+    if target_yaw is None:
+        target_yaw = math.atan2(target_y - y, target_x - x)
+    target_yaw_deg = math.degrees(target_yaw)
+    yaw_diff_deg = (target_yaw_deg - math.degrees(yaw) + 180.0) % 360.0 - 180.0
+    if abs(yaw_diff_deg) > YAW_TOLERANCE:
+        return Decision.CHANGE_YAW, yaw_diff_deg
+
+    return Decision.NONE, 0.0
+
+
+def decide_batch(
+    x: np.ndarray,
+    y: np.ndarray,
+    z: np.ndarray,
+    yaw: np.ndarray,
+    target_x: "np.ndarray | float",
+    target_y: "np.ndarray | float",
+    target_z: "np.ndarray | float",
+    target_yaw: "np.ndarray | float | None" = None,
+) -> "tuple[np.ndarray, np.ndarray]":
+    """
+    Same as decide() for every element at once, targets can be arrays or scalars.
+
+    target_yaw: Heading in radians to face instead of towards the target, NaN elements face
+        the target like None in decide().
+
+    Returns the decisions (Decision values as int8) and amounts.
+    """
+    delta_z = np.subtract(target_z, z, dtype=np.float64)
+    towards_target = np.arctan2(np.subtract(target_y, y), np.subtract(target_x, x))
+    if target_yaw is not None:
+        towards_target = np.where(np.isnan(target_yaw), towards_target, target_yaw)
+    target_yaw_deg = np.degrees(towards_target)
+    yaw_diff_deg = np.mod(target_yaw_deg - np.degrees(yaw) + 180.0, 360.0) - 180.0
+    delta_z, yaw_diff_deg = np.broadcast_arrays(delta_z, yaw_diff_deg)
+
+    change_altitude = np.abs(delta_z) > ALTITUDE_TOLERANCE
+    change_yaw = ~change_altitude & (np.abs(yaw_diff_deg) > YAW_TOLERANCE)
+
+    decisions = np.full(delta_z.shape, Decision.NONE, dtype=np.int8)
+    decisions[change_yaw] = Decision.CHANGE_YAW
+    decisions[change_altitude] = Decision.CHANGE_ALTITUDE
+
+    amounts = np.where(change_altitude, delta_z, np.where(change_yaw, yaw_diff_deg, 0.0))
+    return decisions, amounts
@@ -0,0 +1,214 @@
+"""
+In-flight COMMAND_LONG table with COMMAND_ACK matching, retries and latency histogram.
+"""
+
+import numpy as np
+from pymavlink import mavutil
+
+
+class CommandAck:
+    """
+    Struct of a received COMMAND_ACK, passed between workers.
+    """
+
+    def __init__(
+        self, command: int, result: int, receive_time: float, system_id: int | None = None
+    ) -> None:
+        """
+        receive_time: time.monotonic() when it arrived.
+        system_id: Vehicle it came from.
+        """
+        self.command = command
+        self.result = result
+        self.receive_time = receive_time
+        self.system_id = system_id
+
+
+class _InFlight:
+    """
+    Sent command awaiting its COMMAND_ACK.
+    """
+
+    def __init__(self, params: "tuple[float, ...]", identity: "tuple[float, ...]") -> None:
+        self.params = params
+        self.identity = identity
+        self.attempts = 0
+        self.send_time = 0.0
+        self.deadline = 0.0
+
+
+class CommandTracker:  # pylint: disable=too-many-instance-attributes
+    """
+    Keeps at most one command in flight per target system and command ID.
+
+    A command whose identity (what it is trying to achieve, e.g. the target altitude)
+    matches the one in flight is suppressed until that one is acknowledged or times out.
+    One with a different identity replaces it. Unacknowledged commands are sent again
+    with exponential backoff, with the confirmation field counting the retransmissions.
+    """
+
+    # Send to ACK latency bins, 1ms to 10s
+    LATENCY_BIN_EDGES = np.geomspace(0.001, 10.0, 41)  # seconds
+
+    def __init__(
+        self,
+        connection: mavutil.mavfile,
+        target_system: int = 1,
+        target_component: int = 0,
+        ack_timeout: float = 1.0,
+        max_attempts: int = 3,
+        backoff: float = 2.0,
+    ) -> None:
+        """
+        target_system: Sent to when send() is not given one.
+        ack_timeout: Seconds to wait for the first COMMAND_ACK, multiplied by backoff on each retry.
+        max_attempts: Sends of one command before giving up.
+        """
+        assert ack_timeout > 0.0, "Timeout must be positive"
+        assert max_attempts >= 1, "At least one attempt"
+        assert backoff >= 1.0, "Backoff must not shorten the timeout"
+
+        self.connection = connection
+        self.target_system = target_system
+        self.target_component = target_component
+        self.ack_timeout = ack_timeout
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+
+        # By (target system, command ID)
+        self.__in_flight: "dict[tuple[int, int], _InFlight]" = {}
+        self.__latency_counts = np.zeros(len(self.LATENCY_BIN_EDGES) + 1, dtype=np.int64)
+
+        self.sent_count = 0
+        self.suppressed_count = 0
+        self.replaced_count = 0
+        self.retry_count = 0
+        self.timeout_count = 0
+        self.rejected_count = 0
+
+    def send(
+        self,
+        command_id: int,
+        params: "tuple[float, ...]",
+        identity: "tuple[float, ...]",
+        tolerance: float,
+        now: float,
+        target_system: int | None = None,
+    ) -> bool:
+        """
+        Send COMMAND_LONG with the 7 params unless an equivalent one is in flight to the target.
+
+        identity: Values that say what the command achieves, compared to the one in flight.
+        tolerance: Largest difference between identities that still counts as the same.
+        target_system: Vehicle to command, None for the default one.
+
+        Returns whether it was sent.
+        """
+        if target_system is None:
+            target_system = self.target_system
+
+        key = (target_system, command_id)
+        current = self.__in_flight.get(key)
+        if current is not None:
+            difference = max(abs(a - b) for a, b in zip(identity, current.identity))
+            if difference <= tolerance:
+                self.suppressed_count += 1
+                return False
+
+            self.replaced_count += 1
+
+        entry = _InFlight(params, identity)
+        self.__in_flight[key] = entry
+        self.__transmit(key, entry, now)
+        return True
+
+    def handle_ack(self, ack: CommandAck) -> None:
+        """
+        Match a COMMAND_ACK to the command in flight to its sender, ignoring unknown ones.
+        """
+        system_id = self.target_system if ack.system_id is None else ack.system_id
+        key = (system_id, ack.command)
+        entry = self.__in_flight.get(key)
+        if entry is None:
+            return
+
+        if ack.result == mavutil.mavlink.MAV_RESULT_IN_PROGRESS:
+            # Still executing, wait for the final ACK without resending
+            entry.deadline = ack.receive_time + self.ack_timeout * self.backoff**entry.attempts
+            return
+
+        del self.__in_flight[key]
+        latency = max(0.0, ack.receive_time - entry.send_time)
+        self.__latency_counts[np.searchsorted(self.LATENCY_BIN_EDGES, latency)] += 1
+        if ack.result != mavutil.mavlink.MAV_RESULT_ACCEPTED:
+            self.rejected_count += 1
+
+    def check_timeouts(self, now: float) -> None:
+        """
+        Resend commands whose ACK is overdue, or give up after the last attempt.
+        """
+        for key, entry in list(self.__in_flight.items()):
+            if now < entry.deadline:
+                continue
+
+            if entry.attempts >= self.max_attempts:
+                del self.__in_flight[key]
+                self.timeout_count += 1
+                continue
+
+            self.retry_count += 1
+            self.__transmit(key, entry, now)
+
+    def in_flight_count(self) -> int:
+        """
+        Commands awaiting an ACK.
+        """
+        return len(self.__in_flight)
+
+    def get_latency_histogram(self) -> "tuple[np.ndarray, np.ndarray]":
+        """
+        Bin edges and counts of send to ACK latency. The first count is below the first edge
+        and the last is above the last edge.
+        """
+        return self.LATENCY_BIN_EDGES, self.__latency_counts.copy()
+
+    def latency_percentile(self, percent: float) -> float | None:
+        """
+        Upper edge of the bin holding the percentile, None before any ACK.
+        """
+        total = int(self.__latency_counts.sum())
+        if total == 0:
+            return None
+
+        index = int(np.searchsorted(np.cumsum(self.__latency_counts), total * percent / 100.0))
+        index = min(index, len(self.LATENCY_BIN_EDGES) - 1)
+        return float(self.LATENCY_BIN_EDGES[index])
+
+    def __transmit(self, key: "tuple[int, int]", entry: _InFlight, now: float) -> None:
+        """
+        Send or resend, the confirmation field is the number of earlier attempts.
+        """
+        target_system, command_id = key
+        self.connection.mav.command_long_send(
+            target_system,
+            self.target_component,
+            command_id,
+            entry.attempts,
+            *entry.params,
+        )
+        entry.attempts += 1
+        entry.send_time = now
+        entry.deadline = now + self.ack_timeout * self.backoff ** (entry.attempts - 1)
+        self.sent_count += 1
+
+    def __str__(self) -> str:
+        p50 = self.latency_percentile(50.0)
+        p99 = self.latency_percentile(99.0)
+        latency = (
+            "no ACKs" if p50 is None else f"p50 <= {p50 * 1000:.1f}ms p99 <= {p99 * 1000:.1f}ms"
+        )
+        return (
+            f"sent: {self.sent_count}, suppressed: {self.suppressed_count}, "
+            f"replaced: {self.replaced_count}, retries: {self.retry_count}, "
+            f"timeouts: {self.timeout_count}, rejected: {self.rejected_count}, latency {latency}"
+        )
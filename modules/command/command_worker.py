@@ -4,21 +4,86 @@ Command worker to make decisions based on Telemetry Data.
 
 import os
 import pathlib
+import queue
+import time
 
 from pymavlink import mavutil
 
+from utilities.statistics import running_statistics
 from utilities.workers import queue_proxy_wrapper
 from utilities.workers import worker_controller
 from . import command
+from . import command_tracker
+from . import geofence
+from . import mission
+from . import state_predictor
 from ..common.modules.logger import logger
 
 
+class CommandWorkerArgs:  # pylint: disable=too-many-instance-attributes
+    """
+    Struct of optional command worker settings.
+    """
+
+    def __init__(
+        self,
+        predictor_kind: state_predictor.PredictorKind | None = None,
+        ack_queue: queue_proxy_wrapper.QueueProxyWrapper | None = None,
+        ack_timeout: float = 1.0,
+        max_attempts: int = 3,
+        waypoints: "list[tuple[float, float, float]] | None" = None,
+        acceptance_radius: float = 1.0,
+        rejoin_distance: float | None = None,
+        look_ahead: float = 5.0,
+        geofence_zones: "list[geofence.GeofenceZone] | None" = None,
+        geofence_cell_size: float = 10.0,
+        latest_wins: bool = False,
+        fold_skipped: bool = True,
+        breach_queue: queue_proxy_wrapper.QueueProxyWrapper | None = None,
+    ) -> None:
+        """
+        predictor_kind: Extrapolate telemetry to the current time before deciding, None to not.
+        ack_queue: COMMAND_ACKs from the telemetry worker, None to send without tracking.
+        ack_timeout: Seconds before an unacknowledged command is sent again.
+        max_attempts: Sends of one command before giving up.
+        waypoints: Mission to fly instead of the fixed target, None to hold the target.
+        acceptance_radius: Distance in metres at which a waypoint counts as reached.
+        rejoin_distance: Distance in metres from the active leg at which the mission is rejoined
+            at the nearest waypoint, None to never rejoin.
+        look_ahead: Distance in metres along the active leg of the point steered towards.
+        geofence_zones: Zones checked before commanding, None for no fence.
+        geofence_cell_size: Grid cell width in metres of the fence index.
+        latest_wins: Take everything queued and decide on the newest of each system only, instead
+            of each in turn.
+        fold_skipped: Count the skipped samples towards the statistics.
+        breach_queue: Receives geofence.BreachEvents apart from the commands, None to only log.
+        """
+        self.predictor_kind = predictor_kind
+        self.ack_queue = ack_queue
+        self.ack_timeout = ack_timeout
+        self.max_attempts = max_attempts
+        self.waypoints = waypoints
+        self.acceptance_radius = acceptance_radius
+        self.rejoin_distance = rejoin_distance
+        self.look_ahead = look_ahead
+        self.geofence_zones = geofence_zones
+        self.geofence_cell_size = geofence_cell_size
+        self.latest_wins = latest_wins
+        self.fold_skipped = fold_skipped
+        self.breach_queue = breach_queue
+
+
 # =================================================================================================
 #                            ↓ BOOTCAMPERS MODIFY BELOW THIS COMMENT ↓
 # =================================================================================================
+# Longest wait for telemetry, so ACKs are still processed while none arrives
+INPUT_TIMEOUT = 0.05  # seconds
+
+
 def command_worker(
     connection: mavutil.mavfile,
     target: command.Position,
+    args: CommandWorkerArgs | None,
     input_queue: queue_proxy_wrapper.QueueProxyWrapper,
     output_queue: queue_proxy_wrapper.QueueProxyWrapper,
     controller: worker_controller.WorkerController,
@@ -29,6 +94,7 @@ def command_worker(
     Args:
         connection: MAVLink connection to the drone
         target: Target position for the command
+        args: Optional settings, None for the defaults
         input_queue: Queue to receive telemetry data
         output_queue: Queue to send command results
         controller: Controller to manage worker lifecycle
@@ -53,32 +119,175 @@ def command_worker(
     # =============================================================================================
     #                          ↓ BOOTCAMPERS MODIFY BELOW THIS COMMENT ↓
     # =============================================================================================
+    if args is None:
+        args = CommandWorkerArgs()
+
+    tracker = None
+    if args.ack_queue is not None:
+        tracker = command_tracker.CommandTracker(
+            connection, ack_timeout=args.ack_timeout, max_attempts=args.max_attempts
+        )
+
+    waypoints = None
+    if args.waypoints is not None:
+        waypoints = mission.Mission(
+            args.waypoints,
+            args.acceptance_radius,
+            start_nearest=True,
+            rejoin_distance=args.rejoin_distance,
+            look_ahead=args.look_ahead,
+        )
+        local_logger.info(f"Mission of {len(waypoints.waypoints)} waypoints", True)
+
+    fence = None
+    if args.geofence_zones is not None:
+        fence = geofence.Geofence(args.geofence_zones, args.geofence_cell_size)
+
     # Instantiate class object (command.Command)
     success, cmd = command.Command.create(
-        connection=connection, target=target, local_logger=local_logger
+        connection=connection,
+        target=target,
+        local_logger=local_logger,
+        predictor_kind=args.predictor_kind,
+        tracker=tracker,
+        waypoints=waypoints,
+        fence=fence,
     )
 
     if not success or cmd is None:
         local_logger.error("Failed to create Command object, exiting worker", True)
         return
 
+    # Age of the sample at decision time, and how many were never decided on
+    decision_ages = running_statistics.CumulativeStatistics(1)
+    max_decision_age = 0.0
+    skipped_count = 0
+
     # Main loop: do work.
     while not controller.is_exit_requested():
         controller.check_pause()
         try:
-            if input_queue is None or input_queue.queue.empty():
+            if tracker is not None:
+                process_acks(args.ack_queue, tracker)
+
+            if input_queue is None:
                 continue
-            # Wait for telemetry data from input queue
-            message = input_queue.queue.get(timeout=1.0)
-            if message is None:
+            # Wait for telemetry data from input queue, expired items are dropped while waiting
+            try:
+                message = input_queue.queue.get(timeout=INPUT_TIMEOUT)
+            except queue.Empty:
                 continue
-            # Process the telemetry data and make decisions
-            result = cmd.run(message)
-            if result is not None and output_queue is not None:
-                output_queue.queue.put(result)
+            messages = [message]
+            if args.latest_wins:
+                queued = take_queued(input_queue)
+                if message is not None:
+                    queued.insert(0, message)
+
+                # Each system sharing the partition still gets its own latest sample decided
+                messages, skipped = latest_per_system(queued)
+                skipped_count += len(skipped)
+                if args.fold_skipped:
+                    for sample in skipped:
+                        cmd.fold(sample)
+
+            for message in messages:
+                if message is None:
+                    continue
+
+                if message.timestamp is not None:
+                    age = time.monotonic() - message.timestamp
+                    decision_ages.add((age,))
+                    max_decision_age = max(max_decision_age, age)
+
+                # Process the telemetry data and make decisions
+                result = cmd.run(message)
+                if isinstance(result, geofence.BreachEvent):
+                    put_breach(args.breach_queue, result, local_logger)
+                elif result is not None and output_queue is not None:
+                    output_queue.queue.put(result)
         except Exception as ex:  # pylint: disable=broad-exception-caught
             local_logger.error(f"Exception in main loop: {ex}", True)
 
+    local_logger.info(
+        f"Staleness: {decision_ages.count} decisions, "
+        f"age mean: {decision_ages.mean[0] * 1000:.1f}ms max: {max_decision_age * 1000:.1f}ms, "
+        f"skipped {skipped_count} samples, expired {input_queue.expired_count}",
+        True,
+    )
+    for system_id, errors in cmd.get_prediction_errors().items():
+        local_logger.info(f"Prediction errors of system {system_id}: {errors}", True)
+    if tracker is not None:
+        local_logger.info(f"Commands: {tracker}", True)
+
+
+def take_queued(input_queue: queue_proxy_wrapper.QueueProxyWrapper) -> "list[object]":
+    """
+    Everything already in the queue without waiting, oldest first, sentinels left out.
+    """
+    samples = []
+    while True:
+        try:
+            sample = input_queue.queue.get_nowait()
+        except queue.Empty:
+            break
+
+        if sample is not None:
+            samples.append(sample)
+
+    return samples
+
+
+def latest_per_system(samples: "list[object]") -> "tuple[list[object], list[object]]":
+    """
+    The newest sample of each system in the order they arrived, and the older ones they
+    replace, oldest first.
+    """
+    latest = {}
+    for index, sample in enumerate(samples):
+        latest[sample.system_id] = index
+
+    kept = set(latest.values())
+    return (
+        [sample for index, sample in enumerate(samples) if index in kept],
+        [sample for index, sample in enumerate(samples) if index not in kept],
+    )
+
+
+def put_breach(
+    breach_queue: queue_proxy_wrapper.QueueProxyWrapper | None,
+    breach: geofence.BreachEvent,
+    local_logger: logger.Logger,
+) -> None:
+    """
+    Report the breach without waiting, so a slow reader cannot hold up commanding.
+    """
+    if breach_queue is None:
+        return
+
+    try:
+        breach_queue.queue.put_nowait(breach)
+    except queue.Full:
+        local_logger.warning(f"Breach queue full, not reported: {breach}", True)
+
+
+def process_acks(
+    ack_queue: queue_proxy_wrapper.QueueProxyWrapper,
+    tracker: command_tracker.CommandTracker,
+) -> None:
+    """
+    Match every waiting COMMAND_ACK, then resend what is overdue.
+    """
+    while True:
+        try:
+            ack = ack_queue.queue.get_nowait()
+        except queue.Empty:
+            break
+
+        if ack is not None:
+            tracker.handle_ack(ack)
+
+    tracker.check_timeouts(time.monotonic())
+
 
 # =================================================================================================
 #                            ↑ BOOTCAMPERS MODIFY ABOVE THIS COMMENT ↑
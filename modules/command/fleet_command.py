@@ -0,0 +1,253 @@
+"""
+Decision-making logic for many vehicles at once, keyed by MAVLink system ID.
+"""
+
+from typing import Tuple, Union
+
+import numpy as np
+from pymavlink import mavutil
+
+from . import command
+from . import command_decision
+from . import geofence
+from ..common.modules.logger import logger
+from ..connection import outbound_channel
+from ..telemetry import telemetry
+
+
+# =================================================================================================
+#                            ↓ BOOTCAMPERS MODIFY BELOW THIS COMMENT ↓
+# =================================================================================================
+class FleetCommand:  # pylint: disable=too-many-instance-attributes
+    """
+    Same decisions as Command for every vehicle in the fleet.
+
+    The latest state of each vehicle is kept in one array per field. Samples are queued as
+    they arrive and written into the arrays at the next tick, which then decides for every
+    vehicle heard from since the last one with a single vectorized call. The resulting
+    commands are handed to the connection together.
+
+    With a fence, the updated positions are checked in one batch first. A vehicle that
+    breaches is not commanded until it is back inside.
+    """
+
+    __private_key = object()
+
+    @classmethod
+    def create(
+        cls,
+        connection: mavutil.mavfile,
+        targets: "dict[int, command.Position]",
+        local_logger: logger.Logger,
+        fence: geofence.Geofence | None = None,
+    ) -> Tuple[bool, Union["FleetCommand", None]]:
+        """
+        Falliable create (instantiation) method to create a FleetCommand object.
+
+        targets: MAVLink system ID to the target position of that vehicle.
+        fence: Hold commands to vehicles breaching it.
+        """
+        if connection is None:
+            local_logger.error("Failed to create FleetCommand: connection is None", True)
+            return False, None
+
+        if len(targets) == 0:
+            local_logger.error("Failed to create FleetCommand: no targets", True)
+            return False, None
+
+        for system_id in targets:
+            if not 1 <= system_id <= 255:
+                local_logger.error(
+                    f"Failed to create FleetCommand: invalid system ID {system_id}", True
+                )
+                return False, None
+
+        try:
+            instance = cls(cls.__private_key, connection, targets, local_logger, fence)
+            return True, instance
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            local_logger.error(f"FleetCommand create failed: {e}", True)
+            return False, None
+
+    def __init__(
+        self,
+        key: object,
+        connection: mavutil.mavfile,
+        targets: "dict[int, command.Position]",
+        local_logger: logger.Logger,
+        fence: geofence.Geofence | None,
+    ) -> None:
+        assert key is FleetCommand.__private_key, "Use create() method"
+        self.connection = connection
+        self.logger = local_logger
+        self.fence = fence
+
+        self.system_ids = np.array(sorted(targets), dtype=np.int64)
+        self.__indices = {int(system_id): i for i, system_id in enumerate(self.system_ids)}
+        self.__target_x = np.array([targets[int(i)].x for i in self.system_ids], dtype=np.float64)
+        self.__target_y = np.array([targets[int(i)].y for i in self.system_ids], dtype=np.float64)
+        self.__target_z = np.array([targets[int(i)].z for i in self.system_ids], dtype=np.float64)
+
+        count = len(self.system_ids)
+        self.__x = np.zeros(count)
+        self.__y = np.zeros(count)
+        self.__z = np.zeros(count)
+        self.__yaw = np.zeros(count)
+        self.__velocity_sums = np.zeros((count, 3))
+        self.__velocity_counts = np.zeros(count, dtype=np.int64)
+        self.__breached = np.zeros(count, dtype=bool)
+
+        # Rows of (index, x, y, z, yaw, x velocity, y velocity, z velocity) since the last tick,
+        # written into the arrays all at once
+        self.__pending: "list[tuple[float, ...]]" = []
+
+        self.unknown_count = 0
+        self.sent_count = 0
+
+    def update(self, telemetry_data: telemetry.TelemetryData) -> bool:
+        """
+        Queue the state of the vehicle it came from for the next tick.
+
+        Returns False if it is not from a vehicle of the fleet.
+        """
+        index = self.__indices.get(telemetry_data.system_id)
+        if index is None:
+            self.unknown_count += 1
+            return False
+
+        self.__pending.append(
+            (
+                index,
+                telemetry_data.x,
+                telemetry_data.y,
+                telemetry_data.z,
+                telemetry_data.yaw,
+                telemetry_data.x_velocity,
+                telemetry_data.y_velocity,
+                telemetry_data.z_velocity,
+            )
+        )
+        return True
+
+    def run(self) -> "list[str | geofence.BreachEvent]":
+        """
+        Decide for every vehicle updated since the last call and send the commands.
+
+        Returns a string for each command, prefixed by the system ID, and a
+        geofence.BreachEvent for each vehicle that started breaching the fence.
+        """
+        if len(self.__pending) == 0:
+            return []
+
+        rows = np.array(self.__pending, dtype=np.float64)
+        self.__pending.clear()
+        indices = rows[:, 0].astype(np.int64)
+
+        # Every sample counts towards the average velocity, only the newest is the state
+        np.add.at(self.__velocity_sums, indices, rows[:, 5:8])
+        np.add.at(self.__velocity_counts, indices, 1)
+        fresh, last = np.unique(indices[::-1], return_index=True)
+        latest = rows[len(rows) - 1 - last]
+        self.__x[fresh] = latest[:, 1]
+        self.__y[fresh] = latest[:, 2]
+        self.__z[fresh] = latest[:, 3]
+        self.__yaw[fresh] = latest[:, 4]
+
+        breaches: "list[str | geofence.BreachEvent]" = []
+        if self.fence is not None:
+            breaches.extend(self.__check_fence(fresh))
+            fresh = fresh[~self.__breached[fresh]]
+
+        decisions, amounts = command_decision.decide_batch(
+            self.__x[fresh],
+            self.__y[fresh],
+            self.__z[fresh],
+            self.__yaw[fresh],
+            self.__target_x[fresh],
+            self.__target_y[fresh],
+            self.__target_z[fresh],
+        )
+
+        commanded = np.flatnonzero(decisions != command_decision.Decision.NONE)
+        if len(commanded) == 0:
+            return breaches
+
+        messages = []
+        results = breaches
+        for position in commanded:
+            index = fresh[position]
+            system_id = int(self.system_ids[index])
+            amount = float(amounts[position])
+            if decisions[position] == command_decision.Decision.CHANGE_ALTITUDE:
+                command_id = mavutil.mavlink.MAV_CMD_CONDITION_CHANGE_ALT
+                params = (1, 0, 0, 0, 0, 0, float(self.__target_z[index]))
+                results.append(f"SYSTEM {system_id} CHANGE ALTITUDE: {amount}")
+            else:
+                direction = 1 if amount > 0 else -1
+                command_id = mavutil.mavlink.MAV_CMD_CONDITION_YAW
+                params = (amount, 5, direction, 1, 0, 0, 0)
+                results.append(f"SYSTEM {system_id} CHANGE YAW: {amount}")
+
+            messages.append((system_id, 0, command_id, 0) + params)
+
+        self.__send(messages)
+        return results
+
+    def get_average_velocities(self) -> "dict[int, tuple[float, float, float]]":
+        """
+        Mean velocity of each vehicle that has received telemetry.
+        """
+        averages = {}
+        for index in np.flatnonzero(self.__velocity_counts):
+            mean = self.__velocity_sums[index] / self.__velocity_counts[index]
+            averages[int(self.system_ids[index])] = (
+                float(mean[0]),
+                float(mean[1]),
+                float(mean[2]),
+            )
+        return averages
+
+    def __check_fence(self, fresh: np.ndarray) -> "list[geofence.BreachEvent]":
+        """
+        Update which of the vehicles breach the fence.
+
+        Returns an event for each that started breaching.
+        """
+        assert self.fence is not None
+
+        breaching = self.fence.check_batch(self.__x[fresh], self.__y[fresh], self.__z[fresh])
+        events = []
+        for index in fresh[breaching & ~self.__breached[fresh]]:
+            system_id = int(self.system_ids[index])
+            event = self.fence.explain(
+                float(self.__x[index]), float(self.__y[index]), float(self.__z[index]), system_id
+            )
+            self.__breached[index] = True
+            self.logger.error(str(event))
+            events.append(event)
+
+        for index in fresh[~breaching & self.__breached[fresh]]:
+            self.__breached[index] = False
+            self.logger.info(f"SYSTEM {int(self.system_ids[index])} GEOFENCE CLEARED")
+
+        return events
+
+    def __send(self, messages: "list[tuple]") -> None:
+        """
+        COMMAND_LONGs as argument tuples. Through an OutboundChannel they are queued with
+        a single put, otherwise each is written directly.
+        """
+        self.sent_count += len(messages)
+        if isinstance(self.connection, outbound_channel.OutboundChannel):
+            self.connection.send_batch(
+                [outbound_channel.OutboundMessage("command_long", args, {}) for args in messages]
+            )
+            return
+
+        for args in messages:
+            self.connection.mav.command_long_send(*args)
+
+
+# =================================================================================================
+#                            ↑ BOOTCAMPERS MODIFY ABOVE THIS COMMENT ↑
+# =================================================================================================
@@ -0,0 +1,142 @@
+"""
+Fleet command worker to make decisions for many vehicles based on Telemetry Data.
+"""
+
+import os
+import pathlib
+import queue
+
+from pymavlink import mavutil
+
+from utilities.workers import queue_proxy_wrapper
+from utilities.workers import worker_controller
+from . import command
+from . import command_worker
+from . import fleet_command
+from . import geofence
+from ..common.modules.logger import logger
+
+
+class FleetCommandWorkerArgs:
+    """
+    Struct of optional fleet command worker settings.
+    """
+
+    def __init__(
+        self,
+        geofence_zones: "list[geofence.GeofenceZone] | None" = None,
+        geofence_cell_size: float = 10.0,
+        breach_queue: queue_proxy_wrapper.QueueProxyWrapper | None = None,
+    ) -> None:
+        """
+        geofence_zones: Zones checked before commanding each vehicle, None for no fence.
+        geofence_cell_size: Grid cell width in metres of the fence index.
+        breach_queue: Receives geofence.BreachEvents apart from the commands, None to only log.
+        """
+        self.geofence_zones = geofence_zones
+        self.geofence_cell_size = geofence_cell_size
+        self.breach_queue = breach_queue
+
+
+# =================================================================================================
+#                            ↓ BOOTCAMPERS MODIFY BELOW THIS COMMENT ↓
+# =================================================================================================
+TICK_TIMEOUT = 0.1  # seconds
+MAX_SAMPLES_PER_TICK = 1000
+
+
+def fleet_command_worker(
+    connection: mavutil.mavfile,
+    targets: "dict[int, command.Position]",
+    args: FleetCommandWorkerArgs | None,
+    input_queue: queue_proxy_wrapper.QueueProxyWrapper,
+    output_queue: queue_proxy_wrapper.QueueProxyWrapper,
+    controller: worker_controller.WorkerController,
+) -> None:
+    """
+    Worker process.
+
+    Args:
+        connection: MAVLink connection to the drones
+        targets: MAVLink system ID to the target position of that vehicle
+        args: Optional settings, None for the defaults
+        input_queue: Queue to receive telemetry data of every vehicle
+        output_queue: Queue to send command results
+        controller: Controller to manage worker lifecycle
+    """
+    # =============================================================================================
+    #                          ↑ BOOTCAMPERS MODIFY ABOVE THIS COMMENT ↑
+    # =============================================================================================
+
+    # Instantiate logger
+    worker_name = pathlib.Path(__file__).stem
+    process_id = os.getpid()
+    result, local_logger = logger.Logger.create(f"{worker_name}_{process_id}", True)
+    if not result:
+        print("ERROR: Worker failed to create logger")
+        return
+
+    # Get Pylance to stop complaining
+    assert local_logger is not None
+
+    local_logger.info("Logger initialized", True)
+
+    # =============================================================================================
+    #                          ↓ BOOTCAMPERS MODIFY BELOW THIS COMMENT ↓
+    # =============================================================================================
+    if args is None:
+        args = FleetCommandWorkerArgs()
+
+    fence = None
+    if args.geofence_zones is not None:
+        fence = geofence.Geofence(args.geofence_zones, args.geofence_cell_size)
+
+    # Instantiate class object (fleet_command.FleetCommand)
+    result, fleet = fleet_command.FleetCommand.create(connection, targets, local_logger, fence)
+    if not result:
+        local_logger.error("Failed to create FleetCommand", True)
+        return
+
+    # Get Pylance to stop complaining
+    assert fleet is not None
+
+    # Main loop: do work.
+    while not controller.is_exit_requested():
+        controller.check_pause()
+
+        # Wait for the first sample, then take everything else already queued,
+        # so one tick decides for every vehicle heard from since the last one
+        samples = []
+        try:
+            samples.append(input_queue.queue.get(timeout=TICK_TIMEOUT))
+            while len(samples) < MAX_SAMPLES_PER_TICK:
+                samples.append(input_queue.queue.get_nowait())
+        except queue.Empty:
+            pass
+
+        try:
+            for telemetry_data in samples:
+                if telemetry_data is not None:
+                    fleet.update(telemetry_data)
+
+            for command_result in fleet.run():
+                if isinstance(command_result, geofence.BreachEvent):
+                    command_worker.put_breach(args.breach_queue, command_result, local_logger)
+                else:
+                    output_queue.queue.put(command_result)
+        except Exception as ex:  # pylint: disable=broad-exception-caught
+            local_logger.error(f"Exception in main loop: {ex}", True)
+
+    for system_id, (vx, vy, vz) in fleet.get_average_velocities().items():
+        local_logger.info(f"SYSTEM {system_id} AVERAGE VELOCITY: ({vx}, {vy}, {vz})", True)
+    local_logger.info(
+        f"Worker stopping, sent {fleet.sent_count} commands, "
+        f"ignored {fleet.unknown_count} samples from unknown systems, "
+        f"expired {input_queue.expired_count}",
+        True,
+    )
+
+
+# =================================================================================================
+#                            ↑ BOOTCAMPERS MODIFY ABOVE THIS COMMENT ↑
+# =================================================================================================
@@ -0,0 +1,314 @@
+"""
+Inclusion and exclusion zones checked against every telemetry position.
+"""
+
+import enum
+import math
+
+import numpy as np
+
+
+class ZoneKind(enum.Enum):
+    """
+    Whether the vehicle has to stay inside or outside a zone.
+    """
+
+    INCLUSION = 0
+    EXCLUSION = 1
+
+
+class GeofenceZone:
+    """
+    Struct of a polygon in the x-y plane with an altitude band.
+    """
+
+    def __init__(
+        self,
+        kind: ZoneKind,
+        vertices: "list[tuple[float, float]]",
+        min_z: float = -math.inf,
+        max_z: float = math.inf,
+    ) -> None:
+        """
+        vertices: Corners in order, the last one connects back to the first.
+        min_z, max_z: Altitude band in metres, the zone is the polygon extruded over it.
+        """
+        self.kind = kind
+        self.vertices = vertices
+        self.min_z = min_z
+        self.max_z = max_z
+
+
+class BreachEvent:
+    """
+    Struct of a position that violates the fence.
+    """
+
+    def __init__(
+        self,
+        x: float,
+        y: float,
+        z: float,
+        outside_inclusion: bool,
+        exclusion_zones: "list[int]",
+        system_id: int | None = None,
+    ) -> None:
+        """
+        outside_inclusion: Not inside any inclusion zone.
+        exclusion_zones: Indices of the exclusion zones it is inside.
+        system_id: Vehicle breaching, None if not known.
+        """
+        self.x = x
+        self.y = y
+        self.z = z
+        self.outside_inclusion = outside_inclusion
+        self.exclusion_zones = exclusion_zones
+        self.system_id = system_id
+
+    def __str__(self) -> str:
+        reasons = []
+        if self.outside_inclusion:
+            reasons.append("outside inclusion zones")
+        if len(self.exclusion_zones) > 0:
+            reasons.append(f"inside exclusion zones {self.exclusion_zones}")
+        source = "" if self.system_id is None else f"SYSTEM {self.system_id} "
+        return f"{source}GEOFENCE BREACH at ({self.x}, {self.y}, {self.z}): {', '.join(reasons)}"
+
+
+class _Cell:
+    """
+    Zones of one grid cell: ones covering all of it, and ones with an edge through it.
+    """
+
+    def __init__(self) -> None:
+        self.inside: "list[int]" = []
+        # Zone index to the zone's edges as (x1, y1, x2, y2) that overlap the cell's row
+        self.boundary: "dict[int, list[tuple[float, float, float, float]]]" = {}
+
+
+class Geofence:  # pylint: disable=too-many-instance-attributes
+    """
+    Point in zone tests sped up by a uniform grid over the zones.
+
+    Each cell records the zones that cover it completely, and for zones with an edge
+    through it, the edges of that zone overlapping the cell's row. A single point is then
+    answered from its cell: the covering zones directly, and each boundary zone by the
+    same crossing number test as the batch, on the row's edges only, since no other edge
+    can cross a ray along the row. Points outside every cell are inside no zone.
+
+    Batches of points are tested against the full polygons with vectorized crossing
+    numbers, after rejecting points outside each zone's bounding box.
+    """
+
+    def __init__(
+        self, zones: "list[GeofenceZone]", cell_size: float = 10.0, max_cells: int = 1000000
+    ) -> None:
+        """
+        cell_size: Grid cell width in metres, grown if the grid would exceed max_cells.
+        """
+        assert cell_size > 0.0, "Cell size must be positive"
+
+        self.zones = zones
+        self.__polygons = [np.asarray(zone.vertices, dtype=np.float64) for zone in zones]
+        for polygon in self.__polygons:
+            assert polygon.ndim == 2 and polygon.shape[1] == 2, "Vertices are (x, y) pairs"
+            assert len(polygon) >= 3, "A zone needs at least 3 vertices"
+
+        self.__exclusion = [zone.kind == ZoneKind.EXCLUSION for zone in zones]
+        self.__has_inclusion = any(zone.kind == ZoneKind.INCLUSION for zone in zones)
+        self.__min_z = [zone.min_z for zone in zones]
+        self.__max_z = [zone.max_z for zone in zones]
+        self.bounding_boxes = np.array(
+            [
+                [polygon[:, 0].min(), polygon[:, 1].min(), polygon[:, 0].max(), polygon[:, 1].max()]
+                for polygon in self.__polygons
+            ]
+        ).reshape(-1, 4)
+
+        self.__cells: "dict[int, _Cell]" = {}
+        self.__origin = (0.0, 0.0)
+        self.__cell_size = cell_size
+        self.__shape = (0, 0)
+        if len(zones) > 0:
+            self.__build_grid(cell_size, max_cells)
+
+    def check(
+        self, x: float, y: float, z: float, system_id: int | None = None
+    ) -> BreachEvent | None:
+        """
+        Breach at the position, None if it is allowed.
+        """
+        event = self.__event(x, y, z, self.zones_containing(x, y, z), system_id)
+        if not event.outside_inclusion and len(event.exclusion_zones) == 0:
+            return None
+
+        return event
+
+    def explain(self, x: float, y: float, z: float, system_id: int | None = None) -> BreachEvent:
+        """
+        Breach at a position check_batch() reported, from the full polygons like the batch.
+        """
+        zones = [
+            zone
+            for zone, polygon in enumerate(self.__polygons)
+            if self.__min_z[zone] <= z <= self.__max_z[zone]
+            and bool(_contains(polygon, np.array([x]), np.array([y]))[0])
+        ]
+        return self.__event(x, y, z, zones, system_id)
+
+    def zones_containing(self, x: float, y: float, z: float) -> "list[int]":
+        """
+        Indices of the zones the position is inside, in increasing order.
+        """
+        cell = self.__cells.get(self.__cell_key(x, y))
+        if cell is None:
+            return []
+
+        zones = list(cell.inside)
+        if len(cell.boundary) > 0:
+            for zone, edges in cell.boundary.items():
+                if _ray_crossings(x, y, edges) % 2 == 1:
+                    zones.append(zone)
+            zones.sort()
+
+        return [zone for zone in zones if self.__min_z[zone] <= z <= self.__max_z[zone]]
+
+    def check_batch(self, x: np.ndarray, y: np.ndarray, z: np.ndarray) -> np.ndarray:
+        """
+        Whether each position is a breach.
+        """
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        z = np.asarray(z, dtype=np.float64)
+
+        in_inclusion = np.zeros(x.shape, dtype=bool)
+        in_exclusion = np.zeros(x.shape, dtype=bool)
+        for zone, polygon in enumerate(self.__polygons):
+            min_x, min_y, max_x, max_y = self.bounding_boxes[zone]
+            candidates = np.flatnonzero(
+                (x >= min_x)
+                & (x <= max_x)
+                & (y >= min_y)
+                & (y <= max_y)
+                & (z >= self.__min_z[zone])
+                & (z <= self.__max_z[zone])
+            )
+            if len(candidates) == 0:
+                continue
+
+            inside = candidates[_contains(polygon, x[candidates], y[candidates])]
+            if self.__exclusion[zone]:
+                in_exclusion[inside] = True
+            else:
+                in_inclusion[inside] = True
+
+        if self.__has_inclusion:
+            return in_exclusion | ~in_inclusion
+        return in_exclusion
+
+    def __event(
+        self, x: float, y: float, z: float, zones: "list[int]", system_id: int | None
+    ) -> BreachEvent:
+        """
+        Event for the position inside the zones, whether or not it breaches.
+        """
+        outside_inclusion = self.__has_inclusion and all(self.__exclusion[i] for i in zones)
+        exclusion_zones = [i for i in zones if self.__exclusion[i]]
+        return BreachEvent(x, y, z, outside_inclusion, exclusion_zones, system_id)
+
+    def __build_grid(self, cell_size: float, max_cells: int) -> None:
+        """
+        Classify every cell overlapped by a zone's bounding box.
+        """
+        min_x, min_y = self.bounding_boxes[:, :2].min(axis=0)
+        max_x, max_y = self.bounding_boxes[:, 2:].max(axis=0)
+        area = max(max_x - min_x, cell_size) * max(max_y - min_y, cell_size)
+        cell_size = max(cell_size, math.sqrt(area / max_cells))
+
+        self.__origin = (float(min_x), float(min_y))
+        self.__cell_size = cell_size
+        self.__shape = (
+            int((max_x - min_x) // cell_size) + 1,
+            int((max_y - min_y) // cell_size) + 1,
+        )
+
+        for zone, polygon in enumerate(self.__polygons):
+            # Edges mark every cell their bounding box overlaps, a superset of the cells they cross
+            edge_cells: "set[int]" = set()
+            row_edges: "dict[int, list[tuple[float, float, float, float]]]" = {}
+            for (x1, y1), (x2, y2) in zip(polygon.tolist(), np.roll(polygon, -1, axis=0).tolist()):
+                low_x, low_y = self.__cell_coordinates(min(x1, x2), min(y1, y2))
+                high_x, high_y = self.__cell_coordinates(max(x1, x2), max(y1, y2))
+                for iy in range(low_y, high_y + 1):
+                    row_edges.setdefault(iy, []).append((x1, y1, x2, y2))
+                    for ix in range(low_x, high_x + 1):
+                        edge_cells.add(ix * self.__shape[1] + iy)
+
+            box = self.bounding_boxes[zone]
+            low_x, low_y = self.__cell_coordinates(box[0], box[1])
+            high_x, high_y = self.__cell_coordinates(box[2], box[3])
+            grid_x, grid_y = np.meshgrid(
+                np.arange(low_x, high_x + 1), np.arange(low_y, high_y + 1), indexing="ij"
+            )
+            grid_x = grid_x.ravel()
+            grid_y = grid_y.ravel()
+            centers_inside = _contains(
+                polygon,
+                self.__origin[0] + (grid_x + 0.5) * cell_size,
+                self.__origin[1] + (grid_y + 0.5) * cell_size,
+            )
+
+            for ix, iy, center_inside in zip(
+                grid_x.tolist(), grid_y.tolist(), centers_inside.tolist()
+            ):
+                key = ix * self.__shape[1] + iy
+                if key in edge_cells:
+                    self.__cells.setdefault(key, _Cell()).boundary[zone] = row_edges[iy]
+                elif center_inside:
+                    self.__cells.setdefault(key, _Cell()).inside.append(zone)
+
+    def __cell_coordinates(self, x: float, y: float) -> "tuple[int, int]":
+        """
+        Column and row of the cell holding the position, clamped to the grid.
+        """
+        ix = int((x - self.__origin[0]) // self.__cell_size)
+        iy = int((y - self.__origin[1]) // self.__cell_size)
+        return min(max(ix, 0), self.__shape[0] - 1), min(max(iy, 0), self.__shape[1] - 1)
+
+    def __cell_key(self, x: float, y: float) -> int | None:
+        """
+        Key of the cell holding the position, None outside the grid.
+        """
+        ix = (x - self.__origin[0]) // self.__cell_size
+        iy = (y - self.__origin[1]) // self.__cell_size
+        if not (0 <= ix < self.__shape[0] and 0 <= iy < self.__shape[1]):
+            return None
+        return int(ix) * self.__shape[1] + int(iy)
+
+
+def _ray_crossings(x: float, y: float, edges: "list[tuple[float, float, float, float]]") -> int:
+    """
+    Edges crossed by the ray from the point towards +x, the same arithmetic as _contains().
+    """
+    crossings = 0
+    for x1, y1, x2, y2 in edges:
+        if (y1 > y) != (y2 > y) and x < x1 + (y - y1) * ((x2 - x1) / (y2 - y1)):
+            crossings += 1
+    return crossings
+
+
+def _contains(polygon: np.ndarray, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """
+    Crossing number test of every point against every edge at once.
+    """
+    x1 = polygon[:, 0]
+    y1 = polygon[:, 1]
+    x2 = np.roll(x1, -1)
+    y2 = np.roll(y1, -1)
+
+    py = y[:, np.newaxis]
+    straddles = (y1 > py) != (y2 > py)
+    slope = np.divide(x2 - x1, y2 - y1, out=np.zeros_like(x1), where=y2 != y1)
+    crossing_x = x1 + (py - y1) * slope
+    crossings = straddles & (x[:, np.newaxis] < crossing_x)
+    return np.count_nonzero(crossings, axis=1) % 2 == 1
@@ -0,0 +1,264 @@
+"""
+Waypoint mission that tells Command which target is active.
+"""
+
+import math
+
+import numpy as np
+
+
+def load_waypoints(path: str) -> np.ndarray:
+    """
+    Waypoints from a CSV file with one x,y,z row per waypoint (local NED, metres).
+    """
+    return np.loadtxt(path, delimiter=",", ndmin=2, dtype=np.float64)
+
+
+class WaypointIndex:
+    """
+    Static 3D KD-tree over the waypoints for nearest waypoint queries in O(log n).
+
+    Stored implicitly: the waypoints are reordered so that the node of the range [lo, hi)
+    is its middle element, split on axis depth % 3, with its subtrees on either side.
+    """
+
+    def __init__(self, points: np.ndarray) -> None:
+        count = len(points)
+        order = np.arange(count)
+        stack = [(0, count, 0)]
+        while len(stack) > 0:
+            lo, hi, depth = stack.pop()
+            if hi - lo <= 1:
+                continue
+
+            middle = (lo + hi) // 2
+            segment = order[lo:hi]
+            order[lo:hi] = segment[np.argpartition(points[segment, depth % 3], middle - lo)]
+            stack.append((lo, middle, depth + 1))
+            stack.append((middle + 1, hi, depth + 1))
+
+        # Plain lists, indexing them is much faster than numpy for single elements
+        self.__order = order.tolist()
+        self.__points = points[order].tolist()
+
+    def nearest(self, x: float, y: float, z: float) -> "tuple[int, float]":
+        """
+        Index of the nearest waypoint and its distance.
+        """
+        query = (x, y, z)
+        best_index = -1
+        best_squared = math.inf
+        # (lo, hi, depth, squared distance to the splitting plane that led here)
+        stack = [(0, len(self.__points), 0, 0.0)]
+        while len(stack) > 0:
+            lo, hi, depth, bound = stack.pop()
+            if lo >= hi or bound >= best_squared:
+                continue
+
+            middle = (lo + hi) // 2
+            point = self.__points[middle]
+            squared = (
+                (query[0] - point[0]) ** 2 + (query[1] - point[1]) ** 2 + (query[2] - point[2]) ** 2
+            )
+            if squared < best_squared:
+                best_squared = squared
+                best_index = middle
+
+            axis = depth % 3
+            offset = query[axis] - point[axis]
+            near, far = (
+                ((lo, middle), (middle + 1, hi))
+                if offset < 0.0
+                else ((middle + 1, hi), (lo, middle))
+            )
+            # Far side first so the near side is searched first
+            stack.append((far[0], far[1], depth + 1, offset * offset))
+            stack.append((near[0], near[1], depth + 1, 0.0))
+
+        return self.__order[best_index], math.sqrt(best_squared)
+
+
+class Mission:  # pylint: disable=too-many-instance-attributes
+    """
+    Sequence of waypoints with the legs between them precomputed.
+
+    The active waypoint only moves forward, and only the active leg is checked per sample:
+    it is reached within the acceptance radius or once the vehicle has passed its end.
+    The vehicle is steered towards a point a look-ahead distance further along the active
+    leg than its own progress, which brings it back onto the leg when it drifts off, and
+    along the altitude profile of the leg's climb. The spatial index is used to join the mission at the nearest waypoint,
+    and to rejoin it there when the vehicle strays too far from the active leg.
+    """
+
+    def __init__(
+        self,
+        waypoints: "np.ndarray | list[tuple[float, float, float]]",
+        acceptance_radius: float = 1.0,
+        loop: bool = False,
+        start_nearest: bool = False,
+        rejoin_distance: float | None = None,
+        look_ahead: float = 5.0,
+    ) -> None:
+        """
+        waypoints: x, y, z of each waypoint in order.
+        acceptance_radius: Distance in metres at which a waypoint counts as reached.
+        loop: Start over after the last waypoint instead of holding it.
+        start_nearest: Join at the waypoint nearest the first sample instead of the first one.
+        rejoin_distance: Distance in metres from the active leg beyond which the mission is
+            rejoined at the nearest waypoint, None to never rejoin.
+        look_ahead: Distance in metres along the leg, past the vehicle's progress, of the
+            point it is steered towards. Shorter corrects drift faster but more sharply.
+        """
+        points = np.asarray(waypoints, dtype=np.float64).reshape(-1, 3)
+        assert len(points) >= 1, "At least one waypoint"
+        assert acceptance_radius > 0.0, "Acceptance radius must be positive"
+        assert rejoin_distance is None or rejoin_distance > 0.0, "Rejoin distance must be positive"
+        assert look_ahead > 0.0, "Look-ahead distance must be positive"
+
+        self.waypoints = points
+        self.acceptance_radius = acceptance_radius
+        self.loop = loop
+        self.rejoin_distance = rejoin_distance
+        self.look_ahead = look_ahead
+        self.index = WaypointIndex(points)
+
+        # Leg i goes from waypoint i - 1 to waypoint i, the first one from the last if looping
+        vectors = points - np.roll(points, 1, axis=0)
+        if not loop:
+            vectors[0] = 0.0
+        self.leg_lengths = np.linalg.norm(vectors, axis=1)
+        self.leg_headings = np.arctan2(vectors[:, 1], vectors[:, 0])
+        self.leg_climbs = vectors[:, 2]
+        self.__leg_starts = (points - vectors).tolist()
+        self.__leg_directions = np.divide(
+            vectors,
+            self.leg_lengths[:, np.newaxis],
+            out=np.zeros_like(vectors),
+            where=self.leg_lengths[:, np.newaxis] > 0.0,
+        ).tolist()
+        self.__leg_lengths = self.leg_lengths.tolist()
+        self.__leg_headings = self.leg_headings.tolist()
+        self.__leg_climbs = self.leg_climbs.tolist()
+        self.__points = points.tolist()
+
+        self.active_index = 0
+        self.is_complete = False
+        self.__joined = not start_nearest
+
+    @property
+    def active_target(self) -> "tuple[float, float, float]":
+        """
+        Position of the active waypoint.
+        """
+        x, y, z = self.__points[self.active_index]
+        return x, y, z
+
+    def update(self, x: float, y: float, z: float) -> bool:
+        """
+        Advance past every waypoint the vehicle at this position has reached.
+
+        Returns whether the active waypoint changed.
+        """
+        previous = self.active_index
+        if not self.__joined:
+            self.rejoin(x, y, z)
+            self.__joined = True
+        elif self.rejoin_distance is not None:
+            _, squared = self.__leg_progress(x, y, z)
+            if squared > self.rejoin_distance**2:
+                self.rejoin(x, y, z)
+
+        # Bounded so a loop of waypoints all within the radius cannot spin forever
+        for _ in range(len(self.__points)):
+            if self.is_complete or not self.__reached(x, y, z):
+                break
+
+            self.__advance()
+
+        return self.active_index != previous
+
+    def leg_target(self, x: float, y: float, z: float) -> "tuple[float, float]":
+        """
+        Heading in radians towards the point look_ahead further along the active leg than the
+        vehicle's progress (at most its end), and the altitude of the leg's climb at that
+        progress. Without a leg (the first waypoint of a mission that does not loop) the
+        heading is towards the waypoint and the altitude is its own.
+        """
+        target = self.__points[self.active_index]
+        length = self.__leg_lengths[self.active_index]
+        if length == 0.0:
+            return math.atan2(target[1] - y, target[0] - x), target[2]
+
+        along, _ = self.__leg_progress(x, y, z)
+        climb = self.__leg_climbs[self.active_index]
+        start = self.__leg_starts[self.active_index]
+        direction = self.__leg_directions[self.active_index]
+        ahead = min(along + self.look_ahead, length)
+        aim_x = start[0] + direction[0] * ahead - x
+        aim_y = start[1] + direction[1] * ahead - y
+        if aim_x == 0.0 and aim_y == 0.0:
+            # Straight above or below the point, as on a vertical leg
+            heading = self.__leg_headings[self.active_index]
+        else:
+            heading = math.atan2(aim_y, aim_x)
+        return heading, start[2] + climb * along / length
+
+    def rejoin(self, x: float, y: float, z: float) -> None:
+        """
+        Make the waypoint nearest to the position the active one.
+        """
+        self.active_index, _ = self.index.nearest(x, y, z)
+        self.is_complete = False
+
+    def __reached(self, x: float, y: float, z: float) -> bool:
+        """
+        Within the acceptance radius of the active waypoint, or past the end of its leg.
+        """
+        target = self.__points[self.active_index]
+        offset = (x - target[0], y - target[1], z - target[2])
+        if offset[0] ** 2 + offset[1] ** 2 + offset[2] ** 2 <= self.acceptance_radius**2:
+            return True
+
+        length = self.__leg_lengths[self.active_index]
+        if length == 0.0:
+            return False
+
+        start = self.__leg_starts[self.active_index]
+        direction = self.__leg_directions[self.active_index]
+        along = (
+            (x - start[0]) * direction[0]
+            + (y - start[1]) * direction[1]
+            + (z - start[2]) * direction[2]
+        )
+        return along >= length
+
+    def __leg_progress(self, x: float, y: float, z: float) -> "tuple[float, float]":
+        """
+        Distance along the active leg of the nearest point on it, and the squared distance
+        of the vehicle from that point.
+        """
+        start = self.__leg_starts[self.active_index]
+        direction = self.__leg_directions[self.active_index]
+        length = self.__leg_lengths[self.active_index]
+        offset = (x - start[0], y - start[1], z - start[2])
+        along = offset[0] * direction[0] + offset[1] * direction[1] + offset[2] * direction[2]
+        along = min(max(along, 0.0), length)
+        return along, (
+            (offset[0] - direction[0] * along) ** 2
+            + (offset[1] - direction[1] * along) ** 2
+            + (offset[2] - direction[2] * along) ** 2
+        )
+
+    def __advance(self) -> None:
+        """
+        Make the next waypoint active, or finish on the last one.
+        """
+        if self.active_index + 1 < len(self.__points):
+            self.active_index += 1
+            return
+
+        if self.loop:
+            self.active_index = 0
+            return
+
+        self.is_complete = True
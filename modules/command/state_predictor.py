@@ -0,0 +1,205 @@
+"""
+Predicts the current vehicle state from telemetry that has waited in queues.
+"""
+
+import copy
+import enum
+import math
+
+import numpy as np
+
+
+class PredictorKind(enum.Enum):
+    """
+    How the position and velocity are estimated before extrapolating.
+    """
+
+    EXTRAPOLATE = 0  # Latest measurement as is
+    KALMAN = 1  # Constant velocity Kalman filter per axis
+
+
+class PredictionErrors:
+    """
+    Struct of how far predictions were from the next measurement.
+    """
+
+    def __init__(
+        self,
+        count: int,
+        mean_position_error: float,  # m
+        max_position_error: float,  # m
+        mean_yaw_error: float,  # rad
+    ) -> None:
+        self.count = count
+        self.mean_position_error = mean_position_error
+        self.max_position_error = max_position_error
+        self.mean_yaw_error = mean_yaw_error
+
+    def __str__(self) -> str:
+        return (
+            f"{self.count} predictions, position error mean: {self.mean_position_error:.3f}m "
+            f"max: {self.max_position_error:.3f}m, yaw error mean: {self.mean_yaw_error:.4f}rad"
+        )
+
+
+class StatePredictor:  # pylint: disable=too-many-instance-attributes
+    """
+    Extrapolates TelemetryData to the current time using its velocities and angular rates.
+
+    The time each half of the sample was valid comes from `timestamp` (time.monotonic()
+    when the older half arrived, shared by all processes) and the per half ages, which were
+    taken when the sample was produced. Samples without them are passed through unchanged. Angular rates are body rates, treated as Euler rates,
+    which holds for the small roll and pitch of normal flight.
+
+    Before each prediction, the previous estimate is propagated to the new measurement
+    time and compared with it, which gives the prediction error.
+    """
+
+    POSITION_FIELDS = ("x", "y", "z")
+    VELOCITY_FIELDS = ("x_velocity", "y_velocity", "z_velocity")
+    ANGLE_FIELDS = ("roll", "pitch", "yaw")
+    RATE_FIELDS = ("roll_speed", "pitch_speed", "yaw_speed")
+
+    def __init__(
+        self,
+        kind: PredictorKind = PredictorKind.EXTRAPOLATE,
+        acceleration_noise: float = 1.0,
+        position_noise: float = 0.1,
+        velocity_noise: float = 0.1,
+    ) -> None:
+        """
+        acceleration_noise: Kalman process noise, standard deviation in m/s^2.
+        position_noise: Kalman measurement noise, standard deviation in m.
+        velocity_noise: Kalman measurement noise, standard deviation in m/s.
+        """
+        self.kind = kind
+        self.__acceleration_variance = acceleration_noise**2
+        self.__measurement_covariance = np.diag([position_noise**2, velocity_noise**2])
+
+        # Per axis [position, velocity] and its covariance, all 3 axes at once
+        self.__state = np.zeros((3, 2))
+        self.__covariance = np.zeros((3, 2, 2))
+        self.__position_time: float | None = None
+        self.__yaw = 0.0
+        self.__yaw_speed = 0.0
+        self.__attitude_time: float | None = None
+
+        self.__error_count = 0
+        self.__position_error_sum = 0.0
+        self.__position_error_max = 0.0
+        self.__yaw_error_sum = 0.0
+
+    def predict(self, data: object, now: float) -> object:
+        """
+        Copy of the TelemetryData with position and attitude extrapolated to now.
+        """
+        if data.timestamp is None or data.position_age is None or data.attitude_age is None:
+            return data
+
+        produced = data.timestamp + max(data.position_age, data.attitude_age)
+        position_time = produced - data.position_age
+        attitude_time = produced - data.attitude_age
+        measured = np.array(
+            [
+                [getattr(data, position), getattr(data, velocity)]
+                for position, velocity in zip(self.POSITION_FIELDS, self.VELOCITY_FIELDS)
+            ]
+        )
+
+        self.__record_error(measured, position_time, data.yaw, attitude_time)
+        self.__update_position(measured, position_time)
+        self.__yaw = data.yaw
+        self.__yaw_speed = data.yaw_speed
+        self.__attitude_time = attitude_time
+
+        predicted = copy.copy(data)
+        position_dt = max(0.0, now - position_time)
+        for axis, (position, velocity) in enumerate(
+            zip(self.POSITION_FIELDS, self.VELOCITY_FIELDS)
+        ):
+            setattr(
+                predicted,
+                position,
+                float(self.__state[axis, 0] + self.__state[axis, 1] * position_dt),
+            )
+            setattr(predicted, velocity, float(self.__state[axis, 1]))
+
+        attitude_dt = max(0.0, now - attitude_time)
+        for angle, rate in zip(self.ANGLE_FIELDS, self.RATE_FIELDS):
+            setattr(
+                predicted,
+                angle,
+                _wrap(getattr(data, angle) + getattr(data, rate) * attitude_dt),
+            )
+
+        predicted.timestamp = now
+        predicted.position_age = 0.0
+        predicted.attitude_age = 0.0
+        return predicted
+
+    def get_errors(self) -> PredictionErrors:
+        """
+        Prediction error so far.
+        """
+        count = max(1, self.__error_count)
+        return PredictionErrors(
+            self.__error_count,
+            self.__position_error_sum / count,
+            self.__position_error_max,
+            self.__yaw_error_sum / count,
+        )
+
+    def __record_error(
+        self, measured: np.ndarray, position_time: float, yaw: float, attitude_time: float
+    ) -> None:
+        """
+        Compare the previous estimate, propagated to the measurement time, with the measurement.
+        """
+        if self.__position_time is None or self.__attitude_time is None:
+            return
+
+        dt = position_time - self.__position_time
+        expected = self.__state[:, 0] + self.__state[:, 1] * dt
+        position_error = float(np.linalg.norm(measured[:, 0] - expected))
+
+        expected_yaw = self.__yaw + self.__yaw_speed * (attitude_time - self.__attitude_time)
+        yaw_error = abs(_wrap(yaw - expected_yaw))
+
+        self.__error_count += 1
+        self.__position_error_sum += position_error
+        self.__position_error_max = max(self.__position_error_max, position_error)
+        self.__yaw_error_sum += yaw_error
+
+    def __update_position(self, measured: np.ndarray, position_time: float) -> None:
+        """
+        New position and velocity estimate for all axes.
+        """
+        if self.kind == PredictorKind.EXTRAPOLATE or self.__position_time is None:
+            self.__state[:] = measured
+            self.__covariance[:] = self.__measurement_covariance
+            self.__position_time = position_time
+            return
+
+        dt = max(0.0, position_time - self.__position_time)
+        self.__position_time = position_time
+
+        # Predict: x = F x, P = F P F^T + Q
+        transition = np.array([[1.0, dt], [0.0, 1.0]])
+        process_covariance = self.__acceleration_variance * np.array(
+            [[dt**4 / 4.0, dt**3 / 2.0], [dt**3 / 2.0, dt**2]]
+        )
+        state = self.__state @ transition.T
+        covariance = transition @ self.__covariance @ transition.T + process_covariance
+
+        # Update, position and velocity are both measured: K = P (P + R)^-1
+        gain = covariance @ np.linalg.inv(covariance + self.__measurement_covariance)
+        innovation = measured - state
+        self.__state = state + np.einsum("aij,aj->ai", gain, innovation)
+        self.__covariance = (np.eye(2) - gain) @ covariance
+
+
+def _wrap(angle: float) -> float:
+    """
+    Wrap an angle into [-pi, pi).
+    """
+    return (angle + math.pi) % (2.0 * math.pi) - math.pi
@@ -0,0 +1,260 @@
+"""
+Bulk socket reading for TCP and UDP MAVLink connections.
+"""
+
+import collections
+import select
+import socket
+import time
+from typing import Deque, List, Tuple, Union
+
+from pymavlink import mavutil
+
+from ..common.modules.logger import logger
+
+
+# =================================================================================================
+#                            ↓ BOOTCAMPERS MODIFY BELOW THIS COMMENT ↓
+# =================================================================================================
+SUPPORTED_CONNECTIONS = (mavutil.mavtcp, mavutil.mavtcpin, mavutil.mavudp)
+
+
+class BulkReader:  # pylint: disable=too-many-instance-attributes
+    """
+    Reads every available byte from the connection socket in large chunks
+    and parses all of the MAVLink messages contained in them at once.
+
+    pymavlink only asks the socket for the bytes needed by the next message,
+    so each message costs at least one system call. This reader drains the
+    socket into a single reusable buffer instead.
+
+    recv_match() and select() behave like the mavfile ones, handing out the
+    decoded messages one at a time, so it can stand in for the connection when reading.
+    """
+
+    __private_key = object()
+
+    __POLL_INTERVAL = 0.05  # seconds
+
+    @classmethod
+    def create(
+        cls,
+        connection: mavutil.mavfile,
+        local_logger: logger.Logger,
+        buffer_size: int = 65536,
+        max_reads: int = 16,
+    ) -> Tuple[bool, Union["BulkReader", None]]:
+        """
+        Falliable create (instantiation) method to create a BulkReader object.
+
+        connection: TCP (tcp, tcpin) or UDP (udp, udpin, udpout) MAVLink connection.
+        buffer_size: Size of the receive buffer in bytes.
+        max_reads: Maximum number of socket reads per call, to bound the time spent draining.
+        """
+        if connection is None:
+            local_logger.error("Failed to create BulkReader: connection is None", True)
+            return False, None
+
+        if not isinstance(connection, SUPPORTED_CONNECTIONS):
+            local_logger.error(
+                f"Failed to create BulkReader: unsupported connection {type(connection).__name__}",
+                True,
+            )
+            return False, None
+
+        if buffer_size <= 0 or max_reads <= 0:
+            local_logger.error(
+                "Failed to create BulkReader: buffer size and read count must be positive", True
+            )
+            return False, None
+
+        try:
+            instance = cls(cls.__private_key, connection, local_logger, buffer_size, max_reads)
+            return True, instance
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            local_logger.error(f"BulkReader create failed: {e}", True)
+            return False, None
+
+    def __init__(
+        self,
+        key: object,
+        connection: mavutil.mavfile,
+        local_logger: logger.Logger,
+        buffer_size: int,
+        max_reads: int,
+    ) -> None:
+        assert key is BulkReader.__private_key, "Use create() method"
+        self._connection = connection
+        self._logger = local_logger
+        self._max_reads = max_reads
+        self._is_datagram = isinstance(connection, mavutil.mavudp)
+
+        # Allocated once and reused for every read
+        self._buffer = bytearray(buffer_size)
+        self._view = memoryview(self._buffer)
+        # Decoded but not yet handed out by recv_match()
+        self._pending: Deque[mavutil.mavlink.MAVLink_message] = collections.deque()
+
+        self.bytes_received = 0
+        self.reads = 0
+
+    def fileno(self) -> int:
+        """
+        File descriptor to wait on for incoming data, -1 if there is none yet.
+        """
+        port = self._connection.port
+        if port is None:
+            # tcpin before a client has connected
+            return -1 if self._connection.fd is None else self._connection.fd
+        return port.fileno()
+
+    def recv_match(
+        self,
+        condition: str | None = None,
+        type: "str | list[str] | None" = None,  # pylint: disable=redefined-builtin
+        blocking: bool = False,
+        timeout: float | None = None,
+    ) -> mavutil.mavlink.MAVLink_message | None:
+        """
+        Same as `mavfile.recv_match()`, messages that do not match are discarded.
+
+        Returns the next matching message, None if there is none within the timeout.
+        """
+        if type is not None and not isinstance(type, (list, set)):
+            type = [type]
+
+        start_time = time.monotonic()
+        while True:
+            while len(self._pending) > 0:
+                message = self._pending.popleft()
+                if type is not None and message.get_type() not in type:
+                    continue
+                if not mavutil.evaluate_condition(condition, self._connection.messages):
+                    continue
+                return message
+
+            wait = 0.0
+            if blocking:
+                wait = self.__POLL_INTERVAL
+                if timeout is not None:
+                    wait = min(wait, start_time + timeout - time.monotonic())
+                    if wait <= 0.0:
+                        return None
+
+            self._pending.extend(self.read(wait))
+            if len(self._pending) == 0 and not blocking:
+                return None
+
+    def select(self, timeout: float) -> bool:
+        """
+        Same as `mavfile.select()`, true straight away if decoded messages are waiting.
+        """
+        if len(self._pending) > 0:
+            return True
+
+        fd = self.fileno()
+        if fd < 0:
+            time.sleep(timeout)
+            return False
+
+        try:
+            readable, _, _ = select.select([fd], [], [], timeout)
+        except (OSError, ValueError):
+            return False
+        return len(readable) > 0
+
+    def read(self, timeout: float = 0.0) -> List[mavutil.mavlink.MAVLink_message]:
+        """
+        Read everything currently available and return all decoded messages.
+
+        timeout: Seconds to wait for data if none is available yet, 0 to not wait.
+
+        Returns a list of MAVLink messages, which is empty if nothing was received.
+        """
+        port = self._connection.port
+        if port is None:
+            # tcpin has not accepted a client yet, pymavlink accepts inside recv()
+            message = self._connection.recv_match(blocking=timeout > 0.0, timeout=timeout)
+            return [] if message is None else [message]
+
+        if timeout > 0.0:
+            readable, _, _ = select.select([port], [], [], timeout)
+            if not readable:
+                return []
+
+        messages = []
+        for _ in range(self._max_reads):
+            count = self._receive(port)
+            if count <= 0:
+                break
+
+            messages.extend(self._parse(self._view[:count]))
+
+            # A stream read that did not fill the buffer has drained the socket
+            if not self._is_datagram and count < len(self._buffer):
+                break
+
+        return messages
+
+    def _receive(self, port: socket.socket) -> int:
+        """
+        Single read into the reusable buffer.
+
+        Returns the number of bytes read, 0 if nothing was available or the peer closed.
+        """
+        try:
+            if self._is_datagram:
+                count, address = port.recvfrom_into(self._buffer)
+                self._track_udp_client(address)
+            else:
+                count = port.recv_into(self._buffer)
+        except (BlockingIOError, InterruptedError):
+            return 0
+        except ConnectionError as e:
+            self._logger.warning(f"Connection error while reading: {e}", True)
+            if isinstance(self._connection, mavutil.mavtcp):
+                self._connection.handle_disconnect()
+            return 0
+
+        if count == 0 and not self._is_datagram:
+            self._logger.warning("Peer closed the connection", True)
+            if isinstance(self._connection, mavutil.mavtcp):
+                self._connection.handle_eof()
+            return 0
+
+        self.reads += 1
+        self.bytes_received += count
+        return count
+
+    def _track_udp_client(self, address: Tuple[str, int]) -> None:
+        """
+        Keep the client bookkeeping pymavlink's own UDP recv() does, so that writes still work.
+        """
+        if self._connection.udp_server:
+            self._connection.clients.add(address)
+            self._connection.clients_last_alive[address] = time.time()
+        elif self._connection.broadcast:
+            self._connection.last_address = address
+
+    def _parse(self, chunk: memoryview) -> List[mavutil.mavlink.MAVLink_message]:
+        """
+        Feed a whole chunk to the MAVLink parser and post every decoded message.
+        """
+        connection = self._connection
+        if connection.logfile_raw:
+            connection.logfile_raw.write(chunk)
+        if connection.first_byte:
+            connection.auto_mavlink_version(bytes(chunk))
+
+        connection.pre_message()
+        messages: List[mavutil.mavlink.MAVLink_message] = connection.mav.parse_buffer(chunk) or []
+        for message in messages:
+            # Keeps target_system, sysid_state and packet loss statistics up to date
+            connection.post_message(message)
+
+        return messages
+
+
+# =================================================================================================
+#                            ↑ BOOTCAMPERS MODIFY ABOVE THIS COMMENT ↑
+# =================================================================================================
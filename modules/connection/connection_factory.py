@@ -0,0 +1,153 @@
+"""
+Creates MAVLink connections with tuned sockets.
+"""
+
+import socket
+
+from pymavlink import mavutil
+
+from ..common.modules.logger import logger
+
+
+class SocketOptions:  # pylint: disable=too-many-instance-attributes
+    """
+    Struct of socket tuning options. None keeps the operating system default.
+    """
+
+    def __init__(
+        self,
+        tcp_nodelay: bool = True,
+        receive_buffer_size: int | None = None,  # bytes
+        send_buffer_size: int | None = None,  # bytes
+        keepalive: bool = False,
+        keepalive_idle: int | None = None,  # s
+        keepalive_interval: int | None = None,  # s
+        keepalive_count: int | None = None,
+        low_latency: bool = False,
+    ) -> None:
+        self.tcp_nodelay = tcp_nodelay
+        self.receive_buffer_size = receive_buffer_size
+        self.send_buffer_size = send_buffer_size
+        self.keepalive = keepalive
+        self.keepalive_idle = keepalive_idle
+        self.keepalive_interval = keepalive_interval
+        self.keepalive_count = keepalive_count
+        self.low_latency = low_latency
+
+    def __str__(self) -> str:
+        return (
+            f"SocketOptions(tcp_nodelay={self.tcp_nodelay}, "
+            f"receive_buffer_size={self.receive_buffer_size}, "
+            f"send_buffer_size={self.send_buffer_size}, keepalive={self.keepalive}, "
+            f"low_latency={self.low_latency})"
+        )
+
+
+# =================================================================================================
+#                            ↓ BOOTCAMPERS MODIFY BELOW THIS COMMENT ↓
+# =================================================================================================
+# IPTOS_LOWDELAY from <netinet/ip.h>, not exported by the socket module on every platform
+IPTOS_LOWDELAY = 0x10
+# Highest SO_PRIORITY an unprivileged process can set on Linux
+LOW_LATENCY_PRIORITY = 6
+
+
+def create_connection(
+    connection_string: str,
+    options: SocketOptions,
+    local_logger: logger.Logger,
+    **connection_kwargs: object,
+) -> "tuple[bool, mavutil.mavfile | None]":
+    """
+    Wraps `mavutil.mavlink_connection()` and tunes the socket it creates.
+
+    connection_string: pymavlink connection string (e.g. tcp:localhost:12345).
+    options: Socket options to apply.
+    connection_kwargs: Passed through to `mavutil.mavlink_connection()`.
+
+    Returns whether the connection was created and the connection.
+    """
+    try:
+        connection = mavutil.mavlink_connection(connection_string, **connection_kwargs)
+    # Catching all exceptions for library call
+    # pylint: disable-next=broad-exception-caught
+    except Exception as e:
+        local_logger.error(f"Failed to create connection {connection_string}: {e}", True)
+        return False, None
+
+    if isinstance(connection, mavutil.mavtcpin):
+        # Accepted sockets inherit these options from the listening socket
+        sock = connection.listen
+    else:
+        sock = getattr(connection, "port", None)
+
+    if not isinstance(sock, socket.socket):
+        local_logger.warning(
+            f"Connection {connection_string} is not a socket, socket options not applied", True
+        )
+        return True, connection
+
+    if not apply_socket_options(sock, options, local_logger):
+        connection.close()
+        return False, None
+
+    local_logger.info(f"Connection {connection_string} created with {options}", True)
+    return True, connection
+
+
+def apply_socket_options(
+    sock: socket.socket, options: SocketOptions, local_logger: logger.Logger
+) -> bool:
+    """
+    Apply socket options. Options the platform does not support are skipped with a warning.
+
+    Returns whether all supported options were applied.
+    """
+    is_stream = sock.type == socket.SOCK_STREAM
+
+    settings = []
+    if options.receive_buffer_size is not None:
+        settings.append((socket.SOL_SOCKET, "SO_RCVBUF", options.receive_buffer_size))
+    if options.send_buffer_size is not None:
+        settings.append((socket.SOL_SOCKET, "SO_SNDBUF", options.send_buffer_size))
+    if options.low_latency:
+        settings.append((socket.IPPROTO_IP, "IP_TOS", IPTOS_LOWDELAY))
+        settings.append((socket.SOL_SOCKET, "SO_PRIORITY", LOW_LATENCY_PRIORITY))
+
+    if is_stream:
+        settings.append((socket.IPPROTO_TCP, "TCP_NODELAY", int(options.tcp_nodelay)))
+        settings.append((socket.SOL_SOCKET, "SO_KEEPALIVE", int(options.keepalive)))
+        if options.keepalive:
+            if options.keepalive_idle is not None:
+                settings.append((socket.IPPROTO_TCP, "TCP_KEEPIDLE", options.keepalive_idle))
+            if options.keepalive_interval is not None:
+                settings.append((socket.IPPROTO_TCP, "TCP_KEEPINTVL", options.keepalive_interval))
+            if options.keepalive_count is not None:
+                settings.append((socket.IPPROTO_TCP, "TCP_KEEPCNT", options.keepalive_count))
+
+    for level, name, value in settings:
+        option = getattr(socket, name, None)
+        if option is None:
+            local_logger.warning(f"{name} is not supported on this platform, skipped", True)
+            continue
+
+        try:
+            sock.setsockopt(level, option, value)
+        except OSError as e:
+            local_logger.error(f"Failed to set {name} to {value}: {e}", True)
+            return False
+
+    # The kernel may adjust buffer sizes (e.g. Linux doubles and caps them)
+    if options.receive_buffer_size is not None or options.send_buffer_size is not None:
+        receive_size = sock.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF)
+        send_size = sock.getsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF)
+        local_logger.info(
+            f"Socket buffers: receive {receive_size} bytes, send {send_size} bytes", True
+        )
+
+    return True
+
+
+# =================================================================================================
+#                            ↑ BOOTCAMPERS MODIFY ABOVE THIS COMMENT ↑
+# =================================================================================================
@@ -0,0 +1,53 @@
+"""
+Drops MAVLink messages that already arrived over another link.
+"""
+
+
+class DuplicateFilter:
+    """
+    Remembers the last message for every (system, component, sequence number).
+
+    The sequence number wraps every 256 messages, which can take less than a second
+    at high rates, so a repeat only counts as a duplicate if the message ID and
+    checksum also match and it arrives within the window.
+    """
+
+    SEQUENCE_COUNT = 256
+
+    def __init__(self, window: float = 1.0) -> None:
+        """
+        window: Seconds after which a repeated message is delivered again.
+        """
+        assert window > 0.0, "Window must be positive"
+
+        self.window = window
+        # (system, component) to per sequence number [message ID, checksum, arrival time]
+        self.__seen: "dict[tuple[int, int], list[list]]" = {}
+        self.duplicate_count = 0
+
+    def is_duplicate(
+        self,
+        system: int,
+        component: int,
+        sequence: int,
+        message_id: int,
+        checksum: int,
+        now: float,
+    ) -> bool:
+        """
+        Records the message and returns whether it was already seen within the window.
+        """
+        slots = self.__seen.get((system, component))
+        if slots is None:
+            slots = [[-1, -1, 0.0] for _ in range(self.SEQUENCE_COUNT)]
+            self.__seen[(system, component)] = slots
+
+        slot = slots[sequence % self.SEQUENCE_COUNT]
+        if slot[0] == message_id and slot[1] == checksum and now - slot[2] <= self.window:
+            self.duplicate_count += 1
+            return True
+
+        slot[0] = message_id
+        slot[1] = checksum
+        slot[2] = now
+        return False
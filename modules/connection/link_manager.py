@@ -0,0 +1,498 @@
+"""
+Redundant MAVLink links with merged inbound streams and best-link outbound routing.
+"""
+
+import os
+import select
+import time
+from multiprocessing import managers
+from typing import Tuple, Union
+
+from pymavlink import mavutil
+
+from . import connection_factory
+from . import duplicate_filter
+from ..common.modules.logger import logger
+
+
+class LinkStatistics:
+    """
+    Struct of per link health.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        is_healthy: bool,
+        rtt: float | None,  # s
+        loss: float,  # %
+        silence: float,  # s since the last message
+        duplicate_count: int,
+    ) -> None:
+        self.name = name
+        self.is_healthy = is_healthy
+        self.rtt = rtt
+        self.loss = loss
+        self.silence = silence
+        self.duplicate_count = duplicate_count
+
+    def __str__(self) -> str:
+        rtt = "unknown" if self.rtt is None else f"{self.rtt * 1000:.1f}ms"
+        return (
+            f"{self.name}: healthy: {self.is_healthy}, rtt: {rtt}, loss: {self.loss:.1f}%, "
+            f"silence: {self.silence:.3f}s, duplicates: {self.duplicate_count}"
+        )
+
+
+# =================================================================================================
+#                            ↓ BOOTCAMPERS MODIFY BELOW THIS COMMENT ↓
+# =================================================================================================
+class _Link:  # pylint: disable=too-many-instance-attributes
+    """
+    One connection and its health.
+    """
+
+    # Weight of a new round trip sample in the smoothed round trip time, as in TCP
+    RTT_GAIN = 0.125
+    # Answers to pings older than this are not ours, or too late to be useful
+    PING_EXPIRY = 2.0  # seconds
+
+    def __init__(self, name: str, connection: mavutil.mavfile, now: float) -> None:
+        self.name = name
+        self.connection = connection
+        self.last_receive_time = now
+        self.smoothed_rtt: float | None = None
+        # When smoothed_rtt last changed, to take the newest from the shared health
+        self.rtt_time = 0.0
+        self.loss = 0.0  # %
+        self.write_failure_time: float | None = None
+        self.duplicate_count = 0
+
+    def is_healthy(self, now: float, stall_timeout: float) -> bool:
+        """
+        Healthy if something arrived recently, and since the last failed write.
+        """
+        if self.write_failure_time is not None and (
+            self.write_failure_time >= self.last_receive_time
+        ):
+            return False
+        return now - self.last_receive_time <= stall_timeout
+
+    def add_rtt_sample(self, rtt: float, now: float) -> None:
+        """
+        Exponentially smoothed round trip time.
+        """
+        self.rtt_time = now
+        if self.smoothed_rtt is None:
+            self.smoothed_rtt = rtt
+            return
+
+        self.smoothed_rtt += self.RTT_GAIN * (rtt - self.smoothed_rtt)
+
+
+class _RoutedMav:
+    """
+    Stand-in for `mavfile.mav` that sends every message over the current best link.
+    """
+
+    def __init__(self, owner: "LinkManager") -> None:
+        self._owner = owner
+
+    def __getattr__(self, name: str) -> object:
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        if not name.endswith("_send"):
+            return getattr(self._owner.best_link().connection.mav, name)
+
+        def send(*args: object, **kwargs: object) -> None:
+            self._owner.send(name, args, kwargs)
+
+        return send
+
+
+class LinkManager:  # pylint: disable=too-many-instance-attributes
+    """
+    Opens several connections to the same drone (e.g. primary link and backup radio).
+
+    Inbound messages from all links are merged and duplicates are dropped by
+    (system, component, sequence number). Outbound messages go over the healthy link
+    with the lowest round trip time, penalized by its packet loss. Round trip time is
+    measured with TIMESYNC pings. A link that is silent for longer than the stall timeout,
+    or whose last write failed, is skipped on the next send.
+
+    Only the outbound writer sends and it never receives, so the processes that receive
+    publish what they see of each link into a shared dict (share_health()) that the
+    writer merges before choosing a link. Pings are sent by the writer (ping_links())
+    with their send time in ts1, and timed by whichever process reads the answer,
+    as time.monotonic_ns() is the same clock in every process.
+    """
+
+    __private_key = object()
+
+    __POLL_INTERVAL = 0.01  # seconds
+    # Seconds between publishing or merging the shared health
+    __HEALTH_INTERVAL = 0.05
+    # Loss of 10% counts the same as doubling the round trip time
+    __LOSS_PENALTY = 10.0
+    # Round trip time assumed for a link that has not answered a ping yet
+    __DEFAULT_RTT = 1.0  # seconds
+    # A healthy active link is only replaced by one that scores this much better, against flapping
+    __SWITCH_MARGIN = 0.8
+
+    @classmethod
+    def create(
+        cls,
+        connection_strings: "list[str]",
+        options: connection_factory.SocketOptions,
+        local_logger: logger.Logger,
+        stall_timeout: float = 0.25,
+        ping_period: float = 0.1,
+        duplicate_window: float = 1.0,
+    ) -> Tuple[bool, Union["LinkManager", None]]:
+        """
+        Falliable create (instantiation) method to create a LinkManager object.
+        Links that fail to open are skipped, at least one must open.
+
+        connection_strings: One pymavlink connection string per link, the first is the primary.
+        stall_timeout: Seconds without a message before a link is considered stalled.
+        ping_period: Seconds between TIMESYNC pings on each link.
+        duplicate_window: Seconds in which a repeated message counts as a duplicate.
+        """
+        if stall_timeout <= 0.0 or ping_period <= 0.0 or duplicate_window <= 0.0:
+            local_logger.error("Failed to create LinkManager: periods must be positive", True)
+            return False, None
+
+        now = time.monotonic()
+        links = []
+        for connection_string in connection_strings:
+            result, connection = connection_factory.create_connection(
+                connection_string, options, local_logger
+            )
+            if not result:
+                local_logger.warning(f"Link {connection_string} skipped", True)
+                continue
+
+            links.append(_Link(connection_string, connection, now))
+
+        if len(links) == 0:
+            local_logger.error("Failed to create LinkManager: no link could be opened", True)
+            return False, None
+
+        return True, cls(
+            cls.__private_key,
+            links,
+            local_logger,
+            stall_timeout,
+            ping_period,
+            duplicate_window,
+        )
+
+    def __init__(
+        self,
+        key: object,
+        links: "list[_Link]",
+        local_logger: logger.Logger,
+        stall_timeout: float,
+        ping_period: float,
+        duplicate_window: float,
+    ) -> None:
+        assert key is LinkManager.__private_key, "Use create() method"
+        self._links = links
+        self._logger = local_logger
+        self._stall_timeout = stall_timeout
+        self._ping_period = ping_period
+        self._duplicates = duplicate_filter.DuplicateFilter(duplicate_window)
+
+        self.mav = _RoutedMav(self)
+        self._next_ping_time = 0.0
+        self._next_link = 0
+        self._active_link: _Link | None = None
+
+        # (link name, process ID) to (last receive time, smoothed rtt, rtt time, loss)
+        self._health: "managers.DictProxy | None" = None
+        self._next_publish_time = 0.0
+        self._next_merge_time = 0.0
+
+    def __getattr__(self, name: str) -> object:
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        return getattr(self.best_link().connection, name)
+
+    @property
+    def target_system(self) -> int:
+        """
+        System ID of the drone as seen on any link.
+        """
+        for link in self._links:
+            if link.connection.target_system:
+                return link.connection.target_system
+        return 0
+
+    def share_health(self, health: "managers.DictProxy") -> None:
+        """
+        Exchange link health with the other processes through a dict shared by all of them
+        (SyncManager.dict()). Call before the workers are started.
+        """
+        self._health = health
+
+    def get_statistics(self) -> "list[LinkStatistics]":
+        """
+        Returns the health of every link.
+        """
+        now = time.monotonic()
+        self._merge_health(now, True)
+        return [
+            LinkStatistics(
+                link.name,
+                link.is_healthy(now, self._stall_timeout),
+                link.smoothed_rtt,
+                link.loss,
+                now - link.last_receive_time,
+                link.duplicate_count,
+            )
+            for link in self._links
+        ]
+
+    def best_link(self) -> _Link:
+        """
+        Healthy link with the lowest loss-penalized round trip time.
+        If every link is stalled, the one heard from most recently.
+        """
+        now = time.monotonic()
+        self._merge_health(now)
+        healthy = [link for link in self._links if link.is_healthy(now, self._stall_timeout)]
+        if len(healthy) == 0:
+            best = max(self._links, key=lambda link: link.last_receive_time)
+        else:
+            best = min(healthy, key=self._score)
+            active = self._active_link
+            if (
+                active is not None
+                and active in healthy
+                and self._score(best) > self._score(active) * self.__SWITCH_MARGIN
+            ):
+                best = active
+
+        if best is not self._active_link:
+            if self._active_link is not None:
+                self._logger.info(f"Outbound traffic switched to {best.name}", True)
+            self._active_link = best
+
+        return best
+
+    def send(self, name: str, args: tuple, kwargs: dict) -> None:
+        """
+        Send with `mav.<name>(*args, **kwargs)` over the best link.
+        """
+        link = self.best_link()
+        try:
+            getattr(link.connection.mav, name)(*args, **kwargs)
+        except OSError as e:
+            self._logger.warning(f"Send over {link.name} failed: {e}", True)
+            link.write_failure_time = time.monotonic()
+            # Fail over immediately instead of losing the message
+            fallback = self.best_link()
+            if fallback is not link:
+                getattr(fallback.connection.mav, name)(*args, **kwargs)
+
+    def handle_disconnect(self) -> None:
+        """
+        Writing to the link last chosen failed, the next send goes over another one.
+        Called by the outbound writer, which writes to the chosen link's socket itself.
+        """
+        link = self._active_link
+        if link is None:
+            return
+
+        self._logger.warning(f"Write over {link.name} failed", True)
+        link.write_failure_time = time.monotonic()
+
+    def ping_links(self) -> None:
+        """
+        Send a TIMESYNC request on every link once per ping period.
+        Only call from the process that owns outbound traffic.
+        """
+        now = time.monotonic()
+        if now < self._next_ping_time:
+            return
+
+        self._next_ping_time = now + self._ping_period
+        for link in self._links:
+            try:
+                link.connection.mav.timesync_send(0, time.monotonic_ns())
+            except OSError:
+                link.write_failure_time = now
+
+    def wait_heartbeat(self, blocking: bool = True, timeout: float | None = None) -> object:
+        """
+        Same as `mavfile.wait_heartbeat()` over all links.
+        """
+        return self.recv_match(type="HEARTBEAT", blocking=blocking, timeout=timeout)
+
+    def recv_match(
+        self,
+        condition: str | None = None,
+        type: "str | list[str] | None" = None,  # pylint: disable=redefined-builtin
+        blocking: bool = False,
+        timeout: float | None = None,
+    ) -> object:
+        """
+        Same as `mavfile.recv_match()` over the merged, de-duplicated stream of all links.
+        """
+        if type is not None and not isinstance(type, (list, set)):
+            type = [type]
+
+        start_time = time.monotonic()
+        while True:
+            msg = self._recv_next()
+            while msg is not None:
+                if (type is None or msg.get_type() in type) and self._matches(msg, condition):
+                    return msg
+                msg = self._recv_next()
+
+            if not blocking:
+                return None
+
+            wait = self.__POLL_INTERVAL
+            if timeout is not None:
+                remaining = start_time + timeout - time.monotonic()
+                if remaining <= 0.0:
+                    return None
+                wait = min(wait, remaining)
+
+            self.select(wait)
+
+    def select(self, timeout: float) -> bool:
+        """
+        Same as `mavfile.select()`: wait for up to timeout seconds until any link has data.
+
+        Returns whether data arrived.
+        """
+        descriptors = [link.connection.fd for link in self._links if link.connection.fd is not None]
+        if len(descriptors) == 0:
+            time.sleep(timeout)
+            return True
+
+        try:
+            readable, _, _ = select.select(descriptors, [], [], timeout)
+        except (OSError, ValueError):
+            time.sleep(timeout)
+            return False
+
+        return len(readable) > 0
+
+    def _score(self, link: _Link) -> float:
+        """
+        Lower is better.
+        """
+        rtt = self.__DEFAULT_RTT if link.smoothed_rtt is None else link.smoothed_rtt
+        return rtt * (1.0 + link.loss / self.__LOSS_PENALTY)
+
+    def _recv_next(self) -> object:
+        """
+        Next new message from any link, taking links in turns so none is starved.
+        """
+        for _ in range(len(self._links)):
+            link = self._links[self._next_link]
+            self._next_link = (self._next_link + 1) % len(self._links)
+
+            msg = link.connection.recv_msg()
+            while msg is not None:
+                accepted = self._accept(link, msg)
+                self._publish_health(time.monotonic())
+                if accepted:
+                    return msg
+                msg = link.connection.recv_msg()
+
+        return None
+
+    def _accept(self, link: _Link, msg: object) -> bool:
+        """
+        Update link health and decide whether the message is delivered.
+        """
+        now = time.monotonic()
+        link.last_receive_time = now
+
+        message_type = msg.get_type()
+        if message_type == "BAD_DATA":
+            return False
+
+        # Answer to a ping, tc1 is the remote clock and ts1 our send time echoed back
+        if message_type == "TIMESYNC" and msg.tc1 != 0:
+            rtt = (time.monotonic_ns() - msg.ts1) / 1e9
+            if 0.0 < rtt <= link.PING_EXPIRY:
+                link.add_rtt_sample(rtt, now)
+                return False
+
+        if self._duplicates.is_duplicate(
+            msg.get_srcSystem(),
+            msg.get_srcComponent(),
+            msg.get_seq(),
+            msg.get_msgId(),
+            msg.get_crc(),
+            now,
+        ):
+            link.duplicate_count += 1
+            return False
+
+        return True
+
+    def _matches(self, msg: object, condition: str | None) -> bool:
+        """
+        Evaluate a recv_match() condition against the state of the link the message came from.
+        """
+        if condition is None:
+            return True
+
+        for link in self._links:
+            state = link.connection.sysid_state.get(msg.get_srcSystem())
+            if state is not None and mavutil.evaluate_condition(condition, state.messages):
+                return True
+        return False
+
+    def _publish_health(self, now: float) -> None:
+        """
+        Update the loss of every link and share what this process saw of them.
+        """
+        if now < self._next_publish_time:
+            return
+
+        self._next_publish_time = now + self.__HEALTH_INTERVAL
+        process_id = os.getpid()
+        for link in self._links:
+            link.loss = link.connection.packet_loss()
+            if self._health is not None:
+                self._health[(link.name, process_id)] = (
+                    link.last_receive_time,
+                    link.smoothed_rtt,
+                    link.rtt_time,
+                    link.loss,
+                )
+
+    def _merge_health(self, now: float, force: bool = False) -> None:
+        """
+        Take the newest health any process saw of each link.
+        """
+        if self._health is None or (not force and now < self._next_merge_time):
+            return
+
+        self._next_merge_time = now + self.__HEALTH_INTERVAL
+        links = {link.name: link for link in self._links}
+        for (name, _), (last_receive_time, rtt, rtt_time, loss) in self._health.items():
+            link = links.get(name)
+            if link is None:
+                continue
+
+            if last_receive_time > link.last_receive_time:
+                link.last_receive_time = last_receive_time
+                link.loss = loss
+            if rtt is not None and rtt_time > link.rtt_time:
+                link.smoothed_rtt = rtt
+                link.rtt_time = rtt_time
+
+
+# =================================================================================================
+#                            ↑ BOOTCAMPERS MODIFY ABOVE THIS COMMENT ↑
+# =================================================================================================
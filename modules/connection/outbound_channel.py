@@ -0,0 +1,112 @@
+"""
+Send channel that routes outbound MAVLink messages to the outbound writer.
+"""
+
+import queue
+
+from pymavlink import mavutil
+
+from utilities.workers import queue_proxy_wrapper
+
+
+class OutboundMessage:
+    """
+    Struct for a MAVLink message waiting to be sent by the outbound writer.
+
+    name: pymavlink message name in lower case (e.g. command_long).
+    args: Positional arguments of the pymavlink `<name>_send()` method.
+    kwargs: Keyword arguments of the pymavlink `<name>_send()` method.
+    """
+
+    def __init__(self, name: str, args: tuple, kwargs: dict) -> None:
+        self.name = name
+        self.args = args
+        self.kwargs = kwargs
+
+    @property
+    def message_type(self) -> str:
+        """
+        MAVLink message type (e.g. COMMAND_LONG).
+        """
+        return self.name.upper()
+
+    def __str__(self) -> str:
+        return f"{self.message_type}{self.args}"
+
+
+# =================================================================================================
+#                            ↓ BOOTCAMPERS MODIFY BELOW THIS COMMENT ↓
+# =================================================================================================
+class _OutboundMav:
+    """
+    Stand-in for `mavfile.mav` where every `<name>_send()` call is put into the send queue.
+    """
+
+    PUT_TIMEOUT = 0.1  # seconds
+
+    def __init__(self, send_queue: queue_proxy_wrapper.QueueProxyWrapper) -> None:
+        self._send_queue = send_queue
+        self.dropped = 0
+
+    def __getattr__(self, name: str) -> "(...) -> None":  # type: ignore
+        # Private and dunder lookups (e.g. from pickle) must not be treated as messages
+        if name.startswith("_") or not name.endswith("_send"):
+            raise AttributeError(name)
+
+        message_name = name[: -len("_send")]
+
+        def send(*args: object, **kwargs: object) -> None:
+            try:
+                self._send_queue.queue.put(
+                    OutboundMessage(message_name, args, kwargs), timeout=self.PUT_TIMEOUT
+                )
+            except queue.Full:
+                # Sending is best effort, same as writing to a congested socket
+                self.dropped += 1
+
+        return send
+
+
+class OutboundChannel:
+    """
+    Wraps a connection so that sends go through the outbound writer stage.
+
+    Only `mav.<name>_send()` is redirected, everything else (e.g. `recv_match()`,
+    `target_system`) is read from the wrapped connection. Because it exposes the same
+    interface, it can be passed anywhere a `mavutil.mavfile` is expected.
+    """
+
+    def __init__(
+        self, connection: mavutil.mavfile, send_queue: queue_proxy_wrapper.QueueProxyWrapper
+    ) -> None:
+        self._connection = connection
+        self._send_queue = send_queue
+        self.mav = _OutboundMav(send_queue)
+
+    def send_batch(self, messages: "list[OutboundMessage]") -> bool:
+        """
+        Queue several messages with a single put, the writer sends them in one wakeup.
+
+        Returns False if the send queue stayed full and they were dropped.
+        """
+        if len(messages) == 0:
+            return True
+
+        try:
+            self._send_queue.queue.put(list(messages), timeout=_OutboundMav.PUT_TIMEOUT)
+        except queue.Full:
+            self.mav.dropped += len(messages)
+            return False
+
+        return True
+
+    def __getattr__(self, name: str) -> object:
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        return getattr(self._connection, name)
+
+
+# =================================================================================================
+#                            ↑ BOOTCAMPERS MODIFY ABOVE THIS COMMENT ↑
+# =================================================================================================
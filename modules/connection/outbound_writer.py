@@ -0,0 +1,322 @@
+"""
+Outbound writer that owns all traffic sent to the drone.
+"""
+
+import select
+import socket
+import time
+from typing import Dict, Tuple, Union
+
+from pymavlink import mavutil
+
+from . import outbound_channel
+from . import token_bucket
+from ..common.modules.logger import logger
+
+
+# =================================================================================================
+#                            ↓ BOOTCAMPERS MODIFY BELOW THIS COMMENT ↓
+# =================================================================================================
+class OutboundWriter:  # pylint: disable=too-many-instance-attributes
+    """
+    Coalesces, rate limits and batches outbound MAVLink messages.
+
+    Redundant COMMAND_LONGs with the same target and command ID are replaced by the latest one.
+    Messages over their type's rate stay pending until tokens are available. Rates apply to
+    each target system apart, so commanding a fleet does not starve its vehicles.
+    Everything sendable in a wakeup is packed into a single buffer and written at once.
+    """
+
+    __private_key = object()
+
+    __SEND_TIMEOUT = 0.5  # seconds
+    __IDLE_WAKEUP = 0.1  # seconds
+    __MIN_WAKEUP = 0.001  # seconds
+
+    @classmethod
+    def create(
+        cls,
+        connection: mavutil.mavfile,
+        rate_limits: "dict[str, tuple[float, float]]",
+        local_logger: logger.Logger,
+        max_pending: int = 100,
+    ) -> Tuple[bool, Union["OutboundWriter", None]]:
+        """
+        Falliable create (instantiation) method to create an OutboundWriter object.
+
+        connection: MAVLink connection to write to.
+        rate_limits: Message type (e.g. COMMAND_LONG) to (rate per second, burst) for each
+            target system. Message types without an entry are not rate limited.
+        max_pending: Maximum number of messages waiting for tokens, the oldest is dropped beyond it.
+        """
+        if connection is None:
+            local_logger.error("Failed to create OutboundWriter: connection is None", True)
+            return False, None
+
+        if max_pending <= 0:
+            local_logger.error(
+                "Failed to create OutboundWriter: max pending must be positive", True
+            )
+            return False, None
+
+        for message_type, (rate, burst) in rate_limits.items():
+            if rate <= 0.0 or burst < 1.0:
+                local_logger.error(
+                    f"Failed to create OutboundWriter: invalid rate limit for {message_type}", True
+                )
+                return False, None
+
+        try:
+            instance = cls(cls.__private_key, connection, rate_limits, local_logger, max_pending)
+            return True, instance
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            local_logger.error(f"OutboundWriter create failed: {e}", True)
+            return False, None
+
+    def __init__(
+        self,
+        key: object,
+        connection: mavutil.mavfile,
+        rate_limits: "dict[str, tuple[float, float]]",
+        local_logger: logger.Logger,
+        max_pending: int,
+    ) -> None:
+        assert key is OutboundWriter.__private_key, "Use create() method"
+        self._connection = connection
+        self._logger = local_logger
+        self._max_pending = max_pending
+
+        self._rate_limits = {
+            message_type.upper(): (rate, burst)
+            for message_type, (rate, burst) in rate_limits.items()
+        }
+        # By (message type, target system), created on first use
+        self._buckets: Dict[Tuple[str, int | None], token_bucket.TokenBucket] = {}
+        # Position of target_system in the send arguments of each message name
+        self._target_indices: Dict[str, int | None] = {}
+
+        # Insertion ordered, coalesced messages keep the position of the first one
+        self._pending: Dict[object, outbound_channel.OutboundMessage] = {}
+        self._next_id = 0
+
+        self.sent_count = 0
+        self.coalesced_count = 0
+        self.dropped_count = 0
+        self.write_count = 0
+
+    def run(self, messages: "list[outbound_channel.OutboundMessage]") -> int:
+        """
+        Add newly received messages and write everything that is allowed to be sent.
+
+        Returns the number of messages written.
+        """
+        for message in messages:
+            self._add(message)
+
+        # Link health pings of a multi-link connection, which only the writer may send
+        ping_links = getattr(self._connection, "ping_links", None)
+        if ping_links is not None:
+            ping_links()
+
+        if len(self._pending) == 0:
+            return 0
+
+        # Keep messages pending while a reconnecting connection is down
+        check_connection = getattr(self._connection, "check_connection", None)
+        if check_connection is not None and not check_connection():
+            return 0
+
+        now = time.monotonic()
+        batch = bytearray()
+        datagrams = []
+        sent_keys = []
+        for message_key, message in self._pending.items():
+            bucket = self._bucket(message, now)
+            if bucket is not None and not bucket.try_consume(now):
+                continue
+
+            sent_keys.append(message_key)
+            try:
+                buffer = self._pack(message)
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                self._logger.error(f"Failed to encode {message}: {e}", True)
+                continue
+
+            batch.extend(buffer)
+            datagrams.append(buffer)
+
+        for message_key in sent_keys:
+            del self._pending[message_key]
+
+        if len(datagrams) == 0:
+            return 0
+
+        self._write(batch, datagrams)
+        self.sent_count += len(datagrams)
+        return len(datagrams)
+
+    def time_until_next_send(self) -> float:
+        """
+        Returns how long the caller can wait for new messages before pending ones become sendable.
+        """
+        if len(self._pending) == 0:
+            return self.__IDLE_WAKEUP
+
+        now = time.monotonic()
+        wait = self.__IDLE_WAKEUP
+        for message in self._pending.values():
+            bucket = self._bucket(message, now)
+            if bucket is None:
+                return self.__MIN_WAKEUP
+
+            wait = min(wait, bucket.time_until_available(now))
+
+        return max(wait, self.__MIN_WAKEUP)
+
+    def _bucket(
+        self, message: outbound_channel.OutboundMessage, now: float
+    ) -> token_bucket.TokenBucket | None:
+        """
+        Rate limit of the message's type and target system, None if its type is not limited.
+        """
+        limit = self._rate_limits.get(message.message_type)
+        if limit is None:
+            return None
+
+        bucket_key = (message.message_type, self._target_system(message))
+        bucket = self._buckets.get(bucket_key)
+        if bucket is None:
+            bucket = token_bucket.TokenBucket(limit[0], limit[1], now)
+            self._buckets[bucket_key] = bucket
+        return bucket
+
+    def _target_system(self, message: outbound_channel.OutboundMessage) -> int | None:
+        """
+        System the message is addressed to, None for broadcasts such as HEARTBEAT.
+        """
+        if "target_system" in message.kwargs:
+            return message.kwargs["target_system"]
+
+        if message.name not in self._target_indices:
+            message_class = getattr(mavutil.mavlink, f"MAVLink_{message.name}_message", None)
+            fieldnames = getattr(message_class, "fieldnames", [])
+            index = fieldnames.index("target_system") if "target_system" in fieldnames else None
+            self._target_indices[message.name] = index
+
+        index = self._target_indices[message.name]
+        if index is None or index >= len(message.args):
+            return None
+        return message.args[index]
+
+    def _add(self, message: outbound_channel.OutboundMessage) -> None:
+        """
+        Add a message to the pending messages, replacing a redundant COMMAND_LONG.
+        """
+        message_key = self._coalesce_key(message)
+        if message_key in self._pending:
+            self.coalesced_count += 1
+            self._pending[message_key] = message
+            return
+
+        if len(self._pending) >= self._max_pending:
+            oldest_key = next(iter(self._pending))
+            dropped = self._pending.pop(oldest_key)
+            self.dropped_count += 1
+            self._logger.warning(f"Outbound queue full, dropped {dropped}", True)
+
+        self._pending[message_key] = message
+
+    def _coalesce_key(self, message: outbound_channel.OutboundMessage) -> object:
+        """
+        COMMAND_LONGs are keyed by target and command ID, every other message is unique.
+        """
+        if message.name == "command_long":
+            arguments = dict(
+                zip(("target_system", "target_component", "command"), message.args[:3])
+            )
+            arguments.update(message.kwargs)
+            return (
+                message.name,
+                arguments.get("target_system"),
+                arguments.get("target_component"),
+                arguments.get("command"),
+            )
+
+        self._next_id += 1
+        return self._next_id
+
+    def _pack(self, message: outbound_channel.OutboundMessage) -> bytes:
+        """
+        Encode and pack a message, with the bookkeeping `MAVLink.send()` would do.
+        """
+        mav = self._connection.mav
+        encode = getattr(mav, f"{message.name}_encode")
+        force_mavlink1 = message.kwargs.get("force_mavlink1", False)
+        kwargs = {name: value for name, value in message.kwargs.items() if name != "force_mavlink1"}
+
+        buffer = encode(*message.args, **kwargs).pack(mav, force_mavlink1=force_mavlink1)
+        mav.seq = (mav.seq + 1) % 256
+        mav.total_packets_sent += 1
+        mav.total_bytes_sent += len(buffer)
+        return buffer
+
+    def _write(self, batch: bytearray, datagrams: "list[bytes]") -> None:
+        """
+        Write the batch with a single call for stream sockets.
+        Datagram sockets need one write per message to keep message boundaries.
+        """
+        self.write_count += 1
+        port = getattr(self._connection, "port", None)
+        try:
+            if not isinstance(port, socket.socket):
+                self._connection.write(batch)
+                return
+
+            if port.type == socket.SOCK_DGRAM:
+                for datagram in datagrams:
+                    self._connection.write(datagram)
+                return
+        except OSError as e:
+            self._handle_write_error(e)
+            return
+
+        self._send_all(port, memoryview(batch))
+
+    def _handle_write_error(self, error: OSError) -> None:
+        """
+        Let the connection react the same way it does to its own write errors,
+        reconnecting or failing over to another link.
+        """
+        self._logger.error(f"Outbound write failed: {error}", True)
+        handle_disconnect = getattr(self._connection, "handle_disconnect", None)
+        if handle_disconnect is not None:
+            handle_disconnect()
+
+    def _send_all(self, port: socket.socket, view: memoryview) -> None:
+        """
+        `sendall()` for the non-blocking socket pymavlink creates.
+        The socket is shared with readers, so it cannot be switched to blocking mode.
+        """
+        deadline = time.monotonic() + self.__SEND_TIMEOUT
+        while len(view) > 0:
+            try:
+                sent = port.send(view)
+                view = view[sent:]
+                continue
+            except BlockingIOError:
+                pass
+            except OSError as e:
+                self._handle_write_error(e)
+                return
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0.0:
+                self._logger.error(f"Outbound write timed out, {len(view)} bytes unsent", True)
+                return
+
+            select.select([], [port], [], remaining)
+
+
+# =================================================================================================
+#                            ↑ BOOTCAMPERS MODIFY ABOVE THIS COMMENT ↑
+# =================================================================================================
@@ -0,0 +1,110 @@
+"""
+Outbound writer worker that owns all traffic sent to the drone.
+"""
+
+import os
+import pathlib
+import queue
+
+from pymavlink import mavutil
+
+from utilities.workers import queue_proxy_wrapper
+from utilities.workers import worker_controller
+from . import outbound_writer
+from ..common.modules.logger import logger
+
+
+# =================================================================================================
+#                            ↓ BOOTCAMPERS MODIFY BELOW THIS COMMENT ↓
+# =================================================================================================
+MAX_BATCH_SIZE = 64
+
+
+def outbound_writer_worker(
+    connection: mavutil.mavfile,
+    rate_limits: "dict[str, tuple[float, float]]",
+    max_pending: int,
+    input_queue: queue_proxy_wrapper.QueueProxyWrapper,
+    controller: worker_controller.WorkerController,
+) -> None:
+    """
+    Worker process. There must only be one per connection.
+
+    - connection: pymavlink connection object (mavutil.mavlink_connection(...))
+    - rate_limits: message type to (rate per second, burst) for each target system
+    - max_pending: messages held back by the rate limits before the oldest is dropped
+    - input_queue: send channel that outbound_channel.OutboundChannel puts messages into
+    - controller: worker_controller.Controller used to manage worker lifecycle
+    """
+    # =============================================================================================
+    #                          ↑ BOOTCAMPERS MODIFY ABOVE THIS COMMENT ↑
+    # =============================================================================================
+
+    # Instantiate logger
+    worker_name = pathlib.Path(__file__).stem
+    process_id = os.getpid()
+    result, local_logger = logger.Logger.create(f"{worker_name}_{process_id}", True)
+    if not result:
+        print("ERROR: Worker failed to create logger")
+        return
+
+    # Get Pylance to stop complaining
+    assert local_logger is not None
+
+    local_logger.info("Logger initialized", True)
+
+    # =============================================================================================
+    #                          ↓ BOOTCAMPERS MODIFY BELOW THIS COMMENT ↓
+    # =============================================================================================
+    # The writer is the only process that re-dials a reconnecting connection
+    claim_reconnect = getattr(connection, "claim_reconnect", None)
+    if claim_reconnect is not None:
+        claim_reconnect()
+
+    # Instantiate class object (outbound_writer.OutboundWriter)
+    result, writer = outbound_writer.OutboundWriter.create(
+        connection, rate_limits, local_logger, max_pending
+    )
+    if not result:
+        local_logger.error("Failed to create OutboundWriter", True)
+        return
+
+    # Get Pylance to stop complaining
+    assert writer is not None
+
+    # Main loop: do work.
+    while not controller.is_exit_requested():
+        controller.check_pause()
+
+        # Wait for the first message, then take everything else already queued
+        batch = []
+        try:
+            batch.append(input_queue.queue.get(timeout=writer.time_until_next_send()))
+            while len(batch) < MAX_BATCH_SIZE:
+                batch.append(input_queue.queue.get_nowait())
+        except queue.Empty:
+            pass
+
+        # Skip sentinels and flatten lists queued by OutboundChannel.send_batch()
+        messages = []
+        for item in batch:
+            if isinstance(item, list):
+                messages.extend(item)
+            elif item is not None:
+                messages.append(item)
+
+        try:
+            writer.run(messages)
+        except Exception as ex:  # pylint: disable=broad-exception-caught
+            local_logger.error(f"Exception in main loop: {ex}", True)
+
+    local_logger.info(
+        f"Worker stopping, sent {writer.sent_count} messages in {writer.write_count} writes, "
+        f"coalesced {writer.coalesced_count}, dropped {writer.dropped_count}",
+        True,
+    )
+
+
+# =================================================================================================
+#                            ↑ BOOTCAMPERS MODIFY ABOVE THIS COMMENT ↑
+# =================================================================================================
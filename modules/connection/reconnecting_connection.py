@@ -0,0 +1,562 @@
+"""
+MAVLink connection that re-dials and resumes after the link drops.
+"""
+
+import collections
+import random
+import time
+from typing import Tuple, Union
+
+from pymavlink import mavutil
+
+from . import bulk_reader
+from . import connection_factory
+from ..common.modules.logger import logger
+
+
+class ConnectionMetrics:
+    """
+    Struct of reconnect statistics.
+    """
+
+    def __init__(
+        self,
+        is_connected: bool,
+        reconnect_count: int,
+        downtime: float,  # s
+        buffered_count: int,
+        dropped_count: int,
+    ) -> None:
+        self.is_connected = is_connected
+        self.reconnect_count = reconnect_count
+        self.downtime = downtime
+        self.buffered_count = buffered_count
+        self.dropped_count = dropped_count
+
+    def __str__(self) -> str:
+        return (
+            f"connected: {self.is_connected}, reconnects: {self.reconnect_count}, "
+            f"downtime: {self.downtime:.3f}s, buffered: {self.buffered_count}, "
+            f"dropped: {self.dropped_count}"
+        )
+
+
+# =================================================================================================
+#                            ↓ BOOTCAMPERS MODIFY BELOW THIS COMMENT ↓
+# =================================================================================================
+class _BufferedMav:
+    """
+    Stand-in for `mavfile.mav` that sends while connected and buffers while disconnected.
+    """
+
+    def __init__(self, owner: "ReconnectingConnection") -> None:
+        self._owner = owner
+
+    def __getattr__(self, name: str) -> "(...) -> None":  # type: ignore
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        if not name.endswith("_send"):
+            # Encoders and other attributes come from the current connection
+            return getattr(self._owner.connection.mav, name)
+
+        def send(*args: object, **kwargs: object) -> None:
+            self._owner.send(name, args, kwargs)
+
+        return send
+
+    def __setattr__(self, name: str, value: object) -> None:
+        # Bookkeeping such as seq belongs to the current connection
+        if name.startswith("_"):
+            super().__setattr__(name, value)
+            return
+
+        setattr(self._owner.connection.mav, name, value)
+
+
+class ReconnectingConnection:  # pylint: disable=too-many-instance-attributes
+    """
+    Wraps a TCP or UDP MAVLink connection and re-dials it with exponential backoff
+    when the peer goes away. After every re-dial the heartbeat handshake is repeated
+    and messages sent during the outage are flushed from a bounded buffer. The handshake
+    is polled on later calls instead of waited for, so no caller blocks on it.
+
+    Each process holding a copy of this object recovers its own link, unless the copies
+    share state: then only the one that claimed the reconnect (the outbound writer) dials
+    and handshakes, and the others re-open their connection, read-only, once it has.
+
+    With bulk reading, TCP and UDP sockets are drained a chunk at a time by a BulkReader
+    instead of a system call per message.
+    """
+
+    __private_key = object()
+
+    __POLL_INTERVAL = 0.05  # seconds
+
+    @classmethod
+    def create(
+        cls,
+        connection_string: str,
+        options: connection_factory.SocketOptions,
+        local_logger: logger.Logger,
+        handshake_timeout: float = 5.0,
+        initial_backoff: float = 0.1,
+        max_backoff: float = 5.0,
+        max_buffered: int = 100,
+        link_timeout: float | None = None,
+        bulk_read: bool = False,
+    ) -> Tuple[bool, Union["ReconnectingConnection", None]]:
+        """
+        Falliable create (instantiation) method to create a ReconnectingConnection object.
+        The first connection attempt is made immediately and must succeed.
+
+        handshake_timeout: Seconds to wait for a heartbeat after each re-dial.
+        initial_backoff: Seconds before the first re-dial, doubled after every failure.
+        max_backoff: Maximum seconds between re-dials.
+        max_buffered: Maximum number of outbound messages kept during an outage.
+        link_timeout: Seconds without any message before the link is considered dead,
+            None to only rely on socket errors.
+        bulk_read: Read through a BulkReader when the connection supports it.
+        """
+        if initial_backoff <= 0.0 or max_backoff < initial_backoff:
+            local_logger.error("Failed to create ReconnectingConnection: invalid backoff", True)
+            return False, None
+
+        if max_buffered <= 0:
+            local_logger.error(
+                "Failed to create ReconnectingConnection: max buffered must be positive", True
+            )
+            return False, None
+
+        result, connection = connection_factory.create_connection(
+            connection_string, options, local_logger
+        )
+        if not result:
+            return False, None
+
+        return True, cls(
+            cls.__private_key,
+            connection,
+            connection_string,
+            options,
+            local_logger,
+            handshake_timeout,
+            initial_backoff,
+            max_backoff,
+            max_buffered,
+            link_timeout,
+            bulk_read,
+        )
+
+    def __init__(
+        self,
+        key: object,
+        connection: mavutil.mavfile,
+        connection_string: str,
+        options: connection_factory.SocketOptions,
+        local_logger: logger.Logger,
+        handshake_timeout: float,
+        initial_backoff: float,
+        max_backoff: float,
+        max_buffered: int,
+        link_timeout: float | None,
+        bulk_read: bool,
+    ) -> None:
+        assert key is ReconnectingConnection.__private_key, "Use create() method"
+        self._connection_string = connection_string
+        self._options = options
+        self._logger = local_logger
+        self._bulk_read = bulk_read
+        self._reader: bulk_reader.BulkReader | None = None
+        self._attach(connection)
+        self._handshake_timeout = handshake_timeout
+        self._initial_backoff = initial_backoff
+        self._max_backoff = max_backoff
+        self._link_timeout = link_timeout
+
+        self.mav = _BufferedMav(self)
+        self._buffer: collections.deque = collections.deque(maxlen=max_buffered)
+
+        self._is_connected = True
+        self._last_target_system = connection.target_system
+        self._last_receive_time = time.monotonic()
+        self._failed_attempts = 0
+        self._next_attempt_time = 0.0
+        self._outage_start_time = 0.0
+
+        # Dialed connection waiting for the drone's heartbeat
+        self._handshake_connection: mavutil.mavfile | None = None
+        self._handshake_deadline = 0.0
+
+        # Shared between processes, None for each to recover its own link
+        self._shared: dict | None = None
+        self._owns_reconnect = True
+        # Number of reconnects of the owner that the current connection follows
+        self._generation = 0
+
+        self.reconnect_count = 0
+        self.total_downtime = 0.0
+        self.dropped_count = 0
+
+    def __getattr__(self, name: str) -> object:
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        return getattr(self.connection, name)
+
+    @property
+    def target_system(self) -> int:
+        """
+        System ID of the drone, kept during an outage so callers do not treat it as gone.
+        """
+        if self._is_connected and self.connection.target_system:
+            self._last_target_system = self.connection.target_system
+        return self._last_target_system
+
+    def share_state(self, state: dict) -> None:
+        """
+        Coordinate reconnecting through the dict (a SyncManager.dict()), before the processes
+        start. Afterwards no copy re-dials until one calls claim_reconnect().
+        """
+        state["generation"] = 0
+        state["lost_generation"] = -1
+        self._shared = state
+        self._owns_reconnect = False
+
+    def claim_reconnect(self) -> None:
+        """
+        Make this process the one that re-dials and handshakes for every copy.
+        """
+        self._owns_reconnect = True
+
+    @property
+    def is_connected(self) -> bool:
+        """
+        Whether the link is currently up.
+        """
+        return self._is_connected
+
+    def check_connection(self) -> bool:
+        """
+        For processes that only send: re-dial if the link is down and the backoff has elapsed.
+
+        Returns whether the link is up.
+        """
+        if self._is_connected and self._is_lost_elsewhere():
+            self._handle_disconnect()
+
+        if not self._is_connected:
+            self._try_reconnect()
+
+        return self._is_connected
+
+    def get_metrics(self) -> ConnectionMetrics:
+        """
+        Returns reconnect statistics, downtime includes the current outage.
+        """
+        downtime = self.total_downtime
+        if not self._is_connected:
+            downtime += time.monotonic() - self._outage_start_time
+
+        return ConnectionMetrics(
+            self._is_connected,
+            self.reconnect_count,
+            downtime,
+            len(self._buffer),
+            self.dropped_count,
+        )
+
+    def send(self, name: str, args: tuple, kwargs: dict) -> None:
+        """
+        Send with `mav.<name>(*args, **kwargs)`, or buffer it if the link is down.
+        """
+        if self._is_connected:
+            try:
+                getattr(self.connection.mav, name)(*args, **kwargs)
+            except OSError as e:
+                self._logger.warning(f"Send failed: {e}", True)
+                self._handle_disconnect()
+
+            # pymavlink reports write errors through handle_disconnect() instead of raising
+            if self._is_connected:
+                return
+
+        if len(self._buffer) == self._buffer.maxlen:
+            self.dropped_count += 1
+        self._buffer.append((name, args, kwargs))
+
+    def wait_heartbeat(self, blocking: bool = True, timeout: float | None = None) -> object:
+        """
+        Same as `mavfile.wait_heartbeat()`, reconnecting if needed.
+        """
+        return self.recv_match(type="HEARTBEAT", blocking=blocking, timeout=timeout)
+
+    def recv_match(
+        self,
+        condition: str | None = None,
+        type: "str | list[str] | None" = None,  # pylint: disable=redefined-builtin
+        blocking: bool = False,
+        timeout: float | None = None,
+    ) -> object:
+        """
+        Same as `mavfile.recv_match()`, reconnecting if needed.
+
+        Returns the message, or None if there is none (or the link is down and not blocking).
+        """
+        start_time = time.monotonic()
+        while True:
+            if not self._is_connected:
+                self._try_reconnect()
+
+            if self._is_connected:
+                try:
+                    if self._reader is not None:
+                        msg = self._reader.recv_match(condition=condition, type=type)
+                    else:
+                        msg = self.connection.recv_match(condition=condition, type=type)
+                except OSError as e:
+                    self._logger.warning(f"Receive failed: {e}", True)
+                    msg = None
+                    self._handle_disconnect()
+
+                if msg is not None:
+                    self._last_receive_time = time.monotonic()
+                    return msg
+
+                if self._is_connected and self._is_link_dead():
+                    self._handle_disconnect()
+
+            if not blocking:
+                return None
+
+            wait = self.__POLL_INTERVAL
+            if timeout is not None:
+                remaining = start_time + timeout - time.monotonic()
+                if remaining <= 0.0:
+                    return None
+                wait = min(wait, remaining)
+
+            if self._is_connected:
+                self.select(wait)
+            else:
+                time.sleep(wait)
+
+    def select(self, timeout: float) -> bool:
+        """
+        Same as `mavfile.select()`, but sleeps instead of failing on a closed socket while down.
+
+        Returns whether data arrived.
+        """
+        if not self._is_connected:
+            time.sleep(min(timeout, self.__POLL_INTERVAL))
+            return False
+
+        if self._reader is not None:
+            return self._reader.select(timeout)
+        return self.connection.select(timeout)
+
+    def _is_link_dead(self) -> bool:
+        """
+        Whether the link has been silent for too long.
+        Socket errors and EOF are reported through the connection's disconnect hooks instead.
+        """
+        if self._link_timeout is None:
+            return False
+
+        if time.monotonic() - self._last_receive_time <= self._link_timeout:
+            return False
+
+        self._logger.warning(f"No messages for {self._link_timeout}s", True)
+        return True
+
+    def _attach(self, connection: mavutil.mavfile) -> None:
+        """
+        Use this connection, taking over pymavlink's disconnect hooks.
+        pymavlink's own autoreconnect blocks while retrying, so it is not used.
+        """
+        self.connection = connection
+        if isinstance(connection, mavutil.mavtcp):
+            connection.handle_disconnect = self._handle_disconnect
+            connection.handle_eof = self._handle_disconnect
+
+        self._reader = None
+        if self._bulk_read and isinstance(connection, bulk_reader.SUPPORTED_CONNECTIONS):
+            result, reader = bulk_reader.BulkReader.create(connection, self._logger)
+            if result:
+                self._reader = reader
+
+    def _handle_disconnect(self) -> None:
+        """
+        Mark the link as down and schedule the first re-dial.
+        """
+        if not self._is_connected:
+            return
+
+        self._logger.warning(f"Connection {self._connection_string} lost", True)
+        self._is_connected = False
+        self._outage_start_time = time.monotonic()
+        self._failed_attempts = 0
+        self._next_attempt_time = self._outage_start_time + self._initial_backoff
+        if self._shared is not None:
+            # Readers can see the drop before the owner, which may only be writing
+            self._shared["lost_generation"] = self._generation
+
+        try:
+            self.connection.close()
+        except OSError:
+            pass
+
+    def _is_lost_elsewhere(self) -> bool:
+        """
+        Whether another process has reported the current connection as lost.
+        """
+        if self._shared is None:
+            return False
+
+        return self._shared.get("lost_generation", -1) == self._generation
+
+    def _try_reconnect(self) -> None:
+        """
+        Re-dial if the backoff has elapsed, or carry on with the handshake.
+        Without the reconnect, follow the owner's instead.
+        """
+        if not self._owns_reconnect:
+            self._follow_reconnect()
+            return
+
+        if self._handshake_connection is not None:
+            self._poll_handshake()
+            return
+
+        now = time.monotonic()
+        if now < self._next_attempt_time:
+            return
+
+        connection = self._dial()
+        if connection is None:
+            self._schedule_retry()
+            return
+
+        try:
+            connection.mav.heartbeat_send(
+                mavutil.mavlink.MAV_TYPE_GCS, mavutil.mavlink.MAV_AUTOPILOT_INVALID, 0, 0, 0
+            )
+        except OSError as e:
+            self._logger.warning(f"Handshake failed: {e}", True)
+            connection.close()
+            self._schedule_retry()
+            return
+
+        self._handshake_connection = connection
+        self._handshake_deadline = time.monotonic() + self._handshake_timeout
+        self._poll_handshake()
+
+    def _poll_handshake(self) -> None:
+        """
+        Check for the drone's heartbeat on the dialed connection without waiting for it.
+        """
+        connection = self._handshake_connection
+        assert connection is not None
+
+        try:
+            msg = connection.recv_match(type="HEARTBEAT", blocking=False)
+        except OSError as e:
+            self._logger.warning(f"Handshake failed: {e}", True)
+            msg = None
+            self._handshake_deadline = 0.0
+
+        if msg is not None:
+            self._handshake_connection = None
+            self._generation += 1
+            if self._shared is not None:
+                self._shared["generation"] = self._generation
+            self._on_reconnected(connection)
+            return
+
+        if time.monotonic() < self._handshake_deadline:
+            return
+
+        self._handshake_connection = None
+        connection.close()
+        self._schedule_retry()
+
+    def _follow_reconnect(self) -> None:
+        """
+        Re-open without writing anything once the owner has reconnected.
+        """
+        assert self._shared is not None
+
+        now = time.monotonic()
+        if now < self._next_attempt_time:
+            return
+
+        generation = self._shared.get("generation", 0)
+        if generation == self._generation:
+            self._next_attempt_time = now + self.__POLL_INTERVAL
+            return
+
+        connection = self._dial()
+        if connection is None:
+            self._schedule_retry()
+            return
+
+        self._generation = generation
+        self._on_reconnected(connection)
+
+    def _dial(self) -> mavutil.mavfile | None:
+        """
+        Single connection attempt, backoff is handled here instead of by pymavlink sleeping.
+        """
+        result, connection = connection_factory.create_connection(
+            self._connection_string, self._options, self._logger, retries=1
+        )
+        if not result or connection is None:
+            return None
+
+        if isinstance(connection, mavutil.mavtcp):
+            # pymavlink would re-dial in place, blocking, if the handshake hits a reset
+            connection.handle_disconnect = self._handle_handshake_disconnect
+            connection.handle_eof = self._handle_handshake_disconnect
+        return connection
+
+    def _handle_handshake_disconnect(self) -> None:
+        """
+        The dialed connection dropped before the handshake completed.
+        """
+        self._handshake_deadline = 0.0
+
+    def _schedule_retry(self) -> None:
+        """
+        Back off exponentially before the next attempt.
+        """
+        self._failed_attempts += 1
+        backoff = min(self._max_backoff, self._initial_backoff * 2**self._failed_attempts)
+        # Jitter so that several processes do not re-dial in lockstep
+        backoff *= 0.5 + random.random() / 2
+        self._next_attempt_time = time.monotonic() + backoff
+        self._logger.info(
+            f"Reconnect attempt {self._failed_attempts} failed, retrying in {backoff:.2f}s", True
+        )
+
+    def _on_reconnected(self, connection: mavutil.mavfile) -> None:
+        """
+        Swap in the new connection, update metrics and flush the buffer.
+        """
+        self._attach(connection)
+        self._is_connected = True
+        self._last_receive_time = time.monotonic()
+        self.reconnect_count += 1
+        outage = self._last_receive_time - self._outage_start_time
+        self.total_downtime += outage
+        self._logger.info(
+            f"Reconnected after {outage:.3f}s, resending {len(self._buffer)} messages", True
+        )
+
+        while len(self._buffer) > 0 and self._is_connected:
+            name, args, kwargs = self._buffer.popleft()
+            self.send(name, args, kwargs)
+
+
+# =================================================================================================
+#                            ↑ BOOTCAMPERS MODIFY ABOVE THIS COMMENT ↑
+# =================================================================================================
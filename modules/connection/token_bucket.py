@@ -0,0 +1,59 @@
+"""
+Token bucket rate limiting.
+"""
+
+
+class TokenBucket:
+    """
+    Token bucket rate limiter.
+
+    Tokens refill continuously at `rate` per second up to `burst`,
+    each sent message consumes one token.
+    """
+
+    def __init__(self, rate: float, burst: float, now: float) -> None:
+        """
+        rate: Tokens added per second, must be greater than 0 .
+        burst: Maximum number of tokens stored, must be at least 1 .
+        now: Current monotonic time in seconds, the bucket starts full.
+        """
+        assert rate > 0.0, "Rate must be positive"
+        assert burst >= 1.0, "Burst must be at least 1"
+
+        self.rate = rate
+        self.burst = burst
+        self.__tokens = burst
+        self.__last_time = now
+
+    def __refill(self, now: float) -> None:
+        """
+        Add the tokens accumulated since the last refill.
+        """
+        elapsed = now - self.__last_time
+        if elapsed > 0.0:
+            self.__tokens = min(self.burst, self.__tokens + elapsed * self.rate)
+            self.__last_time = now
+
+    def try_consume(self, now: float, tokens: float = 1.0) -> bool:
+        """
+        Consume tokens if enough are available.
+
+        Returns whether the tokens were consumed.
+        """
+        self.__refill(now)
+        if self.__tokens < tokens:
+            return False
+
+        self.__tokens -= tokens
+        return True
+
+    def time_until_available(self, now: float, tokens: float = 1.0) -> float:
+        """
+        Returns seconds until the requested number of tokens is available, 0 if already available.
+        """
+        self.__refill(now)
+        missing = tokens - self.__tokens
+        if missing <= 0.0:
+            return 0.0
+
+        return missing / self.rate
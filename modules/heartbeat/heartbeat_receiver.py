@@ -2,16 +2,77 @@
 Heartbeat receiving logic.
 """
 
+import time
 from typing import Tuple, Union
 from pymavlink import mavutil
 
+from . import liveness_table
+from . import phi_accrual
 from ..common.modules.logger import logger
 
 
 # =================================================================================================
 #                            ↓ BOOTCAMPERS MODIFY BELOW THIS COMMENT ↓
 # =================================================================================================
-class HeartbeatReceiver:
+class HeartbeatTransition:
+    """
+    Struct of the connection state changing.
+    """
+
+    def __init__(
+        self,
+        previous_state: str | None,
+        state: str,
+        timestamp: float,
+        system_id: int | None = None,
+        component_id: int | None = None,
+    ) -> None:
+        """
+        previous_state: State before, None for the initial state.
+        timestamp: time.time() of the change.
+        system_id, component_id: Endpoint that changed, None for the link as a whole.
+        """
+        self.previous_state = previous_state
+        self.state = state
+        self.timestamp = timestamp
+        self.system_id = system_id
+        self.component_id = component_id
+
+    def __str__(self) -> str:
+        source = "HEARTBEAT"
+        if self.system_id is not None:
+            source = f"HEARTBEAT SYSTEM {self.system_id} COMPONENT {self.component_id}"
+        if self.previous_state is None:
+            return f"{source} {self.state}"
+        return f"{source} {self.previous_state} -> {self.state}"
+
+
+class HeartbeatSummary:
+    """
+    Struct of the connection over a summary period.
+    """
+
+    def __init__(
+        self, state: str, received_count: int, transition_count: int, period: float
+    ) -> None:
+        """
+        received_count: Heartbeats received during the period.
+        transition_count: State changes during the period.
+        period: Seconds covered.
+        """
+        self.state = state
+        self.received_count = received_count
+        self.transition_count = transition_count
+        self.period = period
+
+    def __str__(self) -> str:
+        return (
+            f"HEARTBEAT {self.state}, {self.received_count} received and "
+            f"{self.transition_count} changes in the last {self.period}s"
+        )
+
+
+class HeartbeatReceiver:  # pylint: disable=too-many-instance-attributes
     """
     HeartbeatReceiver class to send a heartbeat
     """
@@ -23,12 +84,25 @@ class HeartbeatReceiver:
         cls,
         connection: mavutil.mavfile,
         local_logger: logger.Logger,
+        detector: phi_accrual.PhiAccrualDetector | None = None,
+        phi_threshold: float = 8.0,
+        table: liveness_table.LivenessTable | None = None,
     ) -> Tuple[bool, Union["HeartbeatReceiver", None]]:
         """
         Falliable create (instantiation) method to create a HeartbeatReceiver object.
+
+        detector: Decides when silence means disconnected for run_event().
+        phi_threshold: Suspicion level at which the connection is considered lost.
+        table: Tracks each system and component heard from, None to only track the link.
         """
+        if not 0.0 < phi_threshold <= 15.0:
+            local_logger.error("HeartbeatReceiver create failed: threshold out of range", True)
+            return False, None
+
         try:
-            instance = cls(cls.__private_key, connection, local_logger)
+            instance = cls(
+                cls.__private_key, connection, local_logger, detector, phi_threshold, table
+            )
             return True, instance
         except Exception as e:  # pylint: disable=broad-exception-caught
             local_logger.error(f"HeartbeatReceiver create failed: {e}", True)
@@ -39,11 +113,19 @@ class HeartbeatReceiver:
         key: object,
         connection: mavutil.mavfile,
         local_logger: logger.Logger,
+        detector: phi_accrual.PhiAccrualDetector | None,
+        phi_threshold: float,
+        table: liveness_table.LivenessTable | None,
     ) -> None:
         assert key is HeartbeatReceiver.__private_key, "Use create() method"
         self._connection = connection
         self._logger = local_logger
+        self._detector = detector
+        self._phi_threshold = phi_threshold
+        self.table = table
+        self.__endpoint_changes: "list[HeartbeatTransition]" = []
         self.missed_count = 0
+        self.received_count = 0
         self.state = "Disconnected"
 
     def run(self) -> None:
@@ -56,6 +138,15 @@ class HeartbeatReceiver:
             msg = self._connection.recv_match(type="HEARTBEAT", blocking=False)
             if msg is not None:
                 self.missed_count = 0
+                self.received_count += 1
+                self.__record(msg)
+                # Other endpoints on the link have theirs waiting as well
+                while self.table is not None:
+                    queued = self._connection.recv_match(type="HEARTBEAT", blocking=False)
+                    if queued is None:
+                        break
+                    self.received_count += 1
+                    self.__record(queued)
                 if self.state != "Connected":
                     self.state = "Connected"
                     self._logger.info("Heartbeat connected", True)
@@ -68,6 +159,92 @@ class HeartbeatReceiver:
         except Exception as e:  # pylint: disable=broad-exception-caught
             self._logger.error(f"HeartbeatReceiver run failed: {e}", True)
 
+    def run_event(self, max_wait: float) -> None:
+        """
+        Block until a heartbeat arrives, the detector's deadline passes or max_wait is over.
+
+        Each heartbeat is timestamped as it is read, but only the one waited for adds an
+        interval to the detector, and the connection is considered disconnected at the moment
+        the suspicion level reaches the threshold.
+        """
+        assert self._detector is not None, "Event driven mode needs a detector"
+
+        try:
+            deadline = self._detector.deadline(self._phi_threshold)
+            now = time.monotonic()
+            if deadline is not None and now < deadline:
+                wait = min(max_wait, deadline - now)
+            elif deadline is not None and self.state != "Disconnected":
+                # Past the deadline but not reported yet, check without waiting
+                wait = 0.0
+            else:
+                # Nothing heard yet or already lost, only a heartbeat can change the state
+                wait = max_wait
+
+            if wait > 0.0:
+                msg = self._connection.recv_match(type="HEARTBEAT", blocking=True, timeout=wait)
+            else:
+                msg = self._connection.recv_match(type="HEARTBEAT", blocking=False)
+
+            # Only the first read was waited for, the rest were buffered and arrived earlier.
+            # The gap before a recovery is an outage, not an interval.
+            interval_known = self.state != "Disconnected"
+            while msg is not None:
+                self._detector.heartbeat(time.monotonic(), interval_known)
+                interval_known = False
+                self.received_count += 1
+                self.__record(msg)
+                msg = self._connection.recv_match(type="HEARTBEAT", blocking=False)
+                if self.state != "Connected":
+                    self.state = "Connected"
+                    self._logger.info("Heartbeat connected", True)
+                self._logger.debug("Heartbeat received", True)
+
+            deadline = self._detector.deadline(self._phi_threshold)
+            if deadline is not None and time.monotonic() >= deadline:
+                if self.state != "Disconnected":
+                    self.state = "Disconnected"
+                    phi = self._detector.phi(time.monotonic())
+                    self._logger.warning(f"Heartbeat disconnected, phi {phi:.1f}", True)
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            self._logger.error(f"HeartbeatReceiver run failed: {e}", True)
+
+    def sweep_endpoints(self) -> "list[HeartbeatTransition]":
+        """
+        State changes of the individual endpoints since the last call, after expiring the
+        ones that went silent. Empty without a table.
+        """
+        if self.table is None:
+            return []
+
+        changes = self.__endpoint_changes
+        self.__endpoint_changes = []
+        for system_id, component_id in self.table.sweep(time.monotonic()):
+            changes.append(
+                HeartbeatTransition(
+                    "Connected", "Disconnected", time.time(), system_id, component_id
+                )
+            )
+        return changes
+
+    def __record(self, msg: object) -> None:
+        """
+        Update the table with the heartbeat's source.
+        """
+        if self.table is None:
+            return
+
+        system_id = msg.get_srcSystem()
+        component_id = msg.get_srcComponent()
+        known = len(self.table)
+        if self.table.update(system_id, component_id, time.monotonic()):
+            previous_state = None if len(self.table) > known else "Disconnected"
+            self.__endpoint_changes.append(
+                HeartbeatTransition(
+                    previous_state, "Connected", time.time(), system_id, component_id
+                )
+            )
+
 
 # =================================================================================================
 #                            ↑ BOOTCAMPERS MODIFY ABOVE THIS COMMENT ↑
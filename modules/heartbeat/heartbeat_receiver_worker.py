@@ -2,36 +2,81 @@
 Heartbeat worker that sends heartbeats periodically.
 """
 
+import math
 import os
 import pathlib
 import time
+from multiprocessing import managers
 
 from pymavlink import mavutil
 
 from utilities.workers import queue_proxy_wrapper
 from utilities.workers import worker_controller
 from . import heartbeat_receiver
+from . import liveness_table
+from . import phi_accrual
 from ..common.modules.logger import logger
 
 
 # =================================================================================================
 #                            ↓ BOOTCAMPERS MODIFY BELOW THIS COMMENT ↓
 # =================================================================================================
+class HeartbeatReceiverArgs:  # pylint: disable=too-many-instance-attributes
+    """
+    Struct of optional heartbeat receiver settings.
+    """
+
+    def __init__(
+        self,
+        event_driven: bool = False,
+        phi_threshold: float = 8.0,
+        window_size: int = 100,
+        min_std: float = 0.1,
+        edge_triggered: bool = False,
+        summary_period: float | None = None,
+        state_slot: managers.ValueProxy | None = None,
+        track_endpoints: bool = False,
+        endpoint_timeout: float = 5.0,
+    ) -> None:
+        """
+        event_driven: Wait on heartbeats and a phi accrual deadline instead of polling.
+        phi_threshold: Suspicion level at which the connection is considered lost.
+        window_size: Inter-arrival times the detector learns from.
+        min_std: Lower bound in seconds on the spread of the inter-arrival times.
+        edge_triggered: Output a HeartbeatTransition when the state changes, instead of the
+            state every period.
+        summary_period: Seconds between HeartbeatSummary outputs, None for none.
+        state_slot: Shared value (SyncManager.Value()) kept at the current state, None for none.
+        track_endpoints: Also track every system and component heard from, reporting their
+            changes like the link's.
+        endpoint_timeout: Seconds of silence before an endpoint is lost, at least.
+        """
+        self.event_driven = event_driven
+        self.phi_threshold = phi_threshold
+        self.window_size = window_size
+        self.min_std = min_std
+        self.edge_triggered = edge_triggered
+        self.summary_period = summary_period
+        self.state_slot = state_slot
+        self.track_endpoints = track_endpoints
+        self.endpoint_timeout = endpoint_timeout
 
 
 def heartbeat_receiver_worker(
     connection: mavutil.mavfile,
+    heartbeat_period: float,
+    args: HeartbeatReceiverArgs | None,
     output_queue: queue_proxy_wrapper.QueueProxyWrapper,
     controller: worker_controller.WorkerController,
-    heartbeat_period: float = 1.0,
 ) -> None:
     """
     Worker process.
 
     - connection: pymavlink connection object (mavutil.mavlink_connection(...))
+    - heartbeat_period: seconds between heartbeats
+    - args: optional settings, None for the defaults
     - output_queue: multiprocessing.Queue to send data to other processes
     - controller: worker_controller.Controller used to manage worker lifecycle
-    - heartbeat_period: seconds between heartbeats
     """
     # =============================================================================================
     #                          ↑ BOOTCAMPERS MODIFY ABOVE THIS COMMENT ↑
@@ -55,24 +100,95 @@ def heartbeat_receiver_worker(
     # =============================================================================================
     # Instantiate class object (heartbeat_receiver.HeartbeatReceiver)
 
+    if args is None:
+        args = HeartbeatReceiverArgs()
+
+    detector = None
+    if args.event_driven:
+        detector = phi_accrual.PhiAccrualDetector(heartbeat_period, args.window_size, args.min_std)
+
+    table = None
+    if args.track_endpoints:
+        table = liveness_table.LivenessTable(args.endpoint_timeout)
+
     # Main loop: do work.
-    result, receiver = heartbeat_receiver.HeartbeatReceiver.create(connection, local_logger)
+    result, receiver = heartbeat_receiver.HeartbeatReceiver.create(
+        connection, local_logger, detector, args.phi_threshold, table
+    )
     if not result:
         local_logger.error("Failed to create HeartbeatReceiver", True)
         return
 
     local_logger.info("HeartbeatReceiver created, entering main loop", True)
 
+    summary_period = math.inf if args.summary_period is None else args.summary_period
+    next_period = time.monotonic()
+    next_summary = next_period + summary_period
+    last_state = None
+    transition_count = 0
+    summary_received = 0
+
     try:
         while not controller.is_exit_requested():
             controller.check_pause()
-            receiver.run()
-            output_queue.queue.put(receiver.state)
-            time.sleep(heartbeat_period)
+            if args.event_driven:
+                receiver.run_event(max(0.0, min(next_period, next_summary) - time.monotonic()))
+            else:
+                receiver.run()
+
+            now = time.monotonic()
+            changed = receiver.state != last_state
+            if changed:
+                if args.state_slot is not None:
+                    args.state_slot.value = receiver.state
+                if args.edge_triggered:
+                    output_queue.queue.put(
+                        heartbeat_receiver.HeartbeatTransition(
+                            last_state, receiver.state, time.time()
+                        )
+                    )
+                if last_state is not None:
+                    transition_count += 1
+                last_state = receiver.state
+
+            for endpoint_change in receiver.sweep_endpoints():
+                local_logger.info(f"{endpoint_change}", True)
+                if args.edge_triggered:
+                    output_queue.queue.put(endpoint_change)
+
+            # Absolute schedule so the period does not drift with processing time
+            due = now >= next_period
+            if due:
+                while next_period <= now:
+                    next_period += heartbeat_period
+
+            # Event driven changes are published straight away rather than at the next period
+            if not args.edge_triggered and (changed or due):
+                output_queue.queue.put(receiver.state)
+
+            if now >= next_summary:
+                output_queue.queue.put(
+                    heartbeat_receiver.HeartbeatSummary(
+                        receiver.state,
+                        receiver.received_count - summary_received,
+                        transition_count,
+                        summary_period,
+                    )
+                )
+                summary_received = receiver.received_count
+                transition_count = 0
+                while next_summary <= now:
+                    next_summary += summary_period
+
+            if not args.event_driven:
+                time.sleep(max(0.0, next_period - time.monotonic()))
 
     except Exception as exc:  # pylint: disable=broad-exception-caught
         local_logger.error(f"Unhandled exception in heartbeat receiver worker: {exc}", True)
     finally:
+        if table is not None:
+            for entry in table.entries():
+                local_logger.info(f"{entry}", True)
         local_logger.info("Heartbeat receiver worker shutting down", True)
 
 
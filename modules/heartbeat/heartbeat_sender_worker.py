@@ -4,10 +4,10 @@ Heartbeat worker that sends heartbeats periodically.
 
 import os
 import pathlib
-import time
 
 from pymavlink import mavutil
 
+from utilities.workers import periodic_scheduler
 from utilities.workers import worker_controller
 from . import heartbeat_sender
 from ..common.modules.logger import logger
@@ -16,18 +16,21 @@ from ..common.modules.logger import logger
 # =================================================================================================
 #                            ↓ BOOTCAMPERS MODIFY BELOW THIS COMMENT ↓
 # =================================================================================================
+STATISTICS_PERIOD = 60.0  # seconds
+MAX_WAIT = 0.1  # seconds, how long exit and pause requests can go unnoticed
+
+
 def heartbeat_sender_worker(
     connection: mavutil.mavfile,
+    heartbeat_period: float,
     controller: worker_controller.WorkerController,
-    heartbeat_period: float = 1.0,
-    # Add other necessary worker arguments here
 ) -> None:
     """
     Worker process.
 
     - connection: pymavlink connection object (mavutil.mavlink_connection(...))
-    - controller: worker_controller.Controller used to manage worker lifecycle
     - heartbeat_period: seconds between heartbeats
+    - controller: worker_controller.Controller used to manage worker lifecycle
     """
     # =============================================================================================
     #                          ↑ BOOTCAMPERS MODIFY ABOVE THIS COMMENT ↑
@@ -55,16 +58,32 @@ def heartbeat_sender_worker(
         local_logger.error("Failed to create HeartbeatSender", True)
         return
 
+    def log_statistics() -> None:
+        for task_statistics in scheduler.statistics():
+            local_logger.info(f"{task_statistics}", True)
+
+    # Sent at fixed deadlines so the rate does not drift below 1 / heartbeat_period,
+    # a late heartbeat is sent once rather than in a burst
+    scheduler = periodic_scheduler.PeriodicScheduler()
+    scheduler.add("heartbeat", heartbeat_period, sender.run, periodic_scheduler.MissedPolicy.SKIP)
+    scheduler.add(
+        "statistics",
+        STATISTICS_PERIOD,
+        log_statistics,
+        periodic_scheduler.MissedPolicy.SKIP,
+        STATISTICS_PERIOD,
+    )
+
     local_logger.info("HeartbeatSender created, entering main loop", True)
 
     try:
         while not controller.is_exit_requested():
-            time.sleep(heartbeat_period)
             controller.check_pause()
-            sender.run()
+            scheduler.run_next(MAX_WAIT)
     except Exception as exc:  # pylint: disable=broad-exception-caught
         local_logger.error(f"Unhandled exception in heartbeat worker: {exc}", True)
     finally:
+        log_statistics()
         local_logger.info("Heartbeat worker shutting down", True)
 
 
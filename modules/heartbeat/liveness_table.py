@@ -0,0 +1,189 @@
+"""
+Liveness of every MAVLink system and component heard on a link.
+"""
+
+import math
+
+import numpy as np
+
+
+class LivenessEntry:
+    """
+    Struct of one endpoint in the table.
+    """
+
+    def __init__(
+        self,
+        system_id: int,
+        component_id: int,
+        last_seen: float,
+        rate: float,
+        connected: bool,
+    ) -> None:
+        """
+        last_seen: time.monotonic() of the latest heartbeat.
+        rate: Smoothed heartbeats per second, 0 until a second one arrives.
+        """
+        self.system_id = system_id
+        self.component_id = component_id
+        self.last_seen = last_seen
+        self.rate = rate
+        self.connected = connected
+
+    def __str__(self) -> str:
+        state = "Connected" if self.connected else "Disconnected"
+        return (
+            f"SYSTEM {self.system_id} COMPONENT {self.component_id}: {state}, "
+            f"{self.rate:.2f} Hz, last seen {self.last_seen:.3f}"
+        )
+
+
+class LivenessTable:  # pylint: disable=too-many-instance-attributes
+    """
+    Heartbeat times of every (system ID, component ID) pair, one row each in parallel arrays.
+
+    A lookup array over all 65536 pairs finds the row of a heartbeat with one index, so an
+    update does not depend on the number of endpoints. Each row keeps the deadline by which
+    its next heartbeat is due, and a sweep compares all of them against now at once.
+    """
+
+    __KEYS = 256 * 256
+
+    def __init__(
+        self,
+        timeout: float = 5.0,
+        missed_intervals: float = 3.0,
+        smoothing: float = 0.1,
+        capacity: int = 64,
+    ) -> None:
+        """
+        timeout: Seconds of silence before an endpoint is lost, at least.
+        missed_intervals: Slower senders are lost after this many of their own intervals instead.
+        smoothing: Weight of the newest interval in the smoothed one, in (0, 1].
+        capacity: Rows allocated up front, doubled whenever full.
+        """
+        assert timeout > 0.0, "Timeout must be positive"
+        assert missed_intervals > 0.0, "Missed intervals must be positive"
+        assert 0.0 < smoothing <= 1.0, "Smoothing out of range"
+        assert capacity > 0, "Capacity must be positive"
+
+        self.timeout = timeout
+        self.missed_intervals = missed_intervals
+        self.smoothing = smoothing
+
+        self.__rows = np.full(LivenessTable.__KEYS, -1, dtype=np.int32)
+        self.__count = 0
+        self.__system_ids = np.zeros(capacity, dtype=np.uint8)
+        self.__component_ids = np.zeros(capacity, dtype=np.uint8)
+        self.__last_seen = np.zeros(capacity)
+        # Smoothed seconds between heartbeats, 0 until the second one
+        self.__intervals = np.zeros(capacity)
+        # Infinite once lost, so the sweep reports each loss once
+        self.__deadlines = np.full(capacity, math.inf)
+        self.__connected = np.zeros(capacity, dtype=bool)
+
+    def __len__(self) -> int:
+        return self.__count
+
+    def update(self, system_id: int, component_id: int, now: float) -> bool:
+        """
+        Record a heartbeat from the endpoint at now (time.monotonic()).
+
+        Returns whether the endpoint was not connected before, either new or recovered.
+        The silence before a recovery is an outage, not an interval, so it is not smoothed in.
+        """
+        key = (system_id << 8) | component_id
+        row = int(self.__rows[key])
+        if row < 0:
+            row = self.__add(key, system_id, component_id)
+        elif self.__connected[row]:
+            interval = now - self.__last_seen[row]
+            previous = self.__intervals[row]
+            if previous == 0.0:
+                self.__intervals[row] = interval
+            else:
+                self.__intervals[row] = previous + self.smoothing * (interval - previous)
+
+        self.__last_seen[row] = now
+        self.__deadlines[row] = now + max(
+            self.timeout, self.missed_intervals * self.__intervals[row]
+        )
+        was_connected = bool(self.__connected[row])
+        self.__connected[row] = True
+        return not was_connected
+
+    def sweep(self, now: float) -> "list[tuple[int, int]]":
+        """
+        Mark every endpoint past its deadline as lost.
+
+        Returns the (system ID, component ID) of the endpoints lost since the last sweep.
+        """
+        lost = np.flatnonzero(self.__deadlines[: self.__count] <= now)
+        if len(lost) == 0:
+            return []
+
+        self.__deadlines[lost] = math.inf
+        self.__connected[lost] = False
+        return list(zip(self.__system_ids[lost].tolist(), self.__component_ids[lost].tolist()))
+
+    def get(self, system_id: int, component_id: int) -> LivenessEntry | None:
+        """
+        The endpoint's entry, None if it was never heard from.
+        """
+        row = int(self.__rows[(system_id << 8) | component_id])
+        if row < 0:
+            return None
+
+        return self.__entry(row)
+
+    def entries(self) -> "list[LivenessEntry]":
+        """
+        Every endpoint in the order first heard from.
+        """
+        return [self.__entry(row) for row in range(self.__count)]
+
+    @property
+    def connected_count(self) -> int:
+        """
+        Endpoints currently connected.
+        """
+        return int(np.count_nonzero(self.__connected[: self.__count]))
+
+    def __entry(self, row: int) -> LivenessEntry:
+        interval = float(self.__intervals[row])
+        return LivenessEntry(
+            int(self.__system_ids[row]),
+            int(self.__component_ids[row]),
+            float(self.__last_seen[row]),
+            1.0 / interval if interval > 0.0 else 0.0,
+            bool(self.__connected[row]),
+        )
+
+    def __add(self, key: int, system_id: int, component_id: int) -> int:
+        """
+        Allocate a row for a new endpoint, growing the arrays if needed.
+        """
+        if self.__count == len(self.__last_seen):
+            capacity = len(self.__last_seen) * 2
+            self.__system_ids = _grow(self.__system_ids, capacity, 0)
+            self.__component_ids = _grow(self.__component_ids, capacity, 0)
+            self.__last_seen = _grow(self.__last_seen, capacity, 0.0)
+            self.__intervals = _grow(self.__intervals, capacity, 0.0)
+            self.__deadlines = _grow(self.__deadlines, capacity, math.inf)
+            self.__connected = _grow(self.__connected, capacity, False)
+
+        row = self.__count
+        self.__count += 1
+        self.__rows[key] = row
+        self.__system_ids[row] = system_id
+        self.__component_ids[row] = component_id
+        return row
+
+
+def _grow(array: np.ndarray, capacity: int, fill: object) -> np.ndarray:
+    """
+    Copy of the array extended to the capacity with the fill value.
+    """
+    grown = np.full(capacity, fill, dtype=array.dtype)
+    grown[: len(array)] = array
+    return grown
@@ -0,0 +1,119 @@
+"""
+Phi accrual failure detector over heartbeat inter-arrival times.
+"""
+
+import math
+import statistics
+
+import numpy as np
+
+
+class PhiAccrualDetector:  # pylint: disable=too-many-instance-attributes
+    """
+    Suspicion that the sender is gone, from how late the next heartbeat is compared to
+    the recent inter-arrival times (assumed normally distributed).
+
+    phi = -log10(P(interval > time since the last heartbeat)), so phi 1 means a 10% chance
+    the heartbeat is still coming, 2 means 1% and so on.
+    """
+
+    def __init__(
+        self,
+        expected_interval: float,
+        window_size: int = 100,
+        min_std: float = 0.1,
+        acceptable_pause: float = 0.0,
+    ) -> None:
+        """
+        expected_interval: Seconds between heartbeats assumed until some are observed.
+        window_size: Inter-arrival times kept.
+        min_std: Lower bound on the standard deviation in seconds, so a perfectly regular
+            sender is not suspected on the slightest delay.
+        acceptable_pause: Extra seconds of silence tolerated on top of the distribution.
+        """
+        assert expected_interval > 0.0, "Interval must be positive"
+        assert window_size >= 2, "Window needs at least 2 samples"
+        assert min_std > 0.0, "Standard deviation bound must be positive"
+
+        self.min_std = min_std
+        self.acceptable_pause = acceptable_pause
+        self.last_heartbeat: float | None = None
+
+        # Seeded as if two heartbeats a quarter interval either side of the expected one were seen
+        self.__intervals = np.zeros(window_size)
+        self.__intervals[0] = expected_interval * 0.75
+        self.__intervals[1] = expected_interval * 1.25
+        self.__count = 2
+        self.__next = 2 % window_size
+        self.__sum = float(self.__intervals.sum())
+        self.__squared_sum = float(np.square(self.__intervals).sum())
+
+    def heartbeat(self, now: float, interval_known: bool = True) -> None:
+        """
+        Record a heartbeat arriving at now (time.monotonic()).
+
+        interval_known: False when the time since the previous heartbeat is not an
+            inter-arrival time, like the silence before a recovery or a heartbeat read from a
+            backlog, so only the arrival is recorded.
+        """
+        if self.last_heartbeat is not None and interval_known:
+            interval = now - self.last_heartbeat
+            size = len(self.__intervals)
+            if self.__count == size:
+                oldest = self.__intervals[self.__next]
+                self.__sum -= oldest
+                self.__squared_sum -= oldest * oldest
+            else:
+                self.__count += 1
+
+            self.__intervals[self.__next] = interval
+            self.__sum += interval
+            self.__squared_sum += interval * interval
+            self.__next = (self.__next + 1) % size
+
+            # Recompute once per lap so rounding error cannot build up
+            if self.__next == 0:
+                self.__sum = float(self.__intervals.sum())
+                self.__squared_sum = float(np.square(self.__intervals).sum())
+
+        self.last_heartbeat = now
+
+    @property
+    def mean(self) -> float:
+        """
+        Mean inter-arrival time plus the acceptable pause.
+        """
+        return self.__sum / self.__count + self.acceptable_pause
+
+    @property
+    def std(self) -> float:
+        """
+        Standard deviation of the inter-arrival times, at least min_std.
+        """
+        mean = self.__sum / self.__count
+        variance = max(0.0, self.__squared_sum / self.__count - mean * mean)
+        return max(math.sqrt(variance), self.min_std)
+
+    def phi(self, now: float) -> float:
+        """
+        Suspicion level at now, 0 before the first heartbeat.
+        """
+        if self.last_heartbeat is None:
+            return 0.0
+
+        y = (now - self.last_heartbeat - self.mean) / self.std
+        # Tail probability, through erfc so it does not round to 0 for late heartbeats
+        probability = 0.5 * math.erfc(y / math.sqrt(2.0))
+        return -math.log10(max(probability, 1e-300))
+
+    def deadline(self, threshold: float) -> float | None:
+        """
+        Time at which phi reaches the threshold if no heartbeat arrives, None before the first.
+        """
+        assert 0.0 < threshold <= 15.0, "Threshold out of the representable range"
+
+        if self.last_heartbeat is None:
+            return None
+
+        y = statistics.NormalDist().inv_cdf(1.0 - 10.0**-threshold)
+        return self.last_heartbeat + self.mean + y * self.std
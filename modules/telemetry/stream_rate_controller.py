@@ -0,0 +1,249 @@
+"""
+Negotiates ATTITUDE and LOCAL_POSITION_NED stream rates with the autopilot.
+"""
+
+import time
+from typing import Tuple, Union
+
+from pymavlink import mavutil
+
+from . import telemetry
+from ..common.modules.logger import logger
+
+
+class _StreamState:
+    """
+    Requested and confirmed rate of one message.
+    """
+
+    def __init__(self, name: str, message_id: int) -> None:
+        self.name = name
+        self.message_id = message_id
+        self.wanted_rate: float | None = None
+        self.confirmed_rate: float | None = None
+        # After a refused or unanswered request, no new request until this time
+        self.hold_until = 0.0
+
+
+# =================================================================================================
+#                            ↓ BOOTCAMPERS MODIFY BELOW THIS COMMENT ↓
+# =================================================================================================
+class StreamRateController:  # pylint: disable=too-many-instance-attributes
+    """
+    Requests message intervals with MAV_CMD_SET_MESSAGE_INTERVAL and adjusts them at runtime.
+
+    Rates go up to the active rate while the drone is manoeuvring and down to the idle rate
+    when it is holding still. They are cut while consumers fall behind (output queue filling)
+    and dropped to the paused rate while workers are paused. Each change is confirmed by
+    COMMAND_ACK and retried if unanswered. The ACK does not say which message it is for,
+    so only one request is in flight at a time.
+    """
+
+    __private_key = object()
+
+    MESSAGE_IDS = {
+        "ATTITUDE": mavutil.mavlink.MAVLINK_MSG_ID_ATTITUDE,
+        "LOCAL_POSITION_NED": mavutil.mavlink.MAVLINK_MSG_ID_LOCAL_POSITION_NED,
+    }
+
+    # Movement that counts as manoeuvring
+    __ACTIVE_SPEED = 0.2  # m/s
+    __ACTIVE_YAW_SPEED = 0.05  # rad/s
+    # Stay at the active rate this long after the last movement
+    __ACTIVE_HOLD = 2.0  # seconds
+    # Output queue fill fraction above which consumers are behind
+    __LAG_THRESHOLD = 0.5
+    __LAG_CUT = 0.5
+    # Rate changes smaller than this fraction are not sent
+    __CHANGE_THRESHOLD = 0.1
+    # Wait before asking again for a stream whose request failed
+    __FAILURE_HOLD = 10.0  # seconds
+
+    @classmethod
+    def create(
+        cls,
+        connection: mavutil.mavfile,
+        local_logger: logger.Logger,
+        idle_rate: float = 2.0,
+        active_rate: float = 20.0,
+        paused_rate: float = 0.5,
+        ack_timeout: float = 0.5,
+        max_attempts: int = 3,
+    ) -> Tuple[bool, Union["StreamRateController", None]]:
+        """
+        Falliable create (instantiation) method to create a StreamRateController object.
+
+        Rates are in messages per second. ack_timeout is seconds to wait for COMMAND_ACK
+        before sending again, at most max_attempts times.
+        """
+        if min(idle_rate, active_rate, paused_rate, ack_timeout) <= 0.0 or max_attempts < 1:
+            local_logger.error("Failed to create StreamRateController: invalid settings", True)
+            return False, None
+
+        return True, cls(
+            cls.__private_key,
+            connection,
+            local_logger,
+            (idle_rate, active_rate, paused_rate),
+            ack_timeout,
+            max_attempts,
+        )
+
+    def __init__(
+        self,
+        key: object,
+        connection: mavutil.mavfile,
+        local_logger: logger.Logger,
+        rates: "tuple[float, float, float]",
+        ack_timeout: float,
+        max_attempts: int,
+    ) -> None:
+        assert key is StreamRateController.__private_key, "Use create() method"
+        self.connection = connection
+        self.local_logger = local_logger
+        self.idle_rate, self.active_rate, self.paused_rate = rates
+        self.ack_timeout = ack_timeout
+        self.max_attempts = max_attempts
+
+        self.streams = [_StreamState(name, msg_id) for name, msg_id in self.MESSAGE_IDS.items()]
+        # Stream awaiting COMMAND_ACK, with the rate, send time and attempt count
+        self.in_flight: "tuple[_StreamState, float, float, int] | None" = None
+        self.last_active_time = time.monotonic()
+
+    def start(self) -> None:
+        """
+        Request the active rate for every stream.
+        """
+        for stream in self.streams:
+            stream.wanted_rate = self.active_rate
+        self.__send_next(time.monotonic())
+
+    def update(
+        self,
+        data: telemetry.TelemetryData | None,
+        queue_lag: float,
+        paused: bool,
+    ) -> None:
+        """
+        Pick the rate for the current demand and send any pending request.
+
+        data: Latest telemetry output, None if there was none.
+        queue_lag: Fill fraction of the output queue, 0 to 1.
+        paused: Whether workers are paused.
+        """
+        now = time.monotonic()
+        if data is not None and self.__is_moving(data):
+            self.last_active_time = now
+
+        if paused:
+            rate = self.paused_rate
+        elif now - self.last_active_time <= self.__ACTIVE_HOLD:
+            rate = self.active_rate
+        else:
+            rate = self.idle_rate
+
+        for stream in self.streams:
+            if now < stream.hold_until:
+                continue
+
+            stream_rate = rate
+            if queue_lag > self.__LAG_THRESHOLD and stream.confirmed_rate is not None:
+                # Consumers cannot keep up, back off from what the drone is sending now
+                stream_rate = max(
+                    self.paused_rate, min(rate, stream.confirmed_rate * self.__LAG_CUT)
+                )
+
+            current = stream.wanted_rate
+            if current is None or abs(stream_rate - current) > current * self.__CHANGE_THRESHOLD:
+                stream.wanted_rate = stream_rate
+
+        self.__check_timeout(now)
+        self.__send_next(now)
+
+    def handle_ack(self, msg: object) -> None:
+        """
+        Process a COMMAND_ACK, ignoring those for other commands.
+        """
+        if msg.command != mavutil.mavlink.MAV_CMD_SET_MESSAGE_INTERVAL or self.in_flight is None:
+            return
+
+        stream, rate, _, _ = self.in_flight
+        self.in_flight = None
+        if msg.result != mavutil.mavlink.MAV_RESULT_ACCEPTED:
+            self.local_logger.warning(
+                f"{stream.name} interval rejected with result {msg.result}", True
+            )
+            # Do not keep asking for a rate that is refused
+            stream.wanted_rate = stream.confirmed_rate
+            stream.hold_until = time.monotonic() + self.__FAILURE_HOLD
+            return
+
+        stream.confirmed_rate = rate
+        self.local_logger.info(f"{stream.name} rate confirmed at {rate:.1f}Hz", True)
+        self.__send_next(time.monotonic())
+
+    def __is_moving(self, data: telemetry.TelemetryData) -> bool:
+        """
+        Whether the drone is translating or turning.
+        """
+        speed_squared = data.x_velocity**2 + data.y_velocity**2 + data.z_velocity**2
+        return (
+            speed_squared > self.__ACTIVE_SPEED**2 or abs(data.yaw_speed) > self.__ACTIVE_YAW_SPEED
+        )
+
+    def __check_timeout(self, now: float) -> None:
+        """
+        Resend an unanswered request, or give up after the last attempt.
+        """
+        if self.in_flight is None:
+            return
+
+        stream, rate, sent_time, attempts = self.in_flight
+        if now - sent_time < self.ack_timeout:
+            return
+
+        if attempts >= self.max_attempts:
+            self.local_logger.warning(f"{stream.name} interval not acknowledged, giving up", True)
+            self.in_flight = None
+            stream.wanted_rate = stream.confirmed_rate
+            stream.hold_until = now + self.__FAILURE_HOLD
+            return
+
+        self.__send(stream, rate, now, attempts + 1)
+
+    def __send_next(self, now: float) -> None:
+        """
+        Send the first stream whose wanted rate is not confirmed, if none is in flight.
+        """
+        if self.in_flight is not None:
+            return
+
+        for stream in self.streams:
+            if stream.wanted_rate is not None and stream.wanted_rate != stream.confirmed_rate:
+                self.__send(stream, stream.wanted_rate, now, 1)
+                return
+
+    def __send(self, stream: _StreamState, rate: float, now: float, attempt: int) -> None:
+        """
+        COMMAND_LONG with MAV_CMD_SET_MESSAGE_INTERVAL (511).
+        """
+        interval = int(1_000_000 / rate)  # microseconds
+        self.connection.mav.command_long_send(
+            self.connection.target_system,
+            0,
+            mavutil.mavlink.MAV_CMD_SET_MESSAGE_INTERVAL,
+            attempt - 1,  # confirmation: number of retransmissions
+            stream.message_id,
+            interval,
+            0,
+            0,
+            0,
+            0,
+            0,
+        )
+        self.in_flight = (stream, rate, now, attempt)
+
+
+# =================================================================================================
+#                            ↑ BOOTCAMPERS MODIFY ABOVE THIS COMMENT ↑
+# =================================================================================================
@@ -0,0 +1,314 @@
+"""
+Streaming sample-and-hold telemetry fusion.
+"""
+
+import queue
+import time
+from typing import Optional, Tuple, Union
+
+from pymavlink import mavutil
+
+from utilities.workers import queue_proxy_wrapper
+from . import stream_rate_controller
+from . import telemetry
+from . import telemetry_alignment
+from ..command import command_tracker
+from ..common.modules.logger import logger
+
+
+# =================================================================================================
+#                            ↓ BOOTCAMPERS MODIFY BELOW THIS COMMENT ↓
+# =================================================================================================
+class _VehicleState:
+    """
+    Held messages of one system.
+    """
+
+    def __init__(self, aligner: telemetry_alignment.TelemetryAligner | None) -> None:
+        self.position_msg = None
+        self.attitude_msg = None
+        self.position_time = 0.0
+        self.attitude_time = 0.0
+        self.aligner = aligner
+        self.last_aligned_time: float | None = None
+
+
+class StreamingTelemetry:  # pylint: disable=too-many-instance-attributes
+    """
+    Keeps the latest ATTITUDE and LOCAL_POSITION_NED of each system across calls and
+    emits a fused TelemetryData either on every update or at a fixed rate.
+
+    Unlike Telemetry, partial state is never thrown away, so output follows the faster
+    stream instead of waiting for a fresh pair. Each output records how old each half is.
+    With alignment, both halves are interpolated to a common timestamp instead.
+    """
+
+    __private_key = object()
+
+    __MESSAGE_TYPES = ["LOCAL_POSITION_NED", "ATTITUDE"]
+    __UPDATE_TIMEOUT = 1.0  # seconds
+
+    @classmethod
+    def create(
+        cls,
+        connection: mavutil.mavfile,
+        local_logger: logger.Logger,
+        output_rate: float | None = None,
+        aligned: bool = False,
+        history_size: int = 32,
+        rate_controller: stream_rate_controller.StreamRateController | None = None,
+        ack_queue: queue_proxy_wrapper.QueueProxyWrapper | None = None,
+    ) -> Tuple[bool, Union["StreamingTelemetry", None]]:
+        """
+        Falliable create (instantiation) method to create a StreamingTelemetry object.
+
+        output_rate: TelemetryData per second for each system, None to emit on every update.
+        aligned: Interpolate to a common timestamp instead of pairing the latest of each.
+        history_size: Samples buffered per message type for alignment.
+        rate_controller: Receives the COMMAND_ACKs for SET_MESSAGE_INTERVAL.
+        ack_queue: Receives the other COMMAND_ACKs as CommandAck, for the command worker.
+        """
+        if output_rate is not None and output_rate <= 0.0:
+            local_logger.error("Failed to create StreamingTelemetry: rate must be positive", True)
+            return False, None
+
+        if history_size < 2:
+            local_logger.error("Failed to create StreamingTelemetry: history too short", True)
+            return False, None
+
+        try:
+            instance = cls(
+                cls.__private_key,
+                connection,
+                local_logger,
+                output_rate,
+                history_size if aligned else None,
+                rate_controller,
+                ack_queue,
+            )
+            return True, instance
+        except Exception as ex:  # pylint: disable=broad-exception-caught
+            local_logger.error(f"Failed to create StreamingTelemetry object: {ex}", True)
+            return False, None
+
+    def __init__(
+        self,
+        key: object,
+        connection: mavutil.mavfile,
+        local_logger: logger.Logger,
+        output_rate: float | None,
+        history_size: int | None,
+        rate_controller: stream_rate_controller.StreamRateController | None,
+        ack_queue: queue_proxy_wrapper.QueueProxyWrapper | None,
+    ) -> None:
+        assert key is StreamingTelemetry.__private_key, "Use create() method"
+        self.connection = connection
+        self.local_logger = local_logger
+        self.output_period = None if output_rate is None else 1.0 / output_rate
+        # None without alignment
+        self.history_size = history_size
+        self.rate_controller = rate_controller
+        self.ack_queue = ack_queue
+        self.message_types = list(self.__MESSAGE_TYPES)
+        if rate_controller is not None or ack_queue is not None:
+            # This worker reads the socket, so it is the one that sees them
+            self.message_types.append("COMMAND_ACK")
+
+        # Held across calls, by system ID
+        self.vehicles: "dict[int, _VehicleState]" = {}
+
+        self.next_output_time = time.monotonic()
+
+    def run(self) -> "list[telemetry.TelemetryData]":
+        """
+        Wait for the next update and return the fused state of the updated system,
+        or wait for the next output time with a fixed rate and return every system.
+
+        A system is left out until both message types have been received at least once.
+        The list is empty if nothing arrived within the timeout when emitting on every update.
+        """
+        if self.output_period is None:
+            system_id = self.__receive_until(time.monotonic() + self.__UPDATE_TIMEOUT, True)
+            if system_id is None:
+                return []
+            data = self.__fuse(system_id, True)
+            return [] if data is None else [data]
+
+        self.__receive_until(self.next_output_time, False)
+
+        # Absolute deadlines so the rate does not drift, skip ahead if we fell behind
+        self.next_output_time += self.output_period
+        now = time.monotonic()
+        if self.next_output_time < now:
+            self.next_output_time = now + self.output_period
+
+        outputs = [self.__fuse(system_id, False) for system_id in self.vehicles]
+        return [data for data in outputs if data is not None]
+
+    def __receive_until(self, deadline: float, stop_on_update: bool) -> int | None:
+        """
+        Update the held messages until the deadline.
+
+        Returns the system ID last updated, None if nothing was.
+        """
+        updated = None
+        while True:
+            msg = self.connection.recv_match(type=self.message_types, blocking=False)
+            if msg is not None and msg.get_type() == "COMMAND_ACK":
+                self.__forward_ack(msg)
+                continue
+
+            if msg is not None:
+                updated = msg.get_srcSystem()
+                self.__hold(updated, msg)
+                if stop_on_update:
+                    return updated
+                continue
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0.0:
+                return updated
+
+            self.connection.select(remaining)
+
+    def __hold(self, system_id: int, msg: object) -> None:
+        """
+        Keep the message as the system's latest of its type.
+
+        With alignment, messages older than the buffered ones are dropped.
+        """
+        vehicle = self.vehicles.get(system_id)
+        if vehicle is None:
+            aligner = None
+            if self.history_size is not None:
+                aligner = telemetry_alignment.TelemetryAligner(self.history_size)
+            vehicle = _VehicleState(aligner)
+            self.vehicles[system_id] = vehicle
+
+        now = time.monotonic()
+        if msg.get_type() == "LOCAL_POSITION_NED":
+            if vehicle.aligner is not None and not vehicle.aligner.add_position(
+                msg.time_boot_ms, (msg.x, msg.y, msg.z, msg.vx, msg.vy, msg.vz)
+            ):
+                self.local_logger.debug(f"Stale position of system {system_id} dropped", True)
+                return
+
+            vehicle.position_msg = msg
+            vehicle.position_time = now
+            return
+
+        if vehicle.aligner is not None and not vehicle.aligner.add_attitude(
+            msg.time_boot_ms,
+            (msg.roll, msg.pitch, msg.yaw, msg.rollspeed, msg.pitchspeed, msg.yawspeed),
+        ):
+            self.local_logger.debug(f"Stale attitude of system {system_id} dropped", True)
+            return
+
+        vehicle.attitude_msg = msg
+        vehicle.attitude_time = now
+
+    def __forward_ack(self, msg: object) -> None:
+        """
+        Hand the COMMAND_ACK to whoever sent the command.
+        """
+        if msg.command == mavutil.mavlink.MAV_CMD_SET_MESSAGE_INTERVAL:
+            if self.rate_controller is not None:
+                self.rate_controller.handle_ack(msg)
+            return
+
+        if self.ack_queue is None:
+            return
+
+        try:
+            self.ack_queue.queue.put_nowait(
+                command_tracker.CommandAck(
+                    msg.command, msg.result, time.monotonic(), msg.get_srcSystem()
+                )
+            )
+        except queue.Full:
+            self.local_logger.warning(f"ACK for command {msg.command} dropped, queue full", True)
+
+    def __fuse(self, system_id: int, only_new: bool) -> Optional[telemetry.TelemetryData]:
+        """
+        Combine the held messages of the system, with the age of each.
+
+        only_new: With alignment, skip if the common timestamp has not advanced.
+        """
+        vehicle = self.vehicles[system_id]
+        if vehicle.position_msg is None or vehicle.attitude_msg is None:
+            return None
+
+        now = time.monotonic()
+        if vehicle.aligner is not None:
+            return self.__fuse_aligned(system_id, vehicle, only_new, now)
+
+        position_msg = vehicle.position_msg
+        attitude_msg = vehicle.attitude_msg
+        return telemetry.TelemetryData(
+            time_since_boot=max(position_msg.time_boot_ms, attitude_msg.time_boot_ms),
+            x=position_msg.x,
+            y=position_msg.y,
+            z=position_msg.z,
+            x_velocity=position_msg.vx,
+            y_velocity=position_msg.vy,
+            z_velocity=position_msg.vz,
+            roll=attitude_msg.roll,
+            pitch=attitude_msg.pitch,
+            yaw=attitude_msg.yaw,
+            roll_speed=attitude_msg.rollspeed,
+            pitch_speed=attitude_msg.pitchspeed,
+            yaw_speed=attitude_msg.yawspeed,
+            position_age=now - vehicle.position_time,
+            attitude_age=now - vehicle.attitude_time,
+            # Held data ages from when it arrived, so it still expires at the queue deadline
+            timestamp=min(vehicle.position_time, vehicle.attitude_time),
+            system_id=system_id,
+        )
+
+    def __fuse_aligned(
+        self, system_id: int, vehicle: _VehicleState, only_new: bool, now: float
+    ) -> Optional[telemetry.TelemetryData]:
+        """
+        Both halves interpolated to the newest common timestamp.
+        """
+        assert vehicle.aligner is not None
+
+        timestamp = vehicle.aligner.sample()
+        if timestamp is None:
+            return None
+        if only_new and timestamp == vehicle.last_aligned_time:
+            return None
+        vehicle.last_aligned_time = timestamp
+
+        # Both halves are valid at the arrival of the slower stream's newest message
+        if vehicle.position_msg.time_boot_ms == timestamp:
+            age = now - vehicle.position_time
+        else:
+            age = now - vehicle.attitude_time
+
+        position = vehicle.aligner.position
+        attitude = vehicle.aligner.attitude
+        return telemetry.TelemetryData(
+            time_since_boot=int(timestamp),
+            x=float(position[0]),
+            y=float(position[1]),
+            z=float(position[2]),
+            x_velocity=float(position[3]),
+            y_velocity=float(position[4]),
+            z_velocity=float(position[5]),
+            roll=float(attitude[0]),
+            pitch=float(attitude[1]),
+            yaw=float(attitude[2]),
+            roll_speed=float(attitude[3]),
+            pitch_speed=float(attitude[4]),
+            yaw_speed=float(attitude[5]),
+            position_age=age,
+            attitude_age=age,
+            timestamp=now - age,
+            system_id=system_id,
+        )
+
+
+# =================================================================================================
+#                            ↑ BOOTCAMPERS MODIFY ABOVE THIS COMMENT ↑
+# =================================================================================================
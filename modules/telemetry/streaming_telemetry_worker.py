@@ -0,0 +1,110 @@
+"""
+Telemetry worker that forwards the held state on every update or at a fixed rate.
+"""
+
+import os
+import pathlib
+
+from pymavlink import mavutil
+
+from utilities.workers import queue_proxy_wrapper
+from utilities.workers import worker_controller
+from . import stream_rate_controller
+from . import streaming_telemetry
+from ..common.modules.logger import logger
+
+
+# =================================================================================================
+#                            ↓ BOOTCAMPERS MODIFY BELOW THIS COMMENT ↓
+# =================================================================================================
+def streaming_telemetry_worker(
+    connection: mavutil.mavfile,
+    output_rate: float | None,
+    aligned: bool,
+    stream_rates: "tuple[float, float, float] | None",
+    output_queue: queue_proxy_wrapper.QueueProxyWrapper,
+    ack_queue: queue_proxy_wrapper.QueueProxyWrapper,
+    controller: worker_controller.WorkerController,
+) -> None:
+    """
+    Worker process.
+
+    - connection: pymavlink connection object (mavutil.mavlink_connection(...))
+    - output_rate: TelemetryData per second, None to send on every update
+    - aligned: interpolate both message types to a common timestamp
+    - stream_rates: (idle, active, paused) rates to request from the drone, None to leave as is
+    - output_queue: multiprocessing.Queue to send data to other processes
+    - ack_queue: multiprocessing.Queue to send COMMAND_ACKs to the command worker
+    - controller: worker_controller.Controller used to manage worker lifecycle
+    """
+    # =============================================================================================
+    #                          ↑ BOOTCAMPERS MODIFY ABOVE THIS COMMENT ↑
+    # =============================================================================================
+
+    # Instantiate logger
+    worker_name = pathlib.Path(__file__).stem
+    process_id = os.getpid()
+    result, local_logger = logger.Logger.create(f"{worker_name}_{process_id}", True)
+    if not result:
+        print("ERROR: Worker failed to create logger")
+        return
+
+    # Get Pylance to stop complaining
+    assert local_logger is not None
+
+    local_logger.info("Logger initialized", True)
+
+    # =============================================================================================
+    #                          ↓ BOOTCAMPERS MODIFY BELOW THIS COMMENT ↓
+    # =============================================================================================
+    # Instantiate class objects (streaming_telemetry.StreamingTelemetry)
+    rate_controller = None
+    if stream_rates is not None:
+        result, rate_controller = stream_rate_controller.StreamRateController.create(
+            connection, local_logger, *stream_rates
+        )
+        if not result:
+            local_logger.error("Failed to create StreamRateController", True)
+            return
+
+        # Get Pylance to stop complaining
+        assert rate_controller is not None
+
+        rate_controller.start()
+
+    result, telem = streaming_telemetry.StreamingTelemetry.create(
+        connection,
+        local_logger,
+        output_rate,
+        aligned,
+        rate_controller=rate_controller,
+        ack_queue=ack_queue,
+    )
+    if not result:
+        local_logger.error("Failed to create StreamingTelemetry", True)
+        return
+
+    # Get Pylance to stop complaining
+    assert telem is not None
+
+    # Main loop: do work.
+    data = None
+    while not controller.is_exit_requested():
+        if rate_controller is not None:
+            queue_lag = 0.0
+            if output_queue.maxsize > 0:
+                queue_lag = output_queue.queue.qsize() / output_queue.maxsize
+            rate_controller.update(data, queue_lag, controller.is_paused())
+
+        controller.check_pause()
+        outputs = telem.run()
+        for output in outputs:
+            output_queue.queue.put(output)
+            local_logger.debug(f"Telemetry data: {output}", True)
+        data = outputs[-1] if len(outputs) > 0 else None
+    local_logger.info("Worker stopping", True)
+
+
+# =================================================================================================
+#                            ↑ BOOTCAMPERS MODIFY ABOVE THIS COMMENT ↑
+# =================================================================================================
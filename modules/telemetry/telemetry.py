@@ -30,6 +30,10 @@ class TelemetryData:  # pylint: disable=too-many-instance-attributes
         roll_speed: float | None = None,  # rad/s
         pitch_speed: float | None = None,  # rad/s
         yaw_speed: float | None = None,  # rad/s
+        position_age: float | None = None,  # s since LOCAL_POSITION_NED arrived, when produced
+        attitude_age: float | None = None,  # s since ATTITUDE arrived, when produced
+        timestamp: float | None = None,  # time.monotonic() the older half arrived
+        system_id: int | None = None,  # MAVLink system the data is from
     ) -> None:
         self.time_since_boot = time_since_boot
         self.x = x
@@ -44,6 +48,10 @@ class TelemetryData:  # pylint: disable=too-many-instance-attributes
         self.roll_speed = roll_speed
         self.pitch_speed = pitch_speed
         self.yaw_speed = yaw_speed
+        self.position_age = position_age
+        self.attitude_age = attitude_age
+        self.timestamp = timestamp
+        self.system_id = system_id
 
     def __str__(self) -> str:
         return f"""{{
@@ -59,7 +67,11 @@ class TelemetryData:  # pylint: disable=too-many-instance-attributes
             yaw: {self.yaw},
             roll_speed: {self.roll_speed},
             pitch_speed: {self.pitch_speed},
-            yaw_speed: {self.yaw_speed}
+            yaw_speed: {self.yaw_speed},
+            position_age: {self.position_age},
+            attitude_age: {self.attitude_age},
+            timestamp: {self.timestamp},
+            system_id: {self.system_id}
         }}"""
 
 
@@ -73,15 +85,20 @@ class Telemetry:
 
     __private_key = object()
 
+    __TIMEOUT_DURATION = 1.0  # seconds
+
     @classmethod
     def create(
-        cls, connection: mavutil.mavfile, local_logger: logger.Logger
+        cls, connection: mavutil.mavfile, local_logger: logger.Logger, event_driven: bool = True
     ) -> Tuple[bool, Union["Telemetry", None]]:
         """
         Falliable create (instantiation) method to create a Telemetry object.
+
+        event_driven: Sleep on the connection's file descriptor until bytes arrive,
+            instead of polling the connection in a loop.
         """
         try:
-            instance = cls(cls.__private_key, connection, local_logger)
+            instance = cls(cls.__private_key, connection, local_logger, event_driven)
             return True, instance
         except Exception as ex:  # pylint: disable=broad-exception-caught
             local_logger.error(f"Failed to create Telemetry object: {ex}")
@@ -92,10 +109,12 @@ class Telemetry:
         key: object,
         connection: mavutil.mavfile,
         local_logger: logger.Logger,
+        event_driven: bool,
     ) -> None:
         assert key is Telemetry.__private_key, "Use create() method"
         self.connection = connection
         self.local_logger = local_logger
+        self.event_driven = event_driven
         self.position_msg = None
         self.attitude_msg = None
 
@@ -110,19 +129,25 @@ class Telemetry:
         # Read MAVLink message ATTITUDE (30)
         # Return the most recent of both, and use the most recent message's timestamp
 
-        start_time = time.time()
-        timeout_duration = 1.0
+        deadline = time.monotonic() + self.__TIMEOUT_DURATION
 
         # Reset messages for fresh collection
         temp_position_msg = None
         temp_attitude_msg = None
 
         # Collect both message types within the timeout window
-        while time.time() - start_time < timeout_duration:
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0.0:
+                break
+
             msg = self.connection.recv_match(
-                type=["LOCAL_POSITION_NED", "ATTITUDE"], blocking=False, timeout=0.1
+                type=["LOCAL_POSITION_NED", "ATTITUDE"], blocking=False
             )
             if not msg:
+                if self.event_driven:
+                    # Everything buffered has been parsed, sleep until more bytes arrive
+                    self.connection.select(remaining)
                 continue
 
             if msg.get_type() == "LOCAL_POSITION_NED":
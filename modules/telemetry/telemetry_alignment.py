@@ -0,0 +1,231 @@
+"""
+Samples ATTITUDE and LOCAL_POSITION_NED at a common timestamp.
+"""
+
+import math
+
+import numpy as np
+
+
+class MessageHistory:  # pylint: disable=too-many-instance-attributes
+    """
+    Preallocated ring buffer of timestamped samples of one message type.
+
+    Nothing is allocated after construction, so pushing and interpolating
+    keep up at high message rates.
+    """
+
+    # A jump back this far is a reboot of the sender, not a reordered message
+    RESET_JUMP = 500.0  # ms
+    # A reboot to less than RESET_JUMP before the newest sample shows as every push rejected
+    RESET_AFTER_REJECTED = 3
+
+    def __init__(self, capacity: int, width: int, angle_count: int = 0) -> None:
+        """
+        capacity: Number of samples kept.
+        width: Number of values per sample.
+        angle_count: Leading values that are angles in radians, interpolated the short way round.
+        """
+        assert capacity >= 2, "Capacity must be at least 2"
+        assert 0 <= angle_count <= width, "Angle count must be within width"
+
+        self.capacity = capacity
+        self.__times = np.zeros(capacity)
+        self.__values = np.zeros((capacity, width))
+        self.__next = 0
+        self.__count = 0
+        self.__rejected_count = 0
+
+        self.__difference = np.zeros(width)
+        # Views created once, reused for every interpolation
+        self.__difference_angles = self.__difference[:angle_count]
+        self.__angle_count = angle_count
+
+    @property
+    def count(self) -> int:
+        """
+        Number of samples held.
+        """
+        return self.__count
+
+    def latest_time(self) -> float | None:
+        """
+        Timestamp of the newest sample.
+        """
+        if self.__count == 0:
+            return None
+        return float(self.__times[(self.__next - 1) % self.capacity])
+
+    def clear(self) -> None:
+        """
+        Drop every held sample.
+        """
+        self.__next = 0
+        self.__count = 0
+        self.__rejected_count = 0
+
+    def is_reset(self, timestamp: float) -> bool:
+        """
+        Whether pushing timestamp would clear the history as a restart of the sender's clock.
+        """
+        latest = self.latest_time()
+        if latest is None or timestamp > latest:
+            return False
+
+        return (
+            timestamp < latest - self.RESET_JUMP
+            or self.__rejected_count + 1 >= self.RESET_AFTER_REJECTED
+        )
+
+    def push(self, timestamp: float, values: "tuple[float, ...]") -> bool:
+        """
+        Store a sample, overwriting the oldest when full.
+
+        A timestamp far behind the newest held one, or several in a row that are not newer,
+        mean the sender restarted its clock: the history is cleared and the sample stored.
+
+        Returns False if the sample is not newer than the newest held one otherwise.
+        """
+        if self.is_reset(timestamp):
+            self.clear()
+
+        latest = self.latest_time()
+        if latest is not None and timestamp <= latest:
+            self.__rejected_count += 1
+            return False
+
+        self.__rejected_count = 0
+        self.__times[self.__next] = timestamp
+        self.__values[self.__next] = values
+        self.__next = (self.__next + 1) % self.capacity
+        self.__count = min(self.__count + 1, self.capacity)
+        return True
+
+    def interpolate(self, timestamp: float, out: np.ndarray) -> bool:
+        """
+        Write the values at timestamp into out, linear between the two surrounding samples.
+
+        Returns False if timestamp is outside the held samples.
+        """
+        if self.__count == 0:
+            return False
+
+        # Searching back from the newest, the wanted sample is almost always near the end
+        newer = (self.__next - 1) % self.capacity
+        if timestamp > self.__times[newer]:
+            return False
+
+        for _ in range(self.__count - 1):
+            older = (newer - 1) % self.capacity
+            if self.__times[older] <= timestamp:
+                self.__blend(older, newer, timestamp, out)
+                return True
+            newer = older
+
+        if timestamp == self.__times[newer]:
+            out[:] = self.__values[newer]
+            return True
+
+        return False
+
+    def __blend(self, older: int, newer: int, timestamp: float, out: np.ndarray) -> None:
+        """
+        Linear interpolation with angles unwrapped.
+        """
+        start = self.__values[older]
+        fraction = (timestamp - self.__times[older]) / (self.__times[newer] - self.__times[older])
+
+        np.subtract(self.__values[newer], start, out=self.__difference)
+        if self.__angle_count > 0:
+            _wrap(self.__difference_angles)
+
+        np.multiply(self.__difference, fraction, out=self.__difference)
+        np.add(start, self.__difference, out=out)
+        if self.__angle_count > 0:
+            _wrap(out[: self.__angle_count])
+
+
+def _wrap(angles: np.ndarray) -> None:
+    """
+    Wrap angles into [-pi, pi) in place.
+    """
+    np.add(angles, math.pi, out=angles)
+    np.mod(angles, 2.0 * math.pi, out=angles)
+    np.subtract(angles, math.pi, out=angles)
+
+
+class TelemetryAligner:
+    """
+    Buffers both message types and samples them at the newest timestamp both cover.
+
+    Pairing the newest of each by max(time_boot_ms) can combine a position that is
+    up to a message period older than the attitude. Instead the faster stream is
+    interpolated to the time of the slower one.
+    """
+
+    # x, y, z, vx, vy, vz
+    POSITION_WIDTH = 6
+    # roll, pitch, yaw, rollspeed, pitchspeed, yawspeed
+    ATTITUDE_WIDTH = 6
+    ATTITUDE_ANGLE_COUNT = 3
+
+    def __init__(self, capacity: int = 32) -> None:
+        """
+        capacity: Samples kept per message type, must span the slower stream's period.
+        """
+        self.__positions = MessageHistory(capacity, self.POSITION_WIDTH)
+        self.__attitudes = MessageHistory(capacity, self.ATTITUDE_WIDTH, self.ATTITUDE_ANGLE_COUNT)
+
+        self.position = np.zeros(self.POSITION_WIDTH)
+        self.attitude = np.zeros(self.ATTITUDE_WIDTH)
+
+    def add_position(self, time_boot_ms: float, values: "tuple[float, ...]") -> bool:
+        """
+        Buffer LOCAL_POSITION_NED (x, y, z, vx, vy, vz).
+
+        Returns False if the message is older than the buffered ones.
+        """
+        return self.__push(self.__positions, self.__attitudes, time_boot_ms, values)
+
+    def add_attitude(self, time_boot_ms: float, values: "tuple[float, ...]") -> bool:
+        """
+        Buffer ATTITUDE (roll, pitch, yaw, rollspeed, pitchspeed, yawspeed).
+
+        Returns False if the message is older than the buffered ones.
+        """
+        return self.__push(self.__attitudes, self.__positions, time_boot_ms, values)
+
+    @staticmethod
+    def __push(
+        history: MessageHistory,
+        other: MessageHistory,
+        time_boot_ms: float,
+        values: "tuple[float, ...]",
+    ) -> bool:
+        """
+        Push into history, clearing the other one too if the vehicle rebooted.
+
+        Samples from before the reboot must not be interpolated against ones from after.
+        """
+        if history.is_reset(time_boot_ms):
+            other.clear()
+        return history.push(time_boot_ms, values)
+
+    def sample(self) -> float | None:
+        """
+        Fill `position` and `attitude` at the newest common timestamp.
+
+        Returns that timestamp in ms, None if the buffers do not overlap.
+        """
+        position_time = self.__positions.latest_time()
+        attitude_time = self.__attitudes.latest_time()
+        if position_time is None or attitude_time is None:
+            return None
+
+        timestamp = min(position_time, attitude_time)
+        if not self.__positions.interpolate(timestamp, self.position):
+            return None
+        if not self.__attitudes.interpolate(timestamp, self.attitude):
+            return None
+
+        return timestamp
@@ -0,0 +1,220 @@
+"""
+Downsamples one telemetry stream into several outputs at independent rates.
+"""
+
+import copy
+import enum
+import math
+
+import numpy as np
+
+from . import telemetry_history
+
+
+class DecimationMode(enum.Enum):
+    """
+    What an output receives for the samples of one period.
+    """
+
+    LATEST = 0  # Newest sample
+    AVERAGE = 1  # Mean of every field, circular mean of the angles
+    ENVELOPE = 2  # TelemetryEnvelope with the minimum and maximum of every field
+
+
+class DecimatorOutput:
+    """
+    Struct of one decimated output.
+    """
+
+    def __init__(self, queue: object, rate: float | None, mode: DecimationMode) -> None:
+        """
+        queue: QueueProxyWrapper the output is put into.
+        rate: Outputs per second, None for every sample.
+        """
+        assert rate is None or rate > 0.0, "Rate must be positive"
+
+        self.queue = queue
+        self.rate = rate
+        self.mode = mode
+
+
+class TelemetryEnvelope:
+    """
+    Struct of the range of every field over one period, each as a TelemetryData.
+
+    Angles go from minimum to maximum counterclockwise, so the minimum is numerically
+    greater when the range crosses +-pi.
+    """
+
+    def __init__(self, count: int, minimum: object, maximum: object) -> None:
+        self.count = count
+        self.minimum = minimum
+        self.maximum = maximum
+
+    def __str__(self) -> str:
+        return f"{self.count} samples, minimum: {self.minimum}, maximum: {self.maximum}"
+
+
+class _SystemAccumulator:  # pylint: disable=too-many-instance-attributes
+    """
+    Samples of one system over the current period of every output.
+    """
+
+    def __init__(self, count: int, width: int, angle_count: int) -> None:
+        self.counts = np.zeros(count, dtype=np.int64)
+        self.sums = np.zeros((count, width))
+        # Angles are extremes of their offset from the first angle of the period
+        self.minimums = np.full((count, width), np.inf)
+        self.maximums = np.full((count, width), -np.inf)
+        self.sines = np.zeros((count, angle_count))
+        self.cosines = np.zeros((count, angle_count))
+        self.references = np.full((count, angle_count), np.nan)
+        self.latest: object = None
+
+    def reset(self, index: int) -> None:
+        """
+        Start the next period of the output.
+        """
+        self.counts[index] = 0
+        self.sums[index] = 0.0
+        self.minimums[index] = np.inf
+        self.maximums[index] = -np.inf
+        self.sines[index] = 0.0
+        self.cosines[index] = 0.0
+        self.references[index] = np.nan
+
+
+class TelemetryDecimator:
+    """
+    Accumulates every sample once for all outputs, with one row per output,
+    and releases each output when its period is over.
+
+    Each system is accumulated apart, so a period with samples of several vehicles
+    releases one value per vehicle instead of mixing them.
+
+    Angles wrap, so they are averaged on the unit circle and their range is measured
+    from the first angle of the period, which holds while it spans less than half a turn.
+    """
+
+    FIELDS = telemetry_history.TelemetryHistory.FIELDS
+    ANGLE_FIELDS = ("roll", "pitch", "yaw")
+
+    def __init__(self, outputs: "list[tuple[float | None, DecimationMode]]", now: float) -> None:
+        """
+        outputs: (rate, mode) of each output, rate None for every sample.
+        now: Current time in seconds, the first periods start here.
+        """
+        self.__modes = [mode for _, mode in outputs]
+        self.__periods = [0.0 if rate is None else 1.0 / rate for rate, _ in outputs]
+        self.__next_times = [now + period for period in self.__periods]
+
+        self.__angles = np.array([self.FIELDS.index(field) for field in self.ANGLE_FIELDS])
+        self.__values = np.zeros(len(self.FIELDS))
+        # By TelemetryData.system_id, in order of first sample
+        self.__systems: "dict[int | None, _SystemAccumulator]" = {}
+
+    def add(self, data: object) -> None:
+        """
+        Accumulate a TelemetryData for every output. Missing fields count as NaN.
+        """
+        for index, field in enumerate(self.FIELDS):
+            value = getattr(data, field)
+            self.__values[index] = np.nan if value is None else value
+
+        system_id = getattr(data, "system_id", None)
+        system = self.__systems.get(system_id)
+        if system is None:
+            system = _SystemAccumulator(len(self.__modes), len(self.FIELDS), len(self.ANGLE_FIELDS))
+            self.__systems[system_id] = system
+
+        angles = self.__values[self.__angles]
+        np.copyto(system.references, angles, where=np.isnan(system.references))
+        extremes = np.tile(self.__values, (len(self.__modes), 1))
+        extremes[:, self.__angles] = _wrap(angles - system.references)
+
+        system.counts += 1
+        system.sums += self.__values
+        system.sines += np.sin(angles)
+        system.cosines += np.cos(angles)
+        np.minimum(system.minimums, extremes, out=system.minimums)
+        np.maximum(system.maximums, extremes, out=system.maximums)
+        system.latest = data
+
+    def poll(self, now: float) -> "list[tuple[int, object]]":
+        """
+        Outputs whose period is over, as (output index, value), one value per system.
+        Periods without samples produce nothing.
+        """
+        due = []
+        for index, period in enumerate(self.__periods):
+            if now < self.__next_times[index]:
+                continue
+
+            # Fixed schedule so the rate does not drift, skip ahead if we fell behind
+            self.__next_times[index] += period
+            if self.__next_times[index] <= now:
+                self.__next_times[index] = now + period
+
+            for system in self.__systems.values():
+                if system.counts[index] == 0:
+                    continue
+
+                due.append((index, self.__output(system, index)))
+                system.reset(index)
+
+        return due
+
+    def time_until_next(self, now: float) -> float | None:
+        """
+        Seconds until the next output with pending samples is due, 0 if one already is.
+        None if nothing is pending, so there is no need to wake up before the next sample.
+        """
+        pending = [
+            next_time
+            for index, next_time in enumerate(self.__next_times)
+            if any(system.counts[index] > 0 for system in self.__systems.values())
+        ]
+        if len(pending) == 0:
+            return None
+
+        return max(0.0, min(pending) - now)
+
+    def __output(self, system: _SystemAccumulator, index: int) -> object:
+        """
+        Value released for the output from the system's samples.
+        """
+        mode = self.__modes[index]
+        latest = system.latest
+        if mode == DecimationMode.LATEST:
+            return latest
+
+        if mode == DecimationMode.AVERAGE:
+            means = system.sums[index] / system.counts[index]
+            means[self.__angles] = np.arctan2(system.sines[index], system.cosines[index])
+            return self.__with_fields(latest, means)
+
+        minimums = system.minimums[index].copy()
+        maximums = system.maximums[index].copy()
+        minimums[self.__angles] = _wrap(system.references[index] + minimums[self.__angles])
+        maximums[self.__angles] = _wrap(system.references[index] + maximums[self.__angles])
+        return TelemetryEnvelope(
+            int(system.counts[index]),
+            self.__with_fields(latest, minimums),
+            self.__with_fields(latest, maximums),
+        )
+
+    def __with_fields(self, data: object, values: np.ndarray) -> object:
+        """
+        Copy of the TelemetryData with the fields replaced.
+        """
+        result = copy.copy(data)
+        for field, value in zip(self.FIELDS, values):
+            setattr(result, field, float(value))
+        return result
+
+
+def _wrap(angles: np.ndarray) -> np.ndarray:
+    """
+    Wrap angles into [-pi, pi).
+    """
+    return (angles + math.pi) % (2.0 * math.pi) - math.pi
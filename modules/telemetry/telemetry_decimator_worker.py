@@ -0,0 +1,92 @@
+"""
+Decimator worker that fans the telemetry stream out to consumers at their own rates.
+"""
+
+import os
+import pathlib
+import queue
+import time
+
+from utilities.workers import queue_proxy_wrapper
+from utilities.workers import worker_controller
+from . import telemetry_decimator
+from ..common.modules.logger import logger
+
+
+# =================================================================================================
+#                            ↓ BOOTCAMPERS MODIFY BELOW THIS COMMENT ↓
+# =================================================================================================
+IDLE_TIMEOUT = 0.1  # seconds
+
+
+def telemetry_decimator_worker(
+    outputs: "list[telemetry_decimator.DecimatorOutput]",
+    input_queue: queue_proxy_wrapper.QueueProxyWrapper,
+    controller: worker_controller.WorkerController,
+) -> None:
+    """
+    Worker process.
+
+    - outputs: queue, rate and mode of each consumer
+    - input_queue: multiprocessing.Queue of TelemetryData from the telemetry worker
+    - controller: worker_controller.Controller used to manage worker lifecycle
+    """
+    # =============================================================================================
+    #                          ↑ BOOTCAMPERS MODIFY ABOVE THIS COMMENT ↑
+    # =============================================================================================
+
+    # Instantiate logger
+    worker_name = pathlib.Path(__file__).stem
+    process_id = os.getpid()
+    result, local_logger = logger.Logger.create(f"{worker_name}_{process_id}", True)
+    if not result:
+        print("ERROR: Worker failed to create logger")
+        return
+
+    # Get Pylance to stop complaining
+    assert local_logger is not None
+
+    local_logger.info("Logger initialized", True)
+
+    # =============================================================================================
+    #                          ↓ BOOTCAMPERS MODIFY BELOW THIS COMMENT ↓
+    # =============================================================================================
+    # Instantiate class object (telemetry_decimator.TelemetryDecimator)
+    decimator = telemetry_decimator.TelemetryDecimator(
+        [(output.rate, output.mode) for output in outputs], time.monotonic()
+    )
+    dropped = [0] * len(outputs)
+
+    # Main loop: do work.
+    while not controller.is_exit_requested():
+        controller.check_pause()
+
+        # Sleep until the next sample or the next output, whichever is first
+        timeout = decimator.time_until_next(time.monotonic())
+        timeout = IDLE_TIMEOUT if timeout is None else min(timeout, IDLE_TIMEOUT)
+        try:
+            data = input_queue.queue.get(timeout=timeout) if timeout > 0.0 else None
+        except queue.Empty:
+            data = None
+
+        if data is not None:
+            decimator.add(data)
+
+        for index, value in decimator.poll(time.monotonic()):
+            try:
+                outputs[index].queue.queue.put_nowait(value)
+            except queue.Full:
+                # A slow consumer gets the next period instead of holding up the others
+                dropped[index] += 1
+                local_logger.debug(f"Output {index} full, dropped {dropped[index]}", True)
+
+    local_logger.info(
+        f"Worker stopping, dropped per output: {dropped}, "
+        f"expired inputs: {input_queue.expired_count}",
+        True,
+    )
+
+
+# =================================================================================================
+#                            ↑ BOOTCAMPERS MODIFY ABOVE THIS COMMENT ↑
+# =================================================================================================
@@ -0,0 +1,128 @@
+"""
+Columnar history of TelemetryData with windowed queries.
+"""
+
+import numpy as np
+
+
+class WindowStatistics:
+    """
+    Struct of per field statistics over a window, each indexed like TelemetryHistory.FIELDS.
+    """
+
+    def __init__(
+        self,
+        count: int,
+        mean: np.ndarray,
+        minimum: np.ndarray,
+        maximum: np.ndarray,
+        variance: np.ndarray,
+    ) -> None:
+        self.count = count
+        self.mean = mean
+        self.minimum = minimum
+        self.maximum = maximum
+        self.variance = variance
+
+
+class TelemetryHistory:
+    """
+    Last `capacity` TelemetryData, one preallocated NumPy column per field.
+
+    Every sample is written twice, at i and i + capacity, so the newest n samples are
+    always contiguous and windows are returned as views without copying. Appending is
+    constant time. Samples must be appended in time order.
+    """
+
+    FIELDS = (
+        "x",
+        "y",
+        "z",
+        "x_velocity",
+        "y_velocity",
+        "z_velocity",
+        "roll",
+        "pitch",
+        "yaw",
+        "roll_speed",
+        "pitch_speed",
+        "yaw_speed",
+    )
+
+    def __init__(self, capacity: int, use_float32: bool = False) -> None:
+        """
+        capacity: Number of samples kept.
+        use_float32: Halve the memory of the field columns, timestamps stay float64.
+        """
+        assert capacity > 0, "Capacity must be positive"
+
+        self.capacity = capacity
+        dtype = np.float32 if use_float32 else np.float64
+        self.__times = np.zeros(2 * capacity)
+        self.__columns = np.zeros((len(self.FIELDS), 2 * capacity), dtype=dtype)
+        self.__next = 0
+        self.__count = 0
+        self.__field_indices = {field: index for index, field in enumerate(self.FIELDS)}
+
+    def __len__(self) -> int:
+        return self.__count
+
+    def field_index(self, field: str) -> int:
+        """
+        Row of the field in the arrays returned by queries.
+        """
+        return self.__field_indices[field]
+
+    def append(self, data: object) -> None:
+        """
+        Store a TelemetryData, overwriting the oldest when full. Missing fields are stored as NaN.
+        """
+        mirror = self.__next + self.capacity
+        self.__times[self.__next] = data.time_since_boot
+        self.__times[mirror] = data.time_since_boot
+        for index, field in enumerate(self.FIELDS):
+            value = getattr(data, field)
+            if value is None:
+                value = np.nan
+            self.__columns[index, self.__next] = value
+            self.__columns[index, mirror] = value
+
+        self.__next = (self.__next + 1) % self.capacity
+        self.__count = min(self.__count + 1, self.capacity)
+
+    def last(self, count: int) -> "tuple[np.ndarray, np.ndarray]":
+        """
+        Views of the timestamps and field columns (fields x samples) of the newest samples,
+        oldest first. Fewer are returned if fewer are held.
+
+        The views are overwritten by later appends, copy them to keep them.
+        """
+        count = max(0, min(count, self.__count))
+        end = self.__next + self.capacity
+        return self.__times[end - count : end], self.__columns[:, end - count : end]
+
+    def since(self, time_since_boot: float) -> "tuple[np.ndarray, np.ndarray]":
+        """
+        Views of the samples at or after the timestamp, as in last().
+        """
+        times, _ = self.last(self.__count)
+        skipped = int(np.searchsorted(times, time_since_boot, side="left"))
+        return self.last(self.__count - skipped)
+
+    @staticmethod
+    def statistics(columns: np.ndarray) -> WindowStatistics | None:
+        """
+        Vectorized per field statistics of a window from last() or since().
+
+        Returns None for an empty window.
+        """
+        if columns.shape[1] == 0:
+            return None
+
+        return WindowStatistics(
+            columns.shape[1],
+            columns.mean(axis=1),
+            columns.min(axis=1),
+            columns.max(axis=1),
+            columns.var(axis=1),
+        )
@@ -0,0 +1,135 @@
+"""
+Replay telemetry through Command.run() and the batch decision logic, and compare them.
+To run:
+```
+python -m tests.benchmarks.benchmark_command_backtest
+```
+"""
+
+import math
+import time
+
+import numpy as np
+from pymavlink import mavutil
+
+from modules.command import command
+from modules.command import command_decision
+from modules.common.modules.logger import logger
+from modules.common.modules.logger import logger_main_setup
+from modules.common.modules.read_yaml import read_yaml
+from modules.telemetry import telemetry
+
+
+# Commands are sent to nobody
+CONNECTION_STRING = "udpout:localhost:14599"
+TARGET = command.Position(10.0, -5.0, 20.0)
+SCALAR_SAMPLE_COUNT = 20000
+BATCH_SAMPLE_COUNT = 2000000
+RESULT_PREFIXES = {
+    command_decision.Decision.CHANGE_ALTITUDE: "CHANGE ALTITUDE: ",
+    command_decision.Decision.CHANGE_YAW: "CHANGE YAW: ",
+}
+
+
+def random_flight(count: int) -> "tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]":
+    """
+    Positions around the target and random headings.
+    """
+    generator = np.random.default_rng(0)
+    x = generator.uniform(-50.0, 50.0, count)
+    y = generator.uniform(-50.0, 50.0, count)
+    z = TARGET.z + generator.uniform(-1.0, 1.0, count)
+    yaw = generator.uniform(-math.pi, math.pi, count)
+    return x, y, z, yaw
+
+
+def main() -> int:
+    """
+    Check Command.run() against the batch results, then time both.
+    """
+    # Configuration settings
+    result, config = read_yaml.open_config(logger.CONFIG_FILE_PATH)
+    if not result:
+        print("ERROR: Failed to load configuration file")
+        return -1
+
+    # Get Pylance to stop complaining
+    assert config is not None
+
+    # Setup main logger
+    result, main_logger, _ = logger_main_setup.setup_main_logger(config)
+    if not result:
+        print("ERROR: Failed to create main logger")
+        return -1
+
+    # Get Pylance to stop complaining
+    assert main_logger is not None
+
+    # Command logs every call, keep that out of the main log
+    result, command_logger = logger.Logger.create("benchmark_command_backtest", False)
+    if not result:
+        print("ERROR: Failed to create command logger")
+        return -1
+
+    # Get Pylance to stop complaining
+    assert command_logger is not None
+
+    connection = mavutil.mavlink_connection(CONNECTION_STRING)
+    result, cmd = command.Command.create(connection, TARGET, command_logger)
+    if not result:
+        main_logger.error("Failed to create Command")
+        return -1
+
+    # Get Pylance to stop complaining
+    assert cmd is not None
+
+    x, y, z, yaw = random_flight(SCALAR_SAMPLE_COUNT)
+
+    start = time.perf_counter()
+    outputs = [
+        cmd.run(
+            telemetry.TelemetryData(
+                x=x[i], y=y[i], z=z[i], yaw=yaw[i], x_velocity=0.0, y_velocity=0.0, z_velocity=0.0
+            )
+        )
+        for i in range(SCALAR_SAMPLE_COUNT)
+    ]
+    scalar_time = (time.perf_counter() - start) / SCALAR_SAMPLE_COUNT
+
+    decisions, amounts = command_decision.decide_batch(x, y, z, yaw, TARGET.x, TARGET.y, TARGET.z)
+    mismatches = 0
+    for i, output in enumerate(outputs):
+        decision = command_decision.Decision(decisions[i])
+        if decision == command_decision.Decision.NONE:
+            mismatches += output is not None
+            continue
+
+        prefix = RESULT_PREFIXES[decision]
+        if output is None or not output.startswith(prefix):
+            mismatches += 1
+            continue
+
+        mismatches += not math.isclose(float(output[len(prefix) :]), amounts[i], abs_tol=1e-9)
+
+    main_logger.info(f"{mismatches} mismatches in {SCALAR_SAMPLE_COUNT} samples")
+
+    x, y, z, yaw = random_flight(BATCH_SAMPLE_COUNT)
+    start = time.perf_counter()
+    command_decision.decide_batch(x, y, z, yaw, TARGET.x, TARGET.y, TARGET.z)
+    batch_time = (time.perf_counter() - start) / BATCH_SAMPLE_COUNT
+
+    main_logger.info(
+        f"Command.run: {scalar_time * 1e6:.2f}us per sample, "
+        f"batch: {batch_time * 1e9:.1f}ns per sample, {scalar_time / batch_time:.0f}x faster"
+    )
+
+    connection.close()
+    return 0 if mismatches == 0 else -1
+
+
+if __name__ == "__main__":
+    result_main = main()
+    if result_main < 0:
+        print(f"Failed with return code {result_main}")
+    else:
+        print("Success!")
@@ -0,0 +1,94 @@
+"""
+Soak benchmark of Command.run() per call cost over a long flight.
+To run:
+```
+python -m tests.benchmarks.benchmark_command_soak
+```
+"""
+
+import time
+
+from pymavlink import mavutil
+
+from modules.command import command
+from modules.common.modules.logger import logger
+from modules.common.modules.logger import logger_main_setup
+from modules.common.modules.read_yaml import read_yaml
+from modules.telemetry import telemetry
+
+
+# Nothing is ever sent, the drone holds the target altitude and faces the target
+CONNECTION_STRING = "udpout:localhost:14599"
+TARGET = command.Position(10.0, 0.0, 5.0)
+TELEMETRY = telemetry.TelemetryData(
+    x=0.0, y=0.0, z=5.0, yaw=0.0, x_velocity=1.0, y_velocity=0.5, z_velocity=0.0
+)
+BLOCK_SIZE = 20000  # calls
+BLOCK_COUNT = 10
+
+
+def main() -> int:
+    """
+    Time blocks of calls one after another, flat block times mean constant cost per call.
+    """
+    # Configuration settings
+    result, config = read_yaml.open_config(logger.CONFIG_FILE_PATH)
+    if not result:
+        print("ERROR: Failed to load configuration file")
+        return -1
+
+    # Get Pylance to stop complaining
+    assert config is not None
+
+    # Setup main logger
+    result, main_logger, _ = logger_main_setup.setup_main_logger(config)
+    if not result:
+        print("ERROR: Failed to create main logger")
+        return -1
+
+    # Get Pylance to stop complaining
+    assert main_logger is not None
+
+    connection = mavutil.mavlink_connection(CONNECTION_STRING)
+
+    # Command logs every call, keep that out of the measurement
+    result, command_logger = logger.Logger.create("benchmark_command_soak", False)
+    if not result:
+        print("ERROR: Failed to create command logger")
+        return -1
+
+    # Get Pylance to stop complaining
+    assert command_logger is not None
+
+    result, cmd = command.Command.create(connection, TARGET, command_logger)
+    if not result:
+        main_logger.error("Failed to create Command")
+        return -1
+
+    # Get Pylance to stop complaining
+    assert cmd is not None
+
+    block_times = []
+    for block in range(BLOCK_COUNT):
+        start = time.perf_counter()
+        for _ in range(BLOCK_SIZE):
+            cmd.run(TELEMETRY)
+        block_times.append((time.perf_counter() - start) / BLOCK_SIZE)
+
+        main_logger.info(
+            f"calls {block * BLOCK_SIZE}-{(block + 1) * BLOCK_SIZE}: "
+            f"{block_times[-1] * 1e6:.2f}us per call"
+        )
+
+    main_logger.info(f"last/first block: {block_times[-1] / block_times[0]:.2f}")
+
+    connection.close()
+    return 0
+
+
+if __name__ == "__main__":
+    result_main = main()
+    if result_main < 0:
+        print(f"Failed with return code {result_main}")
+    else:
+        print("Success!")
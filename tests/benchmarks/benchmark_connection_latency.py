@@ -0,0 +1,130 @@
+"""
+Benchmark COMMAND_LONG to COMMAND_ACK round trip latency with different socket options.
+To run:
+```
+python -m tests.benchmarks.benchmark_connection_latency
+```
+"""
+
+import statistics
+import subprocess
+import sys
+import time
+
+from pymavlink import mavutil
+
+from modules.common.modules.logger import logger
+from modules.common.modules.logger import logger_main_setup
+from modules.common.modules.read_yaml import read_yaml
+from modules.connection import connection_factory
+from tests.integration.mock_drones import latency_drone
+
+
+MOCK_DRONE_MODULE = "tests.integration.mock_drones.latency_drone"
+CONNECTION_STRING = "tcp:localhost:12345"
+NUM_TRIALS = latency_drone.NUM_TRIALS
+ACK_TIMEOUT = 1.0  # seconds
+DRONE_STARTUP_DELAY = 1.0  # seconds
+
+CONFIGURATIONS = {
+    "nagle": connection_factory.SocketOptions(tcp_nodelay=False),
+    "nodelay": connection_factory.SocketOptions(tcp_nodelay=True),
+    "tuned": connection_factory.SocketOptions(
+        tcp_nodelay=True,
+        receive_buffer_size=1 << 20,
+        send_buffer_size=1 << 20,
+        keepalive=True,
+        keepalive_idle=5,
+        keepalive_interval=1,
+        keepalive_count=3,
+        low_latency=True,
+    ),
+}
+
+
+def measure(options: connection_factory.SocketOptions, main_logger: logger.Logger) -> "list[float]":
+    """
+    Measure round trip times in seconds against a freshly started mock drone.
+    """
+    # Drone outlives this statement, it is waited on below
+    # pylint: disable-next=consider-using-with
+    drone = subprocess.Popen([sys.executable, "-m", MOCK_DRONE_MODULE])
+    time.sleep(DRONE_STARTUP_DELAY)
+
+    result, connection = connection_factory.create_connection(
+        CONNECTION_STRING, options, main_logger
+    )
+    if not result:
+        drone.kill()
+        return []
+
+    # Get Pylance to stop complaining
+    assert connection is not None
+
+    round_trips = []
+    for _ in range(NUM_TRIALS):
+        start = time.perf_counter()
+        # Two small writes back to back, which is where Nagle's algorithm delays the second
+        connection.mav.heartbeat_send(
+            mavutil.mavlink.MAV_TYPE_GCS, mavutil.mavlink.MAV_AUTOPILOT_INVALID, 0, 0, 0
+        )
+        connection.mav.command_long_send(
+            1, 0, mavutil.mavlink.MAV_CMD_CONDITION_YAW, 0, 0, 5, 1, 1, 0, 0, 0
+        )
+        msg = connection.recv_match(type="COMMAND_ACK", blocking=True, timeout=ACK_TIMEOUT)
+        if msg is None:
+            main_logger.warning("Timed out waiting for COMMAND_ACK")
+            continue
+
+        round_trips.append(time.perf_counter() - start)
+
+    connection.close()
+    drone.wait()
+    return round_trips
+
+
+def main() -> int:
+    """
+    Run the benchmark for every configuration.
+    """
+    # Configuration settings
+    result, config = read_yaml.open_config(logger.CONFIG_FILE_PATH)
+    if not result:
+        print("ERROR: Failed to load configuration file")
+        return -1
+
+    # Get Pylance to stop complaining
+    assert config is not None
+
+    # Setup main logger
+    result, main_logger, _ = logger_main_setup.setup_main_logger(config)
+    if not result:
+        print("ERROR: Failed to create main logger")
+        return -1
+
+    # Get Pylance to stop complaining
+    assert main_logger is not None
+
+    for name, options in CONFIGURATIONS.items():
+        round_trips = measure(options, main_logger)
+        if len(round_trips) < 2:
+            main_logger.error(f"{name}: not enough samples")
+            return -1
+
+        round_trips.sort()
+        main_logger.info(
+            f"{name}: {len(round_trips)} samples, "
+            f"median {statistics.median(round_trips) * 1000:.3f} ms, "
+            f"p95 {round_trips[int(len(round_trips) * 0.95) - 1] * 1000:.3f} ms, "
+            f"max {round_trips[-1] * 1000:.3f} ms"
+        )
+
+    return 0
+
+
+if __name__ == "__main__":
+    result_main = main()
+    if result_main < 0:
+        print(f"Failed with return code {result_main}")
+    else:
+        print("Success!")
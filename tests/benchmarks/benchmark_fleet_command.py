@@ -0,0 +1,227 @@
+"""
+Time one FleetCommand tick against one Command per vehicle as the fleet grows,
+and check the fleet gets through the outbound writer's rate limits at the main loop's rate.
+To run:
+```
+python -m tests.benchmarks.benchmark_fleet_command
+```
+"""
+
+import math
+import multiprocessing as mp
+import multiprocessing.managers
+import queue
+import time
+
+import numpy as np
+from pymavlink import mavutil
+
+from modules.command import command
+from modules.command import fleet_command
+from modules.common.modules.logger import logger
+from modules.common.modules.logger import logger_main_setup
+from modules.common.modules.read_yaml import read_yaml
+from modules.connection import outbound_channel
+from modules.connection import outbound_writer
+from modules.telemetry import telemetry
+from utilities.workers import queue_proxy_wrapper
+
+
+# Commands are sent to nobody
+CONNECTION_STRING = "udpout:localhost:14599"
+# MAVLink system IDs go up to 255
+FLEET_SIZES = [1, 10, 100, 255]
+TICK_COUNT = 20
+# Fleet decisions at the main loop's rate when going through the outbound writer
+TICK_PERIOD = 0.1  # seconds
+# Same as OUTBOUND_RATE_LIMITS and OUTBOUND_MAX_PENDING in bootcamp_main
+OUTBOUND_RATE_LIMITS = {
+    "COMMAND_LONG": (5.0, 5.0),
+    "HEARTBEAT": (2.0, 2.0),
+}
+
+
+def outbound_max_pending(count: int) -> int:
+    """
+    Same as OUTBOUND_MAX_PENDING in bootcamp_main for a fleet of the given size.
+    """
+    return 100 + 2 * count
+
+
+def random_fleet(count: int, tick: int) -> "list[telemetry.TelemetryData]":
+    """
+    One sample per vehicle, system IDs from 1.
+    """
+    generator = np.random.default_rng(tick)
+    x = generator.uniform(-50.0, 50.0, count)
+    y = generator.uniform(-50.0, 50.0, count)
+    z = 20.0 + generator.uniform(-1.0, 1.0, count)
+    yaw = generator.uniform(-math.pi, math.pi, count)
+    return [
+        telemetry.TelemetryData(
+            x=x[i],
+            y=y[i],
+            z=z[i],
+            yaw=yaw[i],
+            x_velocity=0.0,
+            y_velocity=0.0,
+            z_velocity=0.0,
+            system_id=i + 1,
+        )
+        for i in range(count)
+    ]
+
+
+def time_fleet(
+    connection: mavutil.mavfile, count: int, local_logger: logger.Logger
+) -> "tuple[float, int]":
+    """
+    Seconds per tick and commands sent with FleetCommand.
+    """
+    targets = {system_id: command.Position(0.0, 0.0, 20.0) for system_id in range(1, count + 1)}
+    result, fleet = fleet_command.FleetCommand.create(connection, targets, local_logger)
+    assert result and fleet is not None
+
+    samples = [random_fleet(count, tick) for tick in range(TICK_COUNT)]
+    sent = 0
+    start = time.perf_counter()
+    for tick_samples in samples:
+        for telemetry_data in tick_samples:
+            fleet.update(telemetry_data)
+        sent += len(fleet.run())
+    return (time.perf_counter() - start) / TICK_COUNT, sent
+
+
+def run_fleet_through_writer(
+    connection: mavutil.mavfile,
+    count: int,
+    mp_manager: multiprocessing.managers.SyncManager,
+    local_logger: logger.Logger,
+) -> "tuple[int, int, int, int]":
+    """
+    FleetCommand ticks through an OutboundChannel, drained into an OutboundWriter each tick
+    like outbound_writer_worker does.
+
+    Returns commands decided, written, coalesced and dropped.
+    """
+    send_queue = queue_proxy_wrapper.QueueProxyWrapper(mp_manager)
+    channel = outbound_channel.OutboundChannel(connection, send_queue)
+    targets = {system_id: command.Position(0.0, 0.0, 20.0) for system_id in range(1, count + 1)}
+    result, fleet = fleet_command.FleetCommand.create(channel, targets, local_logger)
+    assert result and fleet is not None
+
+    result, writer = outbound_writer.OutboundWriter.create(
+        connection, OUTBOUND_RATE_LIMITS, local_logger, outbound_max_pending(count)
+    )
+    assert result and writer is not None
+
+    samples = [random_fleet(count, tick) for tick in range(TICK_COUNT)]
+    for tick_samples in samples:
+        start = time.monotonic()
+        for telemetry_data in tick_samples:
+            fleet.update(telemetry_data)
+        fleet.run()
+
+        messages = []
+        try:
+            while True:
+                messages.extend(send_queue.queue.get_nowait())
+        except queue.Empty:
+            pass
+        writer.run(messages)
+
+        time.sleep(max(0.0, TICK_PERIOD - (time.monotonic() - start)))
+
+    return fleet.sent_count, writer.sent_count, writer.coalesced_count, writer.dropped_count
+
+
+def time_commands(
+    connection: mavutil.mavfile, count: int, local_logger: logger.Logger
+) -> "tuple[float, int]":
+    """
+    Seconds per tick and commands sent with one Command per vehicle.
+    """
+    commands = []
+    for _ in range(count):
+        result, cmd = command.Command.create(
+            connection, command.Position(0.0, 0.0, 20.0), local_logger
+        )
+        assert result and cmd is not None
+        commands.append(cmd)
+
+    samples = [random_fleet(count, tick) for tick in range(TICK_COUNT)]
+    sent = 0
+    start = time.perf_counter()
+    for tick_samples in samples:
+        for cmd, telemetry_data in zip(commands, tick_samples):
+            sent += cmd.run(telemetry_data) is not None
+    return (time.perf_counter() - start) / TICK_COUNT, sent
+
+
+def main() -> int:
+    """
+    Both approaches on the same samples for each fleet size.
+    """
+    # Configuration settings
+    result, config = read_yaml.open_config(logger.CONFIG_FILE_PATH)
+    if not result:
+        print("ERROR: Failed to load configuration file")
+        return -1
+
+    # Get Pylance to stop complaining
+    assert config is not None
+
+    # Setup main logger
+    result, main_logger, _ = logger_main_setup.setup_main_logger(config)
+    if not result:
+        print("ERROR: Failed to create main logger")
+        return -1
+
+    # Get Pylance to stop complaining
+    assert main_logger is not None
+
+    # Command logs every call, keep that out of the main log
+    result, command_logger = logger.Logger.create("benchmark_fleet_command", False)
+    if not result:
+        print("ERROR: Failed to create command logger")
+        return -1
+
+    # Get Pylance to stop complaining
+    assert command_logger is not None
+
+    mp_manager = mp.Manager()
+    connection = mavutil.mavlink_connection(CONNECTION_STRING)
+    mismatches = 0
+    for count in FLEET_SIZES:
+        fleet_time, fleet_sent = time_fleet(connection, count, command_logger)
+        commands_time, commands_sent = time_commands(connection, count, command_logger)
+        mismatches += fleet_sent != commands_sent
+        main_logger.info(
+            f"{count} vehicles: fleet {fleet_time * 1e3:.3f}ms per tick, "
+            f"Command per vehicle {commands_time * 1e3:.3f}ms per tick, "
+            f"{commands_time / fleet_time:.1f}x, {fleet_sent} commands"
+        )
+
+        # Rates apply per vehicle, so nothing is dropped and at most one of each command
+        # per vehicle is still waiting for tokens
+        decided, written, coalesced, dropped = run_fleet_through_writer(
+            connection, count, mp_manager, command_logger
+        )
+        pending = decided - written - coalesced
+        mismatches += dropped != 0 or pending > 2 * count
+        main_logger.info(
+            f"{count} vehicles through the outbound writer: {decided} decided, "
+            f"{written} written ({written / (count * TICK_COUNT * TICK_PERIOD):.1f}/s per vehicle), "
+            f"{coalesced} coalesced, {dropped} dropped, {pending} pending"
+        )
+
+    connection.close()
+    return 0 if mismatches == 0 else -1
+
+
+if __name__ == "__main__":
+    result_main = main()
+    if result_main < 0:
+        print(f"Failed with return code {result_main}")
+    else:
+        print("Success!")
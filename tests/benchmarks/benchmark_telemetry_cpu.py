@@ -0,0 +1,102 @@
+"""
+Benchmark CPU usage of Telemetry.run() polling versus waiting on the socket.
+To run:
+```
+python -m tests.benchmarks.benchmark_telemetry_cpu
+```
+"""
+
+import subprocess
+import sys
+import time
+
+from pymavlink import mavutil
+
+from modules.common.modules.logger import logger
+from modules.common.modules.logger import logger_main_setup
+from modules.common.modules.read_yaml import read_yaml
+from modules.telemetry import telemetry
+from tests.integration.mock_drones import telemetry_drone
+
+
+MOCK_DRONE_MODULE = "tests.integration.mock_drones.telemetry_drone"
+CONNECTION_STRING = "tcp:localhost:12345"
+DRONE_STARTUP_DELAY = 1.0  # seconds
+# While the drone is streaming
+MEASURE_DURATION = telemetry_drone.NUM_TRIALS * telemetry_drone.TOTAL_PERIOD  # seconds
+
+
+def measure(event_driven: bool, main_logger: logger.Logger) -> "tuple[float, int]":
+    """
+    Run Telemetry against a freshly started mock drone.
+
+    Returns the fraction of one core used and the number of TelemetryData produced.
+    """
+    # Drone outlives this statement, it is waited on below
+    # pylint: disable-next=consider-using-with
+    drone = subprocess.Popen([sys.executable, "-m", MOCK_DRONE_MODULE])
+    time.sleep(DRONE_STARTUP_DELAY)
+
+    connection = mavutil.mavlink_connection(CONNECTION_STRING)
+    connection.mav.heartbeat_send(
+        mavutil.mavlink.MAV_TYPE_GCS, mavutil.mavlink.MAV_AUTOPILOT_INVALID, 0, 0, 0
+    )
+
+    result, telem = telemetry.Telemetry.create(connection, main_logger, event_driven)
+    if not result:
+        drone.kill()
+        return 0.0, 0
+
+    # Get Pylance to stop complaining
+    assert telem is not None
+
+    outputs = 0
+    start_wall = time.monotonic()
+    start_cpu = time.process_time()
+    while time.monotonic() - start_wall < MEASURE_DURATION:
+        if telem.run() is not None:
+            outputs += 1
+
+    cpu = time.process_time() - start_cpu
+    wall = time.monotonic() - start_wall
+
+    connection.close()
+    drone.wait()
+    return cpu / wall, outputs
+
+
+def main() -> int:
+    """
+    Run the benchmark for both modes.
+    """
+    # Configuration settings
+    result, config = read_yaml.open_config(logger.CONFIG_FILE_PATH)
+    if not result:
+        print("ERROR: Failed to load configuration file")
+        return -1
+
+    # Get Pylance to stop complaining
+    assert config is not None
+
+    # Setup main logger
+    result, main_logger, _ = logger_main_setup.setup_main_logger(config)
+    if not result:
+        print("ERROR: Failed to create main logger")
+        return -1
+
+    # Get Pylance to stop complaining
+    assert main_logger is not None
+
+    for name, event_driven in (("polling", False), ("event driven", True)):
+        core_fraction, outputs = measure(event_driven, main_logger)
+        main_logger.info(f"{name}: {core_fraction * 100:.1f}% CPU, {outputs} TelemetryData")
+
+    return 0
+
+
+if __name__ == "__main__":
+    result_main = main()
+    if result_main < 0:
+        print(f"Failed with return code {result_main}")
+    else:
+        print("Success!")
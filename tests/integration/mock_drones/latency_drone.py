@@ -0,0 +1,59 @@
+"""
+Mock drone for measuring link latency. Acknowledges every COMMAND_LONG immediately.
+"""
+
+import os
+import pathlib
+
+from pymavlink import mavutil
+
+from modules.common.modules.logger import logger
+
+
+CONNECTION_STRING = "tcpin:localhost:12345"
+TIMEOUT = 5.0
+NUM_TRIALS = 200
+
+
+def main() -> int:
+    """
+    Begin mock drone simulation to benchmark connection latency.
+    """
+    # Mocked autopilot/drone
+    # source_system = 1 (airside on drone)
+    # source_component = 0 (autopilot)
+    connection = mavutil.mavlink_connection(CONNECTION_STRING, source_system=1, source_component=0)
+    connection.wait_heartbeat()
+
+    # Instantiate logger after main starts
+    drone_name = pathlib.Path(__file__).stem
+    process_id = os.getpid()
+    result, local_logger = logger.Logger.create(f"{drone_name}_{process_id}", True)
+    if not result:
+        print("ERROR: Worker failed to create drone logger")
+        return -1
+
+    # Get Pylance to stop complaining
+    assert local_logger is not None
+
+    local_logger.info("Logger initialized")
+
+    # Task is to acknowledge NUM_TRIALS COMMAND_LONG messages as fast as possible
+    for _ in range(NUM_TRIALS):
+        msg = connection.recv_match(type="COMMAND_LONG", blocking=True, timeout=TIMEOUT)
+        if not msg:
+            local_logger.error("Timed out waiting for COMMAND_LONG")
+            return -2
+
+        connection.mav.command_ack_send(msg.command, mavutil.mavlink.MAV_RESULT_ACCEPTED)
+
+    local_logger.info("Done!")
+    return 0
+
+
+if __name__ == "__main__":
+    result_main = main()
+    if result_main < 0:
+        print(f"Drone: Failed with return code {result_main}")
+    else:
+        print("Drone: Success!")
@@ -247,6 +247,7 @@ def main() -> int:
     command_worker.command_worker(
         connection,
         TARGET,
+        None,
         input_queue,
         output_queue,
         controller,
@@ -139,9 +139,10 @@ def main() -> int:
 
     heartbeat_receiver_worker.heartbeat_receiver_worker(
         connection,
+        HEARTBEAT_PERIOD,
+        None,
         output_queue,
         controller,
-        heartbeat_period=HEARTBEAT_PERIOD,
         # Add other necessary worker arguments here
     )
     # =============================================================================================
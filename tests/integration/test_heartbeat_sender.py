@@ -100,9 +100,8 @@ def main() -> int:
 
     heartbeat_sender_worker.heartbeat_sender_worker(
         connection,
+        HEARTBEAT_PERIOD,
         controller,
-        heartbeat_period=HEARTBEAT_PERIOD,
-        # Add other necessary worker arguments here
     )
     # =============================================================================================
     #                          ↑ BOOTCAMPERS MODIFY ABOVE THIS COMMENT ↑
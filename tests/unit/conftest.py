@@ -0,0 +1,15 @@
+"""
+Fixtures shared by the unit tests.
+"""
+
+import pytest
+
+from tests.unit import fake_logger
+
+
+@pytest.fixture()
+def local_logger() -> fake_logger.FakeLogger:  # type: ignore
+    """
+    Logger counting warnings and failing the test on errors.
+    """
+    yield fake_logger.FakeLogger()  # type: ignore
@@ -0,0 +1,41 @@
+"""
+Logger stand-in for unit tests, so they do not write log files.
+"""
+
+
+class FakeLogger:
+    """
+    Counts warnings and errors instead of writing them anywhere.
+    """
+
+    def __init__(self, fail_on_error: bool = True) -> None:
+        """
+        fail_on_error: Raise on errors so they fail the test, instead of only counting them.
+        """
+        self.fail_on_error = fail_on_error
+        self.warning_count = 0
+        self.error_count = 0
+
+    def debug(self, _message: str, _log_with_frame_info: bool = True) -> None:
+        """
+        Same signature as Logger.debug().
+        """
+
+    def info(self, _message: str, _log_with_frame_info: bool = True) -> None:
+        """
+        Same signature as Logger.info().
+        """
+
+    def warning(self, _message: str, _log_with_frame_info: bool = True) -> None:
+        """
+        Same signature as Logger.warning().
+        """
+        self.warning_count += 1
+
+    def error(self, message: str, _log_with_frame_info: bool = True) -> None:
+        """
+        Same signature as Logger.error().
+        """
+        self.error_count += 1
+        if self.fail_on_error:
+            raise AssertionError(message)
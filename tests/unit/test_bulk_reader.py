@@ -0,0 +1,150 @@
+"""
+Test bulk reading and parsing of MAVLink messages from a UDP socket.
+"""
+
+import socket
+
+import pytest
+from pymavlink import mavutil
+
+from tests.unit import fake_logger
+
+# The bulk reader logs through the common submodule
+pytest.importorskip("modules.common.modules.logger.logger")
+
+# Imported after the check above
+# pylint: disable-next=wrong-import-position
+from modules.connection import bulk_reader
+
+
+# Test functions use test fixture signature names and access class privates
+# No enable
+# pylint: disable=protected-access,redefined-outer-name
+
+
+TIMEOUT = 0.5  # seconds
+
+
+def encode(message_type: str) -> bytes:
+    """
+    Bytes of a HEARTBEAT or an ATTITUDE from system 1.
+    """
+    mav = mavutil.mavlink.MAVLink(None, srcSystem=1, srcComponent=1)
+    if message_type == "HEARTBEAT":
+        message = mav.heartbeat_encode(
+            mavutil.mavlink.MAV_TYPE_QUADROTOR, mavutil.mavlink.MAV_AUTOPILOT_GENERIC, 0, 0, 0
+        )
+    else:
+        message = mav.attitude_encode(100, 0.1, 0.2, 0.3, 0.0, 0.0, 0.0)
+    return message.pack(mav)
+
+
+@pytest.fixture()
+def connection() -> mavutil.mavudp:  # type: ignore
+    """
+    UDP connection listening on a free local port.
+    """
+    instance = mavutil.mavlink_connection("udpin:127.0.0.1:0")
+    yield instance  # type: ignore
+    instance.close()
+
+
+@pytest.fixture()
+def sender(connection: mavutil.mavudp) -> "tuple[socket.socket, tuple]":  # type: ignore
+    """
+    Socket sending to the connection, and the address to send to.
+    """
+    instance = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    yield instance, connection.port.getsockname()  # type: ignore
+    instance.close()
+
+
+@pytest.fixture()
+def reader(connection: mavutil.mavudp) -> bulk_reader.BulkReader:  # type: ignore
+    """
+    Reader draining the connection.
+    """
+    result, instance = bulk_reader.BulkReader.create(connection, fake_logger.FakeLogger())  # type: ignore
+    assert result
+    assert instance is not None
+
+    yield instance  # type: ignore
+
+
+class TestBulkReader:
+    """
+    Parsing whole chunks and handing messages out like recv_match().
+    """
+
+    def test_many_per_read(
+        self, sender: "tuple[socket.socket, tuple]", reader: bulk_reader.BulkReader
+    ) -> None:
+        """
+        Several messages in one datagram are decoded by a single read.
+        """
+        # Setup
+        port, address = sender
+        port.sendto(encode("HEARTBEAT") + encode("ATTITUDE") + encode("HEARTBEAT"), address)
+
+        # Run
+        messages = reader.read(TIMEOUT)
+
+        # Test
+        assert [message.get_type() for message in messages] == [
+            "HEARTBEAT",
+            "ATTITUDE",
+            "HEARTBEAT",
+        ]
+        assert reader.reads == 1
+
+    def test_split_across_reads(
+        self, sender: "tuple[socket.socket, tuple]", reader: bulk_reader.BulkReader
+    ) -> None:
+        """
+        A message cut in two is kept by the parser and decoded once the rest arrives.
+        """
+        # Setup
+        port, address = sender
+        data = encode("ATTITUDE")
+        half = len(data) // 2
+
+        # Run
+        port.sendto(data[:half], address)
+        first = reader.read(TIMEOUT)
+        port.sendto(data[half:], address)
+        second = reader.read(TIMEOUT)
+
+        # Test
+        assert not first
+        assert len(second) == 1
+        assert second[0].get_type() == "ATTITUDE"
+        assert second[0].yaw == pytest.approx(0.3)
+        assert reader.bytes_received == len(data)
+
+    def test_recv_match(
+        self,
+        connection: mavutil.mavudp,
+        sender: "tuple[socket.socket, tuple]",
+        reader: bulk_reader.BulkReader,
+    ) -> None:
+        """
+        Messages of other types are skipped, decoded messages are handed out one at a time.
+        """
+        # Setup
+        port, address = sender
+        port.sendto(encode("HEARTBEAT") + encode("ATTITUDE") + encode("ATTITUDE"), address)
+
+        # Run
+        first = reader.recv_match(type="ATTITUDE", blocking=True, timeout=TIMEOUT)
+        waiting = reader.select(0.0)
+        second = reader.recv_match(type=["ATTITUDE"])
+        empty = reader.recv_match(type="ATTITUDE", blocking=True, timeout=0.05)
+
+        # Test
+        assert first is not None and first.get_type() == "ATTITUDE"
+        assert waiting
+        assert second is not None and second.get_type() == "ATTITUDE"
+        assert empty is None
+        assert reader.reads == 1
+        # Posted to the connection like its own recv_msg() would
+        assert connection.target_system == 1
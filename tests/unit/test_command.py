@@ -0,0 +1,256 @@
+"""
+Test that skipped samples are counted the same way as decided ones.
+"""
+
+import queue
+
+import pytest
+
+from tests.unit import fake_logger
+
+# Command logs through the common submodule
+pytest.importorskip("modules.common.modules.logger.logger")
+
+# Imported after the check above
+# pylint: disable=wrong-import-position
+from modules.command import command
+from modules.command import command_worker
+from modules.command import state_predictor
+from modules.telemetry import telemetry
+from utilities.workers import queue_proxy_wrapper
+
+# pylint: enable=wrong-import-position
+
+
+# Test functions use test fixture signature names and access class privates
+# No enable
+# pylint: disable=protected-access,redefined-outer-name
+
+
+SAMPLE_COUNT = 10
+SAMPLE_PERIOD = 0.1  # seconds
+
+
+class RecordingMav:
+    """
+    Keeps the COMMAND_LONG arguments instead of sending them.
+    """
+
+    def __init__(self) -> None:
+        self.sent = []
+
+    def command_long_send(self, *args: object) -> None:
+        """
+        Record the call.
+        """
+        self.sent.append(args)
+
+
+class RecordingConnection:
+    """
+    Connection with a recording mav.
+    """
+
+    def __init__(self) -> None:
+        self.mav = RecordingMav()
+
+
+class FakeManager:
+    """
+    Hands out in process queues instead of starting a manager process.
+    """
+
+    def Queue(self, maxsize: int) -> queue.Queue:  # pylint: disable=invalid-name
+        """
+        Same signature as SyncManager.Queue().
+        """
+        return queue.Queue(maxsize)
+
+
+def samples(system_id: int | None = None) -> "list[telemetry.TelemetryData]":
+    """
+    Vehicle moving along x at 1m/s with noisy measured velocities.
+    """
+    return [
+        telemetry.TelemetryData(
+            x=float(i) * SAMPLE_PERIOD,
+            y=0.0,
+            z=20.0,
+            x_velocity=1.0 + (0.5 if i % 2 == 0 else -0.5),
+            y_velocity=0.0,
+            z_velocity=0.0,
+            roll=0.0,
+            pitch=0.0,
+            yaw=0.0,
+            roll_speed=0.0,
+            pitch_speed=0.0,
+            yaw_speed=0.0,
+            position_age=0.0,
+            attitude_age=0.0,
+            timestamp=100.0 + float(i) * SAMPLE_PERIOD,
+            system_id=system_id,
+        )
+        for i in range(SAMPLE_COUNT)
+    ]
+
+
+def make_command() -> command.Command:
+    """
+    Command predicting with a Kalman filter.
+    """
+    result, instance = command.Command.create(
+        RecordingConnection(),  # type: ignore
+        command.Position(10.0, 0.0, 20.0),
+        fake_logger.FakeLogger(),  # type: ignore
+        state_predictor.PredictorKind.KALMAN,
+    )
+    assert result
+    assert instance is not None
+    return instance
+
+
+class TestFold:
+    """
+    Skipped samples towards the average velocity.
+    """
+
+    def test_same_as_deciding(self) -> None:
+        """
+        Folding all but the last sample gives the same average as deciding on every one.
+        """
+        # Setup
+        folding = make_command()
+        deciding = make_command()
+        data = samples()
+
+        # Run
+        for telemetry_data in data[:-1]:
+            folding.fold(telemetry_data)
+        folding.run(data[-1])
+
+        for telemetry_data in data:
+            deciding.run(telemetry_data)
+
+        # Test
+        folded = folding.systems[None].velocity_statistics
+        assert folded.count == SAMPLE_COUNT
+        assert folded.mean == pytest.approx(deciding.systems[None].velocity_statistics.mean)
+
+    def test_filtered_velocity(self) -> None:
+        """
+        The predictor's velocity is counted, not the measured one.
+        """
+        # Setup
+        cmd = make_command()
+        reference = state_predictor.StatePredictor(state_predictor.PredictorKind.KALMAN)
+        data = samples()
+
+        # Run
+        for telemetry_data in data:
+            cmd.fold(telemetry_data)
+        expected = [reference.predict(telemetry_data, 0.0).x_velocity for telemetry_data in data]
+
+        # Test
+        statistics = cmd.systems[None].velocity_statistics
+        assert statistics.mean[0] == pytest.approx(sum(expected) / len(expected))
+        # Measured velocities alternate between 0.5 and 1.5m/s, a variance of 0.25
+        assert statistics.variance[0] < 0.25 / 2.0
+
+    def test_per_system(self) -> None:
+        """
+        Systems sharing a partition are estimated and averaged apart.
+        """
+        # Setup
+        cmd = make_command()
+        alone = make_command()
+        moving = samples(1)
+        # Second vehicle holding still at the same place
+        still = samples(2)
+        for telemetry_data in still:
+            telemetry_data.x = 0.0
+            telemetry_data.x_velocity = 0.0
+
+        # Run
+        for first, second in zip(moving, still):
+            cmd.fold(first)
+            cmd.fold(second)
+        for telemetry_data in moving:
+            alone.fold(telemetry_data)
+
+        # Test
+        assert sorted(cmd.systems) == [1, 2]
+        assert cmd.systems[1].velocity_statistics.mean == pytest.approx(
+            alone.systems[1].velocity_statistics.mean
+        )
+        assert cmd.systems[2].velocity_statistics.mean == pytest.approx([0.0, 0.0, 0.0])
+        assert set(cmd.get_prediction_errors()) == {1, 2}
+
+
+class TestTakeQueued:
+    """
+    Draining the input queue for latest wins.
+    """
+
+    def test_oldest_first(self) -> None:
+        """
+        Everything queued is returned in order, sentinels left out.
+        """
+        # Setup
+        input_queue = queue_proxy_wrapper.QueueProxyWrapper(FakeManager())  # type: ignore
+        data = samples()[:3]
+        input_queue.queue.put(data[0])
+        input_queue.queue.put(None)
+        input_queue.queue.put(data[1])
+        input_queue.queue.put(data[2])
+
+        # Run
+        taken = command_worker.take_queued(input_queue)
+        empty = command_worker.take_queued(input_queue)
+
+        # Test
+        assert taken == data
+        assert not empty
+
+
+class TestLatestPerSystem:
+    """
+    Latest wins for each system sharing a partition.
+    """
+
+    def test_latest_of_each(self) -> None:
+        """
+        Every system keeps its newest sample, the older ones of each are skipped in order.
+        """
+        # Setup
+        first = samples(1)
+        second = samples(2)
+        queued = [first[0], second[0], first[1], second[1], first[2]]
+
+        # Run
+        latest, skipped = command_worker.latest_per_system(queued)
+
+        # Test
+        assert latest == [second[1], first[2]]
+        assert skipped == [first[0], second[0], first[1]]
+
+    def test_skipped_folded_per_system(self) -> None:
+        """
+        Folding the skipped samples and deciding the latest counts every sample of each
+        system towards its own average.
+        """
+        # Setup
+        cmd = make_command()
+        first = samples(1)
+        second = samples(2)
+        queued = [sample for pair in zip(first, second) for sample in pair]
+
+        # Run
+        latest, skipped = command_worker.latest_per_system(queued)
+        for sample in skipped:
+            cmd.fold(sample)
+        for sample in latest:
+            cmd.run(sample)
+
+        # Test
+        assert cmd.systems[1].velocity_statistics.count == SAMPLE_COUNT
+        assert cmd.systems[2].velocity_statistics.count == SAMPLE_COUNT
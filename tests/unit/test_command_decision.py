@@ -0,0 +1,166 @@
+"""
+Test that batch decisions match single sample decisions.
+"""
+
+import math
+
+import numpy as np
+import pytest
+
+from modules.command import command_decision
+from modules.command import mission
+
+
+# Test functions use test fixture signature names and access class privates
+# No enable
+# pylint: disable=protected-access,redefined-outer-name
+
+
+SAMPLE_COUNT = 10000
+TARGET = (10.0, -5.0, 20.0)
+
+
+@pytest.fixture()
+def samples() -> "tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]":  # type: ignore
+    """
+    Random positions and headings, with altitudes around the tolerance and the yaw wrap.
+    """
+    generator = np.random.default_rng(0)
+    x = generator.uniform(-50.0, 50.0, SAMPLE_COUNT)
+    y = generator.uniform(-50.0, 50.0, SAMPLE_COUNT)
+    z = TARGET[2] + generator.uniform(-1.0, 1.0, SAMPLE_COUNT)
+    yaw = generator.uniform(-math.pi, math.pi, SAMPLE_COUNT)
+    yield x, y, z, yaw  # type: ignore
+
+
+class TestCommandDecision:
+    """
+    Scalar and vectorized decisions.
+    """
+
+    def test_altitude_first(self) -> None:
+        """
+        Altitude is corrected before yaw.
+        """
+        # Run
+        decision, amount = command_decision.decide(0.0, 0.0, 0.0, math.pi, *TARGET)
+
+        # Test
+        assert decision == command_decision.Decision.CHANGE_ALTITUDE
+        assert amount == 20.0
+
+    def test_yaw_wrapped(self) -> None:
+        """
+        Relative yaw takes the short way round.
+        """
+        # Run
+        decision, amount = command_decision.decide(
+            0.0, 0.0, 20.0, math.radians(170.0), 0.0, -1.0, 20.0
+        )
+
+        # Test
+        assert decision == command_decision.Decision.CHANGE_YAW
+        assert amount == pytest.approx(100.0)
+
+    def test_target_yaw(self) -> None:
+        """
+        A given heading is faced instead of the target.
+        """
+        # Run
+        decision, amount = command_decision.decide(
+            0.0, 0.0, 20.0, 0.0, 10.0, 0.0, 20.0, math.radians(-90.0)
+        )
+
+        # Test
+        assert decision == command_decision.Decision.CHANGE_YAW
+        assert amount == pytest.approx(-90.0)
+
+    def test_within_tolerance(self) -> None:
+        """
+        Nothing to do when facing the target at its altitude.
+        """
+        # Run
+        decision, amount = command_decision.decide(0.0, 0.0, 20.2, 0.0, 10.0, 0.0, 20.0)
+
+        # Test
+        assert decision == command_decision.Decision.NONE
+        assert amount == 0.0
+
+    def test_batch_matches_scalar(
+        self, samples: "tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]"
+    ) -> None:
+        """
+        Element by element, against a scalar target.
+        """
+        # Setup
+        x, y, z, yaw = samples
+
+        # Run
+        decisions, amounts = command_decision.decide_batch(x, y, z, yaw, *TARGET)
+
+        # Test
+        for i in range(SAMPLE_COUNT):
+            expected_decision, expected_amount = command_decision.decide(
+                x[i], y[i], z[i], yaw[i], *TARGET
+            )
+            assert decisions[i] == expected_decision
+            assert amounts[i] == pytest.approx(expected_amount, rel=1e-12, abs=1e-9)
+
+    def test_batch_per_sample_targets(
+        self, samples: "tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]"
+    ) -> None:
+        """
+        Every sample with its own target.
+        """
+        # Setup
+        x, y, z, yaw = samples
+        target_x = -x[::-1]
+        target_y = y[::-1]
+
+        # Run
+        decisions, amounts = command_decision.decide_batch(x, y, z, yaw, target_x, target_y, z)
+
+        # Test
+        for i in range(SAMPLE_COUNT):
+            expected_decision, expected_amount = command_decision.decide(
+                x[i], y[i], z[i], yaw[i], target_x[i], target_y[i], z[i]
+            )
+            assert decisions[i] == expected_decision
+            assert amounts[i] == pytest.approx(expected_amount, rel=1e-12, abs=1e-9)
+
+    def test_batch_mission_legs(
+        self, samples: "tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]"
+    ) -> None:
+        """
+        Headings and altitudes of mission legs, NaN facing the target for the rest.
+        """
+        # Setup
+        x, y, z, yaw = samples
+        legs = mission.Mission([(-40.0, -40.0, 19.0), (40.0, 10.0, 21.0)], 1.0)
+        legs.update(-40.0, -40.0, 19.0)
+        targets = np.array([legs.leg_target(*position) for position in zip(x, y, z)])
+        target_yaw = targets[:, 0].copy()
+        target_yaw[::3] = np.nan
+        target_z = targets[:, 1]
+        target_x, target_y, _ = legs.active_target
+
+        # Run
+        decisions, amounts = command_decision.decide_batch(
+            x, y, z, yaw, target_x, target_y, target_z, target_yaw
+        )
+
+        # Test
+        for i in range(SAMPLE_COUNT):
+            expected_decision, expected_amount = command_decision.decide(
+                x[i],
+                y[i],
+                z[i],
+                yaw[i],
+                target_x,
+                target_y,
+                target_z[i],
+                None if i % 3 == 0 else target_yaw[i],
+            )
+            assert decisions[i] == expected_decision
+            assert amounts[i] == pytest.approx(expected_amount, rel=1e-12, abs=1e-9)
+        assert np.count_nonzero(decisions == command_decision.Decision.CHANGE_YAW) > 0
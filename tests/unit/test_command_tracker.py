@@ -0,0 +1,186 @@
+"""
+Test in-flight command tracking.
+"""
+
+import pytest
+from pymavlink import mavutil
+
+from modules.command import command_tracker
+
+
+# Test functions use test fixture signature names and access class privates
+# No enable
+# pylint: disable=protected-access,redefined-outer-name
+
+
+COMMAND = mavutil.mavlink.MAV_CMD_CONDITION_CHANGE_ALT
+PARAMS = (1, 0, 0, 0, 0, 0, 10.0)
+TIMEOUT = 1.0  # seconds
+
+
+class RecordingMav:
+    """
+    Keeps the COMMAND_LONG arguments instead of sending them.
+    """
+
+    def __init__(self) -> None:
+        self.sent = []
+
+    def command_long_send(self, *args: object) -> None:
+        """
+        Record the call.
+        """
+        self.sent.append(args)
+
+
+class RecordingConnection:
+    """
+    Connection with a recording mav.
+    """
+
+    def __init__(self) -> None:
+        self.mav = RecordingMav()
+
+
+@pytest.fixture()
+def connection() -> RecordingConnection:  # type: ignore
+    """
+    Connection that records what is sent.
+    """
+    recorder = RecordingConnection()
+    yield recorder  # type: ignore
+
+
+@pytest.fixture()
+def tracker(connection: RecordingConnection) -> command_tracker.CommandTracker:  # type: ignore
+    """
+    Tracker with 3 attempts and doubling timeouts.
+    """
+    table = command_tracker.CommandTracker(connection, ack_timeout=TIMEOUT, max_attempts=3)
+    yield table  # type: ignore
+
+
+def ack(result: int, receive_time: float) -> command_tracker.CommandAck:
+    """
+    COMMAND_ACK for COMMAND.
+    """
+    return command_tracker.CommandAck(COMMAND, result, receive_time)
+
+
+class TestCommandTracker:
+    """
+    Suppression, ACK matching and retries.
+    """
+
+    def test_duplicate_suppressed_until_ack(
+        self, tracker: command_tracker.CommandTracker, connection: RecordingConnection
+    ) -> None:
+        """
+        Same target is held back while in flight and sent again once acknowledged.
+        """
+        # Run
+        first = tracker.send(COMMAND, PARAMS, (10.0,), 0.5, 0.0)
+        duplicate = tracker.send(COMMAND, PARAMS, (10.2,), 0.5, 0.1)
+        tracker.handle_ack(ack(mavutil.mavlink.MAV_RESULT_ACCEPTED, 0.2))
+        after_ack = tracker.send(COMMAND, PARAMS, (10.0,), 0.5, 0.3)
+
+        # Test
+        assert first
+        assert not duplicate
+        assert after_ack
+        assert tracker.suppressed_count == 1
+        assert len(connection.mav.sent) == 2
+        assert connection.mav.sent[0] == (1, 0, COMMAND, 0) + PARAMS
+
+    def test_new_target_replaces(self, tracker: command_tracker.CommandTracker) -> None:
+        """
+        A different target is sent straight away.
+        """
+        # Setup
+        tracker.send(COMMAND, PARAMS, (10.0,), 0.5, 0.0)
+
+        # Run
+        actual = tracker.send(COMMAND, PARAMS, (20.0,), 0.5, 0.1)
+
+        # Test
+        assert actual
+        assert tracker.replaced_count == 1
+        assert tracker.in_flight_count() == 1
+
+    def test_per_system(
+        self, tracker: command_tracker.CommandTracker, connection: RecordingConnection
+    ) -> None:
+        """
+        The same command to another vehicle is not suppressed, and ACKs complete their own.
+        """
+        # Setup
+        tracker.send(COMMAND, PARAMS, (10.0,), 0.5, 0.0, 2)
+
+        # Run
+        other = tracker.send(COMMAND, PARAMS, (10.0,), 0.5, 0.1, 3)
+        tracker.handle_ack(
+            command_tracker.CommandAck(COMMAND, mavutil.mavlink.MAV_RESULT_ACCEPTED, 0.2, 3)
+        )
+        repeated = tracker.send(COMMAND, PARAMS, (10.0,), 0.5, 0.3, 2)
+
+        # Test
+        assert other
+        assert not repeated
+        assert tracker.in_flight_count() == 1
+        assert [args[0] for args in connection.mav.sent] == [2, 3]
+
+    def test_retry_with_backoff(
+        self, tracker: command_tracker.CommandTracker, connection: RecordingConnection
+    ) -> None:
+        """
+        Resent after 1s then 2s more, given up after 4s more.
+        """
+        # Setup
+        tracker.send(COMMAND, PARAMS, (10.0,), 0.5, 0.0)
+
+        # Run
+        tracker.check_timeouts(0.9)
+        tracker.check_timeouts(1.0)
+        tracker.check_timeouts(2.9)
+        tracker.check_timeouts(3.0)
+        tracker.check_timeouts(7.0)
+
+        # Test
+        confirmations = [args[3] for args in connection.mav.sent]
+        assert confirmations == [0, 1, 2]
+        assert tracker.retry_count == 2
+        assert tracker.timeout_count == 1
+        assert tracker.in_flight_count() == 0
+
+    def test_in_progress_keeps_waiting(self, tracker: command_tracker.CommandTracker) -> None:
+        """
+        IN_PROGRESS extends the deadline without completing the command.
+        """
+        # Setup
+        tracker.send(COMMAND, PARAMS, (10.0,), 0.5, 0.0)
+
+        # Run
+        tracker.handle_ack(ack(mavutil.mavlink.MAV_RESULT_IN_PROGRESS, 0.9))
+        tracker.check_timeouts(1.5)
+
+        # Test
+        assert tracker.retry_count == 0
+        assert tracker.in_flight_count() == 1
+
+    def test_latency_histogram(self, tracker: command_tracker.CommandTracker) -> None:
+        """
+        Send to ACK time lands in the right bin, rejections are counted.
+        """
+        # Setup
+        tracker.send(COMMAND, PARAMS, (10.0,), 0.5, 0.0)
+
+        # Run
+        tracker.handle_ack(ack(mavutil.mavlink.MAV_RESULT_DENIED, 0.05))
+
+        # Test
+        edges, counts = tracker.get_latency_histogram()
+        assert counts.sum() == 1
+        index = int(counts.argmax())
+        assert edges[index - 1] < 0.05 <= edges[index]
+        assert tracker.latency_percentile(50.0) == edges[index]
+        assert tracker.rejected_count == 1
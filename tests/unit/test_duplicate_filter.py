@@ -0,0 +1,90 @@
+"""
+Test duplicate suppression across redundant links.
+"""
+
+import pytest
+
+from modules.connection import duplicate_filter
+
+
+# Test functions use test fixture signature names and access class privates
+# No enable
+# pylint: disable=protected-access,redefined-outer-name
+
+
+WINDOW = 1.0  # seconds
+
+
+@pytest.fixture()
+def message_filter() -> duplicate_filter.DuplicateFilter:  # type: ignore
+    """
+    Empty filter.
+    """
+    dedup = duplicate_filter.DuplicateFilter(WINDOW)
+    yield dedup  # type: ignore
+
+
+class TestDuplicateFilter:
+    """
+    Duplicate detection by (system, component, sequence number).
+    """
+
+    def test_first_copy_delivered(self, message_filter: duplicate_filter.DuplicateFilter) -> None:
+        """
+        First copy goes through, second copy from another link is dropped.
+        """
+        # Run
+        first = message_filter.is_duplicate(1, 1, 10, 30, 0xBEEF, 0.0)
+        second = message_filter.is_duplicate(1, 1, 10, 30, 0xBEEF, 0.01)
+
+        # Test
+        assert not first
+        assert second
+        assert message_filter.duplicate_count == 1
+
+    def test_other_sources_independent(
+        self, message_filter: duplicate_filter.DuplicateFilter
+    ) -> None:
+        """
+        Same sequence number from another system or component is not a duplicate.
+        """
+        # Setup
+        message_filter.is_duplicate(1, 1, 10, 30, 0xBEEF, 0.0)
+
+        # Run
+        other_component = message_filter.is_duplicate(1, 2, 10, 30, 0xBEEF, 0.0)
+        other_system = message_filter.is_duplicate(2, 1, 10, 30, 0xBEEF, 0.0)
+
+        # Test
+        assert not other_component
+        assert not other_system
+
+    def test_wrapped_sequence_not_duplicate(
+        self, message_filter: duplicate_filter.DuplicateFilter
+    ) -> None:
+        """
+        Sequence number reused after wrapping, with different contents.
+        """
+        # Setup
+        message_filter.is_duplicate(1, 1, 10, 30, 0xBEEF, 0.0)
+
+        # Run
+        actual = message_filter.is_duplicate(1, 1, 10, 30, 0xCAFE, 0.2)
+
+        # Test
+        assert not actual
+
+    def test_outside_window_not_duplicate(
+        self, message_filter: duplicate_filter.DuplicateFilter
+    ) -> None:
+        """
+        Identical message after the window is delivered.
+        """
+        # Setup
+        message_filter.is_duplicate(1, 1, 10, 30, 0xBEEF, 0.0)
+
+        # Run
+        actual = message_filter.is_duplicate(1, 1, 10, 30, 0xBEEF, WINDOW + 0.1)
+
+        # Test
+        assert not actual
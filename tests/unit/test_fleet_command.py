@@ -0,0 +1,144 @@
+"""
+Test the fleet decisions with a geofence.
+"""
+
+import pytest
+
+from tests.unit import fake_logger
+
+# Fleet command logs through the common submodule
+pytest.importorskip("modules.common.modules.logger.logger")
+
+# Imported after the check above
+# pylint: disable=wrong-import-position
+from modules.command import command
+from modules.command import fleet_command
+from modules.command import geofence
+from modules.telemetry import telemetry
+
+# pylint: enable=wrong-import-position
+
+
+# Test functions use test fixture signature names and access class privates
+# No enable
+# pylint: disable=protected-access,redefined-outer-name
+
+
+class RecordingMav:
+    """
+    Keeps the COMMAND_LONG arguments instead of sending them.
+    """
+
+    def __init__(self) -> None:
+        self.sent = []
+
+    def command_long_send(self, *args: object) -> None:
+        """
+        Record the call.
+        """
+        self.sent.append(args)
+
+
+class RecordingConnection:
+    """
+    Connection with a recording mav.
+    """
+
+    def __init__(self) -> None:
+        self.mav = RecordingMav()
+
+
+def sample(system_id: int, x: float) -> telemetry.TelemetryData:
+    """
+    Vehicle at x, 10m below its target altitude so it is always commanded.
+    """
+    return telemetry.TelemetryData(
+        x=x,
+        y=50.0,
+        z=10.0,
+        yaw=0.0,
+        x_velocity=0.0,
+        y_velocity=0.0,
+        z_velocity=0.0,
+        system_id=system_id,
+    )
+
+
+@pytest.fixture()
+def connection() -> RecordingConnection:  # type: ignore
+    """
+    Connection that records what is sent.
+    """
+    yield RecordingConnection()  # type: ignore
+
+
+@pytest.fixture()
+def local_logger() -> fake_logger.FakeLogger:  # type: ignore
+    """
+    Logger counting errors instead of failing on them, breaches are logged as errors.
+    """
+    yield fake_logger.FakeLogger(fail_on_error=False)  # type: ignore
+
+
+@pytest.fixture()
+def fleet(
+    connection: RecordingConnection, local_logger: fake_logger.FakeLogger
+) -> fleet_command.FleetCommand:  # type: ignore
+    """
+    Two vehicles that have to stay within a 100m square.
+    """
+    fence = geofence.Geofence(
+        [
+            geofence.GeofenceZone(
+                geofence.ZoneKind.INCLUSION,
+                [(0.0, 0.0), (100.0, 0.0), (100.0, 100.0), (0.0, 100.0)],
+            )
+        ]
+    )
+    targets = {1: command.Position(50.0, 50.0, 20.0), 2: command.Position(50.0, 50.0, 20.0)}
+    result, instance = fleet_command.FleetCommand.create(
+        connection, targets, local_logger, fence  # type: ignore
+    )
+    assert result
+    assert instance is not None
+
+    yield instance  # type: ignore
+
+
+class TestFleetGeofence:
+    """
+    Breaching vehicles are held, the others are commanded.
+    """
+
+    def test_breach_held(
+        self,
+        connection: RecordingConnection,
+        local_logger: fake_logger.FakeLogger,
+        fleet: fleet_command.FleetCommand,
+    ) -> None:
+        """
+        One event when a vehicle leaves, no commands to it until it is back.
+        """
+        # Setup
+        fleet.update(sample(1, 50.0))
+        fleet.update(sample(2, 150.0))
+
+        # Run
+        first = fleet.run()
+        fleet.update(sample(1, 50.0))
+        fleet.update(sample(2, 160.0))
+        second = fleet.run()
+        fleet.update(sample(2, 60.0))
+        back = fleet.run()
+
+        # Test
+        breaches = [result for result in first if isinstance(result, geofence.BreachEvent)]
+        assert len(breaches) == 1
+        assert breaches[0].system_id == 2
+        assert breaches[0].outside_inclusion
+        assert "SYSTEM 2" in str(breaches[0])
+        assert first[1:] == ["SYSTEM 1 CHANGE ALTITUDE: 10.0"]
+        assert second == ["SYSTEM 1 CHANGE ALTITUDE: 10.0"]
+        assert back == ["SYSTEM 2 CHANGE ALTITUDE: 10.0"]
+        assert [args[0] for args in connection.mav.sent] == [1, 1, 2]
+        assert local_logger.error_count == 1
@@ -0,0 +1,149 @@
+"""
+Test the geofence grid index and batch checks.
+"""
+
+import numpy as np
+import pytest
+
+from modules.command import geofence
+
+
+# Test functions use test fixture signature names and access class privates
+# No enable
+# pylint: disable=protected-access,redefined-outer-name
+
+
+@pytest.fixture()
+def fence() -> geofence.Geofence:  # type: ignore
+    """
+    100m square to stay in, with a triangle to avoid between 0m and 50m altitude.
+    """
+    zones = [
+        geofence.GeofenceZone(
+            geofence.ZoneKind.INCLUSION, [(0.0, 0.0), (100.0, 0.0), (100.0, 100.0), (0.0, 100.0)]
+        ),
+        geofence.GeofenceZone(
+            geofence.ZoneKind.EXCLUSION, [(40.0, 40.0), (60.0, 40.0), (50.0, 63.0)], 0.0, 50.0
+        ),
+    ]
+    yield geofence.Geofence(zones, 7.0)  # type: ignore
+
+
+class TestGeofence:
+    """
+    Breach checks.
+    """
+
+    def test_allowed(self, fence: geofence.Geofence) -> None:
+        """
+        Inside the inclusion zone and away from the exclusion zone.
+        """
+        # Run
+        breach = fence.check(10.0, 10.0, 20.0)
+
+        # Test
+        assert breach is None
+
+    def test_outside_inclusion(self, fence: geofence.Geofence) -> None:
+        """
+        Leaving the inclusion zone, including beyond the grid.
+        """
+        # Run
+        near = fence.check(100.5, 50.0, 20.0)
+        far = fence.check(-1000.0, 50.0, 20.0)
+
+        # Test
+        assert near is not None and near.outside_inclusion
+        assert far is not None and far.outside_inclusion
+
+    def test_inside_exclusion(self, fence: geofence.Geofence) -> None:
+        """
+        The exclusion zone only applies within its altitude band.
+        """
+        # Run
+        low = fence.check(50.0, 45.0, 20.0)
+        high = fence.check(50.0, 45.0, 60.0)
+
+        # Test
+        assert low is not None
+        assert low.exclusion_zones == [1]
+        assert not low.outside_inclusion
+        assert high is None
+
+    def test_index_matches_batch(self, fence: geofence.Geofence) -> None:
+        """
+        The grid answers the same as testing the full polygons.
+        """
+        # Setup
+        generator = np.random.default_rng(0)
+        points = generator.uniform(-10.0, 110.0, (5000, 3))
+
+        # Run
+        expected = fence.check_batch(points[:, 0], points[:, 1], points[:, 2])
+        actual = [fence.check(x, y, z) is not None for x, y, z in points.tolist()]
+
+        # Test
+        assert actual == expected.tolist()
+        assert 0 < np.count_nonzero(expected) < len(points)
+
+
+class TestRoundNumbers:
+    """
+    Fences whose edges and vertices fall on cell corners and centres.
+    """
+
+    @pytest.mark.parametrize(
+        "vertices",
+        [
+            # Diamond with edges through cell centres
+            [(20.0, 0.0), (40.0, 20.0), (20.0, 40.0), (0.0, 20.0)],
+            # L-shape with its inner corner on a cell centre
+            [(0.0, 0.0), (30.0, 0.0), (30.0, 15.0), (15.0, 15.0), (15.0, 30.0), (0.0, 30.0)],
+        ],
+    )
+    def test_index_matches_batch(self, vertices: "list[tuple[float, float]]") -> None:
+        """
+        The grid answers the same as testing the full polygons, as an exclusion and an
+        inclusion zone.
+        """
+        # Setup
+        generator = np.random.default_rng(0)
+        points = generator.uniform(-5.0, 45.0, (20000, 3))
+        # Exactly on edges, vertices and cell centres too
+        grid_points = [(x, y, 0.0) for x in range(-5, 46, 5) for y in range(-5, 46, 5)]
+        points = np.concatenate([points, np.array(grid_points, dtype=np.float64)])
+
+        for kind in geofence.ZoneKind:
+            fence = geofence.Geofence([geofence.GeofenceZone(kind, vertices)], 10.0)
+
+            # Run
+            expected = fence.check_batch(points[:, 0], points[:, 1], points[:, 2])
+            actual = [fence.check(x, y, z) is not None for x, y, z in points.tolist()]
+
+            # Test
+            assert actual == expected.tolist()
+            assert 0 < np.count_nonzero(expected) < len(points)
+
+    def test_explain_matches_batch(self) -> None:
+        """
+        Positions exactly on the fence are explained with the zones the batch test used.
+        """
+        # Setup
+        fence = geofence.Geofence(
+            [
+                geofence.GeofenceZone(
+                    geofence.ZoneKind.EXCLUSION,
+                    [(20.0, 0.0), (40.0, 20.0), (20.0, 40.0), (0.0, 20.0)],
+                )
+            ],
+            10.0,
+        )
+        points = [(x, y, 0.0) for x in range(0, 41, 5) for y in range(0, 41, 5)]
+
+        # Run
+        breaching = fence.check_batch(*np.array(points, dtype=np.float64).T)
+        events = [fence.explain(*point) for point, breach in zip(points, breaching) if breach]
+
+        # Test
+        assert len(events) > 0
+        assert all(event.exclusion_zones == [0] for event in events)
@@ -0,0 +1,186 @@
+"""
+Test the event driven heartbeat receiver with a fake connection.
+"""
+
+import time
+
+import pytest
+
+from tests.unit import fake_logger
+
+# The receiver logs through the common submodule
+pytest.importorskip("modules.common.modules.logger.logger")
+
+# Imported after the check above
+# pylint: disable-next=wrong-import-position
+from modules.heartbeat import heartbeat_receiver, phi_accrual
+
+
+# Test functions use test fixture signature names and access class privates
+# No enable
+# pylint: disable=protected-access,redefined-outer-name
+
+
+PERIOD = 0.01  # seconds
+MAX_WAIT = 0.05  # seconds
+
+
+class FakeHeartbeat:
+    """
+    HEARTBEAT from the vehicle's autopilot.
+    """
+
+    def get_srcSystem(self) -> int:  # pylint: disable=invalid-name
+        """
+        Same as MAVLink_message.get_srcSystem().
+        """
+        return 1
+
+    def get_srcComponent(self) -> int:  # pylint: disable=invalid-name
+        """
+        Same as MAVLink_message.get_srcComponent().
+        """
+        return 1
+
+
+class FakeConnection:
+    """
+    Hands out the heartbeats it is given, blocking reads wait out their timeout otherwise.
+    """
+
+    def __init__(self) -> None:
+        self.pending = 0
+        self.read_count = 0
+
+    def recv_match(  # pylint: disable=redefined-builtin
+        self, type: str, blocking: bool = False, timeout: float | None = None
+    ) -> FakeHeartbeat | None:
+        """
+        Same signature as mavfile.recv_match().
+        """
+        assert type == "HEARTBEAT"
+        self.read_count += 1
+        if self.pending > 0:
+            self.pending -= 1
+            return FakeHeartbeat()
+
+        if blocking and timeout is not None:
+            time.sleep(timeout)
+        return None
+
+
+@pytest.fixture()
+def connection() -> FakeConnection:  # type: ignore
+    """
+    Connection with nothing to read.
+    """
+    yield FakeConnection()  # type: ignore
+
+
+@pytest.fixture()
+def receiver(
+    connection: FakeConnection, local_logger: fake_logger.FakeLogger
+) -> heartbeat_receiver.HeartbeatReceiver:  # type: ignore
+    """
+    Event driven receiver expecting a heartbeat every period.
+    """
+    detector = phi_accrual.PhiAccrualDetector(PERIOD, 10, PERIOD / 2.0)
+    result, instance = heartbeat_receiver.HeartbeatReceiver.create(
+        connection, local_logger, detector, 8.0  # type: ignore
+    )
+    assert result
+    assert instance is not None
+
+    yield instance  # type: ignore
+
+
+def send_heartbeats(
+    connection: FakeConnection, receiver: heartbeat_receiver.HeartbeatReceiver, count: int
+) -> None:
+    """
+    Receive the given number of heartbeats one period apart.
+    """
+    for _ in range(count):
+        connection.pending = 1
+        receiver.run_event(MAX_WAIT)
+        time.sleep(PERIOD)
+
+
+class TestRunEvent:
+    """
+    Transitions of the event driven mode.
+    """
+
+    def test_lost_and_recovered(
+        self,
+        connection: FakeConnection,
+        local_logger: fake_logger.FakeLogger,
+        receiver: heartbeat_receiver.HeartbeatReceiver,
+    ) -> None:
+        """
+        Connected, lost once the deadline passes, and connected again on the next heartbeat.
+        """
+        # Setup
+        send_heartbeats(connection, receiver, 10)
+        assert receiver.state == "Connected"
+
+        # Run
+        for _ in range(20):
+            receiver.run_event(MAX_WAIT)
+            if receiver.state == "Disconnected":
+                break
+        lost_state = receiver.state
+
+        # Still reading while lost, blocking instead of spinning
+        reads = connection.read_count
+        start = time.monotonic()
+        receiver.run_event(MAX_WAIT)
+        receiver.run_event(MAX_WAIT)
+        waited = time.monotonic() - start
+        reads_while_lost = connection.read_count - reads
+
+        send_heartbeats(connection, receiver, 1)
+
+        # Test
+        assert receiver._detector is not None
+        assert receiver._detector.mean < PERIOD * 2.0
+        assert lost_state == "Disconnected"
+        assert reads_while_lost == 2
+        assert waited >= MAX_WAIT * 2.0
+        assert receiver.state == "Connected"
+        assert receiver.received_count == 11
+        assert local_logger.warning_count == 1
+
+    def test_before_first_heartbeat(
+        self, connection: FakeConnection, receiver: heartbeat_receiver.HeartbeatReceiver
+    ) -> None:
+        """
+        Waits on the connection until something arrives.
+        """
+        # Run
+        receiver.run_event(MAX_WAIT)
+        connection.pending = 1
+        receiver.run_event(MAX_WAIT)
+
+        # Test
+        assert connection.read_count == 3
+        assert receiver.state == "Connected"
+
+    def test_buffered_intervals_skipped(
+        self, connection: FakeConnection, receiver: heartbeat_receiver.HeartbeatReceiver
+    ) -> None:
+        """
+        Heartbeats drained from the buffer behind the first do not teach back to back intervals.
+        """
+        # Setup
+        send_heartbeats(connection, receiver, 10)
+        assert receiver._detector is not None
+        mean = receiver._detector.mean
+
+        # Run
+        connection.pending = 5
+        receiver.run_event(MAX_WAIT)
+
+        # Test
+        assert receiver.received_count == 15
+        assert receiver._detector.mean == pytest.approx(mean, rel=0.2)
@@ -0,0 +1,254 @@
+"""
+Test best link selection and failover across the processes sharing a LinkManager.
+"""
+
+import time
+
+import pytest
+
+from tests.unit import fake_logger
+
+# The link manager logs through the common submodule
+pytest.importorskip("modules.common.modules.logger.logger")
+
+# Imported after the check above
+# pylint: disable-next=wrong-import-position
+from modules.connection import link_manager
+
+
+# Test functions use test fixture signature names and access class privates
+# No enable
+# pylint: disable=protected-access,redefined-outer-name
+
+
+STALL_TIMEOUT = 0.3  # seconds
+# Longer than the interval at which health is published and merged
+HEALTH_DELAY = 0.06  # seconds
+
+
+class FakeMessage:
+    """
+    Message from the drone, TIMESYNC if given ts1.
+    """
+
+    def __init__(self, seq: int, ts1: int | None = None) -> None:
+        self.seq = seq
+        self.tc1 = 1
+        self.ts1 = ts1
+
+    def get_type(self) -> str:
+        """
+        Same as MAVLink_message.get_type().
+        """
+        return "HEARTBEAT" if self.ts1 is None else "TIMESYNC"
+
+    def get_srcSystem(self) -> int:  # pylint: disable=invalid-name
+        """
+        Same as MAVLink_message.get_srcSystem().
+        """
+        return 1
+
+    def get_srcComponent(self) -> int:  # pylint: disable=invalid-name
+        """
+        Same as MAVLink_message.get_srcComponent().
+        """
+        return 1
+
+    def get_seq(self) -> int:
+        """
+        Same as MAVLink_message.get_seq().
+        """
+        return self.seq
+
+    def get_msgId(self) -> int:  # pylint: disable=invalid-name
+        """
+        Same as MAVLink_message.get_msgId().
+        """
+        return 0 if self.ts1 is None else 111
+
+    def get_crc(self) -> int:
+        """
+        Same as MAVLink_message.get_crc().
+        """
+        return self.seq
+
+
+class FakeMav:
+    """
+    Records the pings sent.
+    """
+
+    def __init__(self) -> None:
+        self.pings: "list[int]" = []
+
+    def timesync_send(self, tc1: int, ts1: int) -> None:
+        """
+        Same as MAVLink.timesync_send().
+        """
+        assert tc1 == 0
+        self.pings.append(ts1)
+
+
+class FakeConnection:
+    """
+    One link, reading the messages it is given.
+    """
+
+    def __init__(self) -> None:
+        self.mav = FakeMav()
+        self.fd = None
+        self.target_system = 1
+        self.inbox: "list[FakeMessage]" = []
+
+    def recv_msg(self) -> FakeMessage | None:
+        """
+        Same as mavfile.recv_msg().
+        """
+        if len(self.inbox) == 0:
+            return None
+        return self.inbox.pop(0)
+
+    def packet_loss(self) -> float:
+        """
+        Same as mavfile.packet_loss().
+        """
+        return 0.0
+
+
+def make_manager(health: dict) -> link_manager.LinkManager:
+    """
+    Manager of a primary and a backup link, sharing health through the dict.
+    """
+    now = time.monotonic()
+    links = [
+        link_manager._Link("primary", FakeConnection(), now),
+        link_manager._Link("backup", FakeConnection(), now),
+    ]
+    manager = link_manager.LinkManager(
+        link_manager.LinkManager._LinkManager__private_key,
+        links,
+        fake_logger.FakeLogger(),  # type: ignore
+        STALL_TIMEOUT,
+        0.01,
+        1.0,
+    )
+    manager.share_health(health)  # type: ignore
+    return manager
+
+
+def receive(manager: link_manager.LinkManager, link: int, message: FakeMessage) -> None:
+    """
+    Deliver a message over one of the manager's links and read it.
+    """
+    manager._links[link].connection.inbox.append(message)
+    manager.recv_match()
+
+
+@pytest.fixture()
+def health() -> dict:  # type: ignore
+    """
+    Stand-in for the SyncManager.dict() shared between processes.
+    """
+    yield {}  # type: ignore
+
+
+@pytest.fixture()
+def writer(health: dict) -> link_manager.LinkManager:  # type: ignore
+    """
+    The outbound writer's copy, which never receives.
+    """
+    yield make_manager(health)  # type: ignore
+
+
+@pytest.fixture()
+def reader(health: dict) -> link_manager.LinkManager:  # type: ignore
+    """
+    A receiving worker's copy.
+    """
+    yield make_manager(health)  # type: ignore
+
+
+class TestBestLink:
+    """
+    Choosing the outbound link in the writer from what the readers saw.
+    """
+
+    def test_lowest_rtt(
+        self, writer: link_manager.LinkManager, reader: link_manager.LinkManager
+    ) -> None:
+        """
+        Pings sent by the writer and answered to a reader make the faster link preferred.
+        """
+        # Setup
+        writer.ping_links()
+        primary_ping = writer._links[0].connection.mav.pings[0]
+        backup_ping = writer._links[1].connection.mav.pings[0]
+
+        # Run
+        receive(reader, 1, FakeMessage(1, backup_ping))
+        time.sleep(HEALTH_DELAY)
+        receive(reader, 0, FakeMessage(2, primary_ping))
+        best = writer.best_link()
+
+        # Test
+        assert best.name == "backup"
+        assert best.smoothed_rtt is not None and best.smoothed_rtt < HEALTH_DELAY
+        assert writer._links[0].smoothed_rtt is not None
+        assert writer._links[0].smoothed_rtt >= HEALTH_DELAY
+
+    def test_stalled_link_skipped(
+        self, writer: link_manager.LinkManager, reader: link_manager.LinkManager
+    ) -> None:
+        """
+        Once the primary goes silent the writer switches to the backup the reader still hears.
+        """
+        # Setup
+        assert writer.best_link().name == "primary"
+
+        # Run
+        time.sleep(STALL_TIMEOUT)
+        receive(reader, 1, FakeMessage(1))
+        time.sleep(HEALTH_DELAY)
+        best = writer.best_link()
+
+        # Test
+        assert best.name == "backup"
+
+    def test_write_failure(
+        self, writer: link_manager.LinkManager, reader: link_manager.LinkManager
+    ) -> None:
+        """
+        A failed write moves traffic to the backup until the primary is heard from again.
+        """
+        # Setup
+        assert writer.best_link().name == "primary"
+
+        # Run
+        writer.handle_disconnect()
+        failed_over = writer.best_link()
+
+        time.sleep(HEALTH_DELAY)
+        receive(reader, 0, FakeMessage(1))
+        time.sleep(HEALTH_DELAY)
+        recovered = [link.name for link in writer.get_statistics() if link.is_healthy]
+
+        # Test
+        assert failed_over.name == "backup"
+        assert recovered == ["primary", "backup"]
+
+    def test_duplicates_dropped(self, reader: link_manager.LinkManager) -> None:
+        """
+        The same message over both links is delivered once.
+        """
+        # Setup
+        reader._links[0].connection.inbox.append(FakeMessage(7))
+        reader._links[1].connection.inbox.append(FakeMessage(7))
+
+        # Run
+        first = reader.recv_match()
+        second = reader.recv_match()
+
+        # Test
+        assert first is not None
+        assert second is None
+        assert reader.get_statistics()[1].duplicate_count == 1
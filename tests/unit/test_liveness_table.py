@@ -0,0 +1,144 @@
+"""
+Test the per endpoint heartbeat liveness table.
+"""
+
+import pytest
+
+from modules.heartbeat import liveness_table
+
+
+# Test functions use test fixture signature names and access class privates
+# No enable
+# pylint: disable=protected-access,redefined-outer-name
+
+
+TIMEOUT = 2.0  # seconds
+
+
+@pytest.fixture()
+def table() -> liveness_table.LivenessTable:  # type: ignore
+    """
+    Table with room for 4 endpoints before growing.
+    """
+    yield liveness_table.LivenessTable(TIMEOUT, 3.0, 0.5, 4)  # type: ignore
+
+
+class TestLivenessTable:
+    """
+    Updates and expiry.
+    """
+
+    def test_new_endpoint(self, table: liveness_table.LivenessTable) -> None:
+        """
+        The first heartbeat connects the endpoint, later ones do not change it.
+        """
+        # Run
+        first = table.update(1, 1, 10.0)
+        second = table.update(1, 1, 11.0)
+
+        # Test
+        assert first
+        assert not second
+        assert len(table) == 1
+        assert table.get(1, 2) is None
+
+        entry = table.get(1, 1)
+        assert entry is not None
+        assert entry.connected
+        assert entry.last_seen == 11.0
+        assert entry.rate == pytest.approx(1.0)
+
+    def test_rate_smoothed(self, table: liveness_table.LivenessTable) -> None:
+        """
+        The rate follows the intervals with the smoothing weight.
+        """
+        # Run
+        for now in (0.0, 1.0, 1.5):
+            table.update(1, 1, now)
+
+        # Test
+        entry = table.get(1, 1)
+        assert entry is not None
+        assert entry.rate == pytest.approx(1.0 / 0.75)
+
+    def test_sweep(self, table: liveness_table.LivenessTable) -> None:
+        """
+        Only silent endpoints are lost, each once, and come back on their next heartbeat.
+        """
+        # Setup
+        table.update(1, 1, 0.0)
+        table.update(2, 1, 0.0)
+        table.update(2, 1, 1.5)
+
+        # Run
+        lost = table.sweep(TIMEOUT)
+        # Interval of 1.5s missed 3 times
+        kept = table.sweep(1.5 + 4.0)
+        lost_again = table.sweep(1.5 + 4.5)
+        recovered = table.update(1, 1, 7.0)
+
+        # Test
+        assert lost == [(1, 1)]
+        assert not kept
+        assert lost_again == [(2, 1)]
+        assert recovered
+        assert table.connected_count == 1
+
+    def test_outage_not_smoothed(self, table: liveness_table.LivenessTable) -> None:
+        """
+        The rate and deadline after a recovery come from the intervals before the outage.
+        """
+        # Setup
+        for now in (0.0, 1.0, 2.0):
+            table.update(1, 1, now)
+        # Interval of 1s missed 3 times
+        table.sweep(2.0 + 3.0)
+
+        # Run
+        recovered = table.update(1, 1, 60.0)
+        kept = table.sweep(60.0 + 2.9)
+        lost = table.sweep(60.0 + 3.0)
+
+        # Test
+        assert recovered
+        assert not kept
+        assert lost == [(1, 1)]
+        entry = table.get(1, 1)
+        assert entry is not None
+        assert entry.rate == pytest.approx(1.0)
+
+    def test_slow_sender(self, table: liveness_table.LivenessTable) -> None:
+        """
+        An endpoint sending less often than the timeout is given its missed intervals.
+        """
+        # Setup
+        table.update(1, 1, 0.0)
+        table.update(1, 1, 5.0)
+
+        # Run
+        kept = table.sweep(5.0 + 14.0)
+        lost = table.sweep(5.0 + 15.0)
+
+        # Test
+        assert not kept
+        assert lost == [(1, 1)]
+
+    def test_many_endpoints(self, table: liveness_table.LivenessTable) -> None:
+        """
+        Grows past its capacity and keeps every endpoint apart.
+        """
+        # Setup
+        endpoints = [
+            (system_id, component_id) for system_id in range(1, 41) for component_id in range(50)
+        ]
+
+        # Run
+        for i, (system_id, component_id) in enumerate(endpoints):
+            table.update(system_id, component_id, float(i % 2))
+        lost = table.sweep(TIMEOUT)
+
+        # Test
+        assert len(table) == len(endpoints)
+        assert [(entry.system_id, entry.component_id) for entry in table.entries()] == endpoints
+        assert lost == endpoints[::2]
+        assert table.connected_count == len(endpoints) // 2
@@ -0,0 +1,191 @@
+"""
+Test waypoint switching and the nearest waypoint index.
+"""
+
+import numpy as np
+import pytest
+
+from modules.command import mission
+
+
+# Test functions use test fixture signature names and access class privates
+# No enable
+# pylint: disable=protected-access,redefined-outer-name
+
+
+WAYPOINTS = [(0.0, 0.0, 10.0), (10.0, 0.0, 10.0), (10.0, 10.0, 20.0)]
+
+
+@pytest.fixture()
+def square() -> mission.Mission:  # type: ignore
+    """
+    Three waypoints with a 1m acceptance radius.
+    """
+    yield mission.Mission(WAYPOINTS, 1.0)  # type: ignore
+
+
+class TestWaypointIndex:
+    """
+    KD-tree queries.
+    """
+
+    def test_matches_brute_force(self) -> None:
+        """
+        Same nearest waypoint as checking all of them.
+        """
+        # Setup
+        generator = np.random.default_rng(0)
+        points = generator.uniform(-100.0, 100.0, (2000, 3))
+        queries = generator.uniform(-120.0, 120.0, (200, 3))
+        index = mission.WaypointIndex(points)
+
+        # Run
+        actual = [index.nearest(*query) for query in queries]
+
+        # Test
+        distances = np.linalg.norm(points[np.newaxis, :, :] - queries[:, np.newaxis, :], axis=2)
+        assert [i for i, _ in actual] == np.argmin(distances, axis=1).tolist()
+        np.testing.assert_allclose([d for _, d in actual], distances.min(axis=1))
+
+
+class TestMission:
+    """
+    Waypoint switching.
+    """
+
+    def test_precomputed_legs(self, square: mission.Mission) -> None:
+        """
+        Heading, climb and length of each leg.
+        """
+        # Test
+        np.testing.assert_allclose(square.leg_lengths, [0.0, 10.0, np.hypot(10.0, 10.0)])
+        np.testing.assert_allclose(square.leg_headings[1:], [0.0, np.pi / 2.0])
+        np.testing.assert_allclose(square.leg_climbs, [0.0, 0.0, 10.0])
+
+    def test_reached_within_radius(self, square: mission.Mission) -> None:
+        """
+        The next waypoint becomes active once the current one is reached.
+        """
+        # Run
+        far = square.update(5.0, 5.0, 10.0)
+        near = square.update(0.5, 0.0, 10.0)
+
+        # Test
+        assert not far
+        assert near
+        assert square.active_target == WAYPOINTS[1]
+
+    def test_passed_end_of_leg(self, square: mission.Mission) -> None:
+        """
+        Overshooting a waypoint outside the radius still switches.
+        """
+        # Setup
+        square.update(0.0, 0.0, 10.0)
+
+        # Run
+        switched = square.update(12.0, -3.0, 10.0)
+
+        # Test
+        assert switched
+        assert square.active_index == 2
+
+    def test_complete_holds_last(self, square: mission.Mission) -> None:
+        """
+        The last waypoint stays the target after the mission is complete.
+        """
+        # Run
+        for point in WAYPOINTS:
+            square.update(*point)
+
+        # Test
+        assert square.is_complete
+        assert square.active_target == WAYPOINTS[-1]
+
+    def test_loop(self) -> None:
+        """
+        A looping mission starts over.
+        """
+        # Setup
+        looping = mission.Mission(WAYPOINTS, 1.0, loop=True)
+
+        # Run
+        for point in WAYPOINTS:
+            looping.update(*point)
+
+        # Test
+        assert not looping.is_complete
+        assert looping.active_index == 0
+
+    def test_start_nearest(self) -> None:
+        """
+        The first sample joins at the nearest waypoint.
+        """
+        # Setup
+        joining = mission.Mission(WAYPOINTS, 1.0, start_nearest=True)
+
+        # Run
+        joining.update(9.0, 8.0, 18.0)
+
+        # Test
+        assert joining.active_index == 2
+
+    def test_leg_target(self, square: mission.Mission) -> None:
+        """
+        Heading of the active leg and the altitude of its climb where the vehicle is along it.
+        """
+        # Setup
+        first = square.leg_target(-3.0, 4.0, 0.0)
+        square.update(0.0, 0.0, 10.0)
+        square.update(10.0, 0.0, 10.0)
+
+        # Run
+        heading, altitude = square.leg_target(12.0, 2.5, 10.0)
+        past_end = square.leg_target(10.0, 30.0, 10.0)
+
+        # Test
+        assert first == (pytest.approx(np.arctan2(-4.0, 3.0)), 10.0)
+        assert square.active_index == 2
+        # The leg climbs 1m per metre, so the point 5m further along it is 5 / sqrt(2) further
+        # north than the nearest point (10, 1.25)
+        assert heading == pytest.approx(np.arctan2(1.25 + 5.0 / np.sqrt(2.0) - 2.5, -2.0))
+        # The nearest point on the leg is an eighth of the way along its 10m climb
+        assert altitude == pytest.approx(11.25)
+        assert past_end[1] == pytest.approx(20.0)
+
+    def test_cross_track_correction(self) -> None:
+        """
+        On the leg the heading is the leg's, beside it the heading turns back towards it.
+        """
+        # Setup
+        flat = mission.Mission([(0.0, 0.0, 10.0), (100.0, 0.0, 10.0)], 1.0, look_ahead=5.0)
+        flat.update(0.0, 0.0, 10.0)
+
+        # Run
+        on_leg, _ = flat.leg_target(20.0, 0.0, 10.0)
+        left, _ = flat.leg_target(20.0, 5.0, 10.0)
+        right, _ = flat.leg_target(20.0, -5.0, 10.0)
+        near_end, _ = flat.leg_target(98.0, 1.0, 10.0)
+
+        # Test
+        assert flat.active_index == 1
+        assert on_leg == pytest.approx(0.0)
+        assert left == pytest.approx(-np.pi / 4.0)
+        assert right == pytest.approx(np.pi / 4.0)
+        # The aim stops at the waypoint
+        assert near_end == pytest.approx(np.arctan2(-1.0, 2.0))
+
+    def test_rejoin_when_astray(self) -> None:
+        """
+        Far from the active leg, the mission is rejoined at the nearest waypoint.
+        """
+        # Setup
+        straying = mission.Mission(WAYPOINTS, 1.0, rejoin_distance=5.0)
+
+        # Run
+        near = straying.update(3.0, 3.0, 10.0)
+        astray = straying.update(11.0, 12.0, 19.0)
+
+        # Test
+        assert not near
+        assert astray
+        assert straying.active_index == 2
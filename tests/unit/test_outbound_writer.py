@@ -0,0 +1,233 @@
+"""
+Test coalescing, rate limiting and batching of the outbound writer with a fake connection.
+"""
+
+import pytest
+from pymavlink import mavutil
+
+from tests.unit import fake_logger
+
+# The outbound writer logs through the common submodule
+pytest.importorskip("modules.common.modules.logger.logger")
+
+# Imported after the check above
+# pylint: disable=wrong-import-position
+from modules.connection import outbound_channel
+from modules.connection import outbound_writer
+
+# pylint: enable=wrong-import-position
+
+
+# Test functions use test fixture signature names and access class privates
+# No enable
+# pylint: disable=protected-access,redefined-outer-name
+
+
+RATE_LIMITS = {"COMMAND_LONG": (1.0, 2.0), "HEARTBEAT": (1.0, 1.0)}
+MAX_PENDING = 4
+
+
+class FakeConnection:
+    """
+    Real encoder, records what is written instead of sending it.
+    """
+
+    def __init__(self) -> None:
+        self.mav = mavutil.mavlink.MAVLink(None, srcSystem=255, srcComponent=0)
+        self.writes: "list[bytes]" = []
+
+    def write(self, buffer: bytes) -> None:
+        """
+        Same as mavfile.write().
+        """
+        self.writes.append(bytes(buffer))
+
+    def decoded(self) -> "list[mavutil.mavlink.MAVLink_message]":
+        """
+        Every message written so far.
+        """
+        parser = mavutil.mavlink.MAVLink(None)
+        messages = []
+        for buffer in self.writes:
+            messages.extend(parser.parse_buffer(buffer) or [])
+        return messages
+
+
+def command_long(
+    target_system: int, command_id: int, param1: float = 0.0
+) -> outbound_channel.OutboundMessage:
+    """
+    COMMAND_LONG as queued by OutboundChannel.
+    """
+    return outbound_channel.OutboundMessage(
+        "command_long", (target_system, 0, command_id, 0, param1, 0, 0, 0, 0, 0, 0), {}
+    )
+
+
+@pytest.fixture()
+def connection() -> FakeConnection:  # type: ignore
+    """
+    Connection that records writes.
+    """
+    yield FakeConnection()  # type: ignore
+
+
+@pytest.fixture()
+def writer(
+    connection: FakeConnection, local_logger: fake_logger.FakeLogger
+) -> outbound_writer.OutboundWriter:  # type: ignore
+    """
+    Writer with slow rates, so nothing beyond the burst is sent during a test.
+    """
+    result, instance = outbound_writer.OutboundWriter.create(
+        connection, RATE_LIMITS, local_logger, MAX_PENDING  # type: ignore
+    )
+    assert result
+    assert instance is not None
+
+    yield instance  # type: ignore
+
+
+class TestRateLimits:
+    """
+    Rates apply to each target system.
+    """
+
+    def test_per_target_system(
+        self, connection: FakeConnection, writer: outbound_writer.OutboundWriter
+    ) -> None:
+        """
+        One system using up its burst does not hold back another.
+        """
+        # Setup
+        messages = [command_long(1, command_id) for command_id in (1, 2, 3)]
+        messages.append(command_long(2, 1))
+
+        # Run
+        sent = writer.run(messages)
+
+        # Test
+        assert sent == 3
+        decoded = [(message.target_system, message.command) for message in connection.decoded()]
+        assert decoded == [(1, 1), (1, 2), (2, 1)]
+        assert len(writer._pending) == 1
+        # Waiting on tokens rather than polling
+        assert writer.time_until_next_send() > 0.05
+
+    def test_keyword_target_system(
+        self, connection: FakeConnection, writer: outbound_writer.OutboundWriter
+    ) -> None:
+        """
+        The target system is found in keyword arguments too.
+        """
+        # Setup
+        message = outbound_channel.OutboundMessage(
+            "command_long",
+            (),
+            {
+                "target_system": 3,
+                "target_component": 0,
+                "command": 1,
+                "confirmation": 0,
+                "param1": 0,
+                "param2": 0,
+                "param3": 0,
+                "param4": 0,
+                "param5": 0,
+                "param6": 0,
+                "param7": 0,
+            },
+        )
+
+        # Run
+        writer.run([command_long(1, 1), command_long(1, 2), message])
+
+        # Test
+        assert [message.target_system for message in connection.decoded()] == [1, 1, 3]
+        assert ("COMMAND_LONG", 3) in writer._buckets
+
+    def test_broadcast_shares_a_rate(
+        self, connection: FakeConnection, writer: outbound_writer.OutboundWriter
+    ) -> None:
+        """
+        Messages without a target system share one rate for their type.
+        """
+        # Setup
+        heartbeat = outbound_channel.OutboundMessage(
+            "heartbeat",
+            (mavutil.mavlink.MAV_TYPE_GCS, mavutil.mavlink.MAV_AUTOPILOT_INVALID, 0, 0, 0),
+            {},
+        )
+
+        # Run
+        sent = writer.run([heartbeat, heartbeat])
+
+        # Test
+        assert sent == 1
+        assert len(connection.decoded()) == 1
+        assert list(writer._buckets) == [("HEARTBEAT", None)]
+
+
+class TestPending:
+    """
+    Coalescing, batching and the pending limit.
+    """
+
+    def test_coalesced_by_key(
+        self, connection: FakeConnection, writer: outbound_writer.OutboundWriter
+    ) -> None:
+        """
+        A newer COMMAND_LONG with the same target and command replaces the pending one in place.
+        """
+        # Setup
+        writer.run([command_long(1, 1), command_long(1, 2)])
+        connection.writes.clear()
+
+        # Run
+        writer.run([command_long(1, 3, 1.0), command_long(1, 4), command_long(1, 3, 2.0)])
+
+        # Test
+        assert writer.coalesced_count == 1
+        assert [(message.args[2], message.args[4]) for message in writer._pending.values()] == [
+            (3, 2.0),
+            (4, 0.0),
+        ]
+        assert not connection.writes
+
+    def test_batched(
+        self, connection: FakeConnection, writer: outbound_writer.OutboundWriter
+    ) -> None:
+        """
+        Everything sendable in one run is written at once.
+        """
+        # Run
+        sent = writer.run([command_long(1, 1), command_long(2, 1), command_long(3, 1)])
+
+        # Test
+        assert sent == 3
+        assert writer.write_count == 1
+        assert len(connection.writes) == 1
+        assert [message.target_system for message in connection.decoded()] == [1, 2, 3]
+
+    def test_oldest_dropped(
+        self,
+        connection: FakeConnection,
+        local_logger: fake_logger.FakeLogger,
+        writer: outbound_writer.OutboundWriter,
+    ) -> None:
+        """
+        Beyond max_pending the oldest waiting message is dropped.
+        """
+        # Setup
+        writer.run([command_long(1, 1), command_long(1, 2)])
+
+        # Run
+        writer.run([command_long(1, command_id) for command_id in range(3, 3 + MAX_PENDING + 2)])
+
+        # Test
+        assert writer.dropped_count == 2
+        assert local_logger.warning_count == 2
+        assert [message.args[2] for message in writer._pending.values()] == list(
+            range(5, 5 + MAX_PENDING)
+        )
+        assert len(connection.decoded()) == 2
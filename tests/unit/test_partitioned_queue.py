@@ -0,0 +1,136 @@
+"""
+Test consistent hashing and key routed partitions.
+"""
+
+import queue
+
+import pytest
+
+from utilities.workers import partitioned_queue
+from utilities.workers import queue_proxy_wrapper
+
+
+# Test functions use test fixture signature names and access class privates
+# No enable
+# pylint: disable=protected-access,redefined-outer-name
+
+
+PARTITION_COUNT = 4
+KEY_COUNT = 1000
+
+
+class FakeManager:
+    """
+    Hands out in process queues instead of starting a manager process.
+    """
+
+    def Queue(self, maxsize: int) -> queue.Queue:  # pylint: disable=invalid-name
+        """
+        Same signature as SyncManager.Queue().
+        """
+        return queue.Queue(maxsize)
+
+
+class FakeSample:
+    """
+    Item with a system ID.
+    """
+
+    def __init__(self, system_id: int) -> None:
+        self.system_id = system_id
+
+
+@pytest.fixture()
+def partitioned() -> partitioned_queue.PartitionedQueue:  # type: ignore
+    """
+    Partitions of 2 items each, routed by system ID.
+    """
+    partitions = [
+        queue_proxy_wrapper.QueueProxyWrapper(FakeManager(), 2) for _ in range(PARTITION_COUNT)
+    ]
+    yield partitioned_queue.PartitionedQueue(partitions, "system_id")  # type: ignore
+
+
+class TestConsistentHashRing:
+    """
+    Key to partition mapping.
+    """
+
+    def test_spread(self) -> None:
+        """
+        Every partition gets a fair share of the keys.
+        """
+        # Setup
+        ring = partitioned_queue.ConsistentHashRing(PARTITION_COUNT)
+
+        # Run
+        counts = [0] * PARTITION_COUNT
+        for key in range(KEY_COUNT):
+            counts[ring.partition(key)] += 1
+
+        # Test
+        assert min(counts) > KEY_COUNT / PARTITION_COUNT / 2
+        assert max(counts) < KEY_COUNT / PARTITION_COUNT * 2
+
+    def test_adding_partition_only_moves_to_it(self) -> None:
+        """
+        Keys either stay or move to the new partition.
+        """
+        # Setup
+        before = partitioned_queue.ConsistentHashRing(PARTITION_COUNT)
+        after = partitioned_queue.ConsistentHashRing(PARTITION_COUNT + 1)
+
+        # Run
+        moved = [key for key in range(KEY_COUNT) if before.partition(key) != after.partition(key)]
+
+        # Test
+        assert 0 < len(moved) < KEY_COUNT / 2
+        assert all(after.partition(key) == PARTITION_COUNT for key in moved)
+
+
+class TestPartitionedQueue:
+    """
+    Routing of puts.
+    """
+
+    def test_same_key_same_partition(self, partitioned: partitioned_queue.PartitionedQueue) -> None:
+        """
+        Samples of one vehicle all land in one partition.
+        """
+        # Setup
+        expected = partitioned.partition_index(7)
+
+        # Run
+        partitioned.queue.put(FakeSample(7))
+        partitioned.queue.put_nowait(FakeSample(7))
+
+        # Test
+        sizes = [partition.queue.qsize() for partition in partitioned.partitions]
+        assert sizes[expected] == 2
+        assert sum(sizes) == 2
+        assert partitioned.queue.qsize() == 2
+
+    def test_full_partition(self, partitioned: partitioned_queue.PartitionedQueue) -> None:
+        """
+        A full partition raises even though others have room.
+        """
+        # Setup
+        partitioned.queue.put_nowait(FakeSample(1))
+        partitioned.queue.put_nowait(FakeSample(1))
+
+        # Run and test
+        with pytest.raises(queue.Full):
+            partitioned.queue.put_nowait(FakeSample(1))
+
+    def test_sentinel_to_every_partition(
+        self, partitioned: partitioned_queue.PartitionedQueue
+    ) -> None:
+        """
+        None reaches every consumer.
+        """
+        # Run
+        partitioned.queue.put(None)
+
+        # Test
+        assert all(partition.queue.get_nowait() is None for partition in partitioned.partitions)
+        assert partitioned.queue.empty()
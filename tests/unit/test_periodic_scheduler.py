@@ -0,0 +1,170 @@
+"""
+Test the periodic scheduler with a simulated clock.
+"""
+
+import pytest
+
+from utilities.workers import periodic_scheduler
+
+
+# Test functions use test fixture signature names and access class privates
+# No enable
+# pylint: disable=protected-access,redefined-outer-name
+
+
+class FakeClock:
+    """
+    Clock that only moves when slept on, oversleeping by a fixed amount.
+    """
+
+    def __init__(self, overshoot: float = 0.0) -> None:
+        self.now = 0.0
+        self.overshoot = overshoot
+
+    def time(self) -> float:
+        """
+        Same as time.monotonic().
+        """
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        """
+        Same as time.sleep().
+        """
+        self.now += seconds + self.overshoot
+
+
+@pytest.fixture()
+def clock() -> FakeClock:  # type: ignore
+    """
+    Clock oversleeping by 3ms every time.
+    """
+    yield FakeClock(0.003)  # type: ignore
+
+
+@pytest.fixture()
+def scheduler(clock: FakeClock) -> periodic_scheduler.PeriodicScheduler:  # type: ignore
+    """
+    Scheduler on the fake clock.
+    """
+    yield periodic_scheduler.PeriodicScheduler(clock.time, clock.sleep)  # type: ignore
+
+
+class TestPeriodicScheduler:
+    """
+    Deadlines, missed policies and jitter.
+    """
+
+    def test_no_drift(
+        self, clock: FakeClock, scheduler: periodic_scheduler.PeriodicScheduler
+    ) -> None:
+        """
+        Oversleeping and slow callbacks do not push later runs back.
+        """
+        # Setup
+        runs = []
+
+        def work() -> None:
+            runs.append(clock.now)
+            clock.now += 0.01
+
+        scheduler.add("work", 1.0, work)
+
+        # Run
+        while len(runs) < 100:
+            scheduler.run_next(1.0)
+
+        # Test
+        assert len(runs) == 100
+        for i, run in enumerate(runs):
+            assert run == pytest.approx(i * 1.0, abs=0.004)
+
+        statistics = scheduler.statistics()[0]
+        assert statistics.run_count == 100
+        assert statistics.skipped_count == 0
+        assert statistics.max_jitter == pytest.approx(0.003)
+
+    def test_many_tasks(
+        self, clock: FakeClock, scheduler: periodic_scheduler.PeriodicScheduler
+    ) -> None:
+        """
+        Tasks of different periods share the thread and run in deadline order.
+        """
+        # Setup
+        runs = []
+        scheduler.add("fast", 0.25, lambda: runs.append("fast"))
+        scheduler.add("slow", 1.0, lambda: runs.append("slow"), delay=0.1)
+
+        # Run
+        while clock.now < 1.2:
+            scheduler.run_next(0.05)
+
+        # Test
+        assert runs == ["fast", "slow", "fast", "fast", "fast", "fast", "slow"]
+        assert scheduler.next_deadline == pytest.approx(1.25)
+
+    def test_skip(self, clock: FakeClock, scheduler: periodic_scheduler.PeriodicScheduler) -> None:
+        """
+        After a stall a skipping task runs once and stays on its original grid.
+        """
+        # Setup
+        runs = []
+        scheduler.add("skip", 1.0, lambda: runs.append(clock.now))
+        scheduler.run_pending()
+
+        # Run
+        clock.now = 3.5
+        scheduler.run_pending()
+
+        # Test
+        assert runs == [0.0, 3.5]
+        assert scheduler.next_deadline == pytest.approx(4.0)
+        assert scheduler.statistics()[0].skipped_count == 2
+
+    def test_catch_up(
+        self, clock: FakeClock, scheduler: periodic_scheduler.PeriodicScheduler
+    ) -> None:
+        """
+        After a stall a catching up task runs for every deadline it missed.
+        """
+        # Setup
+        runs = []
+        scheduler.add(
+            "catch up",
+            1.0,
+            lambda: runs.append(clock.now),
+            periodic_scheduler.MissedPolicy.CATCH_UP,
+        )
+        scheduler.run_pending()
+
+        # Run
+        clock.now = 3.5
+        runs_made = scheduler.run_pending()
+
+        # Test
+        assert runs_made == 3
+        assert len(runs) == 4
+        assert scheduler.next_deadline == pytest.approx(4.0)
+        assert scheduler.statistics()[0].max_jitter == pytest.approx(2.5)
+
+    def test_remove(
+        self, clock: FakeClock, scheduler: periodic_scheduler.PeriodicScheduler
+    ) -> None:
+        """
+        Removed tasks stop running.
+        """
+        # Setup
+        runs = []
+        scheduler.add("removed", 1.0, lambda: runs.append(clock.now))
+        scheduler.run_pending()
+
+        # Run
+        scheduler.remove("removed")
+        clock.now = 5.0
+        runs_made = scheduler.run_pending()
+
+        # Test
+        assert runs_made == 0
+        assert runs == [0.0]
+        assert scheduler.next_deadline is None
+        assert not scheduler.statistics()
@@ -0,0 +1,126 @@
+"""
+Test the phi accrual failure detector.
+"""
+
+import pytest
+
+from modules.heartbeat import phi_accrual
+
+
+# Test functions use test fixture signature names and access class privates
+# No enable
+# pylint: disable=protected-access,redefined-outer-name
+
+
+PERIOD = 1.0  # seconds
+THRESHOLD = 8.0
+
+
+@pytest.fixture()
+def detector() -> phi_accrual.PhiAccrualDetector:  # type: ignore
+    """
+    Detector that has seen 20 heartbeats exactly one period apart.
+    """
+    instance = phi_accrual.PhiAccrualDetector(PERIOD, 10, 0.1)
+    for i in range(20):
+        instance.heartbeat(i * PERIOD)
+    yield instance  # type: ignore
+
+
+class TestPhiAccrual:
+    """
+    Suspicion from inter-arrival times.
+    """
+
+    def test_before_first_heartbeat(self) -> None:
+        """
+        Nothing to suspect before anything was heard.
+        """
+        # Setup
+        instance = phi_accrual.PhiAccrualDetector(PERIOD)
+
+        # Run
+        phi = instance.phi(100.0)
+        deadline = instance.deadline(THRESHOLD)
+
+        # Test
+        assert phi == 0.0
+        assert deadline is None
+
+    def test_learns_interval(self, detector: phi_accrual.PhiAccrualDetector) -> None:
+        """
+        The seeds leave the window once it has filled with observed intervals.
+        """
+        # Test
+        assert detector.mean == pytest.approx(PERIOD)
+        assert detector.std == pytest.approx(0.1)
+
+    def test_phi_rises(self, detector: phi_accrual.PhiAccrualDetector) -> None:
+        """
+        Suspicion grows the longer nothing arrives.
+        """
+        # Setup
+        last = detector.last_heartbeat
+        assert last is not None
+
+        # Run
+        phis = [detector.phi(last + delay) for delay in (0.5, 1.0, 1.2, 1.5, 3.0)]
+
+        # Test
+        assert phis == sorted(phis)
+        assert phis[1] == pytest.approx(0.30103, abs=1e-4)
+        assert phis[-1] > 15.0
+
+    def test_deadline_matches_phi(self, detector: phi_accrual.PhiAccrualDetector) -> None:
+        """
+        The deadline is where phi reaches the threshold.
+        """
+        # Run
+        deadline = detector.deadline(THRESHOLD)
+
+        # Test
+        assert deadline is not None
+        assert detector.phi(deadline) == pytest.approx(THRESHOLD, abs=1e-6)
+        assert detector.phi(deadline - 0.01) < THRESHOLD
+
+    def test_irregular_heartbeats(self) -> None:
+        """
+        A jittery sender is given more slack than a regular one.
+        """
+        # Setup
+        regular = phi_accrual.PhiAccrualDetector(PERIOD, 10, 0.01)
+        jittery = phi_accrual.PhiAccrualDetector(PERIOD, 10, 0.01)
+        now = 0.0
+        for i in range(20):
+            regular.heartbeat(i * PERIOD)
+            jittery.heartbeat(now)
+            now += PERIOD + (0.3 if i % 2 == 0 else -0.3)
+
+        # Run
+        regular_deadline = regular.deadline(THRESHOLD)
+        jittery_deadline = jittery.deadline(THRESHOLD)
+
+        # Test
+        assert regular_deadline is not None and jittery_deadline is not None
+        assert regular.last_heartbeat is not None and jittery.last_heartbeat is not None
+        jittery_slack = jittery_deadline - jittery.last_heartbeat
+        regular_slack = regular_deadline - regular.last_heartbeat
+        assert jittery_slack > regular_slack + 0.5
+
+    def test_unknown_interval(self, detector: phi_accrual.PhiAccrualDetector) -> None:
+        """
+        A heartbeat after an outage moves the last arrival without learning the outage.
+        """
+        # Setup
+        last = detector.last_heartbeat
+        assert last is not None
+        slack = detector.deadline(THRESHOLD) - last  # type: ignore
+
+        # Run
+        detector.heartbeat(last + 60.0, False)
+        deadline = detector.deadline(THRESHOLD)
+
+        # Test
+        assert detector.last_heartbeat == last + 60.0
+        assert detector.mean == pytest.approx(PERIOD)
+        assert deadline == pytest.approx(last + 60.0 + slack)
@@ -0,0 +1,144 @@
+"""
+Test deadlines on queued items.
+"""
+
+import queue
+import time
+
+import pytest
+
+from utilities.workers import queue_proxy_wrapper
+
+
+# Test functions use test fixture signature names and access class privates
+# No enable
+# pylint: disable=protected-access,redefined-outer-name
+
+
+DEADLINE = 0.2  # seconds
+
+
+class FakeManager:
+    """
+    Hands out in process queues instead of starting a manager process.
+    """
+
+    def Queue(self, maxsize: int) -> queue.Queue:  # pylint: disable=invalid-name
+        """
+        Same signature as SyncManager.Queue().
+        """
+        return queue.Queue(maxsize)
+
+
+class FakeSample:
+    """
+    Item created at a given time.
+    """
+
+    def __init__(self, timestamp: float | None) -> None:
+        self.timestamp = timestamp
+
+
+@pytest.fixture()
+def link() -> queue_proxy_wrapper.QueueProxyWrapper:  # type: ignore
+    """
+    Queue of 5 items with a deadline.
+    """
+    yield queue_proxy_wrapper.QueueProxyWrapper(FakeManager(), 5, DEADLINE)  # type: ignore
+
+
+class TestDeadline:
+    """
+    Expiry at dequeue.
+    """
+
+    def test_fresh_returned(self, link: queue_proxy_wrapper.QueueProxyWrapper) -> None:
+        """
+        Items within the deadline come out unchanged.
+        """
+        # Setup
+        sample = FakeSample(time.monotonic())
+        link.queue.put(sample)
+
+        # Run
+        actual = link.queue.get_nowait()
+
+        # Test
+        assert actual is sample
+        assert link.expired_count == 0
+
+    def test_expired_dropped(self, link: queue_proxy_wrapper.QueueProxyWrapper) -> None:
+        """
+        Items past their deadline are skipped and counted.
+        """
+        # Setup
+        now = time.monotonic()
+        fresh = FakeSample(now)
+        link.queue.put(FakeSample(now - 1.0))
+        link.queue.put(FakeSample(now - DEADLINE * 2.0))
+        link.queue.put(fresh)
+
+        # Run
+        actual = link.queue.get(timeout=0.1)
+
+        # Test
+        assert actual is fresh
+        assert link.expired_count == 2
+        assert link.queue.empty()
+
+    def test_only_expired(self, link: queue_proxy_wrapper.QueueProxyWrapper) -> None:
+        """
+        Nothing fresh behaves like an empty queue.
+        """
+        # Setup
+        link.queue.put(FakeSample(time.monotonic() - 1.0))
+
+        # Run and test
+        with pytest.raises(queue.Empty):
+            link.queue.get_nowait()
+        assert link.expired_count == 1
+
+    def test_only_expired_waits_timeout(self, link: queue_proxy_wrapper.QueueProxyWrapper) -> None:
+        """
+        Waiting for a fresh item behind expired ones gives up after the timeout.
+        """
+        # Setup
+        link.queue.put(FakeSample(time.monotonic() - 1.0))
+        start = time.monotonic()
+
+        # Run and test
+        with pytest.raises(queue.Empty):
+            link.queue.get(timeout=0.05)
+        assert time.monotonic() - start == pytest.approx(0.05, abs=0.03)
+        assert link.expired_count == 1
+
+    def test_stamped_at_put(self, link: queue_proxy_wrapper.QueueProxyWrapper) -> None:
+        """
+        Items without a timestamp are created when put, and sentinels never expire.
+        """
+        # Setup
+        sample = FakeSample(None)
+        link.queue.put(sample)
+        link.fill_queue_with_sentinel()
+
+        # Run
+        actual = link.queue.get_nowait()
+
+        # Test
+        assert actual is sample
+        assert link.queue.get_nowait() is None
+
+    def test_no_deadline(self) -> None:
+        """
+        Without a deadline the queue is the plain one.
+        """
+        # Setup
+        plain = queue_proxy_wrapper.QueueProxyWrapper(FakeManager(), 5)
+
+        # Run
+        plain.queue.put(FakeSample(0.0))
+
+        # Test
+        assert isinstance(plain.queue, queue.Queue)
+        assert plain.queue.get_nowait().timestamp == 0.0
+        assert plain.expired_count == 0
@@ -0,0 +1,297 @@
+"""
+Test re-dialing, buffering and reconnect ownership with fake connections.
+"""
+
+import time
+
+import pytest
+
+from tests.unit import fake_logger
+
+# The reconnecting connection logs through the common submodule
+pytest.importorskip("modules.common.modules.logger.logger")
+
+# Imported after the check above
+# pylint: disable=wrong-import-position
+from modules.connection import connection_factory
+from modules.connection import reconnecting_connection
+
+# pylint: enable=wrong-import-position
+
+
+# Test functions use test fixture signature names and access class privates
+# No enable
+# pylint: disable=protected-access,redefined-outer-name
+
+
+INITIAL_BACKOFF = 0.01  # seconds
+MAX_BACKOFF = 0.05  # seconds
+HANDSHAKE_TIMEOUT = 0.5  # seconds
+MAX_BUFFERED = 3
+
+
+class FakeMav:
+    """
+    Records what is sent.
+    """
+
+    def __init__(self) -> None:
+        self.sent: "list[tuple[str, tuple]]" = []
+
+    def heartbeat_send(self, *args: object) -> None:
+        """
+        Same as MAVLink.heartbeat_send().
+        """
+        self.sent.append(("heartbeat_send", args))
+
+    def command_long_send(self, *args: object) -> None:
+        """
+        Same as MAVLink.command_long_send().
+        """
+        self.sent.append(("command_long_send", args))
+
+
+class FakeConnection:
+    """
+    Hands out the heartbeats it is given.
+    """
+
+    def __init__(self) -> None:
+        self.mav = FakeMav()
+        self.target_system = 1
+        self.heartbeats = 0
+        self.closed = False
+
+    def recv_match(
+        self,
+        condition: str | None = None,
+        type: "str | list[str] | None" = None,  # pylint: disable=redefined-builtin
+        blocking: bool = False,
+        timeout: float | None = None,
+    ) -> str | None:
+        """
+        Same signature as mavfile.recv_match(), never blocks.
+        """
+        assert condition is None and not blocking and timeout is None
+        assert type in (None, "HEARTBEAT")
+        if self.heartbeats == 0:
+            return None
+        self.heartbeats -= 1
+        return "HEARTBEAT"
+
+    def select(self, _timeout: float) -> bool:
+        """
+        Same signature as mavfile.select().
+        """
+        return False
+
+    def close(self) -> None:
+        """
+        Same as mavfile.close().
+        """
+        self.closed = True
+
+
+class FakeFactory:
+    """
+    Stand-in for connection_factory.create_connection(), dialing fails while down.
+    """
+
+    def __init__(self) -> None:
+        self.up = True
+        # Waiting on each new connection
+        self.heartbeats = 1
+        self.dialed: "list[FakeConnection]" = []
+
+    def create_connection(
+        self,
+        _connection_string: str,
+        _options: connection_factory.SocketOptions,
+        _local_logger: object,
+        **_connection_kwargs: object,
+    ) -> "tuple[bool, FakeConnection | None]":
+        """
+        A new connection with the drone's heartbeats waiting, if up.
+        """
+        if not self.up:
+            return False, None
+
+        connection = FakeConnection()
+        connection.heartbeats = self.heartbeats
+        self.dialed.append(connection)
+        return True, connection
+
+
+@pytest.fixture()
+def factory(monkeypatch: pytest.MonkeyPatch) -> FakeFactory:  # type: ignore
+    """
+    Replaces dialing, without jitter on the backoff.
+    """
+    fake = FakeFactory()
+    monkeypatch.setattr(connection_factory, "create_connection", fake.create_connection)
+    monkeypatch.setattr(reconnecting_connection.random, "random", lambda: 1.0)
+    yield fake  # type: ignore
+
+
+def make_connection() -> reconnecting_connection.ReconnectingConnection:
+    """
+    Connection with short backoffs and a small buffer.
+    """
+    result, instance = reconnecting_connection.ReconnectingConnection.create(
+        "tcp:localhost:5760",
+        connection_factory.SocketOptions(),
+        fake_logger.FakeLogger(),  # type: ignore
+        handshake_timeout=HANDSHAKE_TIMEOUT,
+        initial_backoff=INITIAL_BACKOFF,
+        max_backoff=MAX_BACKOFF,
+        max_buffered=MAX_BUFFERED,
+    )
+    assert result
+    assert instance is not None
+    return instance
+
+
+@pytest.fixture()
+def connection(factory: FakeFactory) -> reconnecting_connection.ReconnectingConnection:  # type: ignore
+    """
+    Connected, recovering its own link.
+    """
+    assert factory.up
+    yield make_connection()  # type: ignore
+
+
+class TestReconnectingConnection:
+    """
+    Backoff, buffering, metrics and the handshake.
+    """
+
+    def test_backoff(
+        self, factory: FakeFactory, connection: reconnecting_connection.ReconnectingConnection
+    ) -> None:
+        """
+        Each failed attempt doubles the wait up to the maximum.
+        """
+        # Setup
+        factory.up = False
+        connection._handle_disconnect()
+
+        # Run
+        waits = []
+        for _ in range(4):
+            connection._next_attempt_time = 0.0
+            connection.check_connection()
+            waits.append(connection._next_attempt_time - time.monotonic())
+
+        # Test
+        expected = [0.02, 0.04, 0.05, 0.05]
+        for wait, expected_wait in zip(waits, expected):
+            assert wait == pytest.approx(expected_wait, abs=0.005)
+        assert not connection.is_connected
+        assert len(factory.dialed) == 1
+
+    def test_buffered_during_outage(
+        self, factory: FakeFactory, connection: reconnecting_connection.ReconnectingConnection
+    ) -> None:
+        """
+        Sends while down are kept, oldest dropped first, and sent in order after the handshake.
+        """
+        # Setup
+        connection._handle_disconnect()
+
+        # Run
+        for i in range(MAX_BUFFERED + 2):
+            connection.mav.command_long_send(1, 0, i)
+        buffered = connection.get_metrics()
+        time.sleep(INITIAL_BACKOFF)
+        reconnected = connection.check_connection()
+        metrics = connection.get_metrics()
+
+        # Test
+        assert buffered.buffered_count == MAX_BUFFERED
+        assert buffered.dropped_count == 2
+        assert not buffered.is_connected
+        assert reconnected
+        assert metrics.is_connected
+        assert metrics.reconnect_count == 1
+        assert metrics.buffered_count == 0
+        assert metrics.downtime >= INITIAL_BACKOFF
+        assert factory.dialed[-1].mav.sent[0][0] == "heartbeat_send"
+        assert factory.dialed[-1].mav.sent[1:] == [
+            ("command_long_send", (1, 0, 2)),
+            ("command_long_send", (1, 0, 3)),
+            ("command_long_send", (1, 0, 4)),
+        ]
+
+    def test_handshake_does_not_block(
+        self, factory: FakeFactory, connection: reconnecting_connection.ReconnectingConnection
+    ) -> None:
+        """
+        Without a heartbeat yet the call returns at once, a later one completes the handshake.
+        """
+        # Setup
+        connection._handle_disconnect()
+        connection._next_attempt_time = 0.0
+        factory.heartbeats = 0
+
+        # Run
+        start = time.monotonic()
+        first = connection.check_connection()
+        still_waiting = connection.check_connection()
+        elapsed = time.monotonic() - start
+
+        dialed = factory.dialed[-1]
+        dialed.heartbeats = 1
+        completed = connection.check_connection()
+
+        # Test
+        assert not first
+        assert not still_waiting
+        assert elapsed < HANDSHAKE_TIMEOUT / 2.0
+        assert completed
+        assert len(factory.dialed) == 2
+        assert connection.connection is dialed
+
+
+class TestReconnectOwnership:
+    """
+    Copies sharing state leave re-dialing to the one that claimed it.
+    """
+
+    def test_reader_follows_writer(self, factory: FakeFactory) -> None:
+        """
+        The reader reports the drop and waits, the writer re-dials, then the reader re-opens.
+        """
+        # Setup
+        shared: dict = {}
+        writer = make_connection()
+        reader = make_connection()
+        writer.share_state(shared)
+        reader.share_state(shared)
+        writer.claim_reconnect()
+        initial_dials = len(factory.dialed)
+
+        # Run
+        reader._handle_disconnect()
+        time.sleep(INITIAL_BACKOFF)
+        waiting = reader.check_connection()
+        dials_while_waiting = len(factory.dialed) - initial_dials
+
+        # The writer only learns of it from the reader
+        writer_first = writer.check_connection()
+        time.sleep(INITIAL_BACKOFF)
+        writer_second = writer.check_connection()
+
+        reader._next_attempt_time = 0.0
+        reader_reopened = reader.check_connection()
+
+        # Test
+        assert not waiting
+        assert dials_while_waiting == 0
+        assert not writer_first
+        assert writer_second
+        assert reader_reopened
+        assert shared["generation"] == 1
+        assert len(factory.dialed) == initial_dials + 2
+        # Only the writer handshakes, the reader's connection is read-only
+        assert factory.dialed[-2].mav.sent[0][0] == "heartbeat_send"
+        assert not factory.dialed[-1].mav.sent
@@ -0,0 +1,102 @@
+"""
+Test constant time running statistics.
+"""
+
+import numpy as np
+import pytest
+
+from utilities.statistics import running_statistics
+
+
+# Test functions use test fixture signature names and access class privates
+# No enable
+# pylint: disable=protected-access,redefined-outer-name
+
+
+SAMPLES = [(1.0, -1.0), (2.0, -2.0), (6.0, 0.0), (3.0, 5.0)]
+
+
+class TestCumulativeStatistics:
+    """
+    Welford mean and variance.
+    """
+
+    def test_matches_numpy(self) -> None:
+        """
+        Same as computing over the whole history.
+        """
+        # Setup
+        stats = running_statistics.CumulativeStatistics(2)
+
+        # Run
+        for sample in SAMPLES:
+            stats.add(sample)
+
+        # Test
+        assert stats.count == len(SAMPLES)
+        np.testing.assert_allclose(stats.mean, np.mean(SAMPLES, axis=0))
+        np.testing.assert_allclose(stats.variance, np.var(SAMPLES, axis=0))
+
+    def test_empty(self) -> None:
+        """
+        Zero before any sample.
+        """
+        # Setup
+        stats = running_statistics.CumulativeStatistics(2)
+
+        # Run
+        variance = stats.variance
+
+        # Test
+        np.testing.assert_array_equal(stats.mean, [0.0, 0.0])
+        np.testing.assert_array_equal(variance, [0.0, 0.0])
+
+
+class TestSlidingWindowMean:
+    """
+    Mean of the last samples.
+    """
+
+    @pytest.mark.parametrize("count", [1, 2, 3, 4])
+    def test_window(self, count: int) -> None:
+        """
+        Partial and full windows, including after the sum is recomputed.
+        """
+        # Setup
+        window = running_statistics.SlidingWindowMean(2, 2)
+
+        # Run
+        for sample in SAMPLES[:count]:
+            window.add(sample)
+
+        # Test
+        expected = np.mean(SAMPLES[max(0, count - 2) : count], axis=0)
+        np.testing.assert_allclose(window.mean, expected)
+
+
+class TestExponentialMovingAverage:
+    """
+    Exponential weighting.
+    """
+
+    def test_weights(self) -> None:
+        """
+        First sample initializes, later ones move the average by alpha.
+        """
+        # Setup
+        average = running_statistics.ExponentialMovingAverage(0.5)
+
+        # Run
+        average.add((4.0,))
+        average.add((0.0,))
+
+        # Test
+        np.testing.assert_allclose(average.mean, [2.0])
+
+    def test_invalid_alpha(self) -> None:
+        """
+        Alpha outside (0, 1].
+        """
+        # Run and Test
+        with pytest.raises(AssertionError):
+            running_statistics.ExponentialMovingAverage(0.0)
@@ -0,0 +1,112 @@
+"""
+Test extrapolation of telemetry to the current time.
+"""
+
+import math
+
+import pytest
+
+from modules.command import state_predictor
+
+
+# Test functions use test fixture signature names and access class privates
+# No enable
+# pylint: disable=protected-access,redefined-outer-name
+
+
+class FakeTelemetryData:  # pylint: disable=too-many-instance-attributes
+    """
+    Has the fields of TelemetryData without importing the logger.
+    """
+
+    def __init__(self, timestamp: float | None, x: float, x_velocity: float, yaw: float) -> None:
+        self.x = x
+        self.y = 0.0
+        self.z = 0.0
+        self.x_velocity = x_velocity
+        self.y_velocity = 0.0
+        self.z_velocity = 0.0
+        self.roll = 0.0
+        self.pitch = 0.0
+        self.yaw = yaw
+        self.roll_speed = 0.0
+        self.pitch_speed = 0.0
+        self.yaw_speed = 1.0
+        self.timestamp = timestamp
+        self.position_age = 0.1
+        self.attitude_age = 0.0
+
+
+@pytest.fixture(params=list(state_predictor.PredictorKind))
+def predictor(request: pytest.FixtureRequest) -> state_predictor.StatePredictor:  # type: ignore
+    """
+    Predictor of each kind.
+    """
+    estimator = state_predictor.StatePredictor(request.param)
+    yield estimator  # type: ignore
+
+
+class TestStatePredictor:
+    """
+    Extrapolation and prediction error.
+    """
+
+    def test_no_timestamp_unchanged(self, predictor: state_predictor.StatePredictor) -> None:
+        """
+        Samples that do not say when they were valid are passed through.
+        """
+        # Setup
+        data = FakeTelemetryData(None, 1.0, 2.0, 0.0)
+
+        # Run
+        actual = predictor.predict(data, 10.0)
+
+        # Test
+        assert actual is data
+
+    def test_extrapolated_to_now(self, predictor: state_predictor.StatePredictor) -> None:
+        """
+        Position moves on by velocity times age, yaw by yaw rate and wraps.
+        """
+        # Setup
+        # Position arrived first, attitude 0.1s later
+        data = FakeTelemetryData(9.9, 1.0, 2.0, math.pi - 0.1)
+
+        # Run
+        actual = predictor.predict(data, 10.4)
+
+        # Test
+        # Position was valid at 9.9
+        assert actual.x == pytest.approx(2.0)
+        assert actual.yaw == pytest.approx(-math.pi + 0.3)
+        assert data.x == 1.0
+
+    def test_errors_on_constant_velocity(self, predictor: state_predictor.StatePredictor) -> None:
+        """
+        No error when the motion matches the model.
+        """
+        # Setup
+        for i in range(5):
+            predictor.predict(FakeTelemetryData(10.0 + i, 1.0 + 2.0 * i, 2.0, 0.0 + i), 10.0 + i)
+
+        # Run
+        errors = predictor.get_errors()
+
+        # Test
+        assert errors.count == 4
+        assert errors.max_position_error == pytest.approx(0.0, abs=1e-9)
+        assert errors.mean_yaw_error == pytest.approx(0.0, abs=1e-9)
+
+    def test_error_measured(self) -> None:
+        """
+        A jump the velocity did not predict shows up as error.
+        """
+        # Setup
+        estimator = state_predictor.StatePredictor()
+        estimator.predict(FakeTelemetryData(10.0, 0.0, 1.0, 0.0), 10.0)
+
+        # Run
+        estimator.predict(FakeTelemetryData(11.0, 3.0, 1.0, 1.0), 11.0)
+
+        # Test
+        assert estimator.get_errors().max_position_error == pytest.approx(2.0)
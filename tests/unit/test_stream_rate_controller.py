@@ -0,0 +1,271 @@
+"""
+Test stream rate requests, their retries and backoff with a fake connection.
+"""
+
+import time
+
+import pytest
+from pymavlink import mavutil
+
+from tests.unit import fake_logger
+
+# The rate controller logs through the common submodule
+pytest.importorskip("modules.common.modules.logger.logger")
+
+# Imported after the check above
+# pylint: disable=wrong-import-position
+from modules.telemetry import stream_rate_controller
+from modules.telemetry import telemetry
+
+# pylint: enable=wrong-import-position
+
+
+# Test functions use test fixture signature names and access class privates
+# No enable
+# pylint: disable=protected-access,redefined-outer-name
+
+
+IDLE_RATE = 2.0  # per second
+ACTIVE_RATE = 20.0  # per second
+PAUSED_RATE = 0.5  # per second
+ACK_TIMEOUT = 0.02  # seconds
+MAX_ATTEMPTS = 3
+
+ATTITUDE_ID = mavutil.mavlink.MAVLINK_MSG_ID_ATTITUDE
+POSITION_ID = mavutil.mavlink.MAVLINK_MSG_ID_LOCAL_POSITION_NED
+
+
+class RecordingMav:
+    """
+    Keeps the COMMAND_LONG arguments instead of sending them.
+    """
+
+    def __init__(self) -> None:
+        self.sent = []
+
+    def command_long_send(self, *args: object) -> None:
+        """
+        Record the call.
+        """
+        self.sent.append(args)
+
+    def requests(self) -> "list[tuple[int, float, int]]":
+        """
+        (message ID, rate, confirmation) of each SET_MESSAGE_INTERVAL sent.
+        """
+        return [
+            (args[4], 1_000_000 / args[5], args[3])
+            for args in self.sent
+            if args[2] == mavutil.mavlink.MAV_CMD_SET_MESSAGE_INTERVAL
+        ]
+
+
+class RecordingConnection:
+    """
+    Connection with a recording mav.
+    """
+
+    def __init__(self) -> None:
+        self.mav = RecordingMav()
+        self.target_system = 1
+
+
+class FakeAck:
+    """
+    COMMAND_ACK for SET_MESSAGE_INTERVAL.
+    """
+
+    def __init__(self, result: int = mavutil.mavlink.MAV_RESULT_ACCEPTED) -> None:
+        self.command = mavutil.mavlink.MAV_CMD_SET_MESSAGE_INTERVAL
+        self.result = result
+
+
+def hovering() -> telemetry.TelemetryData:
+    """
+    Holding still.
+    """
+    return telemetry.TelemetryData(x_velocity=0.0, y_velocity=0.0, z_velocity=0.0, yaw_speed=0.0)
+
+
+@pytest.fixture()
+def connection() -> RecordingConnection:  # type: ignore
+    """
+    Connection that records what is sent.
+    """
+    yield RecordingConnection()  # type: ignore
+
+
+@pytest.fixture()
+def controller(
+    connection: RecordingConnection, local_logger: fake_logger.FakeLogger
+) -> stream_rate_controller.StreamRateController:  # type: ignore
+    """
+    Controller with a short ACK timeout, started.
+    """
+    result, instance = stream_rate_controller.StreamRateController.create(
+        connection,  # type: ignore
+        local_logger,  # type: ignore
+        IDLE_RATE,
+        ACTIVE_RATE,
+        PAUSED_RATE,
+        ACK_TIMEOUT,
+        MAX_ATTEMPTS,
+    )
+    assert result
+    assert instance is not None
+    instance.start()
+
+    yield instance  # type: ignore
+
+
+def confirm_all(controller: stream_rate_controller.StreamRateController) -> None:
+    """
+    Accept every request until none is in flight.
+    """
+    while controller.in_flight is not None:
+        controller.handle_ack(FakeAck())
+
+
+class TestRequests:
+    """
+    One request in flight, confirmed by COMMAND_ACK.
+    """
+
+    def test_one_at_a_time(
+        self,
+        connection: RecordingConnection,
+        controller: stream_rate_controller.StreamRateController,
+    ) -> None:
+        """
+        The next stream is only requested once the previous one is acknowledged.
+        """
+        # Setup
+        waiting = connection.mav.requests()
+
+        # Run
+        controller.handle_ack(FakeAck())
+        after_ack = connection.mav.requests()
+        controller.handle_ack(FakeAck())
+
+        # Test
+        assert waiting == [(ATTITUDE_ID, ACTIVE_RATE, 0)]
+        assert after_ack[1:] == [(POSITION_ID, ACTIVE_RATE, 0)]
+        assert [stream.confirmed_rate for stream in controller.streams] == [
+            ACTIVE_RATE,
+            ACTIVE_RATE,
+        ]
+        assert controller.in_flight is None
+
+    def test_idle_and_paused(
+        self,
+        connection: RecordingConnection,
+        controller: stream_rate_controller.StreamRateController,
+    ) -> None:
+        """
+        Pausing drops to the paused rate, staying still drops to the idle rate after the hold.
+        """
+        # Setup
+        confirm_all(controller)
+        sent = len(connection.mav.requests())
+
+        # Run
+        controller.update(hovering(), 0.0, True)
+        confirm_all(controller)
+        paused = connection.mav.requests()[sent:]
+
+        controller.last_active_time -= 10.0
+        controller.update(hovering(), 0.0, False)
+        confirm_all(controller)
+        idle = connection.mav.requests()[sent + len(paused) :]
+
+        # Test
+        assert paused == [(ATTITUDE_ID, PAUSED_RATE, 0), (POSITION_ID, PAUSED_RATE, 0)]
+        assert idle == [(ATTITUDE_ID, IDLE_RATE, 0), (POSITION_ID, IDLE_RATE, 0)]
+
+
+class TestBackoff:
+    """
+    Retries, giving up and cutting rates for slow consumers.
+    """
+
+    def test_retried_then_held(
+        self,
+        connection: RecordingConnection,
+        local_logger: fake_logger.FakeLogger,
+        controller: stream_rate_controller.StreamRateController,
+    ) -> None:
+        """
+        An unanswered request is sent again up to the attempt limit, then that stream is left
+        alone while the other is requested.
+        """
+        # Run
+        for _ in range(MAX_ATTEMPTS):
+            time.sleep(ACK_TIMEOUT)
+            controller.update(None, 0.0, False)
+        requests = connection.mav.requests()
+
+        # Still held on the next update
+        controller.update(None, 0.0, False)
+
+        # Test
+        assert requests == [
+            (ATTITUDE_ID, ACTIVE_RATE, attempt) for attempt in range(MAX_ATTEMPTS)
+        ] + [(POSITION_ID, ACTIVE_RATE, 0)]
+        assert connection.mav.requests() == requests
+        assert controller.streams[0].wanted_rate is None
+        assert controller.streams[0].hold_until > time.monotonic()
+        assert local_logger.warning_count == 1
+
+    def test_rejected_held(
+        self,
+        connection: RecordingConnection,
+        local_logger: fake_logger.FakeLogger,
+        controller: stream_rate_controller.StreamRateController,
+    ) -> None:
+        """
+        A refused rate is not asked for again during the hold.
+        """
+        # Setup
+        confirm_all(controller)
+        controller.update(hovering(), 0.0, True)
+
+        # Run
+        controller.handle_ack(FakeAck(mavutil.mavlink.MAV_RESULT_DENIED))
+        controller.update(hovering(), 0.0, True)
+        confirm_all(controller)
+        controller.update(hovering(), 0.0, True)
+        requests = connection.mav.requests()
+
+        # Test
+        assert requests[2:] == [(ATTITUDE_ID, PAUSED_RATE, 0), (POSITION_ID, PAUSED_RATE, 0)]
+        assert controller.streams[0].confirmed_rate == ACTIVE_RATE
+        assert controller.streams[0].wanted_rate == ACTIVE_RATE
+        assert controller.streams[1].confirmed_rate == PAUSED_RATE
+        assert local_logger.warning_count == 1
+
+    def test_lagging_consumers(
+        self,
+        connection: RecordingConnection,
+        controller: stream_rate_controller.StreamRateController,
+    ) -> None:
+        """
+        A filling output queue halves the confirmed rate, not below the paused rate.
+        """
+        # Setup
+        confirm_all(controller)
+        sent = len(connection.mav.requests())
+
+        # Run
+        for _ in range(8):
+            controller.update(None, 1.0, False)
+            confirm_all(controller)
+
+        # Test
+        attitude_rates = [
+            rate
+            for message_id, rate, _ in connection.mav.requests()[sent:]
+            if message_id == ATTITUDE_ID
+        ]
+        assert attitude_rates[:3] == pytest.approx([10.0, 5.0, 2.5])
+        assert min(attitude_rates) == pytest.approx(PAUSED_RATE)
+        assert controller.streams[0].confirmed_rate == pytest.approx(PAUSED_RATE)
@@ -0,0 +1,215 @@
+"""
+Test sample-and-hold fusion with a fake connection, on every update and at a fixed rate.
+"""
+
+import time
+
+import pytest
+
+from tests.unit import fake_logger
+
+# Streaming telemetry logs through the common submodule
+pytest.importorskip("modules.common.modules.logger.logger")
+
+# Imported after the check above
+# pylint: disable-next=wrong-import-position
+from modules.telemetry import streaming_telemetry
+
+
+# Test functions use test fixture signature names and access class privates
+# No enable
+# pylint: disable=protected-access,redefined-outer-name
+
+
+OUTPUT_RATE = 20.0  # per second
+
+
+class FakeMessage:  # pylint: disable=too-many-instance-attributes
+    """
+    LOCAL_POSITION_NED or ATTITUDE with every value set to the same number.
+    """
+
+    def __init__(self, message_type: str, system_id: int, time_boot_ms: int, value: float) -> None:
+        self.message_type = message_type
+        self.system_id = system_id
+        self.time_boot_ms = time_boot_ms
+        for field in ("x", "y", "z", "vx", "vy", "vz"):
+            setattr(self, field, value)
+        for field in ("roll", "pitch", "yaw", "rollspeed", "pitchspeed", "yawspeed"):
+            setattr(self, field, value)
+
+    def get_type(self) -> str:
+        """
+        Same as MAVLink_message.get_type().
+        """
+        return self.message_type
+
+    def get_srcSystem(self) -> int:  # pylint: disable=invalid-name
+        """
+        Same as MAVLink_message.get_srcSystem().
+        """
+        return self.system_id
+
+
+class FakeConnection:
+    """
+    Hands out the messages it is given, waits on select() otherwise.
+    """
+
+    def __init__(self) -> None:
+        self.inbox: "list[FakeMessage]" = []
+        self.select_count = 0
+
+    def recv_match(
+        self,
+        type: "list[str]",  # pylint: disable=redefined-builtin
+        blocking: bool = False,
+    ) -> FakeMessage | None:
+        """
+        Same signature as mavfile.recv_match(), never blocks.
+        """
+        assert not blocking
+        while len(self.inbox) > 0:
+            msg = self.inbox.pop(0)
+            if msg.get_type() in type:
+                return msg
+        return None
+
+    def select(self, timeout: float) -> bool:
+        """
+        Same signature as mavfile.select(), nothing ever arrives while waiting.
+        """
+        self.select_count += 1
+        time.sleep(timeout)
+        return False
+
+
+def position(system_id: int, time_boot_ms: int, value: float) -> FakeMessage:
+    """
+    LOCAL_POSITION_NED of the system.
+    """
+    return FakeMessage("LOCAL_POSITION_NED", system_id, time_boot_ms, value)
+
+
+def attitude(system_id: int, time_boot_ms: int, value: float) -> FakeMessage:
+    """
+    ATTITUDE of the system.
+    """
+    return FakeMessage("ATTITUDE", system_id, time_boot_ms, value)
+
+
+def make_streaming(
+    connection: FakeConnection, output_rate: float | None
+) -> streaming_telemetry.StreamingTelemetry:
+    """
+    Streaming telemetry without alignment.
+    """
+    result, instance = streaming_telemetry.StreamingTelemetry.create(
+        connection, fake_logger.FakeLogger(), output_rate  # type: ignore
+    )
+    assert result
+    assert instance is not None
+    return instance
+
+
+@pytest.fixture()
+def connection() -> FakeConnection:  # type: ignore
+    """
+    Connection with nothing to read.
+    """
+    yield FakeConnection()  # type: ignore
+
+
+class TestOnUpdate:
+    """
+    One output per update once both halves are held.
+    """
+
+    def test_held_across_updates(self, connection: FakeConnection) -> None:
+        """
+        Nothing until both types arrived, then each update is fused with the held other half.
+        """
+        # Setup
+        streaming = make_streaming(connection, None)
+        connection.inbox = [position(1, 100, 1.0), attitude(1, 110, 2.0), attitude(1, 120, 3.0)]
+
+        # Run
+        first = streaming.run()
+        second = streaming.run()
+        third = streaming.run()
+
+        # Test
+        assert not first
+        assert len(second) == 1
+        assert (second[0].x, second[0].yaw, second[0].time_since_boot) == (1.0, 2.0, 110)
+        assert len(third) == 1
+        assert (third[0].x, third[0].yaw, third[0].time_since_boot) == (1.0, 3.0, 120)
+        assert third[0].system_id == 1
+        assert third[0].position_age >= third[0].attitude_age
+        assert connection.select_count == 0
+
+
+class TestFixedRate:
+    """
+    Every held system at each output time.
+    """
+
+    def test_every_system(self, connection: FakeConnection) -> None:
+        """
+        Each period outputs the latest of every system, even if nothing new arrived.
+        """
+        # Setup
+        streaming = make_streaming(connection, OUTPUT_RATE)
+        connection.inbox = [
+            position(1, 100, 1.0),
+            attitude(1, 100, 1.0),
+            position(2, 100, 5.0),
+            attitude(2, 100, 5.0),
+            position(1, 150, 2.0),
+        ]
+
+        # Run
+        first = streaming.run()
+        start = time.monotonic()
+        second = streaming.run()
+        waited = time.monotonic() - start
+
+        # Test
+        assert {data.system_id: data.x for data in first} == {1: 2.0, 2: 5.0}
+        assert {data.system_id: data.x for data in second} == {1: 2.0, 2: 5.0}
+        assert waited == pytest.approx(1.0 / OUTPUT_RATE, abs=0.02)
+        assert connection.select_count >= 1
+
+    def test_incomplete_left_out(self, connection: FakeConnection) -> None:
+        """
+        A system is not output until both types have been received.
+        """
+        # Setup
+        streaming = make_streaming(connection, OUTPUT_RATE)
+        connection.inbox = [position(1, 100, 1.0), attitude(1, 100, 1.0), position(2, 100, 5.0)]
+
+        # Run
+        outputs = streaming.run()
+
+        # Test
+        assert [data.system_id for data in outputs] == [1]
+
+    def test_held_keeps_arrival_time(self, connection: FakeConnection) -> None:
+        """
+        Data output again without updates is stamped with when its older half arrived.
+        """
+        # Setup
+        streaming = make_streaming(connection, OUTPUT_RATE)
+        connection.inbox = [position(1, 100, 1.0), attitude(1, 100, 1.0)]
+        before = time.monotonic()
+
+        # Run
+        first = streaming.run()
+        second = streaming.run()
+        after = time.monotonic()
+
+        # Test
+        assert len(first) == 1 and len(second) == 1
+        assert second[0].timestamp == first[0].timestamp
+        assert before <= second[0].timestamp <= before + 0.01
+        assert second[0].timestamp + second[0].position_age == pytest.approx(after, abs=0.01)
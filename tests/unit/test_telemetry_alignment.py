@@ -0,0 +1,199 @@
+"""
+Test interpolation of telemetry to a common timestamp.
+"""
+
+import math
+
+import numpy as np
+import pytest
+
+from modules.telemetry import telemetry_alignment
+
+
+# Test functions use test fixture signature names and access class privates
+# No enable
+# pylint: disable=protected-access,redefined-outer-name
+
+
+@pytest.fixture()
+def aligner() -> telemetry_alignment.TelemetryAligner:  # type: ignore
+    """
+    Empty aligner.
+    """
+    fusion = telemetry_alignment.TelemetryAligner(4)
+    yield fusion  # type: ignore
+
+
+class TestMessageHistory:
+    """
+    Ring buffer interpolation.
+    """
+
+    def test_linear_between_samples(self) -> None:
+        """
+        Value a quarter of the way between two samples.
+        """
+        # Setup
+        history = telemetry_alignment.MessageHistory(4, 2)
+        history.push(100.0, (0.0, 10.0))
+        history.push(200.0, (4.0, 20.0))
+        out = np.zeros(2)
+
+        # Run
+        result = history.interpolate(125.0, out)
+
+        # Test
+        assert result
+        np.testing.assert_allclose(out, [1.0, 12.5])
+
+    def test_angles_wrap_short_way(self) -> None:
+        """
+        Halfway from just below pi to just above -pi is pi, not 0.
+        """
+        # Setup
+        history = telemetry_alignment.MessageHistory(4, 1, 1)
+        history.push(0.0, (math.pi - 0.1,))
+        history.push(10.0, (-math.pi + 0.1,))
+        out = np.zeros(1)
+
+        # Run
+        result = history.interpolate(5.0, out)
+
+        # Test
+        assert result
+        assert abs(abs(out[0]) - math.pi) < 1e-9
+
+    def test_outside_range(self) -> None:
+        """
+        No extrapolation past the newest or before the oldest held sample.
+        """
+        # Setup
+        history = telemetry_alignment.MessageHistory(2, 1)
+        history.push(0.0, (0.0,))
+        history.push(10.0, (1.0,))
+        # Overwrites the sample at 0
+        history.push(20.0, (2.0,))
+        out = np.zeros(1)
+
+        # Run
+        after = history.interpolate(25.0, out)
+        before = history.interpolate(5.0, out)
+
+        # Test
+        assert not after
+        assert not before
+        assert history.count == 2
+
+    def test_out_of_order_rejected(self) -> None:
+        """
+        Older or repeated timestamps are not stored.
+        """
+        # Setup
+        history = telemetry_alignment.MessageHistory(4, 1)
+        history.push(10.0, (1.0,))
+
+        # Run
+        result = history.push(10.0, (2.0,))
+
+        # Test
+        assert not result
+        assert history.count == 1
+
+    def test_reboot_clears(self) -> None:
+        """
+        A jump far back is a restarted clock, the old samples are dropped.
+        """
+        # Setup
+        history = telemetry_alignment.MessageHistory(4, 1)
+        history.push(800.0, (1.0,))
+        history.push(900.0, (2.0,))
+        out = np.zeros(1)
+
+        # Run
+        result = history.push(100.0, (3.0,))
+
+        # Test
+        assert result
+        assert history.count == 1
+        assert history.latest_time() == 100.0
+        assert history.interpolate(100.0, out)
+        assert out[0] == 3.0
+
+    def test_short_reboot_clears(self) -> None:
+        """
+        A restart to just before the newest sample is taken once pushes keep being rejected.
+        """
+        # Setup
+        history = telemetry_alignment.MessageHistory(4, 1)
+        history.push(900.0, (1.0,))
+
+        # Run
+        results = [history.push(timestamp, (0.0,)) for timestamp in (700.0, 720.0, 740.0)]
+
+        # Test
+        assert results == [False, False, True]
+        assert history.count == 1
+        assert history.latest_time() == 740.0
+
+
+class TestTelemetryAligner:
+    """
+    Sampling both message types at the newest common timestamp.
+    """
+
+    def test_needs_both(self, aligner: telemetry_alignment.TelemetryAligner) -> None:
+        """
+        Nothing to sample with only one message type.
+        """
+        # Setup
+        aligner.add_position(100.0, (0.0, 0.0, 0.0, 0.0, 0.0, 0.0))
+
+        # Run
+        actual = aligner.sample()
+
+        # Test
+        assert actual is None
+
+    def test_position_interpolated_to_attitude(
+        self, aligner: telemetry_alignment.TelemetryAligner
+    ) -> None:
+        """
+        Attitude is behind, so position is sampled at the attitude time.
+        """
+        # Setup
+        aligner.add_position(0.0, (0.0, 0.0, 0.0, 1.0, 0.0, 0.0))
+        aligner.add_position(500.0, (5.0, 0.0, 0.0, 3.0, 0.0, 0.0))
+        aligner.add_attitude(100.0, (0.0, 0.0, 1.0, 0.0, 0.0, 0.0))
+
+        # Run
+        actual = aligner.sample()
+
+        # Test
+        assert actual == 100.0
+        np.testing.assert_allclose(aligner.position, [1.0, 0.0, 0.0, 1.4, 0.0, 0.0])
+        np.testing.assert_allclose(aligner.attitude, [0.0, 0.0, 1.0, 0.0, 0.0, 0.0])
+
+    def test_reboot(self, aligner: telemetry_alignment.TelemetryAligner) -> None:
+        """
+        After a reboot only samples from after it are combined.
+        """
+        # Setup
+        aligner.add_position(800.0, (1.0, 0.0, 0.0, 0.0, 0.0, 0.0))
+        aligner.add_attitude(800.0, (0.0, 0.0, 1.0, 0.0, 0.0, 0.0))
+        aligner.add_position(900.0, (2.0, 0.0, 0.0, 0.0, 0.0, 0.0))
+        aligner.add_attitude(900.0, (0.0, 0.0, 2.0, 0.0, 0.0, 0.0))
+        assert aligner.sample() == 900.0
+
+        # Run
+        accepted = aligner.add_position(50.0, (5.0, 0.0, 0.0, 0.0, 0.0, 0.0))
+        only_position = aligner.sample()
+        aligner.add_attitude(60.0, (0.0, 0.0, 0.5, 0.0, 0.0, 0.0))
+        aligner.add_position(70.0, (7.0, 0.0, 0.0, 0.0, 0.0, 0.0))
+        actual = aligner.sample()
+
+        # Test
+        assert accepted
+        assert only_position is None
+        assert actual == 60.0
+        np.testing.assert_allclose(aligner.position, [6.0, 0.0, 0.0, 0.0, 0.0, 0.0])
+        np.testing.assert_allclose(aligner.attitude, [0.0, 0.0, 0.5, 0.0, 0.0, 0.0])
@@ -0,0 +1,170 @@
+"""
+Test per consumer decimation of telemetry.
+"""
+
+import math
+
+import pytest
+
+from modules.telemetry import telemetry_decimator
+
+
+# Test functions use test fixture signature names and access class privates
+# No enable
+# pylint: disable=protected-access,redefined-outer-name
+
+
+class FakeTelemetryData:
+    """
+    Has the fields of TelemetryData without importing the logger.
+    """
+
+    def __init__(
+        self,
+        time_since_boot: int,
+        value: float,
+        system_id: int | None = None,
+        yaw: float | None = None,
+    ) -> None:
+        self.time_since_boot = time_since_boot
+        self.system_id = system_id
+        for field in telemetry_decimator.TelemetryDecimator.FIELDS:
+            setattr(self, field, value)
+        if yaw is not None:
+            self.yaw = yaw
+
+
+@pytest.fixture()
+def decimator() -> telemetry_decimator.TelemetryDecimator:  # type: ignore
+    """
+    Every sample, plus 1 Hz outputs of each mode.
+    """
+    fan_out = telemetry_decimator.TelemetryDecimator(
+        [
+            (None, telemetry_decimator.DecimationMode.LATEST),
+            (1.0, telemetry_decimator.DecimationMode.LATEST),
+            (1.0, telemetry_decimator.DecimationMode.AVERAGE),
+            (1.0, telemetry_decimator.DecimationMode.ENVELOPE),
+        ],
+        0.0,
+    )
+    yield fan_out  # type: ignore
+
+
+class TestTelemetryDecimator:
+    """
+    Rates and modes.
+    """
+
+    def test_every_sample(self, decimator: telemetry_decimator.TelemetryDecimator) -> None:
+        """
+        Output without a rate gets each sample straight away, the others wait.
+        """
+        # Setup
+        sample = FakeTelemetryData(0, 1.0)
+        decimator.add(sample)
+
+        # Run
+        due = decimator.poll(0.1)
+
+        # Test
+        assert due == [(0, sample)]
+
+    def test_modes_at_period_end(self, decimator: telemetry_decimator.TelemetryDecimator) -> None:
+        """
+        Latest, average and envelope of the samples of one period.
+        """
+        # Setup
+        for i, value in enumerate([1.0, 5.0, 3.0]):
+            decimator.add(FakeTelemetryData(i, value))
+            decimator.poll(0.1 * (i + 1))
+
+        # Run
+        due = dict(decimator.poll(1.0))
+
+        # Test
+        assert set(due.keys()) == {1, 2, 3}
+        assert due[1].x == 3.0
+        assert due[2].x == 3.0
+        # Angles are averaged on the unit circle
+        yaw = math.atan2(sum(map(math.sin, [1.0, 5.0, 3.0])), sum(map(math.cos, [1.0, 5.0, 3.0])))
+        assert due[2].yaw == pytest.approx(yaw)
+        assert due[2].time_since_boot == 2
+        assert due[3].count == 3
+        assert due[3].minimum.z == 1.0
+        assert due[3].maximum.z == 5.0
+
+    def test_empty_period_skipped(self, decimator: telemetry_decimator.TelemetryDecimator) -> None:
+        """
+        Nothing is output for a period without samples, and accumulators restart each period.
+        """
+        # Setup
+        decimator.add(FakeTelemetryData(0, 1.0))
+        decimator.poll(1.0)
+
+        # Run
+        quiet = decimator.poll(2.0)
+        decimator.add(FakeTelemetryData(1, 9.0))
+        due = dict(decimator.poll(3.0))
+
+        # Test
+        assert not quiet
+        assert due[2].x == 9.0
+        assert due[3].minimum.x == 9.0
+
+    def test_time_until_next(self, decimator: telemetry_decimator.TelemetryDecimator) -> None:
+        """
+        No wake up needed until a sample is pending.
+        """
+        # Setup
+        idle = decimator.time_until_next(0.0)
+        decimator.add(FakeTelemetryData(0, 1.0))
+        decimator.poll(0.25)
+
+        # Run
+        pending = decimator.time_until_next(0.25)
+
+        # Test
+        assert idle is None
+        assert pending == 0.75
+
+    def test_systems_kept_apart(self, decimator: telemetry_decimator.TelemetryDecimator) -> None:
+        """
+        Each vehicle gets its own latest, average and envelope.
+        """
+        # Setup
+        decimator.add(FakeTelemetryData(0, 1.0, 1))
+        decimator.add(FakeTelemetryData(0, 10.0, 2))
+        decimator.add(FakeTelemetryData(1, 3.0, 1))
+        decimator.poll(0.1)
+
+        # Run
+        due = decimator.poll(1.0)
+
+        # Test
+        latest = {value.system_id: value.x for index, value in due if index == 1}
+        average = {value.system_id: value.x for index, value in due if index == 2}
+        envelope = {value.minimum.system_id: value.count for index, value in due if index == 3}
+        assert latest == {1: 3.0, 2: 10.0}
+        assert average == {1: 2.0, 2: 10.0}
+        assert envelope == {1: 2, 2: 1}
+        assert decimator.time_until_next(1.0) is None
+
+    def test_angles_across_wrap(self, decimator: telemetry_decimator.TelemetryDecimator) -> None:
+        """
+        Headings either side of +-pi average to pi and their range is the short arc between them.
+        """
+        # Setup
+        for i, yaw in enumerate([3.0, -3.0, 3.1]):
+            decimator.add(FakeTelemetryData(i, 1.0, yaw=yaw))
+        decimator.poll(0.1)
+
+        # Run
+        due = dict(decimator.poll(1.0))
+
+        # Test
+        assert abs(due[2].yaw) == pytest.approx(3.1, abs=0.05)
+        assert due[2].x == 1.0
+        assert due[3].minimum.yaw == pytest.approx(3.0)
+        assert due[3].maximum.yaw == pytest.approx(-3.0)
+        assert due[3].minimum.x == 1.0
@@ -0,0 +1,138 @@
+"""
+Test the columnar telemetry history.
+"""
+
+import numpy as np
+import pytest
+
+from modules.telemetry import telemetry_history
+
+
+# Test functions use test fixture signature names and access class privates
+# No enable
+# pylint: disable=protected-access,redefined-outer-name
+
+
+CAPACITY = 4
+
+
+class FakeTelemetryData:
+    """
+    Has the fields of TelemetryData without importing the logger.
+    """
+
+    def __init__(self, time_since_boot: int, value: float) -> None:
+        self.time_since_boot = time_since_boot
+        for field in telemetry_history.TelemetryHistory.FIELDS:
+            setattr(self, field, value)
+
+
+@pytest.fixture()
+def history() -> telemetry_history.TelemetryHistory:  # type: ignore
+    """
+    History holding samples 0 to 5 at 100 ms apart, so 2 to 5 remain.
+    """
+    store = telemetry_history.TelemetryHistory(CAPACITY)
+    for i in range(6):
+        store.append(FakeTelemetryData(i * 100, float(i)))
+    yield store  # type: ignore
+
+
+class TestTelemetryHistory:
+    """
+    Windows and statistics.
+    """
+
+    def test_last_after_wrap(self, history: telemetry_history.TelemetryHistory) -> None:
+        """
+        Newest samples in order, oldest first, after the buffer wrapped.
+        """
+        # Run
+        times, columns = history.last(3)
+
+        # Test
+        np.testing.assert_array_equal(times, [300.0, 400.0, 500.0])
+        np.testing.assert_array_equal(columns[history.field_index("z")], [3.0, 4.0, 5.0])
+        assert len(history) == CAPACITY
+
+    def test_last_is_view(self, history: telemetry_history.TelemetryHistory) -> None:
+        """
+        No copy is made.
+        """
+        # Run
+        _, columns = history.last(CAPACITY)
+
+        # Test
+        assert columns.base is not None
+
+    def test_last_clamped(self) -> None:
+        """
+        Asking for more than is held.
+        """
+        # Setup
+        store = telemetry_history.TelemetryHistory(CAPACITY)
+        store.append(FakeTelemetryData(0, 1.0))
+
+        # Run
+        times, columns = store.last(10)
+
+        # Test
+        assert times.shape == (1,)
+        assert columns.shape == (len(telemetry_history.TelemetryHistory.FIELDS), 1)
+
+    def test_since(self, history: telemetry_history.TelemetryHistory) -> None:
+        """
+        Samples at or after the timestamp.
+        """
+        # Run
+        times, _ = history.since(350)
+
+        # Test
+        np.testing.assert_array_equal(times, [400.0, 500.0])
+
+    def test_statistics(self, history: telemetry_history.TelemetryHistory) -> None:
+        """
+        Per field mean, minimum, maximum and variance.
+        """
+        # Setup
+        _, columns = history.last(CAPACITY)
+        x = history.field_index("x")
+
+        # Run
+        stats = telemetry_history.TelemetryHistory.statistics(columns)
+
+        # Test
+        assert stats is not None
+        assert stats.count == CAPACITY
+        assert stats.mean[x] == 3.5
+        assert stats.minimum[x] == 2.0
+        assert stats.maximum[x] == 5.0
+        assert stats.variance[x] == 1.25
+
+    def test_statistics_empty(self, history: telemetry_history.TelemetryHistory) -> None:
+        """
+        No statistics for an empty window.
+        """
+        # Setup
+        _, columns = history.since(1000)
+
+        # Run
+        stats = telemetry_history.TelemetryHistory.statistics(columns)
+
+        # Test
+        assert stats is None
+
+    def test_float32(self) -> None:
+        """
+        Fields stored as float32, timestamps keep full precision.
+        """
+        # Setup
+        store = telemetry_history.TelemetryHistory(CAPACITY, True)
+        store.append(FakeTelemetryData(123456789, 1.0))
+
+        # Run
+        times, columns = store.last(1)
+
+        # Test
+        assert columns.dtype == np.float32
+        assert times[0] == 123456789.0
@@ -0,0 +1,85 @@
+"""
+Test token bucket rate limiting.
+"""
+
+import math
+
+import pytest
+
+from modules.connection import token_bucket
+
+
+# Test functions use test fixture signature names and access class privates
+# No enable
+# pylint: disable=protected-access,redefined-outer-name
+
+
+RATE = 2.0  # tokens per second
+BURST = 3.0
+
+
+@pytest.fixture()
+def bucket() -> token_bucket.TokenBucket:  # type: ignore
+    """
+    Full bucket created at time 0.
+    """
+    limiter = token_bucket.TokenBucket(RATE, BURST, 0.0)
+    yield limiter  # type: ignore
+
+
+class TestTokenBucket:
+    """
+    Token consumption and refill.
+    """
+
+    def test_burst_then_limited(self, bucket: token_bucket.TokenBucket) -> None:
+        """
+        A full bucket allows a burst and then refuses.
+        """
+        # Run
+        actual = [bucket.try_consume(0.0) for _ in range(4)]
+
+        # Test
+        assert actual == [True, True, True, False]
+
+    def test_refill_at_rate(self, bucket: token_bucket.TokenBucket) -> None:
+        """
+        Tokens come back at the configured rate.
+        """
+        # Setup
+        for _ in range(3):
+            bucket.try_consume(0.0)
+
+        # Run
+        too_early = bucket.try_consume(0.4)
+        on_time = bucket.try_consume(0.5)
+
+        # Test
+        assert not too_early
+        assert on_time
+
+    def test_refill_capped_at_burst(self, bucket: token_bucket.TokenBucket) -> None:
+        """
+        Idle time does not accumulate more than the burst.
+        """
+        # Run
+        actual = [bucket.try_consume(100.0) for _ in range(4)]
+
+        # Test
+        assert actual == [True, True, True, False]
+
+    def test_time_until_available(self, bucket: token_bucket.TokenBucket) -> None:
+        """
+        Waiting time for the next token.
+        """
+        # Setup
+        for _ in range(3):
+            bucket.try_consume(0.0)
+        expected = 0.5
+
+        # Run
+        actual = bucket.time_until_available(0.0)
+
+        # Test
+        assert math.isclose(actual, expected)
+        assert bucket.time_until_available(1.0) == 0.0
@@ -0,0 +1,105 @@
+"""
+Constant time and memory statistics over a stream of vectors.
+"""
+
+import numpy as np
+
+
+class CumulativeStatistics:
+    """
+    Mean and variance of everything seen, with Welford's algorithm.
+    """
+
+    def __init__(self, width: int = 1) -> None:
+        """
+        width: Number of values in each sample.
+        """
+        self.count = 0
+        self.mean = np.zeros(width)
+        self.__squared_deviations = np.zeros(width)
+
+    def add(self, values: "np.ndarray | tuple[float, ...]") -> None:
+        """
+        Include a sample.
+        """
+        self.count += 1
+        delta = values - self.mean
+        self.mean += delta / self.count
+        self.__squared_deviations += delta * (values - self.mean)
+
+    @property
+    def variance(self) -> np.ndarray:
+        """
+        Population variance, zero before the first sample.
+        """
+        if self.count == 0:
+            return np.zeros_like(self.mean)
+        return self.__squared_deviations / self.count
+
+
+class SlidingWindowMean:
+    """
+    Mean of the last `size` samples, from a running sum over a ring buffer.
+
+    The sum is recomputed from the buffer once per lap so rounding error cannot build up.
+    """
+
+    def __init__(self, size: int, width: int = 1) -> None:
+        """
+        size: Number of samples in the window.
+        width: Number of values in each sample.
+        """
+        assert size > 0, "Window size must be positive"
+
+        self.size = size
+        self.__samples = np.zeros((size, width))
+        self.__sum = np.zeros(width)
+        self.__next = 0
+        self.count = 0
+
+    def add(self, values: "np.ndarray | tuple[float, ...]") -> None:
+        """
+        Include a sample, dropping the oldest once the window is full.
+        """
+        self.__sum -= self.__samples[self.__next]
+        self.__samples[self.__next] = values
+        self.__sum += self.__samples[self.__next]
+        self.__next = (self.__next + 1) % self.size
+        self.count = min(self.count + 1, self.size)
+
+        if self.__next == 0:
+            self.__sum = self.__samples.sum(axis=0)
+
+    @property
+    def mean(self) -> np.ndarray:
+        """
+        Mean of the window, zero before the first sample.
+        """
+        return self.__sum / max(1, self.count)
+
+
+class ExponentialMovingAverage:
+    """
+    Average weighting recent samples by alpha and older ones by powers of (1 - alpha).
+    """
+
+    def __init__(self, alpha: float, width: int = 1) -> None:
+        """
+        alpha: Weight of the newest sample, between 0 and 1.
+        width: Number of values in each sample.
+        """
+        assert 0.0 < alpha <= 1.0, "Alpha must be in (0, 1]"
+
+        self.alpha = alpha
+        self.mean = np.zeros(width)
+        self.count = 0
+
+    def add(self, values: "np.ndarray | tuple[float, ...]") -> None:
+        """
+        Include a sample, the first one initializes the average.
+        """
+        if self.count == 0:
+            self.mean[:] = values
+        else:
+            self.mean += self.alpha * (values - self.mean)
+        self.count += 1
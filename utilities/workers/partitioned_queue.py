@@ -0,0 +1,159 @@
+"""
+Queue split into partitions, with items routed by key so one key always reaches one worker.
+"""
+
+import bisect
+import hashlib
+
+from utilities.workers import queue_proxy_wrapper
+
+
+def stable_hash(key: object) -> int:
+    """
+    64 bit hash of str(key), the same in every process unlike hash().
+    """
+    digest = hashlib.blake2b(str(key).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
+
+class ConsistentHashRing:
+    """
+    Maps keys to partitions with consistent hashing.
+
+    Each partition owns several points (virtual nodes) on a ring of 64 bit hashes,
+    and a key belongs to the partition of the first point at or after its hash.
+    Changing the number of partitions only moves the keys of the partitions added or removed.
+    """
+
+    def __init__(self, partition_count: int, virtual_nodes: int = 64) -> None:
+        """
+        virtual_nodes: Points per partition, more spread the keys more evenly.
+        """
+        assert partition_count >= 1, "At least one partition"
+        assert virtual_nodes >= 1, "At least one point per partition"
+
+        self.partition_count = partition_count
+        points = sorted(
+            (stable_hash(f"{partition}#{node}"), partition)
+            for partition in range(partition_count)
+            for node in range(virtual_nodes)
+        )
+        self.__hashes = [point_hash for point_hash, _ in points]
+        self.__partitions = [partition for _, partition in points]
+
+    def partition(self, key: object) -> int:
+        """
+        Partition index of the key.
+        """
+        index = bisect.bisect_left(self.__hashes, stable_hash(key))
+        if index == len(self.__hashes):
+            # Past the last point, wrap around to the first
+            index = 0
+        return self.__partitions[index]
+
+
+class _PartitionRouter:
+    """
+    Stand-in for `QueueProxyWrapper.queue` where puts go to the partition of the item's key.
+    """
+
+    def __init__(self, partitioned: "PartitionedQueue") -> None:
+        self._partitioned = partitioned
+
+    def put(self, item: object, block: bool = True, timeout: float | None = None) -> None:
+        """
+        Put into the partition of the item, sentinels (None) go to every partition.
+        """
+        for partition in self._partitioned.partitions_of(item):
+            partition.queue.put(item, block, timeout)
+
+    def put_nowait(self, item: object) -> None:
+        """
+        put() without blocking, raises queue.Full if the partition is full.
+        """
+        self.put(item, False)
+
+    def qsize(self) -> int:
+        """
+        Items waiting across all partitions.
+        """
+        return sum(partition.queue.qsize() for partition in self._partitioned.partitions)
+
+    def empty(self) -> bool:
+        """
+        Whether every partition is empty.
+        """
+        return all(partition.queue.empty() for partition in self._partitioned.partitions)
+
+
+class PartitionedQueue:
+    """
+    Drop-in for QueueProxyWrapper on the producer side, one partition per consumer.
+
+    Items are routed by their `key_field` attribute with a ConsistentHashRing, so all items
+    with the same key (e.g. the system ID of a vehicle) reach the same consumer and its state
+    stays correct while consumers scale out. Each consumer reads its own partition.
+    """
+
+    def __init__(
+        self,
+        partitions: "list[queue_proxy_wrapper.QueueProxyWrapper]",
+        key_field: str,
+        virtual_nodes: int = 64,
+    ) -> None:
+        """
+        partitions: One queue per consumer.
+        key_field: Attribute of the items to route by.
+        """
+        assert len(partitions) >= 1, "At least one partition"
+
+        self.partitions = partitions
+        self.key_field = key_field
+        self.ring = ConsistentHashRing(len(partitions), virtual_nodes)
+        self.maxsize = sum(partition.maxsize for partition in partitions)
+        if any(partition.maxsize <= 0 for partition in partitions):
+            self.maxsize = 0
+
+        self.queue = _PartitionRouter(self)
+        # Keys are few (e.g. vehicles), so remember where each goes instead of hashing every put
+        self.__routes: "dict[object, int]" = {}
+
+    def partition_index(self, key: object) -> int:
+        """
+        Partition index of the key.
+        """
+        index = self.__routes.get(key)
+        if index is None:
+            index = self.ring.partition(key)
+            self.__routes[key] = index
+        return index
+
+    def partitions_of(self, item: object) -> "list[queue_proxy_wrapper.QueueProxyWrapper]":
+        """
+        Partitions the item is put into.
+        """
+        if item is None:
+            return self.partitions
+
+        return [self.partitions[self.partition_index(getattr(item, self.key_field))]]
+
+    def fill_queue_with_sentinel(self, timeout: float = 0.0) -> None:
+        """
+        Fills every partition with sentinel (None).
+        """
+        for partition in self.partitions:
+            partition.fill_queue_with_sentinel(timeout)
+
+    def drain_queue(self, timeout: float = 0.0) -> None:
+        """
+        Drains every partition.
+        """
+        for partition in self.partitions:
+            partition.drain_queue(timeout)
+
+    def fill_and_drain_queue(self) -> None:
+        """
+        Fill with sentinel and then drain, every partition.
+        """
+        for partition in self.partitions:
+            partition.fill_and_drain_queue()
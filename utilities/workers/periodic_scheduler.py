@@ -0,0 +1,209 @@
+"""
+Periodic callbacks run from one thread at absolute deadlines.
+"""
+
+import enum
+import heapq
+import itertools
+import math
+import time
+from typing import Callable
+
+from utilities.statistics import running_statistics
+
+
+class MissedPolicy(enum.Enum):
+    """
+    What a task does about deadlines that passed while it could not run.
+    """
+
+    # Run once for every deadline missed, back to back
+    CATCH_UP = 0
+    # Run once, and count the rest as skipped
+    SKIP = 1
+
+
+class TaskStatistics:
+    """
+    Struct of how on time a task ran.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        run_count: int,
+        skipped_count: int,
+        mean_jitter: float,
+        jitter_std: float,
+        max_jitter: float,
+    ) -> None:
+        """
+        mean_jitter, jitter_std, max_jitter: Seconds between a deadline and running for it.
+        """
+        self.name = name
+        self.run_count = run_count
+        self.skipped_count = skipped_count
+        self.mean_jitter = mean_jitter
+        self.jitter_std = jitter_std
+        self.max_jitter = max_jitter
+
+    def __str__(self) -> str:
+        return (
+            f"{self.name}: {self.run_count} runs, {self.skipped_count} skipped, jitter "
+            f"{self.mean_jitter * 1000.0:.3f} +- {self.jitter_std * 1000.0:.3f} ms, "
+            f"max {self.max_jitter * 1000.0:.3f} ms"
+        )
+
+
+class _Task:  # pylint: disable=too-many-instance-attributes
+    """
+    A callback and its schedule.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        period: float,
+        callback: Callable[[], object],
+        policy: MissedPolicy,
+        deadline: float,
+    ) -> None:
+        self.name = name
+        self.period = period
+        self.callback = callback
+        self.policy = policy
+        self.deadline = deadline
+        self.run_count = 0
+        self.skipped_count = 0
+        self.jitter = running_statistics.CumulativeStatistics(1)
+        self.max_jitter = 0.0
+        self.removed = False
+
+
+class PeriodicScheduler:
+    """
+    Runs every task at start + n * period for increasing n, from a heap of deadlines.
+
+    Deadlines are computed from the start rather than from when the previous run ended,
+    so time spent working and sleeping late does not add up over a long run. Lateness
+    (jitter) is measured against the deadline on every run.
+    """
+
+    def __init__(
+        self,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        """
+        clock, sleep: Time source in seconds and how to wait on it.
+        """
+        self.__clock = clock
+        self.__sleep = sleep
+        self.__tasks: "dict[str, _Task]" = {}
+        # (deadline, insertion order, task), the order breaks ties without comparing tasks
+        self.__heap: "list[tuple[float, int, _Task]]" = []
+        self.__order = itertools.count()
+
+    def add(
+        self,
+        name: str,
+        period: float,
+        callback: Callable[[], object],
+        policy: MissedPolicy = MissedPolicy.SKIP,
+        delay: float = 0.0,
+    ) -> None:
+        """
+        Run the callback every period seconds, the first time after delay seconds.
+        """
+        assert period > 0.0, "Period must be positive"
+        assert name not in self.__tasks, "Task names must be unique"
+
+        task = _Task(name, period, callback, policy, self.__clock() + delay)
+        self.__tasks[name] = task
+        heapq.heappush(self.__heap, (task.deadline, next(self.__order), task))
+
+    def remove(self, name: str) -> None:
+        """
+        Stop running the task, it leaves the heap when its deadline comes up.
+        """
+        task = self.__tasks.pop(name)
+        task.removed = True
+
+    @property
+    def next_deadline(self) -> float | None:
+        """
+        Earliest deadline of any task, None without tasks.
+        """
+        self.__drop_removed()
+        if len(self.__heap) == 0:
+            return None
+        return self.__heap[0][0]
+
+    def run_pending(self) -> int:
+        """
+        Run every task with a deadline up to now, in deadline order.
+
+        Returns the number of runs.
+        """
+        # Deadlines that pass while running wait for the next call, so a callback slower
+        # than its period cannot keep this from returning
+        now = self.__clock()
+        runs = 0
+        while True:
+            self.__drop_removed()
+            if len(self.__heap) == 0 or self.__heap[0][0] > now:
+                return runs
+
+            deadline, _, task = heapq.heappop(self.__heap)
+            started = self.__clock()
+            jitter = max(0.0, started - deadline)
+            task.jitter.add((jitter,))
+            task.max_jitter = max(task.max_jitter, jitter)
+            task.run_count += 1
+            runs += 1
+
+            task.deadline = deadline + task.period
+            if task.policy == MissedPolicy.SKIP and task.deadline <= started:
+                missed = math.floor((started - task.deadline) / task.period) + 1
+                task.skipped_count += missed
+                task.deadline += missed * task.period
+
+            try:
+                task.callback()
+            finally:
+                if not task.removed:
+                    heapq.heappush(self.__heap, (task.deadline, next(self.__order), task))
+
+    def run_next(self, max_wait: float) -> int:
+        """
+        Wait for the next deadline, at most max_wait seconds, then run what is due.
+
+        Returns the number of runs.
+        """
+        deadline = self.next_deadline
+        now = self.__clock()
+        wait = max_wait if deadline is None else min(max_wait, deadline - now)
+        if wait > 0.0:
+            self.__sleep(wait)
+
+        return self.run_pending()
+
+    def statistics(self) -> "list[TaskStatistics]":
+        """
+        Runs and jitter of every task, in the order added.
+        """
+        return [
+            TaskStatistics(
+                task.name,
+                task.run_count,
+                task.skipped_count,
+                float(task.jitter.mean[0]),
+                math.sqrt(float(task.jitter.variance[0])),
+                task.max_jitter,
+            )
+            for task in self.__tasks.values()
+        ]
+
+    def __drop_removed(self) -> None:
+        while len(self.__heap) > 0 and self.__heap[0][2].removed:
+            heapq.heappop(self.__heap)
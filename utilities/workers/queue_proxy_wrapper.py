@@ -7,6 +7,90 @@ import queue
 import time
 
 
+class _Stamped:
+    """
+    Queued item with the time it stops being useful.
+    """
+
+    def __init__(self, item: object, expiry: float) -> None:
+        self.item = item
+        self.expiry = expiry
+
+
+class _DeadlineQueue:
+    """
+    Stand-in for the queue proxy that stamps items on put and drops expired ones on get.
+
+    An item is created at its `timestamp` attribute (time.monotonic()) if it has one,
+    otherwise when it is put. Sentinels (None) never expire.
+    """
+
+    def __init__(self, proxy: object, deadline: float) -> None:
+        self._proxy = proxy
+        self._deadline = deadline
+        self.expired_count = 0
+
+    def put(self, item: object, block: bool = True, timeout: float | None = None) -> None:
+        """
+        Same as Queue.put().
+        """
+        if item is not None:
+            created = getattr(item, "timestamp", None)
+            if created is None:
+                created = time.monotonic()
+            item = _Stamped(item, created + self._deadline)
+
+        self._proxy.put(item, block, timeout)
+
+    def put_nowait(self, item: object) -> None:
+        """
+        Same as Queue.put_nowait().
+        """
+        self.put(item, False)
+
+    def get(self, block: bool = True, timeout: float | None = None) -> object:
+        """
+        Same as Queue.get(), skipping expired items while time is left.
+        """
+        end = None if timeout is None else time.monotonic() + timeout
+        while True:
+            entry = self._proxy.get(block, timeout)
+            if entry is None:
+                return None
+
+            now = time.monotonic()
+            if now <= entry.expiry:
+                return entry.item
+
+            self.expired_count += 1
+            if end is not None:
+                timeout = max(0.0, end - now)
+
+    def get_nowait(self) -> object:
+        """
+        Same as Queue.get_nowait().
+        """
+        return self.get(False)
+
+    def qsize(self) -> int:
+        """
+        Items waiting, including expired ones not yet dropped.
+        """
+        return self._proxy.qsize()
+
+    def empty(self) -> bool:
+        """
+        Same as Queue.empty().
+        """
+        return self._proxy.empty()
+
+    def full(self) -> bool:
+        """
+        Same as Queue.full().
+        """
+        return self._proxy.full()
+
+
 class QueueProxyWrapper:
     """
     Wrapper for an underlying queue proxy which also stores `maxsize`.
@@ -17,9 +101,29 @@ class QueueProxyWrapper:
     __QUEUE_TIMEOUT = 0.1  # seconds
     __QUEUE_DELAY = 0.1  # seconds
 
-    def __init__(self, mp_manager: multiprocessing.managers.SyncManager, maxsize: int = 0) -> None:
+    def __init__(
+        self,
+        mp_manager: multiprocessing.managers.SyncManager,
+        maxsize: int = 0,
+        deadline: float | None = None,
+    ) -> None:
+        """
+        deadline: Seconds after creation an item is dropped at dequeue instead of returned,
+            None to keep everything.
+        """
         self.queue = mp_manager.Queue(maxsize)
+        if deadline is not None:
+            assert deadline > 0.0, "Deadline must be positive"
+            self.queue = _DeadlineQueue(self.queue, deadline)
         self.maxsize = maxsize
+        self.deadline = deadline
+
+    @property
+    def expired_count(self) -> int:
+        """
+        Items dropped past their deadline by this process.
+        """
+        return getattr(self.queue, "expired_count", 0)
 
     def fill_queue_with_sentinel(self, timeout: float = 0.0) -> None:
         """
@@ -45,6 +45,16 @@ class WorkerController:
         self.__pause.acquire()
         self.__pause.release()
 
+    def is_paused(self) -> bool:
+        """
+        Returns whether main has requested worker processes to pause, without blocking.
+        """
+        if not self.__pause.acquire(False):
+            return True
+
+        self.__pause.release()
+        return False
+
     def request_exit(self) -> None:
         """
         Requests worker processes to exit.